@@ -0,0 +1,79 @@
+"""patient_journey_state
+
+Revision ID: a3f1c8e5d920
+Revises: e7b2c9d4a1f6
+Create Date: 2026-10-17 15:00:00.000000
+
+Materialized current journey stage per (patient, journey):
+- patient_journey_state table, indexed for (journey_key, stage, entered_at)
+  range scans and stage-only filters
+- Backfill: latest journey_logs row per (patient, journey), plus journeys
+  only present in patients.journey_status (entered_at NULL: unknown, so
+  stale-journey timeout scans skip them)
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f1c8e5d920"
+down_revision: Union[str, Sequence[str], None] = "e7b2c9d4a1f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create patient_journey_state and backfill it."""
+    op.create_table(
+        "patient_journey_state",
+        sa.Column("patient_id", sa.Uuid(), nullable=False),
+        sa.Column("journey_key", sa.String(length=100), nullable=False),
+        sa.Column("stage", sa.String(length=50), nullable=False),
+        sa.Column(
+            "entered_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["patient_id"], ["patients.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("patient_id", "journey_key"),
+    )
+    op.create_index(
+        "ix_patient_journey_state_stage",
+        "patient_journey_state",
+        ["journey_key", "stage", "entered_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_patient_journey_state_stage_only",
+        "patient_journey_state",
+        ["stage"],
+        unique=False,
+    )
+
+    op.execute("""
+        INSERT INTO patient_journey_state (patient_id, journey_key, stage, entered_at)
+        SELECT DISTINCT ON (patient_id, journey_key)
+            patient_id, journey_key, stage, entered_at
+        FROM (
+            SELECT patient_id, journey_key, to_stage AS stage,
+                   changed_at AS entered_at, 0 AS source
+            FROM journey_logs
+            UNION ALL
+            SELECT p.id, js.key, js.value, NULL::timestamptz, 1
+            FROM patients p, jsonb_each_text(p.journey_status) AS js
+            WHERE jsonb_typeof(p.journey_status) = 'object'
+        ) AS candidates
+        ORDER BY patient_id, journey_key, source, entered_at DESC
+    """)
+
+
+def downgrade() -> None:
+    """Drop patient_journey_state."""
+    op.drop_index(
+        "ix_patient_journey_state_stage_only", table_name="patient_journey_state"
+    )
+    op.drop_index("ix_patient_journey_state_stage", table_name="patient_journey_state")
+    op.drop_table("patient_journey_state")
@@ -0,0 +1,76 @@
+"""cortex_pipeline_traces
+
+Revision ID: a7c3e9f1b5d4
+Revises: f3b8d1e5a7c2
+Create Date: 2026-10-18 02:00:00.000000
+
+Per-run timing summary of Cortex pipelines (stage wall time, queue wait,
+model, tokens, evidence size, finalizer and ledger timings).
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e9f1b5d4"
+down_revision: Union[str, Sequence[str], None] = "f3b8d1e5a7c2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create cortex_pipeline_traces."""
+    op.create_table(
+        "cortex_pipeline_traces",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("pipeline_name", sa.String(length=100), nullable=False),
+        sa.Column("organization_id", sa.Uuid(), nullable=False),
+        sa.Column("clinical_entry_id", sa.Uuid(), nullable=True),
+        sa.Column("privacy_tier", sa.String(length=20), nullable=True),
+        sa.Column("succeeded", sa.Boolean(), nullable=False),
+        sa.Column("failed_step", sa.String(length=50), nullable=True),
+        sa.Column("total_ms", sa.Integer(), nullable=False),
+        sa.Column("finalize_ms", sa.Integer(), nullable=True),
+        sa.Column("ledger_ms", sa.Integer(), nullable=True),
+        sa.Column("tokens_input", sa.Integer(), nullable=False),
+        sa.Column("tokens_output", sa.Integer(), nullable=False),
+        sa.Column("stages", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organizations.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_cortex_pipeline_traces_organization_id"),
+        "cortex_pipeline_traces",
+        ["organization_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_cortex_pipeline_traces_created_at"),
+        "cortex_pipeline_traces",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop cortex_pipeline_traces."""
+    op.drop_index(
+        op.f("ix_cortex_pipeline_traces_created_at"),
+        table_name="cortex_pipeline_traces",
+    )
+    op.drop_index(
+        op.f("ix_cortex_pipeline_traces_organization_id"),
+        table_name="cortex_pipeline_traces",
+    )
+    op.drop_table("cortex_pipeline_traces")
@@ -0,0 +1,99 @@
+"""durable_job_queue
+
+Revision ID: b6d2e4f8a9c1
+Revises: a3f1c8e5d920
+Create Date: 2026-10-17 18:00:00.000000
+
+Postgres-backed job queue replacing FastAPI BackgroundTasks for clinical
+work (Cortex analysis, vault sanitization):
+- jobs table with status, priority, attempts, lease and heartbeat columns
+- Partial indexes for the worker claim (QUEUED by priority, expired
+  RUNNING leases) and a unique active dedupe key
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b6d2e4f8a9c1"
+down_revision: Union[str, Sequence[str], None] = "a3f1c8e5d920"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the jobs table."""
+    job_status = sa.Enum("QUEUED", "RUNNING", "SUCCEEDED", "FAILED", name="jobstatus")
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("kind", sa.String(length=100), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("status", job_status, server_default="QUEUED", nullable=False),
+        sa.Column("priority", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("dedupe_key", sa.String(length=255), nullable=True),
+        sa.Column("organization_id", sa.Uuid(), nullable=True),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("max_attempts", sa.Integer(), server_default="3", nullable=False),
+        sa.Column(
+            "run_after",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("locked_by", sa.String(length=100), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organizations.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_jobs_organization_id", "jobs", ["organization_id"], unique=False
+    )
+    op.create_index(
+        "ix_jobs_queued",
+        "jobs",
+        [sa.text("priority DESC"), "run_after"],
+        unique=False,
+        postgresql_where=sa.text("status = 'QUEUED'"),
+    )
+    op.create_index(
+        "ix_jobs_running_lease",
+        "jobs",
+        ["lease_expires_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'RUNNING'"),
+    )
+    op.create_index(
+        "ix_jobs_active_dedupe_key",
+        "jobs",
+        ["dedupe_key"],
+        unique=True,
+        postgresql_where=sa.text(
+            "status IN ('QUEUED', 'RUNNING') AND dedupe_key IS NOT NULL"
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Drop the jobs table."""
+    op.drop_index("ix_jobs_active_dedupe_key", table_name="jobs")
+    op.drop_index("ix_jobs_running_lease", table_name="jobs")
+    op.drop_index("ix_jobs_queued", table_name="jobs")
+    op.drop_index("ix_jobs_organization_id", table_name="jobs")
+    op.drop_table("jobs")
+    sa.Enum(name="jobstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,67 @@
+"""scheduled_job_runs
+
+Revision ID: c8a4f2e6b1d3
+Revises: b6d2e4f8a9c1
+Create Date: 2026-10-17 20:00:00.000000
+
+Run history of the leader-elected periodic scheduler (one row per run of
+stale_journey_monitor, stale_leads_monitor, conversation_analyzer, ...).
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c8a4f2e6b1d3"
+down_revision: Union[str, Sequence[str], None] = "b6d2e4f8a9c1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create scheduled_job_runs."""
+    op.create_table(
+        "scheduled_job_runs",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("job_id", sa.String(length=100), nullable=False),
+        sa.Column("instance", sa.String(length=255), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("RUNNING", "SUCCEEDED", "FAILED", name="scheduledrunstatus"),
+            nullable=False,
+        ),
+        sa.Column("stats", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column(
+            "started_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_scheduled_job_runs_job_started",
+        "scheduled_job_runs",
+        ["job_id", "started_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_scheduled_job_runs_started",
+        "scheduled_job_runs",
+        ["started_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop scheduled_job_runs."""
+    op.drop_index("ix_scheduled_job_runs_started", table_name="scheduled_job_runs")
+    op.drop_index("ix_scheduled_job_runs_job_started", table_name="scheduled_job_runs")
+    op.drop_table("scheduled_job_runs")
+    sa.Enum(name="scheduledrunstatus").drop(op.get_bind(), checkfirst=True)
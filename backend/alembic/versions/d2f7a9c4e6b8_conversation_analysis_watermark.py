@@ -0,0 +1,40 @@
+"""conversation analysis watermark
+
+Revision ID: d2f7a9c4e6b8
+Revises: c8a4f2e6b1d3
+Create Date: 2026-10-17 22:00:00.000000
+
+Per-patient watermark on daily_conversation_analyses: the conversation
+analyzer only sends messages newer than the last analyzed one.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d2f7a9c4e6b8"
+down_revision: Union[str, Sequence[str], None] = "c8a4f2e6b1d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add last_message_at / last_message_id."""
+    op.add_column(
+        "daily_conversation_analyses",
+        sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "daily_conversation_analyses",
+        sa.Column("last_message_id", sa.Uuid(), nullable=True),
+    )
+    # Existing analyses covered every message received before they were made
+    op.execute("UPDATE daily_conversation_analyses SET last_message_at = created_at")
+
+
+def downgrade() -> None:
+    """Drop the watermark columns."""
+    op.drop_column("daily_conversation_analyses", "last_message_id")
+    op.drop_column("daily_conversation_analyses", "last_message_at")
@@ -0,0 +1,77 @@
+"""gcal_busy_mirror
+
+Revision ID: d4e8a1c2b3f5
+Revises: cada03c9385f
+Create Date: 2026-10-17 09:00:00.000000
+
+Google Calendar busy-time mirror:
+- calendar_busy_intervals table (per ScheduleCalendarSync, indexed by range)
+- sync_tokens + mirror_synced_at on schedule_calendar_syncs
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d4e8a1c2b3f5"
+down_revision: Union[str, Sequence[str], None] = "cada03c9385f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the busy-time mirror table and sync state columns."""
+    op.add_column(
+        "schedule_calendar_syncs",
+        sa.Column(
+            "sync_tokens", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+    )
+    op.add_column(
+        "schedule_calendar_syncs",
+        sa.Column("mirror_synced_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    op.create_table(
+        "calendar_busy_intervals",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("sync_id", sa.Uuid(), nullable=False),
+        sa.Column("calendar_id", sa.String(length=255), nullable=False),
+        sa.Column("event_id", sa.String(length=1024), nullable=False),
+        sa.Column("start_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("end_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["sync_id"], ["schedule_calendar_syncs.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_calendar_busy_sync_range",
+        "calendar_busy_intervals",
+        ["sync_id", "start_time", "end_time"],
+        unique=False,
+    )
+    op.create_index(
+        "uq_calendar_busy_sync_event",
+        "calendar_busy_intervals",
+        ["sync_id", "calendar_id", "event_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop the busy-time mirror."""
+    op.drop_index("uq_calendar_busy_sync_event", table_name="calendar_busy_intervals")
+    op.drop_index("ix_calendar_busy_sync_range", table_name="calendar_busy_intervals")
+    op.drop_table("calendar_busy_intervals")
+    op.drop_column("schedule_calendar_syncs", "mirror_synced_at")
+    op.drop_column("schedule_calendar_syncs", "sync_tokens")
@@ -0,0 +1,79 @@
+"""cortex_step_results
+
+Revision ID: e5a1c7d3f9b2
+Revises: d2f7a9c4e6b8
+Create Date: 2026-10-17 23:00:00.000000
+
+Content-addressed memoization of Cortex pipeline steps (transcription, OCR),
+so re-running a pipeline on the same evidence skips the Vertex calls.
+Rows belong to a patient and are deleted with them.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a1c7d3f9b2"
+down_revision: Union[str, Sequence[str], None] = "d2f7a9c4e6b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create cortex_step_results."""
+    op.create_table(
+        "cortex_step_results",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("step_type", sa.String(length=50), nullable=False),
+        sa.Column("organization_id", sa.Uuid(), nullable=False),
+        sa.Column("patient_id", sa.Uuid(), nullable=False),
+        sa.Column("outputs", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organizations.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["patient_id"], ["patients.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        op.f("ix_cortex_step_results_organization_id"),
+        "cortex_step_results",
+        ["organization_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_cortex_step_results_patient_id"),
+        "cortex_step_results",
+        ["patient_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_cortex_step_results_expires_at"),
+        "cortex_step_results",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop cortex_step_results."""
+    op.drop_index(
+        op.f("ix_cortex_step_results_expires_at"), table_name="cortex_step_results"
+    )
+    op.drop_index(
+        op.f("ix_cortex_step_results_patient_id"), table_name="cortex_step_results"
+    )
+    op.drop_index(
+        op.f("ix_cortex_step_results_organization_id"),
+        table_name="cortex_step_results",
+    )
+    op.drop_table("cortex_step_results")
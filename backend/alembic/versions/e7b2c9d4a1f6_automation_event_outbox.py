@@ -0,0 +1,73 @@
+"""automation_event_outbox
+
+Revision ID: e7b2c9d4a1f6
+Revises: d4e8a1c2b3f5
+Create Date: 2026-10-17 12:00:00.000000
+
+Transactional outbox for automation events:
+- attempts / next_attempt_at / processed_at on system_events
+- DEAD_LETTER value on eventstatus
+- Partial index over due PENDING rows (worker claim query)
+
+PENDING rows written before the outbox existed were never meant to be
+replayed (stale leads monitor duplicates); they are closed as FAILED.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b2c9d4a1f6"
+down_revision: Union[str, Sequence[str], None] = "d4e8a1c2b3f5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add outbox delivery state to system_events."""
+    op.execute(
+        "UPDATE system_events SET status = 'FAILED', "
+        "error_message = 'Logged before the automation outbox; not replayed' "
+        "WHERE status = 'PENDING'"
+    )
+
+    op.execute("ALTER TYPE eventstatus ADD VALUE IF NOT EXISTS 'DEAD_LETTER'")
+
+    op.add_column(
+        "system_events",
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "system_events",
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "system_events",
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_system_events_outbox_due",
+        "system_events",
+        ["next_attempt_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    """Drop outbox delivery state (DEAD_LETTER rows become FAILED)."""
+    op.drop_index("ix_system_events_outbox_due", table_name="system_events")
+    op.drop_column("system_events", "processed_at")
+    op.drop_column("system_events", "next_attempt_at")
+    op.drop_column("system_events", "attempts")
+    # PostgreSQL cannot drop an enum value; keep it but stop using it
+    op.execute(
+        "UPDATE system_events SET status = 'FAILED' WHERE status = 'DEAD_LETTER'"
+    )
@@ -0,0 +1,77 @@
+"""cortex_bulk_runs
+
+Revision ID: f3b8d1e5a7c2
+Revises: e5a1c7d3f9b2
+Create Date: 2026-10-18 01:00:00.000000
+
+Checkpointed bulk re-processing of clinical entries through Cortex, plus the
+(created_at, id) index its keyset pagination walks.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b8d1e5a7c2"
+down_revision: Union[str, Sequence[str], None] = "e5a1c7d3f9b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create cortex_bulk_runs and the clinical entry keyset index."""
+    op.create_table(
+        "cortex_bulk_runs",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "QUEUED",
+                "RUNNING",
+                "SUCCEEDED",
+                "FAILED",
+                "CANCELLED",
+                name="bulkrunstatus",
+            ),
+            nullable=False,
+        ),
+        sa.Column("filters", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("concurrency", sa.Integer(), nullable=False),
+        sa.Column("model_rpm", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("cursor_created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("cursor_id", sa.Uuid(), nullable=True),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("processed", sa.Integer(), nullable=False),
+        sa.Column("succeeded", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("errors", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_by", sa.Uuid(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_clinical_entries_created_id",
+        "clinical_entries",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop cortex_bulk_runs and the clinical entry keyset index."""
+    op.drop_index("ix_clinical_entries_created_id", table_name="clinical_entries")
+    op.drop_table("cortex_bulk_runs")
+    sa.Enum(name="bulkrunstatus").drop(op.get_bind(), checkfirst=True)
@@ -250,6 +250,9 @@ async def update_schedule_sync(
 
     # Update fields
     if data.blocking_calendar_ids is not None:
+        if data.blocking_calendar_ids != (sync_config.blocking_calendar_ids or []):
+            # Busy-time mirror must be rebuilt before it is trusted again
+            sync_config.mirror_synced_at = None
         sync_config.blocking_calendar_ids = data.blocking_calendar_ids
     if data.booking_calendar_id is not None:
         sync_config.booking_calendar_id = data.booking_calendar_id
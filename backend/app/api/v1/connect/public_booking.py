@@ -8,12 +8,15 @@ They allow potential clients to:
 """
 
 from typing import Optional
-from datetime import date
+from contextlib import aclosing
+from datetime import date, datetime, timedelta
+import base64
+import json
 import uuid
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select
 
 from app.db.base import get_db
 from app.db.models import (
@@ -24,11 +27,18 @@ from app.db.models import (
     Patient,
     Organization,
 )
+from app.services.booking_admission import BookingAdmissionService
 from app.services.slots import SlotService
+from app.services.slot_search import SlotSearchService
 from app.core.validators import ISODateTimeWithTZ
 
 router = APIRouter()
 
+# Widest date range of an organization-wide slot search (unauthenticated)
+MAX_SEARCH_RANGE_DAYS = 60
+# Furthest ahead /slots/page looks (horizon_days, and cursors clients send back)
+MAX_HORIZON_DAYS = 365
+
 
 # ============ SCHEMAS ============
 
@@ -58,6 +68,23 @@ class PublicSlotResponse(BaseModel):
     spots_left: int
 
 
+class PublicSlotPageResponse(BaseModel):
+    """Page of upcoming free slots with a cursor for the next page."""
+
+    slots: list[PublicSlotResponse]
+    next_cursor: Optional[str] = None  # None when the horizon is exhausted
+
+
+class PublicSearchSlotResponse(BaseModel):
+    """Free slot found by an organization-wide search."""
+
+    start: str  # ISO datetime
+    end: str  # ISO datetime
+    therapist_id: uuid.UUID
+    service_id: uuid.UUID
+    spots_left: int
+
+
 class BookingCreateRequest(BaseModel):
     """Request to create a new booking."""
 
@@ -83,6 +110,37 @@ class BookingCreateResponse(BaseModel):
     currency: str
 
 
+def _to_public_slot(slot) -> PublicSlotResponse:
+    return PublicSlotResponse(
+        start=slot.start.isoformat() + ("" if slot.start.tzinfo else "Z"),
+        end=slot.end.isoformat() + ("" if slot.end.tzinfo else "Z"),
+        spots_total=slot.max_capacity,
+        spots_booked=slot.current_bookings,
+        spots_left=slot.max_capacity - slot.current_bookings,
+    )
+
+
+def _encode_slot_cursor(after: datetime, until: date) -> str:
+    """Opaque cursor: resume after `after` (naive UTC), stop at `until`."""
+    payload = json.dumps({"after": after.isoformat(), "until": until.isoformat()})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_slot_cursor(cursor: str) -> tuple[datetime, date]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        after = datetime.fromisoformat(payload["after"])
+        until = date.fromisoformat(payload["until"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    # Cursors are not signed: never look further ahead than horizon_days can
+    max_until = datetime.utcnow().date() + timedelta(days=MAX_HORIZON_DAYS)
+    return after, min(until, max_until)
+
+
 # ============ ENDPOINTS ============
 
 
@@ -148,14 +206,119 @@ async def get_public_slots(
         service_id=service_id,
         start_date=start_date,
         end_date=end_date,
+        use_cache=True,
+    )
+
+    return [_to_public_slot(slot) for slot in slots]
+
+
+@router.get(
+    "/slots/page",
+    response_model=PublicSlotPageResponse,
+    summary="Get upcoming slots page by page",
+)
+async def get_public_slots_page(
+    therapist_id: uuid.UUID = Query(..., description="Therapist to book with"),
+    service_id: uuid.UUID = Query(..., description="Service to book"),
+    cursor: Optional[str] = Query(None, description="next_cursor of previous page"),
+    limit: int = Query(20, ge=1, le=100, description="Slots per page"),
+    next_available: bool = Query(
+        False, description="Stop at the first free slot (ignores limit)"
+    ),
+    horizon_days: int = Query(
+        60,
+        ge=1,
+        le=MAX_HORIZON_DAYS,
+        description="How far ahead to look (first page only)",
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Upcoming free slots for a therapist and service, without a date range.
+
+    Weeks are computed lazily until the page fills, so sparse calendars
+    answer quickly. Pass `next_cursor` back to continue after the last slot.
+    """
+    if cursor:
+        after, until = _decode_slot_cursor(cursor)
+    else:
+        after = None
+        until = datetime.utcnow().date() + timedelta(days=horizon_days)
+    if next_available:
+        limit = 1
+
+    slot_service = SlotService(db)
+    slots = []
+    async with aclosing(
+        slot_service.iter_available_slots(
+            therapist_id=therapist_id,
+            service_id=service_id,
+            start_date=(after or datetime.utcnow()).date(),
+            end_date=until,
+            after=after,
+            use_cache=True,
+        )
+    ) as upcoming:
+        async for slot in upcoming:
+            slots.append(slot)
+            if len(slots) >= limit:
+                break
+
+    next_cursor = None
+    if len(slots) >= limit:
+        next_cursor = _encode_slot_cursor(slots[-1].start, until)
+
+    return PublicSlotPageResponse(
+        slots=[_to_public_slot(slot) for slot in slots],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/search",
+    response_model=list[PublicSearchSlotResponse],
+    summary="Find the earliest free slots across all therapists",
+)
+async def search_public_slots(
+    organization_id: uuid.UUID = Query(..., description="Organization to search"),
+    start_date: date = Query(..., description="Start of date range"),
+    end_date: date = Query(..., description="End of date range"),
+    service_ids: Optional[list[uuid.UUID]] = Query(
+        None, description="Services to consider (default: all bookable services)"
+    ),
+    limit: int = Query(10, ge=1, le=100, description="Maximum slots to return"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Earliest free slots for the given services with any therapist.
+    Replaces one /slots call per therapist and service for multi-therapist centers.
+    """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must be on or after start_date",
+        )
+    if end_date - start_date > timedelta(days=MAX_SEARCH_RANGE_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_SEARCH_RANGE_DAYS} days",
+        )
+
+    search_service = SlotSearchService(db)
+    slots = await search_service.search_earliest_slots(
+        organization_id=organization_id,
+        start_date=start_date,
+        end_date=end_date,
+        service_ids=service_ids,
+        limit=limit,
     )
 
     return [
-        PublicSlotResponse(
+        PublicSearchSlotResponse(
             start=slot.start.isoformat() + ("" if slot.start.tzinfo else "Z"),
             end=slot.end.isoformat() + ("" if slot.end.tzinfo else "Z"),
-            spots_total=slot.max_capacity,
-            spots_booked=slot.current_bookings,
+            therapist_id=slot.therapist_id,
+            service_id=slot.service_id,
             spots_left=slot.max_capacity - slot.current_bookings,
         )
         for slot in slots
@@ -335,30 +498,17 @@ async def create_public_booking(
     slot_end = slot_start + timedelta(minutes=service.duration_minutes)
 
     # === CRITICAL: Transactional slot locking ===
-    # 1. Lock the therapist record to serialize booking requests for this therapist.
-    # This prevents race conditions where concurrent transactions see "count < capacity"
-    # and both insert, causing overbooking (Phantom Read problem).
-    await db.execute(
-        select(User.id).where(User.id == booking_data.therapist_id).with_for_update()
-    )
-
-    # 2. Count existing overlapping bookings
-    from sqlalchemy import func
-
-    overlapping_bookings_result = await db.execute(
-        select(func.count(Booking.id)).where(
-            and_(
-                Booking.therapist_id == booking_data.therapist_id,
-                Booking.start_time < slot_end,
-                Booking.end_time > slot_start,
-                Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-            )
-        )
+    # Advisory locks scoped to this therapist's time buckets serialize only
+    # the bookings that can overlap this slot, so concurrent transactions
+    # can't both see "count < capacity" and overbook (Phantom Read problem),
+    # while bookings for other slots proceed in parallel.
+    admitted, existing_count = await BookingAdmissionService(db).admit(
+        therapist_id=booking_data.therapist_id,
+        start=slot_start,
+        end=slot_end,
+        capacity=service.capacity,
     )
-    existing_count = overlapping_bookings_result.scalar() or 0
-
-    # 3. Check capacity
-    if existing_count >= service.capacity:
+    if not admitted:
         # Slot is full
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
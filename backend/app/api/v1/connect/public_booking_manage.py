@@ -315,6 +315,7 @@ async def get_available_slots_for_reschedule(
         service_id=booking.service_type_id,
         start_date=start,
         end_date=end,
+        use_cache=True,
     )
 
     return {
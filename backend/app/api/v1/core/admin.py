@@ -1,14 +1,24 @@
 """Admin API endpoints for SuperUser management."""
 
 import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.db.base import get_db
-from app.db.models import Organization, User, SystemSetting, OrgTier
+from app.db.models import (
+    Organization,
+    User,
+    SystemSetting,
+    OrgTier,
+    BulkRunStatus,
+    CortexBulkRun,
+    EntryType,
+    ProcessingStatus,
+)
 from app.api.deps import CurrentUser
 
 
@@ -375,6 +385,159 @@ async def force_conversation_analysis(
     }
 
 
+# ============ Cortex Bulk Runs ============
+
+
+class BulkRunCreate(BaseModel):
+    """Entries to re-process through Cortex (all filters optional)."""
+
+    organization_id: Optional[uuid.UUID] = None
+    entry_types: Optional[list[EntryType]] = None
+    # Default: COMPLETED and FAILED
+    statuses: Optional[list[ProcessingStatus]] = None
+    created_after: Optional[datetime] = None
+    # Default: now (entries created during the run are left out)
+    created_before: Optional[datetime] = None
+    concurrency: Optional[int] = Field(None, ge=1, le=32)
+    # Requests per minute per model id, e.g. {"gemini-2.5-pro": 120}
+    model_rpm: dict[str, int] = Field(default_factory=dict)
+
+
+async def _get_bulk_run(db: AsyncSession, run_id: uuid.UUID) -> CortexBulkRun:
+    run = await db.get(CortexBulkRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Bulk run not found")
+    return run
+
+
+@router.post("/cortex/bulk-runs", status_code=status.HTTP_202_ACCEPTED)
+async def create_cortex_bulk_run(
+    data: BulkRunCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_superuser),
+):
+    """
+    Re-process matching clinical entries through Cortex in the background.
+
+    Runs as a durable job; progress is checkpointed after every page, so an
+    interrupted run resumes where it stopped. Requires superuser.
+    """
+    from app.services import job_queue
+    from app.services.cortex.bulk import bulk_progress, create_bulk_run
+
+    try:
+        run = await create_bulk_run(
+            db,
+            filters=data.model_dump(exclude={"concurrency", "model_rpm"}),
+            concurrency=data.concurrency,
+            model_rpm=data.model_rpm,
+            created_by=current_user.id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    await job_queue.enqueue_job(
+        db,
+        job_queue.CORTEX_BULK_RUN,
+        {"run_id": str(run.id)},
+        dedupe_key=job_queue.cortex_bulk_run_key(run.id),
+    )
+    await db.commit()
+    return bulk_progress(run)
+
+
+@router.get("/cortex/bulk-runs")
+async def list_cortex_bulk_runs(
+    limit: int = 20,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_superuser),
+):
+    """Most recent bulk runs with their progress and ETA."""
+    from app.services.cortex.bulk import bulk_progress
+
+    result = await db.scalars(
+        select(CortexBulkRun)
+        .order_by(CortexBulkRun.created_at.desc())
+        .limit(min(limit, 100))
+    )
+    return [bulk_progress(run) for run in result.all()]
+
+
+@router.get("/cortex/bulk-runs/{run_id}")
+async def get_cortex_bulk_run(
+    run_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_superuser),
+):
+    """Progress and ETA of a bulk run."""
+    from app.services.cortex.bulk import bulk_progress
+
+    return bulk_progress(await _get_bulk_run(db, run_id))
+
+
+@router.post("/cortex/bulk-runs/{run_id}/cancel")
+async def cancel_cortex_bulk_run(
+    run_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_superuser),
+):
+    """Stop a bulk run after its current page (it can be resumed later)."""
+    from app.services.cortex.bulk import FINISHED_STATUSES, bulk_progress
+
+    run = await _get_bulk_run(db, run_id)
+    if run.status in FINISHED_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Bulk run already {run.status.value}",
+        )
+
+    if run.status == BulkRunStatus.QUEUED:
+        run.finished_at = datetime.now(timezone.utc)
+    run.status = BulkRunStatus.CANCELLED
+    await db.commit()
+    return bulk_progress(run)
+
+
+@router.post("/cortex/bulk-runs/{run_id}/resume", status_code=status.HTTP_202_ACCEPTED)
+async def resume_cortex_bulk_run(
+    run_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_superuser),
+):
+    """Resume a failed or cancelled bulk run from its last checkpoint."""
+    from app.services import job_queue
+    from app.services.cortex.bulk import bulk_progress, reopen_bulk_run
+
+    run = await _get_bulk_run(db, run_id)
+    try:
+        reopen_bulk_run(run)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    # No-op while the run's job is still queued or running
+    await job_queue.enqueue_job(
+        db,
+        job_queue.CORTEX_BULK_RUN,
+        {"run_id": str(run.id)},
+        dedupe_key=job_queue.cortex_bulk_run_key(run.id),
+    )
+    await db.commit()
+    return bulk_progress(run)
+
+
+@router.get("/cortex/stage-latency")
+async def get_cortex_stage_latency(
+    hours: int = 24,
+    pipeline_name: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_superuser),
+):
+    """p50/p95 latency per pipeline stage and model (cortex_pipeline_traces)."""
+    from app.services.cortex.tracing import stage_latency_percentiles
+
+    since = datetime.now(timezone.utc) - timedelta(hours=max(hours, 1))
+    return await stage_latency_percentiles(db, since, pipeline_name)
+
+
 # ============ Financial Reporting (v1.1.11) ============
 
 
@@ -14,6 +14,7 @@ from pydantic import BaseModel
 from app.db.base import get_db
 from app.db.models import Organization, Patient, PrivacyTier
 from app.api.deps import CurrentUser
+from app.services.cortex.cache import purge_patient_step_results
 from app.services.cortex.privacy import PrivacyResolver
 
 
@@ -126,6 +127,14 @@ async def update_org_privacy_settings(
 
     # Update
     org.default_privacy_tier = tier
+    if tier == PrivacyTier.GHOST:
+        # Patients on the org default are GHOST now: drop their cached
+        # transcripts/OCR (GHOST overrides were purged when set)
+        await purge_patient_step_results(
+            db,
+            Patient.organization_id == org.id,
+            Patient.privacy_tier_override.is_(None),
+        )
     await db.commit()
 
     # Get country default for response
@@ -232,6 +241,8 @@ async def update_patient_privacy(
 
     # Update
     patient.privacy_tier_override = tier
+    if tier == PrivacyTier.GHOST:
+        await purge_patient_step_results(db, Patient.id == patient.id)
     await db.commit()
 
     # Fetch org for explanation
@@ -275,16 +286,18 @@ async def clear_patient_privacy_override(
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    # Clear override
-    patient.privacy_tier_override = None
-    await db.commit()
-
-    # Fetch org for explanation
+    # Fetch org for resolution and explanation
     result = await db.execute(
         select(Organization).where(Organization.id == current_user.organization_id)
     )
     org = result.scalar_one_or_none()
 
+    # Clear override
+    patient.privacy_tier_override = None
+    if PrivacyResolver.resolve(patient, org) == PrivacyTier.GHOST:
+        await purge_patient_step_results(db, Patient.id == patient.id)
+    await db.commit()
+
     # Resolve and explain
     explanation = PrivacyResolver.explain(patient, org)
 
@@ -470,6 +470,7 @@ async def get_available_slots(
         service_id=service_id,
         start_date=start_date,
         end_date=end_date,
+        use_cache=True,
     )
 
     return [
@@ -4,13 +4,13 @@ v1.5.5: HARD SWITCH to Cortex. All analysis routes through ClinicalService.
 """
 
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.db.base import get_db
 from app.db.models import ClinicalEntry, Patient, EntryType, UserRole
-from app.services.clinical_service import ClinicalService
+from app.services import job_queue
 
 # v1.3.3: Map EntryType to AI task routing keys
 ENTRY_TYPE_TO_TASK: dict[EntryType, str] = {
@@ -35,7 +35,6 @@ router = APIRouter()
 )
 async def create_clinical_entry(
     entry_data: ClinicalEntryCreate,
-    background_tasks: BackgroundTasks,
     current_user: CurrentClinicalUser,  # RBAC: Only OWNER/THERAPIST can create
     db: AsyncSession = Depends(get_db),
 ):
@@ -73,6 +72,17 @@ async def create_clinical_entry(
         happened_at=entry_data.happened_at,
     )
     db.add(entry)
+    await db.flush()
+
+    # v1.0.7: Queue anonymization for The Vault (GDPR-compliant IP preservation)
+    if entry.content:
+        await job_queue.enqueue_job(
+            db,
+            job_queue.SANITIZE_CLINICAL_ENTRY,
+            {"entry_id": str(entry.id)},
+            organization_id=current_user.organization_id,
+        )
+
     await db.commit()
     await db.refresh(entry)
 
@@ -112,17 +122,6 @@ async def create_clinical_entry(
 
             logging.error(f"Risk detection automation failed: {e}")
 
-    # v1.0.7: Queue anonymization for The Vault (GDPR-compliant IP preservation)
-    if entry.content:
-        from app.services.data_sanitizer import sanitize_and_store_background
-
-        background_tasks.add_task(
-            sanitize_and_store_background,
-            content=entry.content,
-            metadata=entry.entry_metadata or {},
-            source_type="CLINICAL_NOTE",
-        )
-
     return ClinicalEntryResponse.model_validate(entry)
 
 
@@ -248,7 +247,6 @@ async def delete_clinical_entry(
 async def analyze_clinical_entry(
     entry_id: uuid.UUID,
     current_user: CurrentUser,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -256,6 +254,8 @@ async def analyze_clinical_entry(
 
     Returns 202 Accepted immediately. Frontend should poll until
     processing_status changes from PENDING/PROCESSING to COMPLETED/FAILED.
+    The analysis runs as a durable job (app.workers.job_worker); 409 while
+    a previous analysis job of the entry is still queued or running.
     """
     from app.db.models import ProcessingStatus
 
@@ -283,42 +283,26 @@ async def analyze_clinical_entry(
             detail="Cannot analyze an AI_ANALYSIS entry",
         )
 
-    # Don't start new analysis if one is already in progress (unless stale)
-    if entry.processing_status in (
-        ProcessingStatus.PENDING,
-        ProcessingStatus.PROCESSING,
-    ):
-        # Check if analysis is stale (stuck for more than 5 minutes)
-        from datetime import datetime, timedelta, timezone
-
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=5)
-        # Make comparison timezone-aware
-        entry_updated = (
-            entry.updated_at.replace(tzinfo=timezone.utc)
-            if entry.updated_at and entry.updated_at.tzinfo is None
-            else entry.updated_at
+    # v1.5.5: HARD SWITCH - Direct to Cortex (via the job queue)
+    job_id = await job_queue.enqueue_job(
+        db,
+        job_queue.ANALYZE_CLINICAL_ENTRY,
+        {"entry_id": str(entry.id), "user_id": str(current_user.id)},
+        organization_id=current_user.organization_id,
+        priority=job_queue.PRIORITY_INTERACTIVE,
+        dedupe_key=job_queue.clinical_entry_analysis_key(entry.id),
+    )
+    if job_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Analysis already in progress",
         )
-        if entry_updated and entry_updated > cutoff:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Analysis already in progress",
-            )
-        # If stale, allow retry by continuing
 
-    # Set status to PENDING and queue background task
     entry.processing_status = ProcessingStatus.PENDING
     entry.processing_error = None
     await db.commit()
     await db.refresh(entry)
 
-    # v1.5.5: HARD SWITCH - Direct to Cortex
-    clinical_service = ClinicalService(db)
-    background_tasks.add_task(
-        clinical_service.process_entry_async,
-        entry_id=entry.id,
-        user_id=current_user.id,
-    )
-
     return ClinicalEntryResponse.model_validate(entry)
 
 
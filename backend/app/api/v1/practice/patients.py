@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, or_
 
 from app.db.base import get_db
-from app.db.models import Patient
+from app.db.models import Patient, PatientJourneyState
 from app.api.deps import CurrentUser
 from app.schemas.common import PaginatedResponse, ListMetadata
 from .patient_schemas import (
@@ -53,14 +53,17 @@ async def list_patients(
         )
         query = query.where(search_filter)
 
-    # Apply status filter (searches in any journey's status)
+    # Apply status filter (current stage in any journey)
     if status_filter:
-        # Use PostgreSQL JSONB text search - finds if any value in the JSONB contains the status
-        # This handles multi-journey case: {"intake": "BLOCKED", "booking": "CONFIRMED"}
-        status_condition = text("journey_status::text LIKE :status_pattern").bindparams(
-            status_pattern=f'%"{status_filter}"%'
+        # Index lookup on patient_journey_state instead of a JSONB text scan
+        # Handles the multi-journey case: {"intake": "BLOCKED", "booking": "CONFIRMED"}
+        query = query.where(
+            Patient.id.in_(
+                select(PatientJourneyState.patient_id).where(
+                    PatientJourneyState.stage == status_filter
+                )
+            )
         )
-        query = query.where(status_condition)
 
     # Get absolute total count for organization (for the "Total" KPI in Header)
     absolute_total_query = select(func.count()).where(
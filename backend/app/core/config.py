@@ -77,6 +77,68 @@ class Settings(BaseSettings):
     META_VERIFY_TOKEN: Optional[str] = None  # For webhook verification challenge
     META_PHONE_NUMBER_ID: Optional[str] = None  # WhatsApp Business phone number ID
 
+    # Booking Engine availability cache (public widget slot queries)
+    SLOT_CACHE_ENABLED: bool = True
+    SLOT_CACHE_TTL_SECONDS: int = 300  # Shared tier; bounds Google Calendar staleness
+    SLOT_CACHE_LOCAL_TTL_SECONDS: int = 15  # In-process tier (not invalidated cross-instance)
+    SLOT_CACHE_REDIS_URL: Optional[str] = None  # Optional shared tier (redis://...)
+
+    # Google Calendar busy-time mirror
+    GCAL_MIRROR_REFRESH_MINUTES: int = 5  # Background incremental sync interval
+    GCAL_MIRROR_MAX_STALENESS_MINUTES: int = 15  # Older mirrors fall back to FreeBusy
+
+    # Automation Engine compiled rule index (local writes invalidate at once)
+    AUTOMATION_RULE_INDEX_TTL_SECONDS: int = 30  # Bounds staleness across workers
+    AUTOMATION_CONTEXT_TTL_SECONDS: int = 60  # Org tier/owner/service lookups
+    AUTOMATION_ACTION_CONCURRENCY: int = 8  # Concurrent sends per event
+
+    # Automation event outbox (system_events rows drained by async workers)
+    AUTOMATION_OUTBOX_ENABLED: bool = True  # False = run rules inline in the request
+    AUTOMATION_OUTBOX_WORKERS: int = 4  # In-process workers per API instance (0 = none)
+    AUTOMATION_OUTBOX_BATCH_SIZE: int = 10  # Events claimed per worker round trip
+    AUTOMATION_OUTBOX_POLL_SECONDS: float = 1.0  # Idle wait between empty claims
+    AUTOMATION_OUTBOX_LEASE_SECONDS: int = 300  # Claimed events are retried after this
+    AUTOMATION_OUTBOX_MAX_ATTEMPTS: int = 5  # Then the event is dead-lettered
+    AUTOMATION_OUTBOX_RETRY_BASE_SECONDS: int = 30  # Doubles per failed attempt
+
+    # Durable job queue (clinical AI analysis, vault sanitization)
+    JOB_WORKERS: int = 4  # Concurrent jobs per `python -m app.workers.job_worker`
+    JOB_WORKERS_IN_PROCESS: int = 2  # Job workers inside the API (0 = dedicated only)
+    JOB_POLL_SECONDS: float = 1.0  # Idle wait between empty claims
+    JOB_LEASE_SECONDS: int = 120  # Jobs without heartbeats are reclaimed after this
+    JOB_HEARTBEAT_SECONDS: int = 30  # Lease renewal interval while a job runs
+    JOB_MAX_ATTEMPTS: int = 3  # Then the job is FAILED
+    JOB_RETRY_BASE_SECONDS: int = 30  # Doubles per failed attempt
+
+    # Periodic jobs (APScheduler; only the elected leader instance runs them)
+    SCHEDULER_LEADER_ELECTION: bool = True  # False = every instance runs the jobs
+    SCHEDULER_LEADER_RENEW_SECONDS: int = 30  # Leader lock check / follower retry
+    SCHEDULER_RUN_HISTORY_DAYS: int = 30  # scheduled_job_runs retention
+
+    # Daily WhatsApp conversation analysis (AletheIA, hourly scheduler job)
+    CONVERSATION_ANALYSIS_INTERVAL_MINUTES: int = 15  # New messages only, per run
+    CONVERSATION_ANALYSIS_CONCURRENCY: int = 8  # AletheIA calls in flight per run
+    CONVERSATION_ANALYSIS_ORG_CONCURRENCY: int = 2  # Per organization (fair share)
+    CONVERSATION_ANALYSIS_COMMIT_BATCH: int = 50  # Analyses saved per commit
+
+    # Kura Cortex pipelines
+    CORTEX_STAGE_CONCURRENCY: int = 4  # Independent stages side by side (<1 = 1)
+    CORTEX_STEP_CACHE_ENABLED: bool = True  # Reuse transcription/OCR on re-runs
+    CORTEX_STEP_CACHE_TTL_DAYS: int = 30  # Memoized step outputs expire after this
+    CORTEX_TRACE_ENABLED: bool = True  # Persist per-run stage timing summaries
+    CORTEX_TRACE_RETENTION_DAYS: int = 30  # cortex_pipeline_traces retention
+    CORTEX_ANALYZE_CHUNK_CHARS: int = 24000  # Chunk size of map-reduce analysis
+    CORTEX_ANALYZE_CHUNK_CONCURRENCY: int = 4  # Chunk summaries in flight per stage
+
+    # Cortex bulk re-processing (backfills, re-analysis campaigns)
+    CORTEX_BULK_CONCURRENCY: int = 4  # Entries in flight per run (default)
+    CORTEX_BULK_PAGE_SIZE: int = 100  # Entries per keyset page / checkpoint
+    CORTEX_BULK_DEFAULT_RPM: int = 60  # Model calls per minute, unlisted models
+    CORTEX_BULK_MODEL_RPM: dict[str, int] = {
+        "gemini-2.5-pro": 60,
+        "gemini-2.5-flash": 300,
+    }  # Model calls per minute per model id (JSON in the environment)
+
     # Tier Commission Fees (static business constants)
     TIER_FEE_BUILDER: float = 0.05  # 5% platform fee for free tier
     TIER_FEE_PRO: float = 0.02  # 2% platform fee for PRO
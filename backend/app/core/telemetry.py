@@ -8,6 +8,9 @@ Usage:
     from app.core.telemetry import init_telemetry
     app = FastAPI(...)
     init_telemetry(app)
+
+    # Custom spans (e.g. Cortex pipeline stages)
+    tracer = get_tracer(__name__)
 """
 
 import logging
@@ -66,3 +69,15 @@ def init_telemetry(app):
         logger.info("✅ [Telemetry] Distributed Tracing active.")
     except Exception as e:
         logger.warning(f"⚠️ [Telemetry] Cloud Trace failed to initialize: {e}")
+
+
+def get_tracer(name: str):
+    """
+    OpenTelemetry tracer for custom spans.
+
+    Spans are exported by the provider init_telemetry installs (Cloud Trace);
+    without one (local development) they are no-ops.
+    """
+    from opentelemetry import trace
+
+    return trace.get_tracer(name)
@@ -0,0 +1,55 @@
+"""Commit-driven invalidation of in-process caches.
+
+Caches derived from database rows (slot cache, automation rule index,
+automation context) register here which changed rows affect which of their
+entries. One set of SQLAlchemy session hooks serves them all:
+1. after_flush: each cache's `collect` maps the flushed objects to scopes,
+   kept in session.info until the transaction ends
+2. after_commit: each cache's `apply` drops the collected scopes
+3. after_rollback: the collected scopes are discarded (nothing changed)
+
+Usage:
+    register_commit_invalidation("automation_rules", _changed_orgs, _invalidate_orgs)
+"""
+
+from typing import Callable, Hashable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Scopes changed by the session's pending flush (session.new/dirty/deleted)
+Collect = Callable[[Session], Iterable[Hashable]]
+# Drops the cache entries of the committed scopes
+Apply = Callable[[set], None]
+
+_PENDING_KEY = "commit_invalidation_pending"
+
+# key -> (collect, apply)
+_handlers: dict[str, tuple[Collect, Apply]] = {}
+
+
+def register_commit_invalidation(key: str, collect: Collect, apply: Apply) -> None:
+    """Invalidate a cache on commit (idempotent; re-registering replaces)."""
+    _handlers[key] = (collect, apply)
+    if event.contains(Session, "after_flush", _collect_changes):
+        return
+    event.listen(Session, "after_flush", _collect_changes)
+    event.listen(Session, "after_commit", _apply_after_commit)
+    event.listen(Session, "after_rollback", _discard_after_rollback)
+
+
+def _collect_changes(session: Session, flush_context) -> None:
+    for key, (collect, _) in _handlers.items():
+        scopes = set(collect(session))
+        if scopes:
+            pending = session.info.setdefault(_PENDING_KEY, {})
+            pending.setdefault(key, set()).update(scopes)
+
+
+def _apply_after_commit(session: Session) -> None:
+    for key, scopes in session.info.pop(_PENDING_KEY, {}).items():
+        _handlers[key][1](scopes)
+
+
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -19,6 +19,7 @@ from sqlalchemy import (
     Index,
     Table,
     Column,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -76,6 +77,34 @@ class EventStatus(str, enum.Enum):
     PROCESSED = "PROCESSED"  # Rules executed successfully
     IGNORED = "IGNORED"  # No matching rules found
     FAILED = "FAILED"  # Error during rule execution
+    DEAD_LETTER = "DEAD_LETTER"  # Outbox gave up after max retry attempts
+
+
+class JobStatus(str, enum.Enum):
+    """Status of a durable background job (jobs table)."""
+
+    QUEUED = "QUEUED"  # Waiting for a worker (or for its retry time)
+    RUNNING = "RUNNING"  # Claimed by a worker holding a lease
+    SUCCEEDED = "SUCCEEDED"  # Handler finished
+    FAILED = "FAILED"  # Gave up after max attempts
+
+
+class ScheduledRunStatus(str, enum.Enum):
+    """Outcome of a periodic scheduler job run (scheduled_job_runs)."""
+
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class BulkRunStatus(str, enum.Enum):
+    """Status of a Cortex bulk re-processing run (cortex_bulk_runs)."""
+
+    QUEUED = "QUEUED"  # Created, waiting for a job worker
+    RUNNING = "RUNNING"  # Processing pages (or interrupted, resumable)
+    SUCCEEDED = "SUCCEEDED"  # Every matching entry was processed
+    FAILED = "FAILED"  # The run itself gave up (entries fail individually)
+    CANCELLED = "CANCELLED"  # Stopped by an admin at the next checkpoint
 
 
 class OrgTier(str, enum.Enum):
@@ -707,6 +736,11 @@ class ClinicalEntry(Base):
     patient: Mapped["Patient"] = relationship(back_populates="clinical_entries")
     author: Mapped["User"] = relationship()
 
+    __table_args__ = (
+        # Keyset pagination of bulk re-processing runs (cortex.bulk)
+        Index("ix_clinical_entries_created_id", "created_at", "id"),
+    )
+
 
 class SystemSetting(Base):
     """Global system configuration stored in database.
@@ -829,6 +863,10 @@ class AIPipelineConfig(Base):
     #   {"step": "transcribe", "model": "gemini:2.5-flash"},
     #   {"step": "analyze", "model": "gemini:2.5-pro", "prompt_key": "SOAP"}
     # ]
+    # Stages may declare "id" and "depends_on" to run independent stages
+    # concurrently (see app.services.cortex.dag)
+    # "analyze" stages may set "chunk_threshold" (and "chunk_size"), in
+    # characters, to analyze long transcripts map-reduce (AnalyzeStep)
     stages: Mapped[dict] = mapped_column(JSONB, default=list)
 
     # Privacy constraints
@@ -850,6 +888,131 @@ class AIPipelineConfig(Base):
     )
 
 
+class CortexStepResult(Base):
+    """Memoized output of a Cortex pipeline step (content-addressed).
+
+    Keyed by a hash of the step type, model, prompt version and the GCS
+    generation of the evidence it read, so re-running a pipeline on the same
+    entry (retry, prompt change, re-analyze) skips re-transcription/OCR.
+    Never written for GHOST-tier patients; purged when a patient switches to
+    GHOST and deleted with the patient.
+    """
+
+    __tablename__ = "cortex_step_results"
+
+    # sha256 hex of the step's cache key
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    step_type: Mapped[str] = mapped_column(String(50))
+    organization_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), index=True
+    )
+    # Outputs hold transcripts/OCR text of this patient
+    patient_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("patients.id", ondelete="CASCADE"), index=True
+    )
+
+    # context.outputs[step_type] as written by the step
+    outputs: Mapped[dict] = mapped_column(JSONB)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+
+class CortexPipelineTrace(Base):
+    """Timing summary of a Cortex pipeline run (one row per run_pipeline).
+
+    Per-stage wall time, queue wait, model, tokens and evidence size, plus
+    privacy finalization and AI usage ledger timings; the full trace is
+    exported to Cloud Trace (app.services.cortex.tracing). Holds no
+    clinical content.
+    """
+
+    __tablename__ = "cortex_pipeline_traces"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+
+    pipeline_name: Mapped[str] = mapped_column(String(100))
+    organization_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), index=True
+    )
+    clinical_entry_id: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
+    privacy_tier: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+
+    succeeded: Mapped[bool] = mapped_column(Boolean)
+    failed_step: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+
+    total_ms: Mapped[int] = mapped_column(Integer)
+    finalize_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    ledger_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    tokens_input: Mapped[int] = mapped_column(Integer, default=0)
+    tokens_output: Mapped[int] = mapped_column(Integer, default=0)
+
+    # [{"stage", "step_type", "model_id", "wall_ms", "queue_wait_ms",
+    #   "tokens_input", "tokens_output", "evidence_bytes", "cached", "status"}]
+    stages: Mapped[list] = mapped_column(JSONB, default=list)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+
+
+class CortexBulkRun(Base):
+    """Bulk re-processing of clinical entries through Cortex (backfills,
+    re-analysis after a prompt or pipeline change).
+
+    Entries matching `filters` are processed in (created_at, id) order by
+    app.services.cortex.bulk; the cursor and counters are checkpointed after
+    every page, so an interrupted run resumes where it stopped.
+    """
+
+    __tablename__ = "cortex_bulk_runs"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+
+    status: Mapped[BulkRunStatus] = mapped_column(
+        Enum(BulkRunStatus), default=BulkRunStatus.QUEUED
+    )
+    # organization_id, entry_types, statuses, created_after, created_before
+    filters: Mapped[dict] = mapped_column(JSONB, default=dict)
+    concurrency: Mapped[int] = mapped_column(Integer)
+    # Requests per minute per model id (overrides CORTEX_BULK_MODEL_RPM)
+    model_rpm: Mapped[dict] = mapped_column(JSONB, default=dict)
+
+    # Last processed entry (keyset cursor)
+    cursor_created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    cursor_id: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
+
+    # Matching entries when the run was created
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    processed: Mapped[int] = mapped_column(Integer, default=0)
+    succeeded: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    # Most recent entry failures: [{"entry_id": ..., "error": ...}]
+    errors: Mapped[list] = mapped_column(JSONB, default=list)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_by: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Last checkpoint
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
 class AiUsageLog(Base):
     """AI Usage Ledger - FinOps tracking with real token accounting.
 
@@ -1400,6 +1563,16 @@ class ScheduleCalendarSync(Base):
     # Enable/disable sync for this schedule
     sync_enabled: Mapped[bool] = mapped_column(Boolean, default=True)
 
+    # Busy-time mirror state (incremental sync)
+    # Structure: {"<calendar_id>": "<nextSyncToken>"}
+    sync_tokens: Mapped[Optional[dict]] = mapped_column(
+        JSONB, nullable=True, default=dict
+    )
+    # Last time every blocking calendar was mirrored (NULL = mirror not usable)
+    mirror_synced_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -1411,6 +1584,44 @@ class ScheduleCalendarSync(Base):
     schedule: Mapped["AvailabilitySchedule"] = relationship()
 
 
+class CalendarBusyInterval(Base):
+    """Local mirror of busy Google Calendar events for a ScheduleCalendarSync.
+
+    Refreshed incrementally with sync tokens, so the slot engine reads busy
+    times with one indexed range query instead of calling Google.
+    """
+
+    __tablename__ = "calendar_busy_intervals"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    sync_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("schedule_calendar_syncs.id", ondelete="CASCADE")
+    )
+
+    # Source Google calendar and event
+    calendar_id: Mapped[str] = mapped_column(String(255))
+    event_id: Mapped[str] = mapped_column(String(1024))
+
+    # Busy range (UTC)
+    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), onupdate=func.now(), server_default=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_calendar_busy_sync_range", "sync_id", "start_time", "end_time"),
+        Index(
+            "uq_calendar_busy_sync_event",
+            "sync_id",
+            "calendar_id",
+            "event_id",
+            unique=True,
+        ),
+    )
+
+
 # ============ AUTOMATION ENGINE (v0.9.0) ============
 
 
@@ -1444,10 +1655,28 @@ class SystemEventLog(Base):
     entity_type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     entity_id: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
 
+    # Outbox delivery state (PENDING rows are drained by automation workers)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # Due time for PENDING rows: retry backoff, or lease expiry while claimed
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    processed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
 
+    __table_args__ = (
+        Index(
+            "ix_system_events_outbox_due",
+            "next_attempt_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
+
 
 class JourneyTemplate(Base):
     """Blueprint for clinical journeys (Retreats, Intakes, Programs).
@@ -1532,6 +1761,41 @@ class JourneyLog(Base):
     )
 
 
+class PatientJourneyState(Base):
+    """Current stage of each patient in each journey (latest JourneyLog row).
+
+    A normalized, indexed copy of patient.journey_status: one row per
+    (patient, journey), upserted in the same transaction as the JourneyLog
+    entry (see app.services.journey_state). Stage filters and timeout scans
+    read this table instead of journey_logs or the JSONB column.
+    """
+
+    __tablename__ = "patient_journey_state"
+
+    patient_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True
+    )
+    journey_key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    stage: Mapped[str] = mapped_column(String(50))
+
+    # When the patient entered the stage (changed_at of the latest JourneyLog).
+    # NULL when unknown (stage only found in journey_status, no JourneyLog):
+    # such rows never match timeout scans
+    entered_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True, server_default=func.now()
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_patient_journey_state_stage",
+            "journey_key",
+            "stage",
+            "entered_at",
+        ),
+        Index("ix_patient_journey_state_stage_only", "stage"),
+    )
+
+
 class AutomationRule(Base):
     """Configurable automation rules for the Playbook Marketplace.
 
@@ -1813,6 +2077,13 @@ class DailyConversationAnalysis(Base):
         DateTime(timezone=True), server_default=func.now()
     )
 
+    # Watermark: last MessageLog (timestamp, id) included in this analysis.
+    # Later runs only send newer messages, with `summary` as rolling context.
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    last_message_id: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
+
     # Unique constraint: one analysis per patient per day
     __table_args__ = (
         Index("ix_daily_analysis_patient_date", "patient_id", "date", unique=True),
@@ -1969,3 +2240,123 @@ class KarmaRedemption(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+
+
+# ============ BACKGROUND JOBS ============
+
+
+class Job(Base):
+    """Durable background job (clinical AI analysis, vault sanitization).
+
+    Written in the caller's transaction (app.services.job_queue) and run by
+    dedicated workers (app.workers.job_worker). Workers claim QUEUED rows with
+    FOR UPDATE SKIP LOCKED and hold a lease, renewed by heartbeats, while the
+    handler runs; a RUNNING job whose lease expired is claimed again.
+    """
+
+    __tablename__ = "jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+
+    # Handler key (e.g. "clinical.analyze_entry")
+    kind: Mapped[str] = mapped_column(String(100))
+    payload: Mapped[dict] = mapped_column(JSONB, default=dict)
+
+    status: Mapped[JobStatus] = mapped_column(
+        Enum(JobStatus), default=JobStatus.QUEUED, server_default="QUEUED"
+    )
+    # Higher runs first
+    priority: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # At most one QUEUED/RUNNING job per key (e.g. one analysis per entry)
+    dedupe_key: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
+    organization_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3, server_default="3")
+    # QUEUED rows are not claimed before this (retry backoff)
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    # Lease of the worker running the job
+    locked_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_jobs_queued",
+            text("priority DESC"),
+            "run_after",
+            postgresql_where=text("status = 'QUEUED'"),
+        ),
+        Index(
+            "ix_jobs_running_lease",
+            "lease_expires_at",
+            postgresql_where=text("status = 'RUNNING'"),
+        ),
+        Index(
+            "ix_jobs_active_dedupe_key",
+            "dedupe_key",
+            unique=True,
+            postgresql_where=text(
+                "status IN ('QUEUED', 'RUNNING') AND dedupe_key IS NOT NULL"
+            ),
+        ),
+    )
+
+
+class ScheduledJobRun(Base):
+    """History of periodic jobs run by the scheduler leader.
+
+    One row per run of an APScheduler job (app.workers.scheduler), written
+    by the instance that held scheduler leadership at the time.
+    """
+
+    __tablename__ = "scheduled_job_runs"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+
+    # Scheduler job id (e.g. "stale_journey_monitor")
+    job_id: Mapped[str] = mapped_column(String(100))
+    # host:pid of the leader that ran it
+    instance: Mapped[str] = mapped_column(String(255))
+
+    status: Mapped[ScheduledRunStatus] = mapped_column(
+        Enum(ScheduledRunStatus), default=ScheduledRunStatus.RUNNING
+    )
+    # Stats dict returned by the job
+    stats: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_scheduled_job_runs_job_started", "job_id", "started_at"),
+        Index("ix_scheduled_job_runs_started", "started_at"),
+    )
@@ -82,81 +82,31 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """FastAPI lifespan with APScheduler for temporal automation."""
-    from apscheduler.schedulers.asyncio import AsyncIOScheduler
-    from app.workers.stale_journey_monitor import (
-        check_stale_journeys,
-        check_stale_leads,
-    )
-    from app.workers.conversation_analyzer import analyze_daily_conversations
-    from app.db.base import get_session_factory, init_db, close_db
+    from app.workers.automation_outbox import OutboxWorkerPool
+    from app.workers.job_worker import JobWorkerPool
+    from app.workers.scheduler import ClusterScheduler
+    from app.db.base import init_db, close_db
 
     # Initialize database connection (lazy loading pattern)
     await init_db()
 
-    scheduler = AsyncIOScheduler()
-
-    async def run_stale_check():
-        """Wrapper to run stale check with its own DB session."""
-        factory = get_session_factory()
-        async with factory() as db:
-            try:
-                await check_stale_journeys(db)
-            except Exception as e:
-                logger.error(f"Stale journey check failed: {e}")
-
-    async def run_stale_leads_check():
-        """Wrapper to run stale leads check with its own DB session."""
-        factory = get_session_factory()
-        async with factory() as db:
-            try:
-                await check_stale_leads(db)
-            except Exception as e:
-                logger.error(f"Stale leads check failed: {e}")
-
-    async def run_conversation_analysis():
-        """Wrapper to run daily chat analysis with its own DB session."""
-        factory = get_session_factory()
-        async with factory() as db:
-            try:
-                await analyze_daily_conversations(db)
-            except Exception as e:
-                logger.error(f"Conversation analysis failed: {e}")
-
-    # Run every hour
-    scheduler.add_job(
-        run_stale_check,
-        "interval",
-        hours=1,
-        id="stale_journey_monitor",
-        name="Stale Journey Monitor",
-    )
-
-    # Run every hour at minute 15 (offset from other checks)
-    scheduler.add_job(
-        run_stale_leads_check,
-        "interval",
-        hours=1,
-        id="stale_leads_monitor",
-        name="Stale Leads Monitor",
-    )
+    # Periodic jobs: scheduled everywhere, run only by the elected leader
+    scheduler = ClusterScheduler()
+    scheduler.start()
 
-    # Run every hour at minute 30 (offset from stale check at minute 0)
-    scheduler.add_job(
-        run_conversation_analysis,
-        "interval",
-        hours=1,
-        id="conversation_analyzer",
-        name="Hourly Conversation Analyzer",
-    )
+    # Drain automation events written by fire_event/emit_event
+    outbox_pool = OutboxWorkerPool()
+    outbox_pool.start()
 
-    scheduler.start()
-    logger.info(
-        "✅ APScheduler started: stale_journey_monitor, stale_leads_monitor, conversation_analyzer (hourly)"
-    )
+    # Durable jobs (dedicated workers: python -m app.workers.job_worker)
+    job_pool = JobWorkerPool(settings.JOB_WORKERS_IN_PROCESS)
+    job_pool.start()
 
     yield  # Application runs here
 
-    scheduler.shutdown()
+    await scheduler.stop()
+    await outbox_pool.stop()
+    await job_pool.stop(timeout=10)
     await close_db()  # Clean shutdown of database connection
     logger.info("APScheduler shutdown complete")
 
@@ -18,6 +18,7 @@ class PromptTask(str, Enum):
     """Task types for prompt selection."""
 
     CLINICAL_ANALYSIS = "clinical_analysis"
+    TRANSCRIPT_CHUNK = "transcript_chunk"  # Map step of chunked analysis
     AUDIO_SYNTHESIS = "audio_synthesis"
     AUDIO_MEMO = "audio_memo"  # v1.4.10 Crystal Mind
     DOCUMENT_ANALYSIS = "document_analysis"
@@ -62,6 +63,25 @@ Respond in the same language as the input content.
 """
 
 
+TRANSCRIPT_CHUNK_PROMPT = """You are AletheIA, an AI clinical assistant for therapists.
+
+You receive PART {part} of {total} of a long session transcript (retreat, group session).
+Your notes on every part will be combined into the final clinical analysis.
+
+Write concise clinical notes on THIS part only:
+- Main themes, and who raised them (speaker names if present)
+- Emotional shifts and notable moments, with 1-2 literal quotes
+- ANY risk signal (self-harm, crisis, medication changes, dissociation), quoted verbatim
+- Timestamps of key moments, if present
+
+## Guidelines:
+- Respond in plain text, NOT JSON.
+- Do NOT provide formal medical diagnoses.
+
+Respond in the same language as the transcript.
+"""
+
+
 AUDIO_SYNTHESIS_PROMPT = """You are AletheIA, an AI clinical assistant for therapists.
 
 Listen to the PROVIDED audio and generate a structured clinical synthesis in JSON format.
@@ -229,6 +249,7 @@ USER CONTEXT:
 
 PROMPTS: Dict[PromptTask, str] = {
     PromptTask.CLINICAL_ANALYSIS: CLINICAL_SYSTEM_PROMPT,
+    PromptTask.TRANSCRIPT_CHUNK: TRANSCRIPT_CHUNK_PROMPT,
     PromptTask.AUDIO_SYNTHESIS: AUDIO_SYNTHESIS_PROMPT,
     PromptTask.DOCUMENT_ANALYSIS: DOCUMENT_ANALYSIS_PROMPT,
     PromptTask.FORM_ANALYSIS: FORM_ANALYSIS_PROMPT,
@@ -5,6 +5,7 @@ Multimodal analysis of clinical entries using Google Gemini.
 Supports text, audio, and image/document analysis.
 """
 
+import copy
 import os
 import uuid
 from datetime import datetime
@@ -89,6 +90,24 @@ class AletheIA:
         self._user_id = user_id
         self._patient_id = patient_id
 
+    def with_context(
+        self, db=None, organization_id=None, user_id=None, patient_id=None
+    ) -> "AletheIA":
+        """
+        Copy with its own usage-logging context (models and shield are shared).
+
+        For concurrent calls: set_context() on the shared instance would leak
+        one caller's db/organization into another's usage log.
+        """
+        scoped = copy.copy(self)
+        scoped.set_context(
+            db=db,
+            organization_id=organization_id,
+            user_id=user_id,
+            patient_id=patient_id,
+        )
+        return scoped
+
     async def _get_model_for_task(self, task_type: str) -> "genai.GenerativeModel":
         """
         v1.3.4: Get configured model for specific task type from Task Routing.
@@ -653,7 +672,9 @@ Responde SOLO con el JSON, sin texto adicional."""
         except Exception as e:
             return f"Error reading DOCX file: {str(e)}"
 
-    async def analyze_chat_transcript(self, transcript: str) -> dict:
+    async def analyze_chat_transcript(
+        self, transcript: str, previous_summary: Optional[str] = None
+    ) -> dict:
         """
         Analyze WhatsApp chat transcript for clinical insights.
 
@@ -661,6 +682,8 @@ Responde SOLO con el JSON, sin texto adicional."""
 
         Args:
             transcript: Raw chat transcript (Patient: ... / System: ...)
+            previous_summary: Summary of the earlier analysis of this chat;
+                `transcript` then only holds the messages since
 
         Returns:
             dict with summary, sentiment_score, emotional_state, risk_flags, suggestion
@@ -712,10 +735,20 @@ EXAMPLE OUTPUT JSON:
             # v1.3.5: Get routed model for chat analysis (PULSE unit)
             model = await self._get_model_for_task("chat")
 
+            contents = [system_prompt]
+            if previous_summary:
+                # Incremental run: only new messages, with the rolling summary
+                contents.append(
+                    "RESUMEN PREVIO (análisis anterior de esta conversación; "
+                    "actualízalo con los mensajes nuevos):\n"
+                    f"{previous_summary}"
+                )
+            contents.append(f"TRANSCRIPT:\n{transcript}")
+
             # Run in thread pool to not block event loop
             response = await asyncio.to_thread(
                 model.generate_content,
-                [system_prompt, f"TRANSCRIPT:\n{transcript}"],
+                contents,
                 generation_config=genai.GenerationConfig(
                     response_mime_type="application/json",
                     temperature=0.3,
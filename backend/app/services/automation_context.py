@@ -0,0 +1,199 @@
+"""Event-scoped enrichment context for AutomationEngine actions.
+
+Several rules matching one event used to re-run the same lookups (the Lead,
+the "Consulta Inicial" service, the organization and its OWNER) once per
+rule. EventContext loads each of them at most once per event and shares the
+result between every rule and action:
+
+- Event data (the payload's Lead): memoized on the EventContext, so all
+  actions see (and update) the same row.
+- Per-organization data (tier, owner contact, consultation service): small
+  immutable snapshots in a module TTLCache, shared across events.
+
+Invalidation of the per-organization snapshots:
+- Local: SQLAlchemy session hooks drop an organization's entries after any
+  commit that writes its Organization, Users or ServiceTypes.
+- Other processes: bounded by AUTOMATION_CONTEXT_TTL_SECONDS.
+"""
+
+import logging
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Awaitable, Callable, Optional
+from uuid import UUID
+
+from cachetools import TTLCache
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.invalidation import register_commit_invalidation
+from app.db.models import Lead, Organization, OrgTier, ServiceType, User
+
+logger = logging.getLogger(__name__)
+
+# (kind, organization_id) -> snapshot (None is a valid, cached answer)
+_org_cache: TTLCache = TTLCache(
+    maxsize=4096, ttl=settings.AUTOMATION_CONTEXT_TTL_SECONDS
+)
+
+# Bumped on every invalidation; loads that raced with one are not stored
+_generation = 0
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class OwnerContact:
+    """The organization OWNER, as needed for notifications."""
+
+    email: Optional[str]
+    full_name: Optional[str]
+
+
+# =============================================================================
+# Per-Organization Lookups (TTL cache)
+# =============================================================================
+
+
+async def _cached(
+    kind: str, organization_id: UUID, load: Callable[[], Awaitable[Any]]
+) -> Any:
+    key = (kind, organization_id)
+    value = _org_cache.get(key, _MISSING)
+    if value is _MISSING:
+        generation = _generation
+        value = await load()
+        if generation == _generation:
+            _org_cache[key] = value
+    return value
+
+
+async def get_organization_tier(
+    db: AsyncSession, organization_id: UUID
+) -> Optional[OrgTier]:
+    """The organization's tier (None if it does not exist)."""
+
+    async def load():
+        result = await db.execute(
+            select(Organization.tier).where(Organization.id == organization_id)
+        )
+        return result.scalar_one_or_none()
+
+    return await _cached("tier", organization_id, load)
+
+
+async def get_owner_contact(
+    db: AsyncSession, organization_id: UUID
+) -> Optional[OwnerContact]:
+    """Email and name of the organization's OWNER user."""
+
+    async def load():
+        result = await db.execute(
+            select(User).where(
+                User.organization_id == organization_id, User.role == "OWNER"
+            )
+        )
+        owner = result.scalar_one_or_none()
+        return OwnerContact(owner.email, owner.full_name) if owner else None
+
+    return await _cached("owner", organization_id, load)
+
+
+async def get_consultation_service_id(
+    db: AsyncSession, organization_id: UUID
+) -> Optional[UUID]:
+    """Id of the active "Consulta Inicial" service used for booking links."""
+
+    async def load():
+        result = await db.execute(
+            select(ServiceType.id)
+            .where(ServiceType.organization_id == organization_id)
+            .where(ServiceType.title.ilike("%consulta inicial%"))
+            .where(ServiceType.is_active == True)
+        )
+        return result.scalar_one_or_none()
+
+    return await _cached("consultation_service", organization_id, load)
+
+
+def invalidate(organization_id: Optional[UUID] = None) -> None:
+    """Drop an organization's snapshots (or every organization's)."""
+    global _generation
+    _generation += 1
+    if organization_id is None:
+        _org_cache.clear()
+        return
+    for key in [k for k in _org_cache.keys() if k[1] == organization_id]:
+        _org_cache.pop(key, None)
+
+
+# =============================================================================
+# Event Context
+# =============================================================================
+
+
+class EventContext:
+    """
+    Lookups for one event, each loaded at most once.
+
+    Usage:
+        context = EventContext(db, organization_id, payload)
+        lead = await context.lead()
+        link = await context.booking_link(lead_id)
+    """
+
+    def __init__(self, db: AsyncSession, organization_id: UUID, payload: dict):
+        self.db = db
+        self.organization_id = organization_id
+        self.payload = payload
+        self._leads: dict[UUID, Optional[Lead]] = {}
+
+    async def lead(self, lead_id: Optional[str] = None) -> Optional[Lead]:
+        """The Lead referenced by the payload's lead_id (or `lead_id`)."""
+        lead_id = lead_id or self.payload.get("lead_id")
+        if not lead_id:
+            return None
+        key = UUID(str(lead_id))
+        if key not in self._leads:
+            result = await self.db.execute(select(Lead).where(Lead.id == key))
+            self._leads[key] = result.scalar_one_or_none()
+        return self._leads[key]
+
+    async def organization_tier(self) -> Optional[OrgTier]:
+        return await get_organization_tier(self.db, self.organization_id)
+
+    async def owner(self) -> Optional[OwnerContact]:
+        return await get_owner_contact(self.db, self.organization_id)
+
+    async def booking_link(self, lead_id: str) -> str:
+        """Booking link for the consultation service, or the contact page."""
+        service_id = await get_consultation_service_id(self.db, self.organization_id)
+        if service_id:
+            return f"{settings.FRONTEND_URL}/booking/{service_id}?lead={lead_id}"
+        return f"{settings.FRONTEND_URL}/contact"  # Fallback
+
+
+# =============================================================================
+# Write-Driven Hooks (SQLAlchemy session events)
+# =============================================================================
+
+
+def _changed_orgs(session: Session) -> set:
+    org_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Organization):
+            org_ids.add(obj.id)
+        elif isinstance(obj, (User, ServiceType)):
+            history = inspect(obj).attrs.organization_id.history
+            org_ids.update(v for v in history.sum() if v is not None)
+    return org_ids
+
+
+def _invalidate_orgs(org_ids: set) -> None:
+    for organization_id in org_ids:
+        invalidate(organization_id)
+
+
+register_commit_invalidation("automation_context", _changed_orgs, _invalidate_orgs)
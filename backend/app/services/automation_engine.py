@@ -7,24 +7,99 @@ Architecture:
 1. Events are logged to SystemEventLog (audit trail)
 2. Hardcoded rules are evaluated against the event payload
 3. Actions are executed (update patient status, send notifications, etc.)
+
+fire_event/emit_event only write the PENDING SystemEventLog row (the outbox)
+in the caller's transaction; steps 2-3 run in the automation outbox workers
+(app.workers.automation_outbox) unless AUTOMATION_OUTBOX_ENABLED is off.
 """
 
+import asyncio
+import inspect
 import logging
 from uuid import UUID
-from typing import Optional, Any
+from typing import Awaitable, Optional, Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
+from app.core.config import settings
 from app.db.models import (
     SystemEventLog,
     EventStatus,
 )
 from app.schemas.automation_types import TriggerEvent
+from app.services import automation_rule_index, journey_state
+from app.services.automation_context import EventContext
 
 logger = logging.getLogger(__name__)
 
 
+class ActionDispatcher:
+    """
+    Runs an event's side-effect actions (email sends) concurrently.
+
+    Actions touching the session stay sequential in the engine (one
+    AsyncSession cannot run concurrent statements, and later rules may
+    depend on earlier ones' writes). Only their final, independent side
+    effects are submitted here: each starts right away, in the background
+    of the remaining rules, at most AUTOMATION_ACTION_CONCURRENCY at a time.
+
+    An action fails if it raises or returns False (EmailService reports
+    failed sends that way). Isolated actions (dynamic rules) only log their
+    failures, recorded per group in `failed`; a failure of a non-isolated action (legacy rules) is
+    re-raised by wait() once every action has finished, so the event is
+    retried as before. If the event fails before wait(), abort() cancels
+    the actions that have not started and waits for the others, so no send
+    outlives its event.
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        self._semaphore = asyncio.Semaphore(
+            limit or settings.AUTOMATION_ACTION_CONCURRENCY
+        )
+        self._tasks: list[tuple[asyncio.Task, Awaitable]] = []
+        self._started: set[asyncio.Task] = set()
+        self.failed: set = set()  # Groups with a failed isolated action
+
+    def submit(
+        self, label: str, action: Awaitable, isolate: bool = True, group: Any = None
+    ) -> None:
+        group = label if group is None else group
+        task = asyncio.ensure_future(self._run(label, action, isolate, group))
+        self._tasks.append((task, action))
+
+    async def _run(
+        self, label: str, action: Awaitable, isolate: bool, group: Any
+    ) -> None:
+        async with self._semaphore:
+            self._started.add(asyncio.current_task())
+            try:
+                if await action is False:
+                    raise RuntimeError(f"{label} was not sent")
+            except Exception as e:
+                if not isolate:
+                    raise
+                self.failed.add(group)
+                logger.error(f"Error executing action for {label}: {e}", exc_info=True)
+
+    async def wait(self) -> None:
+        """Wait for every submitted action; re-raise the first non-isolated failure."""
+        tasks, self._tasks = [task for task, _ in self._tasks], []
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def abort(self) -> None:
+        """Cancel the actions that have not started; wait for the running ones."""
+        pending, self._tasks = self._tasks, []
+        for task, action in pending:
+            if task not in self._started:
+                task.cancel()
+                if inspect.iscoroutine(action):
+                    action.close()  # Never started: nothing was sent
+        await asyncio.gather(*(task for task, _ in pending), return_exceptions=True)
+
+
 class AutomationEngine:
     """
     Event-driven automation engine with hardcoded rules.
@@ -102,6 +177,17 @@ class AutomationEngine:
 
         return event_log
 
+    async def execute_event(self, event_log: SystemEventLog) -> bool:
+        """
+        Run the rules for an already-logged event (outbox delivery).
+
+        Leaves the log row untouched; the caller records the outcome.
+        Returns True if any rule matched.
+        """
+        return await self._execute_rules(
+            event_log.event_type, event_log.payload or {}, event_log.organization_id
+        )
+
     async def _execute_rules(
         self, event_type: str, payload: dict, organization_id: UUID
     ) -> bool:
@@ -109,43 +195,76 @@ class AutomationEngine:
         Execute rules for the given event.
         Returns True if any rule matched.
 
-        Now queries AutomationRule table for dynamic rules.
+        Dynamic rules come from the compiled rule index (automation_rule_index),
+        not a per-event query. Matched rules prepare their actions one by one
+        in priority order; the resulting sends run concurrently at the end.
+        A dynamic rule counts as matched once its sends have succeeded.
+        """
+        dispatcher = ActionDispatcher()
+        executed_rules = []
+        try:
+            rules_matched = await self._prepare_rules(
+                event_type, payload, organization_id, dispatcher, executed_rules
+            )
+        except BaseException:
+            # Sends that have not started would only be repeated on retry
+            await dispatcher.abort()
+            raise
+
+        # Fan out the queued sends: the event takes as long as the slowest one
+        await dispatcher.wait()
+
+        return rules_matched or any(
+            rule.id not in dispatcher.failed for rule in executed_rules
+        )
+
+    async def _prepare_rules(
+        self,
+        event_type: str,
+        payload: dict,
+        organization_id: UUID,
+        dispatcher: ActionDispatcher,
+        executed_rules: list,
+    ) -> bool:
+        """
+        Run the event's rules up to their sends, which are queued on
+        `dispatcher`. Dynamic rules whose actions were prepared are appended
+        to `executed_rules`. Returns True if a legacy rule matched.
         """
         from app.services.email import email_service
-        from app.db.models import User, Organization, AutomationRule
 
         rules_matched = False
+        # Lookups shared by every rule and action of this event
+        event_context = EventContext(self.db, organization_id, payload)
 
-        # === NEW: Query dynamic rules from database ===
-        print(f"🔍 Looking for rules: event={event_type}, org={organization_id}")
-        dynamic_rules_query = await self.db.execute(
-            select(AutomationRule)
-            .where(
-                AutomationRule.organization_id == organization_id,
-                AutomationRule.trigger_event == event_type,
-                AutomationRule.is_active,
-            )
-            .order_by(AutomationRule.priority.desc())
+        # === Dynamic rules from the compiled in-memory index ===
+        dynamic_rules = await automation_rule_index.get_rules(
+            self.db, organization_id, event_type
+        )
+        logger.debug(
+            f"Found {len(dynamic_rules)} active rules for {event_type} "
+            f"(org={organization_id})"
         )
-        dynamic_rules = dynamic_rules_query.scalars().all()
-
-        print(f"📋 Found {len(dynamic_rules)} active rules for {event_type}")
 
+        # Evaluate every condition before running any action
+        matched_rules = []
         for rule in dynamic_rules:
             try:
-                print(
-                    f"🎯 Processing rule: {rule.name}, agent_config: {rule.agent_config}"
+                if rule.matches(payload):
+                    matched_rules.append(rule)
+                else:
+                    logger.debug(f"Rule {rule.name} conditions not met, skipping")
+            except Exception as e:
+                logger.error(f"Error evaluating rule {rule.name}: {e}", exc_info=True)
+
+        for rule in matched_rules:
+            try:
+                # Execute actions (sends are queued on the dispatcher)
+                await self._execute_actions(
+                    rule, payload, organization_id, event_context, dispatcher
                 )
-                # Check conditions
-                if not self._check_conditions(rule.conditions, payload):
-                    print(f"❌ Rule {rule.name} conditions not met, skipping")
-                    continue
-
-                # Execute actions
-                print(f"▶️ Executing actions for rule: {rule.name}")
-                await self._execute_actions(rule, payload, organization_id)
-                rules_matched = True
-                print(f"✅ Executed rule: {rule.name}")
+                executed_rules.append(rule)
+                logger.info(f"✅ Executed rule: {rule.name}")
 
             except Exception as e:
                 logger.error(f"Error executing rule {rule.name}: {e}", exc_info=True)
@@ -161,18 +280,15 @@ class AutomationEngine:
             flags = self._get_nested_value(payload, "risk_analysis.flags") or []
 
             if patient_id and risk_level in ["HIGH", "CRITICAL"]:
-                # Get org to check tier for blocking decision
-                org_result = await self.db.execute(
-                    select(Organization).where(Organization.id == organization_id)
-                )
-                org = org_result.scalar_one_or_none()
+                # Get org tier for blocking decision
+                tier = await event_context.organization_tier()
 
                 # TIER-BASED RISK SHIELD:
                 # - CENTER tier: Full auto-blocking
                 # - BUILDER/PRO: Only notification (upsell feature)
                 from app.db.models import OrgTier
 
-                if org and org.tier == OrgTier.CENTER:
+                if tier == OrgTier.CENTER:
                     # 1. Update journey status (BLOCKING)
                     await self._update_patient_journey_status(
                         patient_id, "intake", "BLOCKED_HIGH_RISK"
@@ -183,16 +299,11 @@ class AutomationEngine:
                 else:
                     # No blocking for non-CENTER tiers
                     logger.info(
-                        f"HIGH RISK patient {patient_id} - auto-block skipped (tier: {org.tier.value if org else 'unknown'})"
+                        f"HIGH RISK patient {patient_id} - auto-block skipped (tier: {tier.value if tier else 'unknown'})"
                     )
 
                 # 2. Get therapist email (owner of org)
-                therapist_result = await self.db.execute(
-                    select(User).where(
-                        User.organization_id == organization_id, User.role == "OWNER"
-                    )
-                )
-                therapist = therapist_result.scalar_one_or_none()
+                therapist = await event_context.owner()
                 therapist_email = therapist.email if therapist else None
 
                 # 3. Send alert to therapist (all tiers get notification)
@@ -202,17 +313,21 @@ class AutomationEngine:
                         "patient_name": patient_name,
                         "flags": flags,
                     }
-                    if org and org.tier != OrgTier.CENTER:
+                    if tier and tier != OrgTier.CENTER:
                         context["upgrade_hint"] = (
                             "Activa el plan Center para bloqueo automático"
                         )
 
-                    await email_service.send_automation_email(
-                        to_email=therapist_email,
-                        to_name=therapist.full_name if therapist else "Terapeuta",
-                        subject=f"🚨 ALERTA: Riesgo detectado en {patient_name}",
-                        template_type="risk_alert",
-                        context=context,
+                    dispatcher.submit(
+                        "risk alert",
+                        email_service.send_automation_email(
+                            to_email=therapist_email,
+                            to_name=therapist.full_name if therapist else "Terapeuta",
+                            subject=f"🚨 ALERTA: Riesgo detectado en {patient_name}",
+                            template_type="risk_alert",
+                            context=context,
+                        ),
+                        isolate=False,
                     )
 
                 logger.warning(f"HIGH RISK patient {patient_id} - therapist notified")
@@ -233,15 +348,19 @@ class AutomationEngine:
                         f"{settings.FRONTEND_URL}/public/booking?patient={patient_id}"
                     )
 
-                    await email_service.send_automation_email(
-                        to_email=patient_email,
-                        to_name=patient_name,
-                        subject="🎉 ¡Estás dentro! Completa tu reserva",
-                        template_type="patient_accepted",
-                        context={
-                            "name": patient_name,
-                            "payment_link": payment_link,
-                        },
+                    dispatcher.submit(
+                        "payment link",
+                        email_service.send_automation_email(
+                            to_email=patient_email,
+                            to_name=patient_name,
+                            subject="🎉 ¡Estás dentro! Completa tu reserva",
+                            template_type="patient_accepted",
+                            context={
+                                "name": patient_name,
+                                "payment_link": payment_link,
+                            },
+                        ),
+                        isolate=False,
                     )
 
                 logger.info(f"LOW RISK patient {patient_id} - payment link sent")
@@ -278,7 +397,8 @@ class AutomationEngine:
         Update a specific key in the patient's journey_status JSONB.
         Uses PostgreSQL jsonb_set for atomic merge (not overwrite).
 
-        Also writes to JourneyLog for audit trail (v0.9.2).
+        Also writes to JourneyLog for audit trail (v0.9.2) and upserts the
+        materialized patient_journey_state row, all in the same transaction.
 
         Example:
             patient.journey_status = {"intake": "BLOCKED_HIGH_RISK"}
@@ -331,6 +451,9 @@ class AutomationEngine:
         )
         self.db.add(journey_log)
 
+        # 4. Current stage (indexed lookups for stage filters / timeouts)
+        await journey_state.record_stage(self.db, patient_id, journey_key, new_status)
+
         logger.info(
             f"Patient {patient_id}: {journey_key} {old_status or 'NULL'} -> {new_status}"
         )
@@ -340,121 +463,44 @@ class AutomationEngine:
         Extract a value from a nested dict using dot notation.
         Example: _get_nested_value({"a": {"b": 1}}, "a.b") -> 1
         """
-        keys = path.split(".")
-        current = data
-
-        for key in keys:
-            if isinstance(current, dict):
-                current = current.get(key)
-            else:
-                return None
-            if current is None:
-                return None
-
-        return current
+        return automation_rule_index.get_nested_value(data, tuple(path.split(".")))
 
     def _check_conditions(self, conditions: dict, payload: dict) -> bool:
         """
         Check if rule conditions match the payload.
 
         conditions format: {"logic": "AND", "rules": [{...}]}
-        Returns True if conditions match.
+        Returns True if conditions match. Indexed rules carry the compiled
+        predicate already; this compiles on the fly for ad-hoc checks.
         """
-        if not conditions or not conditions.get("rules"):
-            return True  # No conditions = always match
-
-        rules = conditions.get("rules", [])
-        logic = conditions.get("logic", "AND")
-
-        results = []
-        for cond in rules:
-            field = cond.get("field")
-            operator = cond.get("operator")
-            value = cond.get("value")
-
-            # Get actual value from payload
-            actual_value = self._get_nested_value(payload, field)
-
-            # Print for debugging
-            print(
-                f"   📊 Condition check: {field} {operator} {value} (actual: {actual_value})"
-            )
-
-            # Evaluate condition based on operator
-            result = False
-
-            # Equality operators
-            if operator in ("=", "eq", "==", "equals"):
-                result = str(actual_value) == str(value)
-            elif operator in ("!=", "neq", "<>", "not_equals"):
-                result = str(actual_value) != str(value)
-
-            # String operators
-            elif operator == "contains":
-                result = (
-                    str(value).lower() in str(actual_value).lower()
-                    if actual_value
-                    else False
-                )
-            elif operator == "starts_with":
-                result = (
-                    str(actual_value).lower().startswith(str(value).lower())
-                    if actual_value
-                    else False
-                )
-            elif operator == "ends_with":
-                result = (
-                    str(actual_value).lower().endswith(str(value).lower())
-                    if actual_value
-                    else False
-                )
-
-            # Numeric comparison operators
-            elif operator in ("gte", ">="):
-                try:
-                    result = float(actual_value) >= float(value)
-                except (ValueError, TypeError):
-                    result = False
-            elif operator in ("lte", "<="):
-                try:
-                    result = float(actual_value) <= float(value)
-                except (ValueError, TypeError):
-                    result = False
-            elif operator in ("gt", ">"):
-                try:
-                    result = float(actual_value) > float(value)
-                except (ValueError, TypeError):
-                    result = False
-            elif operator in ("lt", "<"):
-                try:
-                    result = float(actual_value) < float(value)
-                except (ValueError, TypeError):
-                    result = False
-
-            else:
-                print(f"   ⚠️ Unknown operator: {operator}")
-                result = False
-
-            print(f"   → Result: {result}")
-            results.append(result)
-
-        if logic == "AND":
-            return all(results) if results else True
-        else:  # OR
-            return any(results) if results else True
+        return automation_rule_index.compile_conditions(conditions)(payload)
 
     async def _execute_actions(
-        self, rule: "AutomationRule", payload: dict, organization_id: UUID
+        self,
+        rule: "AutomationRule | automation_rule_index.CompiledRule",
+        payload: dict,
+        organization_id: UUID,
+        context: Optional[EventContext] = None,
+        dispatcher: Optional[ActionDispatcher] = None,
     ):
         """
         Execute the actions defined in an automation rule.
 
         Handles send_email, send_whatsapp, etc.
         Now supports DRAFT_ONLY mode via agent_config.
+        Lead and service lookups go through the event's EventContext. Sends
+        are queued on `dispatcher` (run by the caller); without one they are
+        awaited here.
         """
-        from app.db.models import PendingAction, Lead
+        from app.db.models import PendingAction
         from app.services.email import email_service
 
+        if context is None:
+            context = EventContext(self.db, organization_id, payload)
+        own_dispatcher = dispatcher is None
+        if own_dispatcher:
+            dispatcher = ActionDispatcher()
+
         for action in rule.actions:
             action_type = action.get("type")
             params = action.get("params", {})
@@ -472,32 +518,13 @@ class AutomationEngine:
                         continue
 
                     # Get lead info
-                    lead_result = await self.db.execute(
-                        select(Lead).where(Lead.id == UUID(lead_id))
-                    )
-                    lead = lead_result.scalar_one_or_none()
+                    lead = await context.lead(lead_id)
                     if not lead:
                         print(f"❌ Lead {lead_id} not found")
                         continue
 
                     # Enrich template params with lead data
-                    from app.core.config import settings
-                    from app.db.models import ServiceType
-
-                    # Find "Consulta Inicial" service for booking link
-                    service_result = await self.db.execute(
-                        select(ServiceType)
-                        .where(ServiceType.organization_id == organization_id)
-                        .where(ServiceType.title.ilike("%consulta inicial%"))
-                        .where(ServiceType.is_active == True)
-                    )
-                    consultation_service = service_result.scalar_one_or_none()
-
-                    # Generate booking link
-                    if consultation_service:
-                        booking_link = f"{settings.FRONTEND_URL}/booking/{consultation_service.id}?lead={lead_id}"
-                    else:
-                        booking_link = f"{settings.FRONTEND_URL}/contact"  # Fallback
+                    booking_link = await context.booking_link(lead_id)
 
                     enriched_params = params.copy()
                     enriched_params["first_name"] = lead.first_name or "Lead"
@@ -528,12 +555,7 @@ class AutomationEngine:
                     # AUTO_SEND mode - send immediately
                     # Get lead data for template substitution
                     lead_id = payload.get("lead_id")
-                    lead = None
-                    if lead_id:
-                        lead_result = await self.db.execute(
-                            select(Lead).where(Lead.id == UUID(lead_id))
-                        )
-                        lead = lead_result.scalar_one_or_none()
+                    lead = await context.lead(lead_id) if lead_id else None
 
                     to_email = params.get("to")
                     subject = params.get("subject", "Notificación")
@@ -541,25 +563,7 @@ class AutomationEngine:
 
                     # Template substitution
                     if lead:
-                        from app.core.config import settings
-                        from app.db.models import ServiceType
-
-                        # Find "Consulta Inicial" service for booking link
-                        service_result = await self.db.execute(
-                            select(ServiceType)
-                            .where(ServiceType.organization_id == organization_id)
-                            .where(ServiceType.title.ilike("%consulta inicial%"))
-                            .where(ServiceType.is_active == True)
-                        )
-                        consultation_service = service_result.scalar_one_or_none()
-
-                        # Generate booking link
-                        if consultation_service:
-                            booking_link = f"{settings.FRONTEND_URL}/booking/{consultation_service.id}?lead={lead_id}"
-                        else:
-                            booking_link = (
-                                f"{settings.FRONTEND_URL}/contact"  # Fallback
-                            )
+                        booking_link = await context.booking_link(lead_id)
 
                         body = body.replace("{first_name}", lead.first_name or "Lead")
                         body = body.replace("{last_name}", lead.last_name or "")
@@ -572,16 +576,55 @@ class AutomationEngine:
                             lead.status = "CONTACTED"
                             await self.db.commit()
 
-                    await email_service.send_automation_email(
-                        to_email=to_email
-                        if to_email != "lead"
-                        else (lead.email if lead else ""),
-                        to_name=lead.first_name if lead else params.get("to_name", ""),
-                        subject=subject,
-                        template_type="generic",
-                        context={"body": body},
+                    dispatcher.submit(
+                        f"rule {rule.name}",
+                        email_service.send_automation_email(
+                            to_email=(
+                                to_email
+                                if to_email != "lead"
+                                else (lead.email if lead else "")
+                            ),
+                            to_name=(
+                                lead.first_name if lead else params.get("to_name", "")
+                            ),
+                            subject=subject,
+                            template_type="generic",
+                            context={"body": body},
+                        ),
+                        group=rule.id,
                     )
-                    logger.info(f"✅ Sent email to {to_email} (rule: {rule.name})")
+                    logger.info(f"✅ Queued email to {to_email} (rule: {rule.name})")
+
+        if own_dispatcher:
+            await dispatcher.wait()
+
+
+async def enqueue_event(
+    db: AsyncSession,
+    event_type: str,
+    payload: dict,
+    organization_id: UUID,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[UUID] = None,
+) -> SystemEventLog:
+    """
+    Write an event to the outbox (PENDING system_events row) without committing.
+
+    The row becomes visible to the outbox workers when the caller's
+    transaction commits, so it is delivered if and only if the caller's
+    own changes are.
+    """
+    event_log = SystemEventLog(
+        organization_id=organization_id,
+        event_type=event_type,
+        payload=payload,
+        status=EventStatus.PENDING,
+        entity_type=entity_type,
+        entity_id=entity_id,
+    )
+    db.add(event_log)
+    await db.flush()  # Get the ID
+    return event_log
 
 
 async def fire_event(
@@ -595,8 +638,22 @@ async def fire_event(
     """
     Convenience function to fire an event (fire-and-forget wrapper).
 
-    Use this from endpoints to trigger automation without blocking.
+    Use this from endpoints to trigger automation without blocking: the event
+    is committed to the outbox together with anything else pending in `db`,
+    and the rules run later in an outbox worker.
     """
+    if settings.AUTOMATION_OUTBOX_ENABLED:
+        event_log = await enqueue_event(
+            db,
+            event_type=event_type.value,
+            payload=payload,
+            organization_id=organization_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+        )
+        await db.commit()
+        return event_log
+
     engine = AutomationEngine(db)
     return await engine.process_event(
         event_type=event_type.value,
@@ -624,6 +681,19 @@ async def emit_event(
         f"🔥 Emitting event: {event_type.value} for org {organization_id}, entity {entity_id}"
     )
     try:
+        if settings.AUTOMATION_OUTBOX_ENABLED:
+            result = await enqueue_event(
+                db,
+                event_type=event_type.value,
+                payload=payload or {},
+                organization_id=organization_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+            )
+            await db.commit()
+            logger.info(f"✅ Event queued for automation: {event_type.value}")
+            return result
+
         engine = AutomationEngine(db)
         result = await engine.process_event(
             event_type=event_type.value,
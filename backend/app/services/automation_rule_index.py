@@ -0,0 +1,256 @@
+"""Compiled in-memory index of AutomationRules for the AutomationEngine.
+
+Every event used to query automation_rules by (organization, trigger) and
+then interpret each rule's JSON conditions. This module keeps, per
+organization, the active rules grouped by trigger_event with their
+conditions compiled into Python predicates once, when they are loaded.
+
+Invalidation:
+- Local: SQLAlchemy session hooks drop an organization's entry after any
+  commit that inserts, updates or deletes one of its AutomationRules.
+- Other processes (workers, seed scripts): bounded by the TTL
+  (AUTOMATION_RULE_INDEX_TTL_SECONDS).
+
+Condition semantics (see compile_conditions) match the original
+interpreter exactly: equality compares str() forms, string operators are
+case-insensitive, numeric operators coerce with float() and are False when
+coercion fails, unknown operators never match.
+"""
+
+import logging
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from cachetools import TTLCache
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.invalidation import register_commit_invalidation
+from app.db.models import AutomationRule
+
+logger = logging.getLogger(__name__)
+
+Predicate = Callable[[dict], bool]
+
+# organization_id -> {trigger_event: tuple[CompiledRule, ...]}
+_index: TTLCache = TTLCache(
+    maxsize=1024, ttl=settings.AUTOMATION_RULE_INDEX_TTL_SECONDS
+)
+
+# Bumped on every invalidation; loads that raced with one are not stored
+_generation = 0
+
+
+# =============================================================================
+# Condition Compilation
+# =============================================================================
+
+
+def _always(payload: dict) -> bool:
+    return True
+
+
+def _never(payload: dict) -> bool:
+    return False
+
+
+def get_nested_value(data: dict, keys: tuple[str, ...]) -> Any:
+    """Walk a pre-split dot path ("a.b" -> ("a", "b")) through nested dicts."""
+    current = data
+    for key in keys:
+        if isinstance(current, dict):
+            current = current.get(key)
+        else:
+            return None
+        if current is None:
+            return None
+    return current
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _compile_condition(cond: dict) -> Predicate:
+    """Compile one {"field", "operator", "value"} condition."""
+    field = cond.get("field")
+    operator = cond.get("operator")
+    value = cond.get("value")
+    if not isinstance(field, str):
+        logger.warning(f"Automation condition without field: {cond}")
+        return _never
+    keys = tuple(field.split("."))
+
+    def actual(payload: dict) -> Any:
+        return get_nested_value(payload, keys)
+
+    # Equality operators
+    if operator in ("=", "eq", "==", "equals"):
+        expected = str(value)
+        return lambda payload: str(actual(payload)) == expected
+    if operator in ("!=", "neq", "<>", "not_equals"):
+        expected = str(value)
+        return lambda payload: str(actual(payload)) != expected
+
+    # String operators (case-insensitive, falsy actual never matches)
+    if operator in ("contains", "starts_with", "ends_with"):
+        needle = str(value).lower()
+        if operator == "contains":
+            test = lambda text: needle in text
+        elif operator == "starts_with":
+            test = lambda text: text.startswith(needle)
+        else:
+            test = lambda text: text.endswith(needle)
+
+        def string_predicate(payload: dict) -> bool:
+            found = actual(payload)
+            return test(str(found).lower()) if found else False
+
+        return string_predicate
+
+    # Numeric comparison operators
+    compare = {
+        "gte": float.__ge__,
+        ">=": float.__ge__,
+        "lte": float.__le__,
+        "<=": float.__le__,
+        "gt": float.__gt__,
+        ">": float.__gt__,
+        "lt": float.__lt__,
+        "<": float.__lt__,
+    }.get(operator)
+    if compare:
+        threshold = _as_float(value)
+        if threshold is None:
+            return _never
+
+        def numeric_predicate(payload: dict) -> bool:
+            number = _as_float(actual(payload))
+            return number is not None and compare(number, threshold)
+
+        return numeric_predicate
+
+    logger.warning(f"Unknown automation condition operator: {operator}")
+    return _never
+
+
+def compile_conditions(conditions: Optional[dict]) -> Predicate:
+    """Compile a rule's conditions ({"logic": "AND"|"OR", "rules": [...]})."""
+    if not conditions or not conditions.get("rules"):
+        return _always  # No conditions = always match
+
+    predicates = [_compile_condition(cond) for cond in conditions["rules"]]
+    if conditions.get("logic", "AND") == "AND":
+        return lambda payload: all(p(payload) for p in predicates)
+    return lambda payload: any(p(payload) for p in predicates)
+
+
+# =============================================================================
+# Rule Index
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """Immutable snapshot of an active AutomationRule, ready to evaluate.
+
+    Exposes the attributes AutomationEngine._execute_actions reads, so it can
+    stand in for the ORM row without touching the session.
+    """
+
+    id: UUID
+    organization_id: UUID
+    name: str
+    trigger_event: str
+    priority: int
+    actions: list
+    agent_config: Optional[dict]
+    matches: Predicate
+
+    @classmethod
+    def from_rule(cls, rule: AutomationRule) -> "CompiledRule":
+        return cls(
+            id=rule.id,
+            organization_id=rule.organization_id,
+            name=rule.name,
+            trigger_event=rule.trigger_event,
+            priority=rule.priority,
+            actions=list(rule.actions or []),
+            agent_config=dict(rule.agent_config) if rule.agent_config else None,
+            matches=compile_conditions(rule.conditions),
+        )
+
+
+async def get_rules(
+    db: AsyncSession, organization_id: UUID, trigger_event: str
+) -> tuple[CompiledRule, ...]:
+    """Active rules for (organization, trigger), highest priority first."""
+    by_trigger = _index.get(organization_id)
+    if by_trigger is None:
+        generation = _generation
+        by_trigger = await _load_organization(db, organization_id)
+        if generation == _generation:
+            _index[organization_id] = by_trigger
+    return by_trigger.get(trigger_event, ())
+
+
+async def _load_organization(
+    db: AsyncSession, organization_id: UUID
+) -> dict[str, tuple[CompiledRule, ...]]:
+    """Load and compile every active rule of an organization in one query."""
+    result = await db.execute(
+        select(AutomationRule)
+        .where(
+            AutomationRule.organization_id == organization_id,
+            AutomationRule.is_active,
+        )
+        .order_by(AutomationRule.priority.desc())
+    )
+    grouped: dict[str, list[CompiledRule]] = {}
+    for rule in result.scalars().all():
+        grouped.setdefault(rule.trigger_event, []).append(CompiledRule.from_rule(rule))
+    logger.debug(
+        f"Compiled {sum(map(len, grouped.values()))} automation rules "
+        f"for org {organization_id}"
+    )
+    return {trigger: tuple(rules) for trigger, rules in grouped.items()}
+
+
+def invalidate(organization_id: Optional[UUID] = None) -> None:
+    """Drop an organization's compiled rules (or the whole index)."""
+    global _generation
+    _generation += 1
+    if organization_id:
+        _index.pop(organization_id, None)
+    else:
+        _index.clear()
+
+
+# =============================================================================
+# Write-Driven Hooks (SQLAlchemy session events)
+# =============================================================================
+
+
+def _changed_orgs(session: Session) -> set:
+    org_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, AutomationRule):
+            continue
+        history = inspect(obj).attrs.organization_id.history
+        org_ids.update(v for v in history.sum() if v is not None)
+    return org_ids
+
+
+def _invalidate_orgs(org_ids: set) -> None:
+    for organization_id in org_ids:
+        invalidate(organization_id)
+
+
+register_commit_invalidation("automation_rule_index", _changed_orgs, _invalidate_orgs)
@@ -14,7 +14,7 @@ Usage:
 import logging
 import uuid
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, TYPE_CHECKING
 from dataclasses import dataclass
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -30,6 +30,9 @@ from app.db.models import (
 from app.services.cortex import CortexOrchestrator, PrivacyResolver
 from app.services.storage import StorageService
 
+if TYPE_CHECKING:
+    from app.services.cortex.bulk import ModelRateLimiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,10 +67,15 @@ class ClinicalService:
     - Uses placeholder text for GHOST entries
     """
 
-    def __init__(self, db: AsyncSession, gcs_service: StorageService = None):
+    def __init__(
+        self,
+        db: AsyncSession,
+        gcs_service: StorageService = None,
+        model_budget: Optional["ModelRateLimiter"] = None,
+    ):
         self.db = db
         self.gcs_service = gcs_service
-        self.orchestrator = CortexOrchestrator(db, gcs_service)
+        self.orchestrator = CortexOrchestrator(db, gcs_service, model_budget)
 
     async def process_entry(
         self,
@@ -383,12 +391,15 @@ class ClinicalService:
         self,
         entry_id: uuid.UUID,
         user_id: uuid.UUID,
-    ):
+    ) -> Optional[ProcessingResult]:
         """
         Background task wrapper for process_entry.
 
         Loads all required entities and processes the entry.
-        Used by FastAPI BackgroundTasks.
+        Used by the clinical.analyze_entry job (app.workers.job_worker).
+
+        Returns:
+            The ProcessingResult, or None if the entry could not be loaded
         """
         from sqlalchemy import select
         from app.db.models import User
@@ -430,5 +441,6 @@ class ClinicalService:
             return
 
         # Process
-        await self.process_entry(entry, patient, organization)
+        result = await self.process_entry(entry, patient, organization)
         await self.db.commit()
+        return result
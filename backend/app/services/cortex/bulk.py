@@ -0,0 +1,383 @@
+"""
+Bulk Runner - Checkpointed re-processing of clinical entries
+
+Prompt changes and pipeline roll-outs (CortexSwitch) mean re-running
+thousands of ClinicalEntry rows through ClinicalService.process_entry.
+A bulk run (CortexBulkRun row):
+
+1. Snapshots its filters (organization, entry types, statuses, created_at
+   window; created_before defaults to the creation time) and counts the
+   matching entries
+2. Reads entry ids a page at a time with (created_at, id) keyset pagination
+3. Processes each page `concurrency` entries at a time, each in its own
+   session, with model calls spaced to each model's requests-per-minute
+   budget (cache hits of cacheable steps don't count)
+4. Checkpoints the cursor and counters after every page: an interrupted run
+   resumes after the last finished page (a page may be processed twice;
+   process_entry is idempotent and re-runs reuse memoized transcriptions)
+
+Runs are started from the admin API (as a cortex.bulk_run job) or the CLI:
+    python scripts/cortex_bulk_reprocess.py --help
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.models import (
+    BulkRunStatus,
+    ClinicalEntry,
+    CortexBulkRun,
+    EntryType,
+    Organization,
+    Patient,
+    ProcessingStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+# Entries already being analyzed (PENDING/PROCESSING) are never touched
+REPROCESSABLE_STATUSES = (ProcessingStatus.COMPLETED, ProcessingStatus.FAILED)
+
+FINISHED_STATUSES = (
+    BulkRunStatus.SUCCEEDED,
+    BulkRunStatus.FAILED,
+    BulkRunStatus.CANCELLED,
+)
+
+# Entry failures kept on the run (most recent)
+MAX_RECORDED_ERRORS = 50
+
+
+class ModelRateLimiter:
+    """
+    Spaces calls to each model to stay within its requests per minute.
+
+    Usage:
+        limiter = ModelRateLimiter({"gemini-2.5-pro": 120})
+        await limiter.acquire("gemini-2.5-pro")  # Before each model call
+    """
+
+    def __init__(self, rpm: Optional[Dict[str, int]] = None):
+        self.rpm = {**settings.CORTEX_BULK_MODEL_RPM, **(rpm or {})}
+        self._next_slot: Dict[str, float] = {}
+
+    async def acquire(self, model_id: str) -> None:
+        """Wait for the model's next free slot (no limit if its rpm is 0)."""
+        rpm = self.rpm.get(model_id, settings.CORTEX_BULK_DEFAULT_RPM)
+        if rpm <= 0:
+            return
+
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(model_id, now))
+        # Reserved before sleeping: concurrent callers queue up behind it
+        self._next_slot[model_id] = slot + 60.0 / rpm
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+# =============================================================================
+# Runs
+# =============================================================================
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Validate bulk run filters and return them in their stored (JSON) form.
+
+    Raises:
+        ValueError: On unknown entry types or non re-processable statuses
+    """
+    filters = filters or {}
+    statuses = [ProcessingStatus(s) for s in filters.get("statuses") or []]
+    if any(s not in REPROCESSABLE_STATUSES for s in statuses):
+        allowed = ", ".join(s.value for s in REPROCESSABLE_STATUSES)
+        raise ValueError(f"Only entries in {allowed} can be re-processed")
+
+    created_before = filters.get("created_before") or datetime.now(timezone.utc)
+    created_after = filters.get("created_after")
+    return {
+        "organization_id": (
+            str(uuid.UUID(str(filters["organization_id"])))
+            if filters.get("organization_id")
+            else None
+        ),
+        "entry_types": [EntryType(t).value for t in filters.get("entry_types") or []],
+        "statuses": [s.value for s in statuses or REPROCESSABLE_STATUSES],
+        "created_after": _isoformat(created_after) if created_after else None,
+        "created_before": _isoformat(created_before),
+    }
+
+
+def _isoformat(value) -> str:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.isoformat()
+
+
+def _filter_clauses(filters: Dict[str, Any]) -> list:
+    """WHERE clauses selecting the entries of a run (normalized filters)."""
+    clauses = [
+        ClinicalEntry.is_ghost.is_(False),  # Content was never stored
+        ClinicalEntry.processing_status.in_(
+            [ProcessingStatus(s) for s in filters["statuses"]]
+        ),
+        ClinicalEntry.created_at < datetime.fromisoformat(filters["created_before"]),
+    ]
+    if filters.get("entry_types"):
+        clauses.append(
+            ClinicalEntry.entry_type.in_([EntryType(t) for t in filters["entry_types"]])
+        )
+    if filters.get("organization_id"):
+        clauses.append(
+            ClinicalEntry.patient_id.in_(
+                select(Patient.id).where(
+                    Patient.organization_id == uuid.UUID(filters["organization_id"])
+                )
+            )
+        )
+    if filters.get("created_after"):
+        clauses.append(
+            ClinicalEntry.created_at >= datetime.fromisoformat(filters["created_after"])
+        )
+    return clauses
+
+
+async def create_bulk_run(
+    db: AsyncSession,
+    filters: Optional[Dict[str, Any]] = None,
+    concurrency: Optional[int] = None,
+    model_rpm: Optional[Dict[str, int]] = None,
+    created_by: Optional[uuid.UUID] = None,
+) -> CortexBulkRun:
+    """
+    Create a QUEUED bulk run without committing.
+
+    Raises:
+        ValueError: On invalid filters
+    """
+    filters = normalize_filters(filters)
+    total = await db.scalar(
+        select(func.count()).select_from(ClinicalEntry).where(*_filter_clauses(filters))
+    )
+    run = CortexBulkRun(
+        id=uuid.uuid4(),
+        status=BulkRunStatus.QUEUED,
+        filters=filters,
+        concurrency=concurrency or settings.CORTEX_BULK_CONCURRENCY,
+        model_rpm=model_rpm or {},
+        total=total or 0,
+        processed=0,
+        succeeded=0,
+        failed=0,
+        errors=[],
+        created_by=created_by,
+    )
+    db.add(run)
+    await db.flush()
+    await db.refresh(run)  # Server defaults (created_at)
+    return run
+
+
+def reopen_bulk_run(run: CortexBulkRun) -> None:
+    """
+    Queue a failed or cancelled run again, so run_bulk resumes it from its
+    last checkpoint. Queued and running runs are left as they are. Does not
+    commit.
+
+    Raises:
+        ValueError: If the run already succeeded
+    """
+    if run.status == BulkRunStatus.SUCCEEDED:
+        raise ValueError("Bulk run already SUCCEEDED")
+    if run.status in (BulkRunStatus.FAILED, BulkRunStatus.CANCELLED):
+        run.status = BulkRunStatus.QUEUED
+        run.finished_at = None
+        run.last_error = None
+
+
+async def _next_page(db: AsyncSession, run: CortexBulkRun, clauses: list) -> List[Any]:
+    """The next CORTEX_BULK_PAGE_SIZE (id, created_at) rows past the cursor."""
+    stmt = select(ClinicalEntry.id, ClinicalEntry.created_at).where(*clauses)
+    if run.cursor_created_at is not None:
+        stmt = stmt.where(
+            or_(
+                ClinicalEntry.created_at > run.cursor_created_at,
+                and_(
+                    ClinicalEntry.created_at == run.cursor_created_at,
+                    ClinicalEntry.id > run.cursor_id,
+                ),
+            )
+        )
+    result = await db.execute(
+        stmt.order_by(ClinicalEntry.created_at, ClinicalEntry.id).limit(
+            settings.CORTEX_BULK_PAGE_SIZE
+        )
+    )
+    return result.all()
+
+
+async def _process_entry(
+    session_factory, entry_id: uuid.UUID, limiter: ModelRateLimiter
+) -> Optional[str]:
+    """Re-process one entry in its own session. Returns the error, if any."""
+    from app.services.clinical_service import ClinicalService
+
+    try:
+        async with session_factory() as session:
+            row = (
+                await session.execute(
+                    select(ClinicalEntry, Patient, Organization)
+                    .join(Patient, ClinicalEntry.patient_id == Patient.id)
+                    .join(Organization, Patient.organization_id == Organization.id)
+                    .where(ClinicalEntry.id == entry_id)
+                )
+            ).one_or_none()
+            if row is None:
+                return None  # Deleted since the page was read
+
+            entry, patient, organization = row
+            result = await ClinicalService(session, model_budget=limiter).process_entry(
+                entry, patient, organization
+            )
+            await session.commit()
+            return None if result.success else result.error or "Processing failed"
+    except Exception as e:
+        logger.error(f"Bulk re-processing failed for entry {entry_id}: {e}")
+        return str(e) or type(e).__name__
+
+
+async def run_bulk(db: AsyncSession, run_id: uuid.UUID) -> Dict[str, Any]:
+    """
+    Run (or resume) a bulk run until it finishes or is cancelled.
+
+    Entry failures are counted and recorded on the run; only database errors
+    reading pages or checkpointing escape (the run can then be resumed).
+
+    Returns:
+        The run's progress report (bulk_progress)
+    """
+    run = await db.get(CortexBulkRun, run_id)
+    if run is None:
+        raise ValueError(f"Bulk run {run_id} not found")
+    if run.status in FINISHED_STATUSES:
+        return bulk_progress(run)
+
+    now = datetime.now(timezone.utc)
+    if run.started_at is None:
+        run.started_at = now
+    else:
+        logger.info(f"Bulk run {run.id}: resuming after {run.processed} entries")
+    run.status = BulkRunStatus.RUNNING
+    run.updated_at = now
+    await db.commit()
+
+    session_factory = async_sessionmaker(
+        db.bind, class_=AsyncSession, expire_on_commit=False, autoflush=False
+    )
+    limiter = ModelRateLimiter(run.model_rpm)
+    pool = asyncio.Semaphore(run.concurrency)
+    clauses = _filter_clauses(run.filters)
+
+    async def process(entry_id: uuid.UUID) -> Optional[str]:
+        async with pool:
+            return await _process_entry(session_factory, entry_id, limiter)
+
+    while True:
+        page = await _next_page(db, run, clauses)
+        await db.commit()  # Don't hold a connection while the page runs
+        if not page:
+            break
+
+        errors = await asyncio.gather(*(process(row.id) for row in page))
+
+        # Checkpoint (an admin may have cancelled the run meanwhile)
+        await db.refresh(run, ["status"])
+        failures = [
+            {"entry_id": str(row.id), "error": error[:500]}
+            for row, error in zip(page, errors)
+            if error
+        ]
+        run.cursor_created_at, run.cursor_id = page[-1].created_at, page[-1].id
+        run.processed += len(page)
+        run.failed += len(failures)
+        run.succeeded += len(page) - len(failures)
+        if failures:
+            run.errors = (run.errors + failures)[-MAX_RECORDED_ERRORS:]
+        run.updated_at = datetime.now(timezone.utc)
+        await db.commit()
+
+        progress = bulk_progress(run)
+        logger.info(
+            f"Bulk run {run.id}: {run.processed}/{run.total} entries "
+            f"({progress['percent']}%), {run.failed} failed, "
+            f"ETA {_format_eta(progress['eta_seconds'])}"
+        )
+        if run.status == BulkRunStatus.CANCELLED:
+            logger.warning(f"Bulk run {run.id}: cancelled")
+            break
+
+    if run.status != BulkRunStatus.CANCELLED:
+        run.status = BulkRunStatus.SUCCEEDED
+    run.finished_at = datetime.now(timezone.utc)
+    await db.commit()
+    logger.info(
+        f"Bulk run {run.id} {run.status.value.lower()}: {run.succeeded} "
+        f"succeeded, {run.failed} failed"
+    )
+    return bulk_progress(run)
+
+
+def bulk_progress(run: CortexBulkRun) -> Dict[str, Any]:
+    """
+    Progress report of a run, with an ETA from its average rate so far.
+
+    The rate is measured from started_at, so time spent interrupted before a
+    resume lowers it (the ETA errs on the long side).
+    """
+    remaining = max(run.total - run.processed, 0)
+    rate_per_minute = None
+    eta_seconds = None
+    if run.started_at and run.updated_at and run.processed:
+        elapsed = (run.updated_at - run.started_at).total_seconds()
+        if elapsed > 0:
+            rate_per_minute = round(run.processed / elapsed * 60, 1)
+            eta_seconds = round(remaining / run.processed * elapsed)
+    if run.status in FINISHED_STATUSES:
+        eta_seconds = None
+
+    return {
+        "id": str(run.id),
+        "status": run.status.value,
+        "filters": run.filters,
+        "concurrency": run.concurrency,
+        "model_rpm": run.model_rpm,
+        "total": run.total,
+        "processed": run.processed,
+        "succeeded": run.succeeded,
+        "failed": run.failed,
+        "remaining": remaining,
+        "percent": round(run.processed / run.total * 100, 1) if run.total else 100.0,
+        "rate_per_minute": rate_per_minute,
+        "eta_seconds": eta_seconds,
+        "errors": run.errors,
+        "last_error": run.last_error,
+        "created_at": run.created_at.isoformat() if run.created_at else None,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "updated_at": run.updated_at.isoformat() if run.updated_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+    }
+
+
+def _format_eta(seconds: Optional[int]) -> str:
+    if seconds is None:
+        return "unknown"
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h{rest // 60:02d}m" if hours else f"{rest // 60}m{rest % 60:02d}s"
@@ -0,0 +1,210 @@
+"""
+Step Result Cache - Content-addressed memoization of pipeline steps
+
+Re-running a pipeline on the same entry (retry after a failed analyze,
+prompt change, admin re-analyze) used to re-transcribe audio and re-OCR
+documents. Cacheable steps (TranscribeStep, OCRStep) are now keyed by:
+
+    sha256(step type, model, prompt version, evidence URI + GCS generation)
+
+and a hit restores the stored outputs instead of calling Vertex.
+
+Privacy:
+- GHOST contexts never read or write the cache
+- Results belong to the patient: deleted with them, and purged when they
+  switch to GHOST (purge_patient_step_results)
+- Evidence without a GCS generation (local files, missing objects) is never
+  cached: its content cannot be identified
+
+Steps that do run take a slot from the optional model budget first (bulk
+runs rate-limit model calls per model; cache hits cost nothing). Steps with
+a model_budget attribute receive the budget for their further calls.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import CortexStepResult, Patient, PrivacyTier
+from app.services.cortex.context import PatientEventContext
+from app.services.cortex.steps.base import PipelineStep
+from app.services.cortex.tracing import current_stage
+
+if TYPE_CHECKING:
+    from app.services.cortex.bulk import ModelRateLimiter
+    from app.services.storage import StorageService
+
+logger = logging.getLogger(__name__)
+
+
+class StepCache:
+    """
+    Memoizes cacheable steps in cortex_step_results.
+
+    Usage:
+        cache = StepCache(db, gcs_service)
+        await cache.execute(step, context)  # Instead of step.execute(context)
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        gcs_service: "StorageService" = None,
+        model_budget: Optional["ModelRateLimiter"] = None,
+    ):
+        self.db = db
+        self.gcs_service = gcs_service
+        self.model_budget = model_budget
+        # Independent stages run concurrently but share one session
+        self._lock = asyncio.Lock()
+
+    async def execute(self, step: PipelineStep, context: PatientEventContext) -> None:
+        """Restore the step's memoized outputs, or execute and memoize it."""
+        key = None
+        if self._applies_to(step, context):
+            key = await self.key_for(step, context)
+
+        span = current_stage()
+        if key:
+            outputs = await self.get(key)
+            if outputs is not None:
+                logger.info(f"  ↺ {step.step_type}: reusing memoized result")
+                step.restore(context, outputs)
+                if span:
+                    span.cached = True
+                return
+
+        if self.model_budget and step.model_id:
+            started = time.perf_counter()
+            await self.model_budget.acquire(step.model_id)
+            if span:
+                span.add_wait(started)
+        if hasattr(step, "model_budget"):
+            # Steps making several model calls take a slot for each further one
+            step.model_budget = self.model_budget
+        await step.execute(context)
+
+        if key and context.outputs.get(step.step_type):
+            await self.put(key, step, context)
+
+    @staticmethod
+    def _applies_to(step: PipelineStep, context: PatientEventContext) -> bool:
+        return (
+            settings.CORTEX_STEP_CACHE_ENABLED
+            and step.cacheable
+            and context.resolved_tier is not None
+            and context.resolved_tier != PrivacyTier.GHOST
+        )
+
+    async def key_for(
+        self, step: PipelineStep, context: PatientEventContext
+    ) -> Optional[str]:
+        """The step's cache key, or None if its evidence cannot be identified."""
+        uri = step.cache_evidence(context)
+        fingerprint = await self._fingerprint(uri) if uri else None
+        if fingerprint is None:
+            return None
+
+        identity = {
+            "step": step.step_type,
+            **step.cache_params(),
+            "evidence": fingerprint,
+        }
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()
+
+    async def _fingerprint(self, uri: str) -> Optional[str]:
+        """URI plus GCS generation (changes whenever the object is rewritten)."""
+        if not uri.startswith("gs://"):
+            return None
+
+        storage = self.gcs_service
+        if storage is None:
+            from app.services.storage import vault_storage
+
+            storage = vault_storage
+        get_generation = getattr(storage, "get_generation", None)
+        if get_generation is None:
+            return None
+
+        try:
+            generation = await asyncio.to_thread(get_generation, uri)
+        except Exception as e:
+            logger.warning(f"Step cache: no generation for {uri}: {e}")
+            return None
+        return f"{uri}#{generation}" if generation else None
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Memoized outputs for `key`, if present and not expired."""
+        try:
+            async with self._lock, self.db.begin_nested():
+                return await self.db.scalar(
+                    select(CortexStepResult.outputs).where(
+                        CortexStepResult.key == key,
+                        CortexStepResult.expires_at > func.now(),
+                    )
+                )
+        except Exception as e:
+            # A cache failure must never fail the pipeline
+            logger.warning(f"Step cache read failed: {e}")
+            return None
+
+    async def put(
+        self, key: str, step: PipelineStep, context: PatientEventContext
+    ) -> None:
+        """Memoize the step's outputs (flushed with the caller's transaction)."""
+        expires_at = datetime.now(timezone.utc) + timedelta(
+            days=settings.CORTEX_STEP_CACHE_TTL_DAYS
+        )
+        stmt = insert(CortexStepResult).values(
+            key=key,
+            step_type=step.step_type,
+            organization_id=context.organization_id,
+            patient_id=context.patient_id,
+            outputs=context.outputs[step.step_type],
+            expires_at=expires_at,
+        )
+        try:
+            async with self._lock, self.db.begin_nested():
+                await self.db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["key"],
+                        set_={
+                            "outputs": stmt.excluded.outputs,
+                            "created_at": func.now(),
+                            "expires_at": stmt.excluded.expires_at,
+                        },
+                    )
+                )
+        except Exception as e:
+            logger.warning(f"Step cache write failed: {e}")
+
+
+async def prune_step_results(db: AsyncSession) -> dict:
+    """Delete expired memoized step results."""
+    result = await db.execute(
+        delete(CortexStepResult).where(CortexStepResult.expires_at <= func.now())
+    )
+    await db.commit()
+    return {"deleted": result.rowcount}
+
+
+async def purge_patient_step_results(db: AsyncSession, *patient_filter) -> int:
+    """
+    Delete memoized results of the patients matching `patient_filter`
+    (e.g. Patient.id == patient_id). Flushed with the caller's transaction.
+    """
+    result = await db.execute(
+        delete(CortexStepResult).where(
+            CortexStepResult.patient_id.in_(select(Patient.id).where(*patient_filter))
+        )
+    )
+    return result.rowcount
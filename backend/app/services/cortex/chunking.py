@@ -0,0 +1,71 @@
+"""
+Transcript Chunking - Splits long transcripts for map-reduce analysis
+
+Retreat and group-session transcripts are too long to analyze in one
+call. AnalyzeStep (stage config "chunk_threshold") splits them here,
+summarizes the chunks concurrently and analyzes the summaries.
+
+Chunks break on turn boundaries, preferring (in order):
+- Lines opening with a timestamp ("[00:12:34]", "01:05") or a speaker
+  label ("Terapeuta:", "Participante 3:"), or blank lines
+- Sentence ends, for turns longer than a chunk
+- Whitespace, for sentences longer than a chunk
+"""
+
+import re
+import textwrap
+from typing import Iterator, List
+
+_TURN_START = re.compile(
+    r"^\s*(?:[\[(]?\d{1,2}:\d{2}(?::\d{2})?[\])]?|[\w*()\[\] .'-]{1,40}:(?:\s|$))"
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def split_transcript(text: str, max_chars: int) -> List[str]:
+    """
+    Split `text` into chunks of at most `max_chars` characters.
+
+    Turns are kept whole and in order whenever they fit in a chunk.
+    """
+    chunks: List[str] = []
+    current = ""
+    for turn in _turns(text):
+        for piece in _fit(turn, max_chars):
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _turns(text: str) -> Iterator[str]:
+    """Consecutive lines of one speaker / timestamp (or paragraph)."""
+    turn: List[str] = []
+    for line in text.splitlines():
+        if not line.strip():
+            if turn:
+                yield "\n".join(turn)
+            turn = []
+            continue
+        if turn and _TURN_START.match(line):
+            yield "\n".join(turn)
+            turn = []
+        turn.append(line.rstrip())
+    if turn:
+        yield "\n".join(turn)
+
+
+def _fit(turn: str, max_chars: int) -> Iterator[str]:
+    """The turn, or its sentences (then words) if it exceeds a chunk."""
+    if len(turn) <= max_chars:
+        yield turn
+        return
+    for sentence in _SENTENCE_END.split(turn):
+        if len(sentence) <= max_chars:
+            yield sentence
+        else:
+            yield from textwrap.wrap(sentence, max_chars, break_long_words=True)
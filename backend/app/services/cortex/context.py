@@ -15,6 +15,7 @@ from dataclasses import dataclass, field
 import uuid
 
 from app.db.models import PrivacyTier
+from app.services.cortex.tracing import current_stage
 
 
 @dataclass
@@ -156,3 +157,7 @@ class PatientEventContext:
     def record_usage(self, response_data: Dict[str, Any]) -> None:
         """Record AI usage for telemetry and cost accounting."""
         self.ai_usage.append(response_data)
+        # Attributed to the stage that made the call (pipeline trace)
+        span = current_stage()
+        if span:
+            span.add_usage(response_data)
@@ -0,0 +1,92 @@
+"""
+Stage Graph - Dependency planning for pipeline stages
+
+AIPipelineConfig.stages entries may declare their dependencies:
+
+    [
+        {"id": "ocr", "step": "ocr"},
+        {"id": "transcribe", "step": "transcribe"},
+        {"step": "analyze", "depends_on": ["ocr", "transcribe"]},
+    ]
+
+A stage's id defaults to its step type. Once any stage declares
+`depends_on`, every stage runs as soon as its dependencies are done (stages
+without `depends_on` start right away). Pipelines that declare none keep
+running their stages in list order.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageNode:
+    """A stage of the pipeline and the stages it waits for."""
+
+    index: int  # Position in AIPipelineConfig.stages
+    id: str
+    config: Dict[str, Any]
+    depends_on: Set[int] = field(default_factory=set)  # Indexes
+
+    @property
+    def step_type(self) -> str:
+        return self.config["step"]
+
+
+def plan_stages(stages: List[Dict[str, Any]]) -> List[StageNode]:
+    """
+    Build the stage graph of a pipeline.
+
+    Stages without a 'step' key are left out.
+
+    Raises:
+        ValueError: On duplicate ids, unknown dependencies or cycles
+    """
+    nodes = []
+    for i, stage in enumerate(stages):
+        if not stage.get("step"):
+            logger.warning(f"Stage {i} missing 'step' key, skipping")
+            continue
+        nodes.append(
+            StageNode(index=i, id=stage.get("id", stage["step"]), config=stage)
+        )
+
+    if not any("depends_on" in node.config for node in nodes):
+        # Sequential: each stage waits for the one before it
+        for previous, node in zip(nodes, nodes[1:]):
+            node.depends_on = {previous.index}
+        return nodes
+
+    by_id: Dict[str, StageNode] = {}
+    for node in nodes:
+        if node.id in by_id:
+            raise ValueError(f"Duplicate stage id '{node.id}'")
+        by_id[node.id] = node
+
+    for node in nodes:
+        for dependency in node.config.get("depends_on", []):
+            if dependency not in by_id:
+                raise ValueError(
+                    f"Stage '{node.id}' depends on unknown stage '{dependency}'"
+                )
+            node.depends_on.add(by_id[dependency].index)
+
+    _check_acyclic(nodes)
+    return nodes
+
+
+def _check_acyclic(nodes: List[StageNode]) -> None:
+    """Raise ValueError if the dependencies form a cycle (Kahn's algorithm)."""
+    remaining = {node.index: set(node.depends_on) for node in nodes}
+    while remaining:
+        ready = [index for index, deps in remaining.items() if not deps]
+        if not ready:
+            ids = sorted(node.id for node in nodes if node.index in remaining)
+            raise ValueError(f"Stage dependency cycle between {', '.join(ids)}")
+        for index in ready:
+            del remaining[index]
+        for deps in remaining.values():
+            deps.difference_update(ready)
@@ -3,23 +3,32 @@ Cortex Orchestrator - Pipeline Execution Engine
 
 The main entry point for executing cognitive pipelines.
 Loads configurations from AIPipelineConfig and executes
-stages sequentially with privacy enforcement.
+stages (in dependency order, independent ones concurrently)
+with privacy enforcement. Every run is traced per stage
+(cortex.tracing).
 """
 
+import asyncio
 import logging
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, TYPE_CHECKING
+from typing import Optional, Dict, Any, List, Set, TYPE_CHECKING
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.db.models import AIPipelineConfig, Patient, Organization
+from app.services.cortex.cache import StepCache
 from app.services.cortex.context import PatientEventContext
+from app.services.cortex.dag import StageNode, plan_stages
 from app.services.cortex.privacy import PrivacyResolver, PipelineFinalizer
 from app.services.cortex.stages import get_step, StepExecutionError
+from app.services.cortex.tracing import PipelineTrace, evidence_size, save_trace
 
 if TYPE_CHECKING:
+    from app.services.cortex.bulk import ModelRateLimiter
     from app.services.storage import GCSService
 
 logger = logging.getLogger(__name__)
@@ -42,7 +51,8 @@ class CortexOrchestrator:
     1. Load pipeline configuration from database
     2. Initialize PatientEventContext with resources
     3. Resolve privacy tier via PrivacyResolver
-    4. Execute each stage sequentially
+    4. Execute the stages: each starts once its `depends_on` stages are
+       done, up to CORTEX_STAGE_CONCURRENCY at a time (see cortex.dag)
     5. Apply privacy enforcement via PipelineFinalizer
     6. Return results
 
@@ -56,10 +66,17 @@ class CortexOrchestrator:
         )
     """
 
-    def __init__(self, db: AsyncSession, gcs_service: "GCSService" = None):
+    def __init__(
+        self,
+        db: AsyncSession,
+        gcs_service: "GCSService" = None,
+        model_budget: Optional["ModelRateLimiter"] = None,
+    ):
         self.db = db
         self.gcs_service = gcs_service
         self.finalizer = PipelineFinalizer()
+        # model_budget: per-model rate limit of model calls (bulk runs)
+        self.step_cache = StepCache(db, gcs_service, model_budget)
 
     async def run_pipeline(
         self,
@@ -145,38 +162,17 @@ class CortexOrchestrator:
         # 4. Execute stages (with fail-safe cleanup for GHOST)
         stages = config.stages or []
         execution_error = None
+        trace = PipelineTrace(pipeline_name, context)
 
         try:
-            for i, stage_config in enumerate(stages):
-                step_type = stage_config.get("step")
-                if not step_type:
-                    logger.warning(f"Stage {i} missing 'step' key, skipping")
-                    continue
-
-                try:
-                    logger.info(f"  → Stage {i + 1}/{len(stages)}: {step_type}")
-                    step = get_step(step_type)
-
-                    # Pass config to step if it accepts it
-                    if hasattr(step, "model") and "model" in stage_config:
-                        step.model = stage_config["model"]
-                    if hasattr(step, "prompt_key") and "prompt_key" in stage_config:
-                        step.prompt_key = stage_config["prompt_key"]
-
-                    await step.execute(context)
-
-                except StepExecutionError as e:
-                    logger.error(f"  ✗ Stage {step_type} failed: {e}")
-                    execution_error = PipelineExecutionError(
-                        pipeline_name, str(e), step=step_type
-                    )
-                    break
-                except Exception as e:
-                    logger.error(f"  ✗ Unexpected error in {step_type}: {e}")
-                    execution_error = PipelineExecutionError(
-                        pipeline_name, str(e), step=step_type
-                    )
-                    break
+            try:
+                plan = plan_stages(stages)
+            except ValueError as e:
+                execution_error = PipelineExecutionError(pipeline_name, str(e))
+            else:
+                execution_error = await self._run_stages(
+                    pipeline_name, plan, len(stages), context, trace
+                )
 
             if not execution_error:
                 logger.info(f"  ✓ All {len(stages)} stages complete")
@@ -192,9 +188,10 @@ class CortexOrchestrator:
                     if context.resolved_tier and context.resolved_tier.value == "GHOST":
                         logger.warning("🔐 GHOST MODE: Executing mandatory cleanup")
 
-                    finalization_result = await self.finalizer.finalize(
-                        context, self.gcs_service
-                    )
+                    with trace.phase("finalize"):
+                        finalization_result = await self.finalizer.finalize(
+                            context, self.gcs_service
+                        )
                     logger.info(f"🔐 Privacy enforcement: {finalization_result}")
                 except Exception as e:
                     logger.error(f"Privacy enforcement failed: {e}")
@@ -207,6 +204,8 @@ class CortexOrchestrator:
 
         # Re-raise execution error after cleanup
         if execution_error:
+            trace.finish(execution_error)
+            await save_trace(self.db, trace)
             raise execution_error
 
         # 5.1 Persist AI Usage (v1.5.9-hf11: Restoration of AIGov Logs)
@@ -215,25 +214,26 @@ class CortexOrchestrator:
                 from app.services.ai.ledger import CostLedger
                 from app.services.ai.base import AIResponse
 
-                for usage in context.ai_usage:
-                    # Map context usage dict to AIResponse for CostLedger
-                    response = AIResponse(
-                        text="",  # Not needed for logging
-                        tokens_input=usage.get("tokens_input", 0),
-                        tokens_output=usage.get("tokens_output", 0),
-                        model_id=usage.get("model_id", "error"),
-                        provider_id=usage.get("provider_id", "vertex-google"),
-                    )
+                with trace.phase("ledger"):
+                    for usage in context.ai_usage:
+                        # Map context usage dict to AIResponse for CostLedger
+                        response = AIResponse(
+                            text="",  # Not needed for logging
+                            tokens_input=usage.get("tokens_input", 0),
+                            tokens_output=usage.get("tokens_output", 0),
+                            model_id=usage.get("model_id", "error"),
+                            provider_id=usage.get("provider_id", "vertex-google"),
+                        )
 
-                    await CostLedger.log_usage(
-                        db=self.db,
-                        response=response,
-                        organization_id=str(organization.id),
-                        task_type=usage.get("task_type", "clinical_analysis"),
-                        user_id=None,  # System context usually
-                        patient_id=str(patient.id),
-                        clinical_entry_id=clinical_entry_id,
-                    )
+                        await CostLedger.log_usage(
+                            db=self.db,
+                            response=response,
+                            organization_id=str(organization.id),
+                            task_type=usage.get("task_type", "clinical_analysis"),
+                            user_id=None,  # System context usually
+                            patient_id=str(patient.id),
+                            clinical_entry_id=clinical_entry_id,
+                        )
                 logger.info(
                     f"📊 Cortex: Persisted {len(context.ai_usage)} AI usage records"
                 )
@@ -241,6 +241,9 @@ class CortexOrchestrator:
                 logger.error(f"Failed to persist AI usage logs: {e}")
                 # Don't fail the pipeline for telemetry errors
 
+        trace.finish()
+        await save_trace(self.db, trace)
+
         # 6. Build result
         elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
 
@@ -261,6 +264,104 @@ class CortexOrchestrator:
 
         return result
 
+    async def _run_stages(
+        self,
+        pipeline_name: str,
+        plan: List[StageNode],
+        total: int,
+        context: PatientEventContext,
+        trace: PipelineTrace,
+    ) -> Optional[PipelineExecutionError]:
+        """
+        Run the stage graph on the shared context.
+
+        After the first failure no further stage starts and the stages still
+        running are cancelled, so nothing writes to the context (or GCS)
+        once privacy enforcement has run.
+
+        Returns:
+            The first failure, or None if every stage succeeded
+        """
+        pending = {node.index: node for node in plan}
+        done: Set[int] = set()
+        running: Dict[asyncio.Task, StageNode] = {}
+        ready_since: Dict[int, float] = {}  # Queue wait for a stage slot
+
+        try:
+            while pending or running:
+                # Values below 1 run the stages one at a time
+                limit = max(settings.CORTEX_STAGE_CONCURRENCY, 1)
+                slots = limit - len(running)
+                ready = [n for n in pending.values() if n.depends_on <= done]
+                for node in ready:
+                    ready_since.setdefault(node.index, time.perf_counter())
+                for node in ready[: max(slots, 0)]:
+                    del pending[node.index]
+                    logger.info(f"  → Stage {node.index + 1}/{total}: {node.step_type}")
+                    queue_wait_ms = round(
+                        (time.perf_counter() - ready_since[node.index]) * 1000
+                    )
+                    task = asyncio.ensure_future(
+                        self._run_stage(node, context, trace, queue_wait_ms)
+                    )
+                    running[task] = node
+
+                finished, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(finished, key=lambda t: running[t].index):
+                    node = running.pop(task)
+                    e = task.exception()
+                    if e is None:
+                        done.add(node.index)
+                        continue
+
+                    if isinstance(e, StepExecutionError):
+                        logger.error(f"  ✗ Stage {node.step_type} failed: {e}")
+                    else:
+                        logger.error(f"  ✗ Unexpected error in {node.step_type}: {e}")
+                    return PipelineExecutionError(
+                        pipeline_name, str(e), step=node.step_type
+                    )
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        return None
+
+    async def _run_stage(
+        self,
+        node: StageNode,
+        context: PatientEventContext,
+        trace: PipelineTrace,
+        queue_wait_ms: int = 0,
+    ) -> None:
+        stage_config = node.config
+        step = get_step(node.step_type)
+
+        # Pass config to step if it accepts it
+        if hasattr(step, "model") and "model" in stage_config:
+            step.model = stage_config["model"]
+        if hasattr(step, "prompt_key") and "prompt_key" in stage_config:
+            step.prompt_key = stage_config["prompt_key"]
+        if hasattr(step, "chunk_threshold") and "chunk_threshold" in stage_config:
+            step.chunk_threshold = stage_config["chunk_threshold"]
+        if hasattr(step, "chunk_size") and "chunk_size" in stage_config:
+            step.chunk_size = stage_config["chunk_size"]
+
+        # Evidence size is looked up alongside the stage, not before it
+        uri = step.cache_evidence(context)
+        size = asyncio.ensure_future(evidence_size(uri, self.gcs_service))
+        try:
+            with trace.stage(node.id, step, queue_wait_ms) as span:
+                # Transcription/OCR are reused from an earlier run when possible
+                await self.step_cache.execute(step, context)
+                # Before the stage's OTel span is ended with its attributes
+                span.evidence_bytes = await size
+        finally:
+            size.cancel()
+
     async def _load_pipeline(self, name: str) -> Optional[AIPipelineConfig]:
         """Load a pipeline configuration by name."""
         stmt = select(AIPipelineConfig).where(AIPipelineConfig.name == name)
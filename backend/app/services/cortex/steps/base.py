@@ -6,7 +6,7 @@ orchestrated by the CortexOrchestrator.
 """
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import Any, Dict, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from app.services.cortex.context import PatientEventContext
@@ -31,6 +31,14 @@ class PipelineStep(ABC):
     # Unique identifier for this step type
     step_type: str = "base"
 
+    # Memoization (see cortex.cache): a cacheable step's outputs depend only
+    # on its input evidence, model and prompt. Bump prompt_version whenever
+    # the step's prompt changes.
+    cacheable: bool = False
+    # Model the step calls (cache key, per-model rate limits of bulk runs)
+    model_id: Optional[str] = None
+    prompt_version: str = "v1"
+
     @abstractmethod
     async def execute(self, context: "PatientEventContext") -> None:
         """
@@ -46,6 +54,19 @@ class PipelineStep(ABC):
         """
         pass
 
+    def cache_evidence(self, context: "PatientEventContext") -> Optional[str]:
+        """URI of the evidence a cacheable step reads (cache key, traced size)."""
+        return None
+
+    def cache_params(self) -> Dict[str, Any]:
+        """Settings that change a cacheable step's output."""
+        return {"model": self.model_id, "prompt_version": self.prompt_version}
+
+    def restore(self, context: "PatientEventContext", outputs: Dict[str, Any]) -> None:
+        """Apply memoized outputs to the context instead of executing."""
+        for key, value in outputs.items():
+            context.add_output(self.step_type, key, value)
+
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} step_type={self.step_type}>"
 
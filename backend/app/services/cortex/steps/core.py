@@ -5,15 +5,26 @@ These steps wrap existing AletheIA logic units into
 the Cortex pipeline architecture.
 """
 
+import asyncio
 import logging
+import time
 from typing import Optional, Dict, Any
 
+from app.core.config import settings
+from app.services.cortex.chunking import split_transcript
 from app.services.cortex.steps.base import PipelineStep, StepExecutionError
 from app.services.cortex.steps.registry import register_step
 from app.services.cortex.context import PatientEventContext
+from app.services.cortex.tracing import current_stage
 
 logger = logging.getLogger(__name__)
 
+# Bump OCRStep.prompt_version when editing (memoized results use the version)
+OCR_PROMPT = (
+    "Extract all text from this clinical document. "
+    "Preserve structure and formatting."
+)
+
 
 @register_step("transcribe")
 class TranscribeStep(PipelineStep):
@@ -27,18 +38,33 @@ class TranscribeStep(PipelineStep):
     """
 
     step_type = "transcribe"
+    cacheable = True
+    model_id = "gemini-2.5-flash"
+
+    def cache_evidence(self, context: PatientEventContext) -> Optional[str]:
+        # Find audio resource
+        for key, uri in context.list_resources().items():
+            if "audio" in key:
+                return uri
+        return None
+
+    def restore(self, context: PatientEventContext, outputs: Dict[str, Any]) -> None:
+        super().restore(context, outputs)
+        if outputs.get("transcript"):
+            self._register_transcript(context)
+
+    def _register_transcript(self, context: PatientEventContext) -> None:
+        """Store transcript as new resource for downstream steps."""
+        context.add_evidence(
+            "transcript:raw",
+            f"memory://{context.patient_id}/transcript",  # Virtual URI
+        )
 
     async def execute(self, context: PatientEventContext) -> None:
         """Transcribe audio from context resources."""
         from app.services.ai.factory import ProviderFactory
 
-        # Find audio resource
-        resources = context.list_resources()
-        audio_uri = None
-        for key, uri in resources.items():
-            if "audio" in key:
-                audio_uri = uri
-                break
+        audio_uri = self.cache_evidence(context)
 
         if not audio_uri:
             raise StepExecutionError(
@@ -49,7 +75,7 @@ class TranscribeStep(PipelineStep):
 
         try:
             # Get AI provider and transcribe
-            provider = ProviderFactory.get_provider("gemini-2.5-flash")
+            provider = ProviderFactory.get_provider(self.model_id)
 
             # The provider handles GCS URIs directly under BAA
             result = await provider.transcribe_audio(audio_uri)
@@ -63,19 +89,15 @@ class TranscribeStep(PipelineStep):
 
             # v1.5.9-hf11: Record usage for telemetry
             context.record_usage({
-                "model_id": result.get("model_id", "gemini-2.5-flash"),
+                "model_id": result.get("model_id", self.model_id),
                 "tokens_input": result.get("tokens_input", 0),
                 "tokens_output": result.get("tokens_output", 0),
                 "task_type": "transcription",
                 "provider_id": "vertex-google",
             })
 
-            # Store transcript as new resource for downstream steps
             if result.get("text"):
-                context.add_evidence(
-                    "transcript:raw",
-                    f"memory://{context.patient_id}/transcript",  # Virtual URI
-                )
+                self._register_transcript(context)
 
             logger.info(
                 f"TranscribeStep: Complete ({len(result.get('text', ''))} chars)"
@@ -94,13 +116,33 @@ class AnalyzeStep(PipelineStep):
     Writes: context.add_output("analyze", "soap_note", ...)
 
     Uses configurable prompts based on the step config.
+
+    Transcripts longer than the stage's "chunk_threshold" (characters) are
+    analyzed map-reduce: chunks (split on speaker/time boundaries, up to
+    "chunk_size" characters) are summarized concurrently, then the summaries
+    are analyzed with the stage's prompt. Under a model budget (bulk runs)
+    every one of these calls takes a slot.
     """
 
     step_type = "analyze"
 
-    def __init__(self, prompt_key: str = "clinical_analysis", model: str = None):
+    def __init__(
+        self,
+        prompt_key: str = "clinical_analysis",
+        model: str = None,
+        chunk_threshold: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ):
         self.prompt_key = prompt_key
         self.model = (model or "gemini-2.5-pro").replace(":", "-")
+        self.chunk_threshold = chunk_threshold  # None = never chunk
+        self.chunk_size = chunk_size
+        # Set by StepCache, which takes the slot of the first model call
+        self.model_budget = None
+
+    @property
+    def model_id(self) -> str:
+        return self.model.replace(":", "-")
 
     async def execute(self, context: PatientEventContext) -> None:
         """Analyze clinical content and generate insights."""
@@ -132,6 +174,13 @@ class AnalyzeStep(PipelineStep):
             task = task_map.get(self.prompt_key, PromptTask.CLINICAL_ANALYSIS)
             prompt = get_prompt(task)
 
+            # Long transcripts: analyze per-chunk notes instead (map-reduce)
+            transcript = context.get_output("transcribe", "transcript") or ""
+            if self.chunk_threshold and len(transcript) > self.chunk_threshold:
+                notes = await self._summarize_chunks(provider, context, transcript)
+                input_text = self._gather_input(context, transcript_notes=notes)
+                await self._acquire_model_slot()
+
             # Build full prompt with content
             full_prompt = f"{prompt}\n\n---\n\n{input_text}"
 
@@ -182,8 +231,70 @@ class AnalyzeStep(PipelineStep):
         except Exception as e:
             raise StepExecutionError(self.step_type, str(e), e)
 
-    def _gather_input(self, context: PatientEventContext) -> str:
-        """Gather text from previous step outputs or direct input."""
+    async def _summarize_chunks(
+        self, provider, context: PatientEventContext, transcript: str
+    ) -> str:
+        """Map step: clinical notes per transcript chunk, in transcript order."""
+        from app.services.ai.prompts import get_prompt, PromptTask
+
+        chunks = split_transcript(
+            transcript, self.chunk_size or settings.CORTEX_ANALYZE_CHUNK_CHARS
+        )
+        logger.info(
+            f"AnalyzeStep: {len(transcript)} chars transcript, "
+            f"summarizing {len(chunks)} chunks"
+        )
+        pool = asyncio.Semaphore(settings.CORTEX_ANALYZE_CHUNK_CONCURRENCY)
+
+        async def summarize(part: int, chunk: str) -> str:
+            prompt = get_prompt(
+                PromptTask.TRANSCRIPT_CHUNK, part=part, total=len(chunks)
+            )
+            async with pool:
+                if part > 1:  # Part 1 uses the step's slot
+                    await self._acquire_model_slot()
+                response = await provider.analyze_text(
+                    content=f"{prompt}\n\n---\n\n{chunk}"
+                )
+            context.record_usage({
+                "model_id": response.model_id,
+                "tokens_input": response.tokens_input,
+                "tokens_output": response.tokens_output,
+                "task_type": "clinical_analysis",
+                "provider_id": response.provider_id,
+            })
+            return f"### Parte {part}/{len(chunks)}\n{response.text.strip()}"
+
+        # Every call finishes before a failure is raised (no orphaned calls)
+        notes = await asyncio.gather(
+            *(summarize(i + 1, chunk) for i, chunk in enumerate(chunks)),
+            return_exceptions=True,
+        )
+        for note in notes:
+            if isinstance(note, BaseException):
+                raise note
+
+        context.add_output(self.step_type, "chunk_count", len(chunks))
+        return "\n\n".join(notes)
+
+    async def _acquire_model_slot(self) -> None:
+        """Take a model budget slot for one more model call (bulk runs)."""
+        if not self.model_budget:
+            return
+        started = time.perf_counter()
+        await self.model_budget.acquire(self.model_id)
+        span = current_stage()
+        if span:
+            span.add_wait(started)
+
+    def _gather_input(
+        self, context: PatientEventContext, transcript_notes: Optional[str] = None
+    ) -> str:
+        """
+        Gather text from previous step outputs or direct input.
+
+        transcript_notes replaces the transcript (chunked analysis).
+        """
         parts = []
 
         # v1.5.5: Check for direct text input (SESSION_NOTE entries)
@@ -195,7 +306,9 @@ class AnalyzeStep(PipelineStep):
 
         # Check for transcript from transcribe step
         transcript = context.get_output("transcribe", "transcript")
-        if transcript:
+        if transcript_notes:
+            parts.append(f"## Transcripción (notas por partes)\n{transcript_notes}")
+        elif transcript:
             parts.append(f"## Transcripción\n{transcript}")
 
         # Check for form data from intake step
@@ -223,18 +336,21 @@ class OCRStep(PipelineStep):
     """
 
     step_type = "ocr"
+    cacheable = True
+    model_id = "gemini-2.5-flash"
+
+    def cache_evidence(self, context: PatientEventContext) -> Optional[str]:
+        # Find image/document resource
+        for key, uri in context.list_resources().items():
+            if any(t in key for t in ["image", "document", "photo", "scan"]):
+                return uri
+        return None
 
     async def execute(self, context: PatientEventContext) -> None:
         """Extract text from images/documents."""
         from app.services.ai.factory import ProviderFactory
 
-        # Find image/document resource
-        resources = context.list_resources()
-        image_uri = None
-        for key, uri in resources.items():
-            if any(t in key for t in ["image", "document", "photo", "scan"]):
-                image_uri = uri
-                break
+        image_uri = self.cache_evidence(context)
 
         if not image_uri:
             raise StepExecutionError(
@@ -244,11 +360,11 @@ class OCRStep(PipelineStep):
         logger.info(f"OCRStep: Processing {image_uri}")
 
         try:
-            provider = ProviderFactory.get_provider("gemini-2.5-flash")
+            provider = ProviderFactory.get_provider(self.model_id)
 
             result = await provider.analyze_image(
                 image_uri=image_uri,
-                prompt="Extract all text from this clinical document. Preserve structure and formatting.",
+                prompt=OCR_PROMPT,
             )
 
             context.add_output(self.step_type, "text_content", result.get("text", ""))
@@ -261,7 +377,7 @@ class OCRStep(PipelineStep):
 
             # v1.5.9-hf11: Record usage for telemetry
             context.record_usage({
-                "model_id": result.get("model_id", "gemini-2.5-flash"),
+                "model_id": result.get("model_id", self.model_id),
                 "tokens_input": result.get("tokens_input", 0),
                 "tokens_output": result.get("tokens_output", 0),
                 "task_type": "document_analysis",
@@ -286,6 +402,7 @@ class TriageStep(PipelineStep):
     """
 
     step_type = "triage"
+    model_id = "gemini-2.5-flash"
 
     async def execute(self, context: PatientEventContext) -> None:
         """Assess clinical risk from content."""
@@ -310,7 +427,7 @@ class TriageStep(PipelineStep):
             from app.services.ai.factory import ProviderFactory
             from app.services.ai.prompts import get_prompt, PromptTask
 
-            provider = ProviderFactory.get_provider("gemini-2.5-flash")
+            provider = ProviderFactory.get_provider(self.model_id)
             prompt = get_prompt(PromptTask.TRIAGE_FORM)
 
             # Build full prompt with content
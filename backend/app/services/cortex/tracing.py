@@ -0,0 +1,314 @@
+"""
+Pipeline Tracing - Per-stage timings of Cortex pipeline runs
+
+Each run_pipeline call records a PipelineTrace:
+- One span per stage: wall time, queue wait (for a stage slot or the model
+  budget of a bulk run), model, input/output tokens, bytes of the evidence
+  it read and whether its result came from the step cache
+- One span each for privacy finalization and the AI usage ledger writes
+
+Spans are exported through OpenTelemetry (core.telemetry: Cloud Trace in
+production, no-ops locally) and each run is persisted in summary form in
+cortex_pipeline_traces, from which stage_latency_percentiles charts
+p50/p95 per stage and model.
+
+Traces hold timings, sizes and counts only, never clinical content.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from opentelemetry import trace as otel_trace
+from sqlalchemy import Float, case, column, delete, func, insert, select, true
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.telemetry import get_tracer
+from app.db.models import CortexPipelineTrace
+
+if TYPE_CHECKING:
+    from app.services.cortex.context import PatientEventContext
+    from app.services.cortex.steps.base import PipelineStep
+
+logger = logging.getLogger(__name__)
+
+tracer = get_tracer(__name__)
+
+# Span of the stage running in the current task (stages run as tasks)
+_current_stage: ContextVar[Optional["StageSpan"]] = ContextVar(
+    "cortex_stage_span", default=None
+)
+
+
+def current_stage() -> Optional["StageSpan"]:
+    """The span of the stage running in this task, if any."""
+    return _current_stage.get()
+
+
+def _ms_since(started: float) -> int:
+    return round((time.perf_counter() - started) * 1000)
+
+
+@dataclass
+class StageSpan:
+    """Summary of one stage of a pipeline run."""
+
+    stage: str
+    step_type: str
+    model_id: Optional[str] = None
+    wall_ms: int = 0
+    queue_wait_ms: int = 0
+    tokens_input: int = 0
+    tokens_output: int = 0
+    evidence_bytes: Optional[int] = None
+    cached: bool = False
+    status: str = "ok"  # ok | error | cancelled
+
+    def add_usage(self, usage: Dict[str, Any]) -> None:
+        self.tokens_input += usage.get("tokens_input") or 0
+        self.tokens_output += usage.get("tokens_output") or 0
+        # The model that actually answered (providers may fall back)
+        self.model_id = usage.get("model_id") or self.model_id
+
+    def add_wait(self, started: float) -> None:
+        self.queue_wait_ms += _ms_since(started)
+
+
+class PipelineTrace:
+    """
+    Trace of one pipeline run.
+
+    Usage:
+        trace = PipelineTrace(pipeline_name, context)
+        with trace.stage("ocr", step, queue_wait_ms):
+            await step.execute(context)
+        with trace.phase("finalize"):
+            ...
+        trace.finish(error)
+        await save_trace(db, trace)
+    """
+
+    def __init__(self, pipeline_name: str, context: "PatientEventContext"):
+        self.pipeline_name = pipeline_name
+        self.organization_id = context.organization_id
+        self.clinical_entry_id = context.clinical_entry_id
+        self.privacy_tier = (
+            context.resolved_tier.value if context.resolved_tier else None
+        )
+        self.stages: List[StageSpan] = []
+        self.phases: Dict[str, int] = {}
+        self.total_ms = 0
+        self.succeeded = True
+        self.failed_step: Optional[str] = None
+
+        self._started = time.perf_counter()
+        self._span = tracer.start_span(
+            "cortex.pipeline",
+            attributes={
+                "cortex.pipeline": pipeline_name,
+                "cortex.privacy_tier": self.privacy_tier or "",
+            },
+        )
+        self._parent = otel_trace.set_span_in_context(self._span)
+
+    @contextmanager
+    def stage(
+        self, stage_id: str, step: "PipelineStep", queue_wait_ms: int = 0
+    ) -> Iterator[StageSpan]:
+        """Time a stage; model usage recorded meanwhile is attributed to it."""
+        span = StageSpan(
+            stage_id, step.step_type, step.model_id, queue_wait_ms=queue_wait_ms
+        )
+        self.stages.append(span)
+        token = _current_stage.set(span)
+        otel_span = tracer.start_span(
+            f"cortex.stage.{step.step_type}", context=self._parent
+        )
+        started = time.perf_counter()
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.status = "cancelled"
+            raise
+        except Exception:
+            span.status = "error"
+            raise
+        finally:
+            span.wall_ms = _ms_since(started)
+            _current_stage.reset(token)
+            otel_span.set_attributes(
+                {
+                    f"cortex.{key}": value
+                    for key, value in asdict(span).items()
+                    if value is not None
+                }
+            )
+            otel_span.end()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a non-stage phase of the run (finalize, ledger)."""
+        otel_span = tracer.start_span(f"cortex.{name}", context=self._parent)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + _ms_since(started)
+            otel_span.end()
+
+    def finish(self, error: Optional[Exception] = None) -> None:
+        """Close the trace (successfully, or with the pipeline's error)."""
+        self.total_ms = _ms_since(self._started)
+        self.succeeded = error is None
+        self.failed_step = getattr(error, "failed_step", None)
+        self._span.set_attributes(
+            {
+                "cortex.succeeded": self.succeeded,
+                "cortex.total_ms": self.total_ms,
+                "cortex.tokens_input": sum(s.tokens_input for s in self.stages),
+                "cortex.tokens_output": sum(s.tokens_output for s in self.stages),
+            }
+        )
+        self._span.end()
+
+    def summary(self) -> Dict[str, Any]:
+        """The persisted form of the trace (a cortex_pipeline_traces row)."""
+        return {
+            "pipeline_name": self.pipeline_name,
+            "organization_id": self.organization_id,
+            "clinical_entry_id": self.clinical_entry_id,
+            "privacy_tier": self.privacy_tier,
+            "succeeded": self.succeeded,
+            "failed_step": self.failed_step,
+            "total_ms": self.total_ms,
+            "finalize_ms": self.phases.get("finalize"),
+            "ledger_ms": self.phases.get("ledger"),
+            "tokens_input": sum(s.tokens_input for s in self.stages),
+            "tokens_output": sum(s.tokens_output for s in self.stages),
+            "stages": [asdict(s) for s in self.stages],
+        }
+
+
+async def evidence_size(uri: Optional[str], storage=None) -> Optional[int]:
+    """Size in bytes of the evidence at `uri` (GCS object or local file)."""
+    if not uri:
+        return None
+    try:
+        if uri.startswith("gs://"):
+            if storage is None:
+                from app.services.storage import vault_storage
+
+                storage = vault_storage
+            return await asyncio.to_thread(storage.get_size, uri)
+        return os.path.getsize(uri) if os.path.isfile(uri) else None
+    except Exception as e:
+        logger.debug(f"Trace: no size for evidence {uri}: {e}")
+        return None
+
+
+async def save_trace(db: AsyncSession, trace: PipelineTrace) -> None:
+    """Persist the trace summary (with the caller's transaction)."""
+    if not settings.CORTEX_TRACE_ENABLED:
+        return
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(CortexPipelineTrace).values(**trace.summary()))
+    except Exception as e:
+        # Telemetry must never fail the pipeline
+        logger.warning(f"Failed to persist pipeline trace: {e}")
+
+
+async def prune_pipeline_traces(db: AsyncSession) -> dict:
+    """Delete pipeline traces older than CORTEX_TRACE_RETENTION_DAYS."""
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.CORTEX_TRACE_RETENTION_DAYS
+    )
+    result = await db.execute(
+        delete(CortexPipelineTrace).where(CortexPipelineTrace.created_at < cutoff)
+    )
+    await db.commit()
+    return {"deleted": result.rowcount}
+
+
+async def stage_latency_percentiles(
+    db: AsyncSession,
+    since: datetime,
+    pipeline_name: Optional[str] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    p50/p95 latencies of pipeline runs since `since`.
+
+    Returns:
+        {"stages": per (step type, model): count, wall and queue wait
+         p50/p95, average tokens, cache hit rate;
+         "phases": finalize, ledger and total p50/p95}
+    """
+    filters = [CortexPipelineTrace.created_at >= since]
+    if pipeline_name:
+        filters.append(CortexPipelineTrace.pipeline_name == pipeline_name)
+
+    stage = (
+        func.jsonb_array_elements(CortexPipelineTrace.stages)
+        .table_valued(column("value", JSONB))
+        .render_derived(name="stage")
+    )
+
+    def number(key: str):
+        return stage.c.value[key].astext.cast(Float)
+
+    def percentiles(expr, name: str) -> list:
+        return [
+            func.percentile_cont(0.5).within_group(expr).label(f"{name}_p50_ms"),
+            func.percentile_cont(0.95).within_group(expr).label(f"{name}_p95_ms"),
+        ]
+
+    step_type = stage.c.value["step_type"].astext.label("step_type")
+    model_id = stage.c.value["model_id"].astext.label("model_id")
+    stage_rows = await db.execute(
+        select(
+            step_type,
+            model_id,
+            func.count().label("count"),
+            *percentiles(number("wall_ms"), "wall"),
+            *percentiles(number("queue_wait_ms"), "queue_wait"),
+            func.avg(number("tokens_input")).label("avg_tokens_input"),
+            func.avg(number("tokens_output")).label("avg_tokens_output"),
+            func.avg(case((stage.c.value["cached"].astext == "true", 1.0), else_=0.0))
+            .cast(Float)
+            .label("cache_hit_rate"),
+        )
+        .select_from(CortexPipelineTrace)
+        .join(stage, true())
+        .where(*filters, stage.c.value["status"].astext == "ok")
+        .group_by(step_type, model_id)
+        .order_by(step_type, model_id)
+    )
+
+    phase_rows = []
+    for name in ("finalize", "ledger", "total"):
+        expr = getattr(CortexPipelineTrace, f"{name}_ms")
+        row = (
+            await db.execute(
+                select(func.count(expr).label("count"), *percentiles(expr, "wall"))
+                .select_from(CortexPipelineTrace)
+                .where(*filters)
+            )
+        ).one()
+        phase_rows.append({"phase": name, **row._asdict()})
+
+    return {
+        "stages": [_rounded(row._asdict()) for row in stage_rows],
+        "phases": [_rounded(row) for row in phase_rows],
+    }
+
+
+def _rounded(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in row.items()}
@@ -117,8 +117,8 @@ async def sanitize_and_store(
     """
     Sanitize clinical content and store in anonymous vault.
 
-    This function is designed to be called via FastAPI BackgroundTasks
-    to ensure completion even after HTTP response is sent.
+    Runs in the job worker (vault.sanitize_clinical_entry jobs, see
+    app.workers.job_worker), after the HTTP response is sent.
 
     Args:
         db: Database session
@@ -167,28 +167,3 @@ async def sanitize_and_store(
     except Exception as e:
         logger.error(f"❌ Data sanitization failed: {e}")
         return None
-
-
-async def sanitize_and_store_background(
-    content: str, metadata: dict, source_type: str, language: str = "es"
-) -> None:
-    """
-    Background-safe wrapper for sanitize_and_store.
-
-    Called via FastAPI BackgroundTasks to ensure execution completes
-    even after HTTP response is sent. Creates its own DB session.
-    """
-    from app.db.base import get_session_factory
-
-    try:
-        factory = get_session_factory()
-        async with factory() as db:
-            await sanitize_and_store(
-                db=db,
-                content=content,
-                metadata=metadata,
-                source_type=source_type,
-                language=language,
-            )
-    except Exception as e:
-        logger.error(f"❌ Background sanitization failed: {e}")
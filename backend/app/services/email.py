@@ -1,5 +1,6 @@
 """Email service using Brevo (formerly Sendinblue) for transactional emails."""
 
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional
@@ -505,7 +506,8 @@ class EmailService:
                 html_content=html_content,
             )
 
-            api_instance.send_transac_email(send_smtp_email)
+            # The Brevo SDK is blocking; keep the loop free for concurrent sends
+            await asyncio.to_thread(api_instance.send_transac_email, send_smtp_email)
             logger.info(f"Automation email sent to {to_email}: {subject}")
             return True
 
@@ -3,18 +3,25 @@
 Handles:
 1. Reading busy times from blocking calendars
 2. Creating booking events in destination calendars
+3. Mirroring busy events locally (incremental sync with sync tokens)
 """
 
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta, timezone
 from typing import Optional
+from urllib.parse import quote
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select
 import httpx
 
-from app.db.models import CalendarIntegration, ScheduleCalendarSync, User
+from app.db.models import (
+    CalendarBusyInterval,
+    CalendarIntegration,
+    ScheduleCalendarSync,
+    User,
+)
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -25,8 +32,15 @@ GOOGLE_CALENDAR_API = "https://www.googleapis.com/calendar/v3"
 class GoogleCalendarService:
     """Service for interacting with Google Calendar API."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self, db: AsyncSession, transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
         self.db = db
+        # Injectable for tests (stubbed calendar server)
+        self.transport = transport
+
+    def _client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport)
 
     async def _get_valid_token(self, user_id: uuid.UUID) -> Optional[str]:
         """Get a valid access token for the user, refreshing if needed."""
@@ -59,7 +73,7 @@ class GoogleCalendarService:
             return False
 
         try:
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.post(
                     "https://oauth2.googleapis.com/token",
                     data={
@@ -90,10 +104,17 @@ class GoogleCalendarService:
         schedule_id: uuid.UUID,
         start_time: datetime,
         end_time: datetime,
+        refresh: bool = False,
     ) -> list[tuple[datetime, datetime]]:
         """
         Get busy time blocks from Google Calendar for a schedule's blocking calendars.
 
+        Served from the local mirror when it is fresh enough; otherwise falls
+        back to the FreeBusy API. `refresh=True` (booking path) first runs an
+        incremental sync of a bootstrapped mirror, in the caller's
+        transaction (flushed, committed by the caller); full syncs (including
+        after an expired sync token) are left to the background worker.
+
         Returns list of (start, end) tuples representing busy times.
         """
         # Get blocking calendar IDs for this schedule
@@ -108,15 +129,73 @@ class GoogleCalendarService:
         if not sync_config or not sync_config.blocking_calendar_ids:
             return []
 
+        if refresh and self._is_mirror_bootstrapped(sync_config):
+            await self.sync_busy_mirror(
+                sync_config, user_id, commit=False, full_sync=False
+            )
+
+        if self._is_mirror_fresh(sync_config):
+            return await self._get_mirrored_busy_times(
+                sync_config.id, start_time, end_time
+            )
+
+        return await self._get_freebusy_times(
+            user_id, sync_config.blocking_calendar_ids, start_time, end_time
+        )
+
+    @staticmethod
+    def _is_mirror_bootstrapped(sync_config: ScheduleCalendarSync) -> bool:
+        """Every blocking calendar has a sync token (incremental sync only)."""
+        tokens = sync_config.sync_tokens or {}
+        return all(tokens.get(cal_id) for cal_id in sync_config.blocking_calendar_ids)
+
+    def _is_mirror_fresh(self, sync_config: ScheduleCalendarSync) -> bool:
+        if not sync_config.mirror_synced_at:
+            return False
+        synced_at = sync_config.mirror_synced_at
+        if synced_at.tzinfo is not None:
+            synced_at = synced_at.astimezone(timezone.utc).replace(tzinfo=None)
+        max_age = timedelta(minutes=settings.GCAL_MIRROR_MAX_STALENESS_MINUTES)
+        return synced_at >= datetime.utcnow() - max_age
+
+    async def _get_mirrored_busy_times(
+        self, sync_id: uuid.UUID, start_time: datetime, end_time: datetime
+    ) -> list[tuple[datetime, datetime]]:
+        """One indexed range query over the busy-time mirror."""
+        result = await self.db.execute(
+            select(CalendarBusyInterval.start_time, CalendarBusyInterval.end_time)
+            .where(
+                CalendarBusyInterval.sync_id == sync_id,
+                CalendarBusyInterval.start_time < end_time,
+                CalendarBusyInterval.end_time > start_time,
+            )
+            .order_by(CalendarBusyInterval.start_time)
+        )
+        # Naive UTC, like the FreeBusy path
+        return [
+            (
+                row.start_time.astimezone(timezone.utc).replace(tzinfo=None),
+                row.end_time.astimezone(timezone.utc).replace(tzinfo=None),
+            )
+            for row in result
+        ]
+
+    async def _get_freebusy_times(
+        self,
+        user_id: uuid.UUID,
+        calendar_ids: list[str],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> list[tuple[datetime, datetime]]:
+        """Live FreeBusy API call (used until the mirror is bootstrapped)."""
         token = await self._get_valid_token(user_id)
         if not token:
             return []
 
         busy_times = []
-        calendar_ids = sync_config.blocking_calendar_ids
 
         try:
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 # Use freebusy API for efficient batch query
                 response = await client.post(
                     f"{GOOGLE_CALENDAR_API}/freeBusy",
@@ -146,6 +225,185 @@ class GoogleCalendarService:
 
         return busy_times
 
+    async def sync_busy_mirror(
+        self,
+        sync_config: ScheduleCalendarSync,
+        user_id: uuid.UUID,
+        commit: bool = True,
+        full_sync: bool = True,
+    ) -> bool:
+        """
+        Incrementally sync the busy-time mirror for a schedule.
+
+        Each blocking calendar is read with its stored sync token (full sync
+        when missing or expired) inside a savepoint: a calendar whose sync
+        fails part-way keeps its previous rows. The mirror is only fresh
+        while every calendar synced (any failure marks it stale).
+        `commit=False` only flushes (the caller's transaction commits).
+        `full_sync=False` skips calendars needing a full sync, leaving the
+        mirror stale for the background refresher. Returns True if busy data
+        changed.
+        """
+        calendar_ids = sync_config.blocking_calendar_ids or []
+        tokens = dict(sync_config.sync_tokens or {})
+        changed = False
+
+        # Calendars no longer blocking this schedule leave the mirror
+        removed = [cal_id for cal_id in tokens if cal_id not in calendar_ids]
+        stale_rows = await self.db.execute(
+            delete(CalendarBusyInterval).where(
+                CalendarBusyInterval.sync_id == sync_config.id,
+                CalendarBusyInterval.calendar_id.not_in(calendar_ids),
+            )
+        )
+        changed |= bool(stale_rows.rowcount)
+        for cal_id in removed:
+            tokens.pop(cal_id)
+
+        token = await self._get_valid_token(user_id)
+        all_synced = token is not None
+        if token:
+            for cal_id in calendar_ids:
+                savepoint = await self.db.begin_nested()
+                synced, cal_changed = await self._sync_calendar(
+                    sync_config.id, cal_id, tokens, token, full_sync
+                )
+                if synced:
+                    await savepoint.commit()
+                    changed |= cal_changed
+                else:
+                    # Never serve a half-rebuilt calendar (e.g. failed full sync)
+                    await savepoint.rollback()
+                    all_synced = False
+
+        # Past events no longer affect availability
+        pruned = await self.db.execute(
+            delete(CalendarBusyInterval).where(
+                CalendarBusyInterval.sync_id == sync_config.id,
+                CalendarBusyInterval.end_time < datetime.utcnow() - timedelta(days=1),
+            )
+        )
+
+        sync_config.sync_tokens = tokens
+        # Any calendar out of sync: reads fall back to FreeBusy until a
+        # later sync succeeds
+        sync_config.mirror_synced_at = datetime.utcnow() if all_synced else None
+        if commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
+
+        if changed:
+            from app.services import slot_cache
+
+            await slot_cache.invalidate_schedule(sync_config.schedule_id)
+
+        logger.info(
+            f"GCal mirror sync {sync_config.schedule_id}: "
+            f"synced={all_synced} changed={changed} pruned={pruned.rowcount}"
+        )
+        return changed
+
+    async def _sync_calendar(
+        self,
+        sync_id: uuid.UUID,
+        calendar_id: str,
+        tokens: dict,
+        access_token: str,
+        full_sync: bool = True,
+    ) -> tuple[bool, bool]:
+        """Sync one calendar into the mirror. Returns (synced, changed)."""
+        changed = False
+        params = {"singleEvents": "true", "showDeleted": "true", "maxResults": 250}
+        if not tokens.get(calendar_id) and not full_sync:
+            return False, changed
+        if tokens.get(calendar_id):
+            params["syncToken"] = tokens[calendar_id]
+        else:
+            # Full sync: rebuild this calendar's rows from scratch
+            await self.db.execute(
+                delete(CalendarBusyInterval).where(
+                    CalendarBusyInterval.sync_id == sync_id,
+                    CalendarBusyInterval.calendar_id == calendar_id,
+                )
+            )
+            params["timeMin"] = (
+                datetime.utcnow() - timedelta(days=1)
+            ).isoformat() + "Z"
+            changed = True
+
+        try:
+            async with self._client() as client:
+                while True:
+                    response = await client.get(
+                        f"{GOOGLE_CALENDAR_API}/calendars/{quote(calendar_id)}/events",
+                        headers={"Authorization": f"Bearer {access_token}"},
+                        params=params,
+                    )
+
+                    if response.status_code == 410:
+                        # Sync token expired: fall back to a full sync
+                        logger.info(f"GCal sync token expired for {calendar_id}")
+                        tokens.pop(calendar_id, None)
+                        if not full_sync:
+                            # Background refresher's job; FreeBusy meanwhile
+                            return False, changed
+                        synced, _ = await self._sync_calendar(
+                            sync_id, calendar_id, tokens, access_token
+                        )
+                        return synced, True
+
+                    if response.status_code != 200:
+                        logger.error(f"Events API error: {response.text}")
+                        return False, changed
+
+                    data = response.json()
+                    if await self._apply_events(
+                        sync_id, calendar_id, data.get("items", [])
+                    ):
+                        changed = True
+
+                    if data.get("nextPageToken"):
+                        params["pageToken"] = data["nextPageToken"]
+                        continue
+
+                    tokens[calendar_id] = data.get("nextSyncToken")
+                    return True, changed
+
+        except Exception as e:
+            logger.error(f"Error syncing calendar {calendar_id}: {e}")
+            return False, changed
+
+    async def _apply_events(
+        self, sync_id: uuid.UUID, calendar_id: str, items: list[dict]
+    ) -> bool:
+        """Upsert busy events and drop cancelled/free ones. Returns True if any."""
+        if not items:
+            return False
+
+        event_ids = [item["id"] for item in items]
+        await self.db.execute(
+            delete(CalendarBusyInterval).where(
+                CalendarBusyInterval.sync_id == sync_id,
+                CalendarBusyInterval.calendar_id == calendar_id,
+                CalendarBusyInterval.event_id.in_(event_ids),
+            )
+        )
+        for item in items:
+            busy = parse_busy_event(item)
+            if busy:
+                self.db.add(
+                    CalendarBusyInterval(
+                        sync_id=sync_id,
+                        calendar_id=calendar_id,
+                        event_id=item["id"],
+                        start_time=busy[0],
+                        end_time=busy[1],
+                    )
+                )
+        await self.db.flush()
+        return True
+
     async def create_booking_event(
         self,
         user_id: uuid.UUID,
@@ -198,7 +456,7 @@ class GoogleCalendarService:
             event_body["attendees"] = [{"email": attendee_email}]
 
         try:
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.post(
                     f"{GOOGLE_CALENDAR_API}/calendars/{calendar_id}/events",
                     headers={"Authorization": f"Bearer {token}"},
@@ -218,6 +476,34 @@ class GoogleCalendarService:
             return None
 
 
+def _parse_event_time(value: dict) -> Optional[datetime]:
+    """Parse an Events API start/end object into an aware UTC datetime."""
+    if value.get("dateTime"):
+        parsed = datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(timezone.utc)
+    if value.get("date"):
+        # All-day event
+        return datetime.combine(
+            date.fromisoformat(value["date"]), time.min, tzinfo=timezone.utc
+        )
+    return None
+
+
+def parse_busy_event(item: dict) -> Optional[tuple[datetime, datetime]]:
+    """Busy range of an Events API item, or None if it doesn't block time."""
+    if item.get("status") == "cancelled":
+        return None
+    if item.get("transparency") == "transparent":
+        return None
+    start = _parse_event_time(item.get("start", {}))
+    end = _parse_event_time(item.get("end", {}))
+    if not start or not end or end <= start:
+        return None
+    return start, end
+
+
 # Factory function for easy instantiation
 def get_google_calendar_service(db: AsyncSession) -> GoogleCalendarService:
     return GoogleCalendarService(db)
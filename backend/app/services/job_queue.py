@@ -0,0 +1,79 @@
+"""Durable job queue (Postgres jobs table).
+
+Long-running work (Gemini analysis, vault sanitization) used to run as
+FastAPI BackgroundTasks inside the web process: it died with the container
+and stuck analyses were only noticed by a "PENDING for more than 5 minutes"
+heuristic. Callers now enqueue a Job row in their own transaction and
+dedicated workers (app.workers.job_worker) run it, with explicit status,
+leases, heartbeats and retries.
+
+A job is visible to workers once the caller commits, so it runs if and only
+if the caller's own changes were saved.
+"""
+
+import uuid
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Job, JobStatus
+
+# Job kinds (handlers are registered in app.workers.job_worker)
+ANALYZE_CLINICAL_ENTRY = "clinical.analyze_entry"
+SANITIZE_CLINICAL_ENTRY = "vault.sanitize_clinical_entry"
+CORTEX_BULK_RUN = "cortex.bulk_run"
+
+# Someone is waiting on the result of these
+PRIORITY_INTERACTIVE = 10
+PRIORITY_BACKGROUND = 0
+
+_ACTIVE_DEDUPE = text("status IN ('QUEUED', 'RUNNING') AND dedupe_key IS NOT NULL")
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: dict,
+    organization_id: Optional[uuid.UUID] = None,
+    priority: int = PRIORITY_BACKGROUND,
+    dedupe_key: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+) -> Optional[uuid.UUID]:
+    """
+    Queue a job without committing.
+
+    With `dedupe_key`, nothing is queued while another QUEUED/RUNNING job
+    holds the same key.
+
+    Returns:
+        The job id, or None if an active job with `dedupe_key` exists
+    """
+    job_id = await db.scalar(
+        insert(Job)
+        .values(
+            id=uuid.uuid4(),
+            kind=kind,
+            payload=payload,
+            status=JobStatus.QUEUED,
+            priority=priority,
+            dedupe_key=dedupe_key,
+            organization_id=organization_id,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        )
+        .on_conflict_do_nothing(
+            index_elements=["dedupe_key"], index_where=_ACTIVE_DEDUPE
+        )
+        .returning(Job.id)
+    )
+    return job_id
+
+
+def clinical_entry_analysis_key(entry_id: uuid.UUID) -> str:
+    return f"clinical_entry:{entry_id}:analyze"
+
+
+def cortex_bulk_run_key(run_id: uuid.UUID) -> str:
+    return f"cortex_bulk_run:{run_id}"
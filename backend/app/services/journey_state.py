@@ -0,0 +1,104 @@
+"""Materialized current journey stage (patient_journey_state).
+
+journey_logs is the append-only history; patients.journey_status the JSONB
+the UI reads. Questions like "who is in stage X, and since when" used to be
+answered by DISTINCT ON over journey_logs or text matching on the JSONB.
+patient_journey_state keeps one row per (patient, journey) with the current
+stage and the time it was entered, indexed on (journey_key, stage,
+entered_at).
+
+Writers:
+- AutomationEngine._update_patient_journey_status calls record_stage in the
+  same transaction as its JourneyLog insert.
+- Code that writes journey_logs / journey_status directly (seed scripts)
+  calls rebuild_journey_state afterwards.
+"""
+
+import uuid
+from typing import Optional, Sequence
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_UPSERT_STAGE = text("""
+    INSERT INTO patient_journey_state (patient_id, journey_key, stage, entered_at)
+    VALUES (:patient_id, :journey_key, :stage, NOW())
+    ON CONFLICT (patient_id, journey_key)
+    DO UPDATE SET
+        stage = EXCLUDED.stage,
+        entered_at = CASE
+            WHEN patient_journey_state.stage IS DISTINCT FROM EXCLUDED.stage
+            THEN EXCLUDED.entered_at
+            ELSE patient_journey_state.entered_at
+        END
+""")
+
+# Latest journey_logs row per (patient, journey); journeys only present in
+# patients.journey_status (no log) get entered_at NULL: the time is unknown,
+# and timeout scans must not treat them as stuck since signup
+_REBUILD = """
+    INSERT INTO patient_journey_state (patient_id, journey_key, stage, entered_at)
+    SELECT DISTINCT ON (patient_id, journey_key)
+        patient_id, journey_key, stage, entered_at
+    FROM (
+        SELECT patient_id, journey_key, to_stage AS stage,
+               changed_at AS entered_at, 0 AS source
+        FROM journey_logs
+        WHERE {logs_filter}
+        UNION ALL
+        SELECT p.id, js.key, js.value, NULL::timestamptz, 1
+        FROM patients p, jsonb_each_text(p.journey_status) AS js
+        WHERE jsonb_typeof(p.journey_status) = 'object' AND {patients_filter}
+    ) AS candidates
+    ORDER BY patient_id, journey_key, source, entered_at DESC
+"""
+
+_PATIENT_IDS = bindparam("patient_ids", type_=ARRAY(PG_UUID(as_uuid=True)))
+
+
+async def record_stage(
+    db: AsyncSession, patient_id: uuid.UUID | str, journey_key: str, stage: str
+) -> None:
+    """
+    Set a patient's current stage in a journey (entered now).
+
+    Re-recording the current stage keeps its entered_at (stage age).
+    """
+    await db.execute(
+        _UPSERT_STAGE,
+        {"patient_id": str(patient_id), "journey_key": journey_key, "stage": stage},
+    )
+
+
+async def rebuild_journey_state(
+    db: AsyncSession, patient_ids: Optional[Sequence[uuid.UUID]] = None
+) -> None:
+    """
+    Recompute patient_journey_state from journey_logs (and journey_status).
+
+    Rebuilds every patient, or only `patient_ids`. Does not commit.
+    """
+    if patient_ids is None:
+        await db.execute(text("DELETE FROM patient_journey_state"))
+        await db.execute(
+            text(_REBUILD.format(logs_filter="TRUE", patients_filter="TRUE"))
+        )
+        return
+
+    params = {"patient_ids": list(patient_ids)}
+    await db.execute(
+        text(
+            "DELETE FROM patient_journey_state WHERE patient_id = ANY(:patient_ids)"
+        ).bindparams(_PATIENT_IDS),
+        params,
+    )
+    await db.execute(
+        text(
+            _REBUILD.format(
+                logs_filter="patient_id = ANY(:patient_ids)",
+                patients_filter="p.id = ANY(:patient_ids)",
+            )
+        ).bindparams(_PATIENT_IDS),
+        params,
+    )
@@ -0,0 +1,436 @@
+"""Precomputed availability cache for the Booking Engine.
+
+Caches the output of SlotService (after blocker filtering, before the
+"past slots" cut) per (therapist, schedule, service, ISO week), so repeated
+public widget loads skip the DB round-trips, the Google Calendar call and
+slot generation.
+
+Tiers:
+1. In-process TTLCache (always on when SLOT_CACHE_ENABLED). Local
+   invalidations do not reach other instances, so its TTL is kept short
+   (SLOT_CACHE_LOCAL_TTL_SECONDS): that bounds how long another instance
+   can show a just-booked slot as free
+2. Optional shared Redis tier (SLOT_CACHE_REDIS_URL, SLOT_CACHE_TTL_SECONDS).
+   Entries are stamped with generation counters, so an invalidation on one
+   instance is seen by every instance on its next read.
+
+Invalidation is write-driven: a SQLAlchemy session hook collects changed
+Booking, TimeOff, AvailabilityBlock, SpecificAvailability,
+ScheduleCalendarSync, ServiceType and CalendarIntegration rows during flush
+and drops the affected entries after commit. Calendar sync code calls
+invalidate_therapist() / invalidate_schedule() directly when new busy data
+arrives.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from itertools import chain
+from typing import Iterable, Optional
+
+from cachetools import TTLCache
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.invalidation import register_commit_invalidation
+from app.db.models import (
+    AvailabilityBlock,
+    Booking,
+    CalendarIntegration,
+    ScheduleCalendarSync,
+    ServiceType,
+    SpecificAvailability,
+    TimeOff,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+# (start, end, max_capacity, current_bookings) - naive UTC
+CachedSlot = tuple[datetime, datetime, int, int]
+
+# Slots may start up to this long before a blocker and still overlap it
+# (covers slots up to 24h, i.e. everything except multi-day retreats).
+SLOT_OVERLAP_MARGIN = timedelta(days=1)
+
+# Ranges spanning more weeks than this invalidate the whole therapist
+MAX_INVALIDATION_WEEKS = 26
+
+_local_cache: TTLCache = TTLCache(
+    maxsize=4096,
+    ttl=min(settings.SLOT_CACHE_TTL_SECONDS, settings.SLOT_CACHE_LOCAL_TTL_SECONDS),
+)
+
+# Bumped on every local invalidation; computations that raced with a write
+# are not stored.
+_invalidation_seq = 0
+
+_redis = None
+_redis_unavailable = False
+
+
+def week_start(day: date) -> date:
+    """Monday of the ISO week containing `day`."""
+    return day - timedelta(days=day.weekday())
+
+
+def weeks_between(start_date: date, end_date: date) -> list[date]:
+    """Mondays of every ISO week touched by [start_date, end_date]."""
+    weeks = []
+    current = week_start(start_date)
+    while current <= end_date:
+        weeks.append(current)
+        current += timedelta(days=7)
+    return weeks
+
+
+@dataclass
+class CacheTicket:
+    """Snapshot taken on read, so a write after a racing invalidation is dropped."""
+
+    seq: int
+    generations: dict[date, list[int]] = field(default_factory=dict)
+
+
+# =============================================================================
+# Shared Tier (Redis)
+# =============================================================================
+
+
+def _get_redis():
+    """Lazily connect to the shared tier. Returns None when not configured."""
+    global _redis, _redis_unavailable
+    if not settings.SLOT_CACHE_REDIS_URL or _redis_unavailable:
+        return None
+    if _redis is None:
+        try:
+            import redis.asyncio as redis_asyncio
+
+            _redis = redis_asyncio.from_url(settings.SLOT_CACHE_REDIS_URL)
+        except ImportError:
+            logger.warning("SLOT_CACHE_REDIS_URL set but redis is not installed")
+            _redis_unavailable = True
+            return None
+    return _redis
+
+
+def _gen_keys(
+    therapist_id: uuid.UUID,
+    schedule_id: uuid.UUID,
+    service_id: uuid.UUID,
+    week: date,
+) -> list[str]:
+    return [
+        f"slots:gen:t:{therapist_id}",
+        f"slots:gen:tw:{therapist_id}:{week.isoformat()}",
+        f"slots:gen:sch:{schedule_id}",
+        f"slots:gen:svc:{service_id}",
+    ]
+
+
+def _entry_key(
+    therapist_id: uuid.UUID,
+    schedule_id: uuid.UUID,
+    service_id: uuid.UUID,
+    week: date,
+) -> str:
+    return f"slots:e:{therapist_id}:{schedule_id}:{service_id}:{week.isoformat()}"
+
+
+def _encode(slots: list[CachedSlot], generations: list[int]) -> str:
+    return json.dumps(
+        {
+            "g": generations,
+            "s": [
+                [s.isoformat(), e.isoformat(), cap, booked]
+                for s, e, cap, booked in slots
+            ],
+        }
+    )
+
+
+def _decode(raw: bytes | str) -> tuple[list[int], list[CachedSlot]]:
+    data = json.loads(raw)
+    slots = [
+        (datetime.fromisoformat(s), datetime.fromisoformat(e), cap, booked)
+        for s, e, cap, booked in data["s"]
+    ]
+    return data["g"], slots
+
+
+async def _shared_invalidate(keys: list[str]) -> None:
+    client = _get_redis()
+    if client is None or not keys:
+        return
+    try:
+        pipe = client.pipeline()
+        for key in keys:
+            pipe.incr(key)
+            # Outlives every entry stamped with the previous generation
+            pipe.expire(key, settings.SLOT_CACHE_TTL_SECONDS * 2)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Slot cache shared invalidation failed: {e}")
+
+
+# =============================================================================
+# Read / Write
+# =============================================================================
+
+
+async def get_weeks(
+    therapist_id: uuid.UUID,
+    schedule_id: uuid.UUID,
+    service_id: uuid.UUID,
+    weeks: list[date],
+) -> tuple[dict[date, list[CachedSlot]], CacheTicket]:
+    """Return cached slots for the requested weeks (misses are omitted)."""
+    ticket = CacheTicket(seq=_invalidation_seq)
+    hits: dict[date, list[CachedSlot]] = {}
+    if not settings.SLOT_CACHE_ENABLED:
+        return hits, ticket
+
+    missing = []
+    for week in weeks:
+        cached = _local_cache.get((therapist_id, schedule_id, service_id, week))
+        if cached is not None:
+            hits[week] = cached
+        else:
+            missing.append(week)
+
+    client = _get_redis()
+    if client is None or not missing:
+        return hits, ticket
+
+    # One round-trip: 4 generation counters + the entry, per missing week
+    keys = []
+    for week in missing:
+        keys.extend(_gen_keys(therapist_id, schedule_id, service_id, week))
+        keys.append(_entry_key(therapist_id, schedule_id, service_id, week))
+    try:
+        values = await client.mget(keys)
+    except Exception as e:
+        logger.warning(f"Slot cache shared read failed: {e}")
+        return hits, ticket
+
+    for i, week in enumerate(missing):
+        row = values[i * 5 : i * 5 + 5]
+        generations = [int(v) if v is not None else 0 for v in row[:4]]
+        ticket.generations[week] = generations
+        if row[4] is None:
+            continue
+        stored_generations, slots = _decode(row[4])
+        if stored_generations == generations:
+            hits[week] = slots
+            _local_cache[(therapist_id, schedule_id, service_id, week)] = slots
+
+    return hits, ticket
+
+
+async def set_weeks(
+    therapist_id: uuid.UUID,
+    schedule_id: uuid.UUID,
+    service_id: uuid.UUID,
+    slots_by_week: dict[date, list[CachedSlot]],
+    ticket: CacheTicket,
+) -> None:
+    """Store freshly computed weeks, unless an invalidation raced the compute."""
+    if not settings.SLOT_CACHE_ENABLED or ticket.seq != _invalidation_seq:
+        return
+
+    for week, slots in slots_by_week.items():
+        _local_cache[(therapist_id, schedule_id, service_id, week)] = slots
+
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline()
+        for week, slots in slots_by_week.items():
+            generations = ticket.generations.get(week)
+            if generations is None:
+                continue
+            pipe.set(
+                _entry_key(therapist_id, schedule_id, service_id, week),
+                _encode(slots, generations),
+                ex=settings.SLOT_CACHE_TTL_SECONDS,
+            )
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Slot cache shared write failed: {e}")
+
+
+# =============================================================================
+# Invalidation
+# =============================================================================
+
+
+def _scope_matches(scope: tuple, key: tuple) -> bool:
+    """Whether a local cache key falls inside an invalidation scope."""
+    kind = scope[0]
+    if kind == "therapist":
+        return key[0] == scope[1] and (scope[2] is None or key[3] in scope[2])
+    if kind == "schedule":
+        return key[1] == scope[1]
+    if kind == "service":
+        return key[2] == scope[1]
+    return True
+
+
+def _scope_gen_keys(scope: tuple) -> list[str]:
+    """Shared-tier generation counters bumped by an invalidation scope."""
+    kind = scope[0]
+    if kind == "therapist":
+        if scope[2] is None:
+            return [f"slots:gen:t:{scope[1]}"]
+        return [f"slots:gen:tw:{scope[1]}:{w.isoformat()}" for w in scope[2]]
+    if kind == "schedule":
+        return [f"slots:gen:sch:{scope[1]}"]
+    if kind == "service":
+        return [f"slots:gen:svc:{scope[1]}"]
+    return []
+
+
+def _invalidate_local(scopes: Iterable[tuple]) -> None:
+    global _invalidation_seq
+    scopes = list(scopes)
+    _invalidation_seq += 1
+    for key in list(_local_cache.keys()):
+        if any(_scope_matches(scope, key) for scope in scopes):
+            _local_cache.pop(key, None)
+
+
+async def _invalidate(scopes: Iterable[tuple]) -> None:
+    scopes = list(scopes)
+    _invalidate_local(scopes)
+    await _shared_invalidate(list(chain.from_iterable(map(_scope_gen_keys, scopes))))
+
+
+async def invalidate_therapist(
+    therapist_id: uuid.UUID, weeks: Optional[Iterable[date]] = None
+) -> None:
+    """Drop cached slots for a therapist (optionally only some ISO weeks)."""
+    week_set = frozenset(weeks) if weeks is not None else None
+    await _invalidate([("therapist", therapist_id, week_set)])
+
+
+async def invalidate_schedule(schedule_id: uuid.UUID) -> None:
+    """Drop cached slots computed from a schedule."""
+    await _invalidate([("schedule", schedule_id)])
+
+
+async def invalidate_service(service_id: uuid.UUID) -> None:
+    """Drop cached slots for a service (duration/capacity/schedule changed)."""
+    await _invalidate([("service", service_id)])
+
+
+def clear() -> None:
+    """Drop the whole in-process tier."""
+    _invalidate_local([("all",)])
+
+
+# =============================================================================
+# Write-Driven Hooks (SQLAlchemy session events)
+# =============================================================================
+
+
+def _attr_values(obj, name: str) -> list:
+    """Current and pre-flush values of an attribute, without emitting SQL."""
+    history = inspect(obj).attrs[name].history
+    return [v for v in history.sum() if v is not None]
+
+
+def _range_weeks(obj, start_attr: str, end_attr: str) -> Optional[frozenset[date]]:
+    """ISO weeks whose slots can overlap the row's (old or new) time range."""
+    starts = _attr_values(obj, start_attr)
+    ends = _attr_values(obj, end_attr)
+    if not starts or not ends:
+        return None
+    from app.services.slots import to_naive_utc
+
+    first = (min(to_naive_utc(s) for s in starts) - SLOT_OVERLAP_MARGIN).date()
+    last = max(to_naive_utc(e) for e in ends).date()
+    weeks = weeks_between(first, last)
+    if len(weeks) > MAX_INVALIDATION_WEEKS:
+        return None
+    return frozenset(weeks)
+
+
+def _scopes_for(obj) -> set[tuple]:
+    """Translate a changed row into cache invalidation scopes."""
+    if isinstance(obj, (Booking, TimeOff, SpecificAvailability)):
+        if isinstance(obj, Booking):
+            owners = _attr_values(obj, "therapist_id")
+            weeks = _range_weeks(obj, "start_time", "end_time")
+        else:
+            owners = _attr_values(obj, "user_id")
+            weeks = _range_weeks(obj, "start_datetime", "end_datetime")
+        return {("therapist", owner, weeks) for owner in owners}
+    if isinstance(obj, (AvailabilityBlock, ScheduleCalendarSync)):
+        return {("schedule", s) for s in _attr_values(obj, "schedule_id")}
+    if isinstance(obj, ServiceType):
+        return {("service", s) for s in _attr_values(obj, "id")}
+    if isinstance(obj, CalendarIntegration):
+        return {("therapist", u, None) for u in _attr_values(obj, "user_id")}
+    return set()
+
+
+_TRACKED = (
+    Booking,
+    TimeOff,
+    SpecificAvailability,
+    AvailabilityBlock,
+    ScheduleCalendarSync,
+    ServiceType,
+    CalendarIntegration,
+)
+
+
+# Busy-mirror bookkeeping; the mirror sync invalidates explicitly on changes
+_MIRROR_STATE_ATTRS = frozenset({"sync_tokens", "mirror_synced_at", "updated_at"})
+
+
+def _only_mirror_state_changed(obj) -> bool:
+    if not isinstance(obj, ScheduleCalendarSync):
+        return False
+    changed = {attr.key for attr in inspect(obj).attrs if attr.history.has_changes()}
+    return changed <= _MIRROR_STATE_ATTRS
+
+
+def _changed_scopes(session: Session) -> set:
+    scopes = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, _TRACKED):
+            continue
+        if obj in session.dirty and (
+            not session.is_modified(obj) or _only_mirror_state_changed(obj)
+        ):
+            continue
+        scopes |= _scopes_for(obj)
+    return scopes
+
+
+def _invalidate_scopes(scopes: set) -> None:
+    # Local tier is dropped right away so the committing request sees it
+    _invalidate_local(scopes)
+
+    gen_keys = list(chain.from_iterable(map(_scope_gen_keys, scopes)))
+    if not gen_keys or _get_redis() is None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.debug("Slot cache: no event loop, shared invalidation skipped")
+        return
+    loop.create_task(_shared_invalidate(gen_keys))
+
+
+register_commit_invalidation("slot_cache", _changed_scopes, _invalidate_scopes)
@@ -0,0 +1,268 @@
+"""Organization-wide availability search for the Booking Engine.
+
+Answers "earliest N free slots for these services, with any therapist" in a
+handful of set-based queries instead of one SlotService.get_available_slots
+call per (therapist, service):
+
+1. Services + therapist links + default schedules
+2. Availability blocks for every schedule involved
+3. Specific availability, time-offs and bookings for every therapist involved
+
+Per-(therapist, service) timelines are generated in memory with the
+SlotService helpers and merged with a heap. Google Calendar is consulted
+lazily: a therapist's busy times are only fetched when one of their slots
+reaches the top of the heap.
+"""
+
+import heapq
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from typing import Iterable, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import (
+    AvailabilityBlock,
+    AvailabilitySchedule,
+    Booking,
+    BookingStatus,
+    SchedulingType,
+    ServiceType,
+    SpecificAvailability,
+    TimeOff,
+    service_therapist_link,
+)
+from app.services.slots import SlotService, TimeSlot, merge_intervals
+
+
+@dataclass
+class Timeline:
+    """Candidate slots for one (therapist, service), sorted by start."""
+
+    therapist_id: uuid.UUID
+    service_id: uuid.UUID
+    schedule_id: uuid.UUID
+    slots: list[TimeSlot] = field(default_factory=list)
+
+
+class SlotSearchService:
+    """Batched earliest-slot search across all therapists of an organization."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.slots = SlotService(db)
+
+    async def search_earliest_slots(
+        self,
+        organization_id: uuid.UUID,
+        start_date: date,
+        end_date: date,
+        service_ids: Optional[list[uuid.UUID]] = None,
+        limit: int = 10,
+    ) -> list[TimeSlot]:
+        """
+        Earliest free slots across every therapist offering the services.
+
+        Args:
+            organization_id: Organization to search in
+            start_date: Start of the date range (inclusive)
+            end_date: End of the date range (inclusive)
+            service_ids: Services to consider (None = all active CALENDAR services)
+            limit: Maximum number of slots to return
+
+        Returns:
+            Up to `limit` TimeSlots ordered by start, with service_id set
+        """
+        timelines = await self._load_timelines(
+            organization_id, start_date, end_date, service_ids
+        )
+        return await self._merge_earliest(timelines, start_date, end_date, limit)
+
+    async def _load_timelines(
+        self,
+        organization_id: uuid.UUID,
+        start_date: date,
+        end_date: date,
+        service_ids: Optional[list[uuid.UUID]],
+    ) -> list[Timeline]:
+        """Build per-(therapist, service) timelines from set-based queries."""
+        # Step 0: Services, therapist links and default schedules
+        service_query = select(ServiceType).where(
+            ServiceType.organization_id == organization_id,
+            ServiceType.is_active == True,
+            ServiceType.scheduling_type == SchedulingType.CALENDAR,
+        )
+        if service_ids:
+            service_query = service_query.where(ServiceType.id.in_(service_ids))
+        services = {
+            s.id: s for s in (await self.db.execute(service_query)).scalars().all()
+        }
+        if not services:
+            return []
+
+        link_rows = await self.db.execute(
+            select(
+                service_therapist_link.c.service_type_id,
+                service_therapist_link.c.user_id,
+            ).where(service_therapist_link.c.service_type_id.in_(services.keys()))
+        )
+        pairs = [(row.user_id, services[row.service_type_id]) for row in link_rows]
+        therapist_ids = {therapist_id for therapist_id, _ in pairs}
+        if not therapist_ids:
+            return []
+
+        default_rows = await self.db.execute(
+            select(AvailabilitySchedule.user_id, AvailabilitySchedule.id).where(
+                AvailabilitySchedule.user_id.in_(therapist_ids),
+                AvailabilitySchedule.is_default == True,
+            )
+        )
+        default_schedules = {row.user_id: row.id for row in default_rows}
+
+        resolved = []
+        for therapist_id, service in pairs:
+            schedule_id = service.schedule_id or default_schedules.get(therapist_id)
+            if schedule_id:
+                resolved.append((therapist_id, service, schedule_id))
+        if not resolved:
+            return []
+        schedule_ids = {schedule_id for _, _, schedule_id in resolved}
+
+        start_dt = datetime.combine(start_date, time.min)
+        end_dt = datetime.combine(end_date, time.max)
+        now = datetime.utcnow()
+
+        # Step 1: Recurring blocks for every schedule involved
+        blocks_by_schedule = defaultdict(list)
+        block_rows = await self.db.execute(
+            select(AvailabilityBlock).where(
+                AvailabilityBlock.schedule_id.in_(schedule_ids),
+                AvailabilityBlock.effective_from <= now,
+                or_(
+                    AvailabilityBlock.effective_until.is_(None),
+                    AvailabilityBlock.effective_until >= now,
+                ),
+            )
+        )
+        for block in block_rows.scalars().all():
+            blocks_by_schedule[block.schedule_id].append(block)
+
+        # Step 2: Specific availability, time-offs and bookings per therapist
+        specific_by_user = defaultdict(list)
+        specific_rows = await self.db.execute(
+            select(SpecificAvailability).where(
+                SpecificAvailability.user_id.in_(therapist_ids),
+                SpecificAvailability.end_datetime >= start_dt,
+                SpecificAvailability.start_datetime <= end_dt,
+            )
+        )
+        for block in specific_rows.scalars().all():
+            specific_by_user[block.user_id].append(block)
+
+        time_offs_by_user = defaultdict(list)
+        time_off_rows = await self.db.execute(
+            select(TimeOff).where(
+                TimeOff.user_id.in_(therapist_ids),
+                TimeOff.start_datetime <= end_dt,
+                TimeOff.end_datetime >= start_dt,
+            )
+        )
+        for time_off in time_off_rows.scalars().all():
+            time_offs_by_user[time_off.user_id].append(time_off)
+
+        bookings_by_user = defaultdict(list)
+        booking_rows = await self.db.execute(
+            select(Booking).where(
+                Booking.therapist_id.in_(therapist_ids),
+                Booking.start_time <= end_dt,
+                Booking.end_time >= start_dt,
+                Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
+            )
+        )
+        for booking in booking_rows.scalars().all():
+            bookings_by_user[booking.therapist_id].append(booking)
+
+        # Step 3: Generate and filter each timeline in memory
+        timelines = []
+        for therapist_id, service, schedule_id in resolved:
+            potential = self.slots._generate_slot_ranges_from_availability(
+                blocks_by_schedule[schedule_id],
+                start_date,
+                end_date,
+                service.duration_minutes,
+            ) + self.slots._generate_slot_ranges_from_specific(
+                [
+                    b
+                    for b in specific_by_user[therapist_id]
+                    if b.schedule_id in (None, schedule_id)
+                ],
+                service.duration_minutes,
+            )
+            available = self.slots._filter_blocked_ranges(
+                list(dict.fromkeys(potential)),
+                [
+                    t
+                    for t in time_offs_by_user[therapist_id]
+                    if t.schedule_id in (None, schedule_id)
+                ],
+                bookings_by_user[therapist_id],
+                [],  # Google Calendar is checked lazily while merging
+                service.capacity,
+                therapist_id,
+            )
+            available = [s for s in available if s.start > now]
+            if not available:
+                continue
+            for slot in available:
+                slot.service_id = service.id
+            available.sort(key=lambda s: s.start)
+            timelines.append(Timeline(therapist_id, service.id, schedule_id, available))
+
+        return timelines
+
+    async def _merge_earliest(
+        self,
+        timelines: Iterable[Timeline],
+        start_date: date,
+        end_date: date,
+        limit: int,
+    ) -> list[TimeSlot]:
+        """Heap-merge timelines, checking Google Calendar only for winners."""
+        heap = []
+        for idx, timeline in enumerate(timelines):
+            heap.append((timeline.slots[0].start, idx, 0, timeline))
+        heapq.heapify(heap)
+
+        busy_cache: dict[tuple, list[tuple[datetime, datetime]]] = {}
+        results: list[TimeSlot] = []
+
+        while heap and len(results) < limit:
+            _, idx, pos, timeline = heapq.heappop(heap)
+            slot = timeline.slots[pos]
+            if pos + 1 < len(timeline.slots):
+                heapq.heappush(
+                    heap, (timeline.slots[pos + 1].start, idx, pos + 1, timeline)
+                )
+
+            key = (timeline.therapist_id, timeline.schedule_id)
+            if key not in busy_cache:
+                busy_cache[key] = merge_intervals(
+                    await self.slots._get_gcal_busy_times(
+                        timeline.therapist_id,
+                        timeline.schedule_id,
+                        start_date,
+                        end_date,
+                    )
+                )
+            if any(
+                slot.overlaps(busy_start, busy_end)
+                for busy_start, busy_end in busy_cache[key]
+            ):
+                continue
+
+            results.append(slot)
+
+        return results
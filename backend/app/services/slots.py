@@ -8,11 +8,13 @@ This service calculates available time slots based on:
 Formula: (AvailabilityBlocks - Events - TimeOff) = Available Slots
 """
 
-from datetime import datetime, date, time, timedelta
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date, time, timedelta, timezone
 import uuid
 from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, func
 
 from app.db.models import (
     AvailabilityBlock,
@@ -24,6 +26,7 @@ from app.db.models import (
     SchedulingType,
     AvailabilitySchedule,
 )
+from app.services import slot_cache
 from app.services.google_calendar import GoogleCalendarService
 
 
@@ -36,6 +39,7 @@ class TimeSlot:
     therapist_id: uuid.UUID
     max_capacity: int = 1
     current_bookings: int = 0
+    service_id: Optional[uuid.UUID] = None  # Set by org-wide searches
 
     @property
     def check_capacity(self) -> bool:
@@ -46,6 +50,114 @@ class TimeSlot:
         return self.start < other_end and self.end > other_start
 
 
+def to_naive_utc(dt: datetime) -> datetime:
+    """Normalize a datetime to naive UTC (slots are generated as naive UTC)."""
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def merge_intervals(
+    intervals: list[tuple[datetime, datetime]],
+) -> list[tuple[datetime, datetime]]:
+    """Normalize, sort and merge ranges into disjoint naive-UTC intervals.
+
+    The result is ordered by both start and end, so overlap lookups can be
+    done with a binary search on the end times. Inverted ranges are dropped.
+    """
+    normalized = sorted(
+        (to_naive_utc(start), to_naive_utc(end)) for start, end in intervals
+    )
+    merged: list[tuple[datetime, datetime]] = []
+    for start, end in normalized:
+        if end < start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class OverlapCounter:
+    """Counts how many ranges overlap a query interval in O(log n).
+
+    A range [s, e) overlaps [start, end) when s < end and e > start. Every
+    range ending at or before `start` also starts before `end`, so the count
+    is (#starts < end) - (#ends <= start).
+    """
+
+    def __init__(self, intervals: list[tuple[datetime, datetime]]):
+        normalized = [
+            (to_naive_utc(start), to_naive_utc(end)) for start, end in intervals
+        ]
+        normalized = [(s, e) for s, e in normalized if s <= e]
+        self.starts = sorted(s for s, _ in normalized)
+        self.ends = sorted(e for _, e in normalized)
+
+    def count(self, start: datetime, end: datetime) -> int:
+        return bisect_left(self.starts, end) - bisect_right(self.ends, start)
+
+
+# Slot candidates are plain (start, end) tuples until the final filter;
+# TimeSlot objects are only built for slots that are actually returned.
+SlotRange = tuple[datetime, datetime]
+WeeklyTemplate = list[list[tuple[timedelta, timedelta]]]
+
+
+def parse_block_minutes(value: str) -> int:
+    """Minutes since midnight for an AvailabilityBlock "HH:MM" string."""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def compile_weekly_template(
+    blocks: list[AvailabilityBlock], duration_minutes: int
+) -> WeeklyTemplate:
+    """Pre-compute slot offsets from midnight for each weekday (0=Monday).
+
+    Block times are parsed once and every slot of a block is laid out up
+    front, so generating a date range is only date + offset arithmetic.
+    Offsets keep block order, matching _generate_slots_from_availability.
+    """
+    template: WeeklyTemplate = [[] for _ in range(7)]
+    if duration_minutes <= 0:
+        return template
+    duration = timedelta(minutes=duration_minutes)
+    for block in blocks:
+        block_start = timedelta(minutes=parse_block_minutes(block.start_time))
+        block_end = timedelta(minutes=parse_block_minutes(block.end_time))
+        offsets = template[block.day_of_week]
+        slot_start = block_start
+        while slot_start + duration <= block_end:
+            offsets.append((slot_start, slot_start + duration))
+            slot_start += duration
+    return template
+
+
+def iter_slot_ranges(
+    template: WeeklyTemplate, start_date: date, end_date: date
+) -> Iterator[SlotRange]:
+    """Lazily expand a weekly template over [start_date, end_date] (inclusive)."""
+    if not any(template):
+        return
+    day = datetime.combine(start_date, time.min)
+    last = datetime.combine(end_date, time.min)
+    one_day = timedelta(days=1)
+    while day <= last:
+        for start, end in template[day.weekday()]:
+            yield day + start, day + end
+        day += one_day
+
+
+def generate_slot_ranges(
+    template: WeeklyTemplate, start_date: date, end_date: date
+) -> list[SlotRange]:
+    """Expand a weekly template over [start_date, end_date] (inclusive)."""
+    return list(iter_slot_ranges(template, start_date, end_date))
+
+
 class SlotService:
     """Service for generating and managing available time slots."""
 
@@ -58,6 +170,7 @@ class SlotService:
         service_id: uuid.UUID,
         start_date: date,
         end_date: date,
+        use_cache: bool = False,
     ) -> list[TimeSlot]:
         """
         Get available time slots for a therapist within a date range.
@@ -67,32 +180,87 @@ class SlotService:
             service_id: The service type being booked
             start_date: Start of the date range (inclusive)
             end_date: End of the date range (inclusive)
+            use_cache: Serve whole ISO weeks from the availability cache
+                (public widget reads; booking validation must not use it)
 
         Returns:
             List of available TimeSlot objects
         """
+        bookable = await self._get_bookable_service(service_id, therapist_id)
+        if not bookable:
+            return []
+        service, schedule_id = bookable
+
+        available_slots = await self._get_range_slots(
+            service, schedule_id, therapist_id, start_date, end_date, use_cache
+        )
+
+        # Step 5: Filter out past slots
+        now = datetime.utcnow()
+        available_slots = [s for s in available_slots if s.start > now]
+
+        return available_slots
+
+    async def iter_available_slots(
+        self,
+        therapist_id: uuid.UUID,
+        service_id: uuid.UUID,
+        start_date: date,
+        end_date: date,
+        after: Optional[datetime] = None,
+        use_cache: bool = False,
+    ) -> AsyncIterator[TimeSlot]:
+        """
+        Yield available slots in start order, one ISO week at a time.
+
+        Each week is only computed once the caller has consumed the previous
+        one, so stopping early (a full page, the next available slot) never
+        scans the rest of the range.
+
+        Args:
+            therapist_id: The therapist's user ID
+            service_id: The service type being booked
+            start_date: Start of the date range (inclusive)
+            end_date: End of the date range (inclusive)
+            after: Only yield slots starting strictly after this (naive UTC)
+            use_cache: Serve weeks from the availability cache
+        """
+        bookable = await self._get_bookable_service(service_id, therapist_id)
+        if not bookable:
+            return
+        service, schedule_id = bookable
+
+        floor = datetime.utcnow()
+        if after is not None:
+            floor = max(floor, to_naive_utc(after))
+            start_date = max(start_date, floor.date())
+
+        week = slot_cache.week_start(start_date)
+        while week <= end_date:
+            chunk_start = max(week, start_date)
+            chunk_end = min(week + timedelta(days=6), end_date)
+            slots = await self._get_range_slots(
+                service, schedule_id, therapist_id, chunk_start, chunk_end, use_cache
+            )
+            for slot in sorted(slots, key=lambda s: s.start):
+                if slot.start > floor:
+                    yield slot
+            week += timedelta(days=7)
+
+    async def _get_bookable_service(
+        self, service_id: uuid.UUID, therapist_id: uuid.UUID
+    ) -> Optional[tuple[ServiceType, uuid.UUID]]:
+        """Service and schedule to browse, or None if there are no slots."""
         # Get service configuration
         service_result = await self.db.execute(
             select(ServiceType).where(ServiceType.id == service_id)
         )
         service = service_result.scalar_one_or_none()
         if not service:
-            return []
-
-        duration_minutes = service.duration_minutes
+            return None
 
         # Get schedule_id to use (from service or user's default)
-        schedule_id = service.schedule_id
-        if not schedule_id:
-            # Get user's default schedule
-            default_schedule = await self.db.execute(
-                select(AvailabilitySchedule).where(
-                    AvailabilitySchedule.user_id == therapist_id,
-                    AvailabilitySchedule.is_default == True,
-                )
-            )
-            default = default_schedule.scalar_one_or_none()
-            schedule_id = default.id if default else None
+        schedule_id = await self._resolve_schedule_id(service, therapist_id)
 
         # For FIXED_DATE services, we don't use recurring availability
         # The therapist explicitly sets the date/time, so we only check bookings
@@ -100,39 +268,81 @@ class SlotService:
             # For FIXED_DATE, there are no "available slots" to browse
             # The booking is at a specific time set by the fixed_date field
             # This method shouldn't be called for FIXED_DATE services
-            return []
+            return None
 
         # CALENDAR services: Use recurring availability + specific availability
         if not schedule_id:
             # No schedule defined, no slots available
-            return []
+            return None
+
+        return service, schedule_id
+
+    async def _get_range_slots(
+        self,
+        service: ServiceType,
+        schedule_id: uuid.UUID,
+        therapist_id: uuid.UUID,
+        start_date: date,
+        end_date: date,
+        use_cache: bool,
+    ) -> list[TimeSlot]:
+        """Steps 1-4 for a date range, from the cache or computed."""
+        if use_cache:
+            return await self._get_cached_slots(
+                service, schedule_id, therapist_id, start_date, end_date
+            )
+        return await self._compute_slots(
+            service, schedule_id, therapist_id, start_date, end_date
+        )
+
+    async def _resolve_schedule_id(
+        self, service: ServiceType, therapist_id: uuid.UUID
+    ) -> Optional[uuid.UUID]:
+        """Schedule linked to the service, or the therapist's default one."""
+        if service.schedule_id:
+            return service.schedule_id
+
+        # Get user's default schedule
+        default_schedule = await self.db.execute(
+            select(AvailabilitySchedule).where(
+                AvailabilitySchedule.user_id == therapist_id,
+                AvailabilitySchedule.is_default == True,
+            )
+        )
+        default = default_schedule.scalar_one_or_none()
+        return default.id if default else None
+
+    async def _compute_slots(
+        self,
+        service: ServiceType,
+        schedule_id: uuid.UUID,
+        therapist_id: uuid.UUID,
+        start_date: date,
+        end_date: date,
+    ) -> list[TimeSlot]:
+        """Run the full pipeline (steps 1-4) for a CALENDAR service."""
+        duration_minutes = service.duration_minutes
 
         # Step 1: Get recurring availability blocks for the schedule
         availability_blocks = await self._get_availability_blocks(schedule_id)
 
         # Step 2: Generate potential slots from availability
-        potential_slots = self._generate_slots_from_availability(
-            availability_blocks,
-            start_date,
-            end_date,
-            duration_minutes,
-            therapist_id,
+        potential_ranges = self._generate_slot_ranges_from_availability(
+            availability_blocks, start_date, end_date, duration_minutes
         )
 
         # Step 1.5: Get specific availability (global + schedule-specific)
         specific_availability = await self._get_specific_availability(
             therapist_id, schedule_id, start_date, end_date
         )
-        potential_specific_slots = self._generate_slots_from_specific(
-            specific_availability, duration_minutes, therapist_id
+        potential_ranges += self._generate_slot_ranges_from_specific(
+            specific_availability, duration_minutes
         )
 
-        # Combine slots and deduplicate
-        all_potential_slots = self._deduplicate_slots(
-            potential_slots + potential_specific_slots
-        )
+        # Combine slots and deduplicate (first occurrence wins)
+        all_potential_ranges = list(dict.fromkeys(potential_ranges))
 
-        if not all_potential_slots:
+        if not all_potential_ranges:
             return []
 
         # Step 3: Get blockers (time-off and existing bookings)
@@ -149,19 +359,66 @@ class SlotService:
         )
 
         # Step 4: Filter out blocked slots (respecting capacity)
-        available_slots = self._filter_blocked_slots(
-            all_potential_slots,
+        return self._filter_blocked_ranges(
+            all_potential_ranges,
             time_offs,
             existing_bookings,
             gcal_busy_times,
             service.capacity,
+            therapist_id,
         )
 
-        # Step 5: Filter out past slots
-        now = datetime.utcnow()
-        available_slots = [s for s in available_slots if s.start > now]
+    async def _get_cached_slots(
+        self,
+        service: ServiceType,
+        schedule_id: uuid.UUID,
+        therapist_id: uuid.UUID,
+        start_date: date,
+        end_date: date,
+    ) -> list[TimeSlot]:
+        """Serve whole ISO weeks from the availability cache, computing misses.
 
-        return available_slots
+        Missing weeks are computed in a single pipeline run over their span and
+        stored per week; the result is trimmed to [start_date, end_date].
+        """
+        weeks = slot_cache.weeks_between(start_date, end_date)
+        cached, ticket = await slot_cache.get_weeks(
+            therapist_id, schedule_id, service.id, weeks
+        )
+
+        missing = [w for w in weeks if w not in cached]
+        if missing:
+            span_start = missing[0]
+            span_end = missing[-1] + timedelta(days=6)
+            computed = await self._compute_slots(
+                service, schedule_id, therapist_id, span_start, span_end
+            )
+            by_week: dict[date, list[slot_cache.CachedSlot]] = {
+                w: [] for w in slot_cache.weeks_between(span_start, span_end)
+            }
+            for slot in computed:
+                week = slot_cache.week_start(slot.start.date())
+                if week in by_week:
+                    by_week[week].append(
+                        (slot.start, slot.end, slot.max_capacity, slot.current_bookings)
+                    )
+            await slot_cache.set_weeks(
+                therapist_id, schedule_id, service.id, by_week, ticket
+            )
+            cached.update(by_week)
+
+        return [
+            TimeSlot(
+                start=start,
+                end=end,
+                therapist_id=therapist_id,
+                max_capacity=max_capacity,
+                current_bookings=current_bookings,
+            )
+            for week in weeks
+            for start, end, max_capacity, current_bookings in cached.get(week, [])
+            if start_date <= start.date() <= end_date
+        ]
 
     async def _get_availability_blocks(
         self, schedule_id: uuid.UUID
@@ -188,7 +445,11 @@ class SlotService:
         duration_minutes: int,
         therapist_id: uuid.UUID,
     ) -> list[TimeSlot]:
-        """Generate potential slots from availability blocks."""
+        """Generate potential slots from availability blocks.
+
+        Reference implementation (day-by-day, block-by-block). The pipeline
+        uses _generate_slot_ranges_from_availability; tests check both agree.
+        """
         slots = []
         current_date = start_date
 
@@ -224,6 +485,18 @@ class SlotService:
 
         return slots
 
+    def _generate_slot_ranges_from_availability(
+        self,
+        blocks: list[AvailabilityBlock],
+        start_date: date,
+        end_date: date,
+        duration_minutes: int,
+    ) -> list[SlotRange]:
+        """Generate potential slot ranges from a precompiled weekly template."""
+        return generate_slot_ranges(
+            compile_weekly_template(blocks, duration_minutes), start_date, end_date
+        )
+
     async def _get_specific_availability(
         self,
         therapist_id: uuid.UUID,
@@ -281,6 +554,24 @@ class SlotService:
                 slot_start = slot_end
         return slots
 
+    def _generate_slot_ranges_from_specific(
+        self,
+        blocks: list[SpecificAvailability],
+        duration_minutes: int,
+    ) -> list[SlotRange]:
+        """Generate slot ranges from specific availability blocks."""
+        ranges: list[SlotRange] = []
+        if duration_minutes <= 0:
+            return ranges
+        duration = timedelta(minutes=duration_minutes)
+        for block in blocks:
+            slot_start = block.start_datetime.replace(tzinfo=None)
+            block_end = block.end_datetime.replace(tzinfo=None)
+            while slot_start + duration <= block_end:
+                ranges.append((slot_start, slot_start + duration))
+                slot_start += duration
+        return ranges
+
     def _deduplicate_slots(self, slots: list[TimeSlot]) -> list[TimeSlot]:
         """Remove duplicate slots (same start time)."""
         seen = set()
@@ -351,15 +642,30 @@ class SlotService:
         end_date: date,
     ) -> list[tuple[datetime, datetime]]:
         """Get busy times from Google Calendar for blocking calendars."""
+        return await self._get_gcal_busy_times_between(
+            therapist_id,
+            schedule_id,
+            datetime.combine(start_date, time.min),
+            datetime.combine(end_date, time.max),
+        )
+
+    async def _get_gcal_busy_times_between(
+        self,
+        therapist_id: uuid.UUID,
+        schedule_id: uuid.UUID,
+        start_dt: datetime,
+        end_dt: datetime,
+        refresh: bool = False,
+    ) -> list[tuple[datetime, datetime]]:
+        """Get Google Calendar busy times within an exact datetime range."""
         try:
             gcal_service = GoogleCalendarService(self.db)
-            start_dt = datetime.combine(start_date, time.min)
-            end_dt = datetime.combine(end_date, time.max)
             return await gcal_service.get_busy_times(
                 user_id=therapist_id,
                 schedule_id=schedule_id,
                 start_time=start_dt,
                 end_time=end_dt,
+                refresh=refresh,
             )
         except Exception:
             # If GCal fails, don't block the booking flow
@@ -383,59 +689,88 @@ class SlotService:
             gcal_busy_times: List of (start, end) tuples from Google Calendar
             capacity: Max number of bookings allowed per slot (default 1)
         """
-        available = []
-
-        def to_naive(dt: datetime) -> datetime:
-            """Convert timezone-aware datetime to naive (UTC)."""
-            if dt.tzinfo is not None:
-                return dt.replace(tzinfo=None)
-            return dt
-
-        for slot in slots:
-            is_blocked = False
-
-            # Check time-offs (Always blocks)
-            for time_off in time_offs:
-                if slot.overlaps(
-                    to_naive(time_off.start_datetime),
-                    to_naive(time_off.end_datetime),
-                ):
-                    is_blocked = True
-                    break
-
-            if is_blocked:
-                continue
-
-            # Check Google Calendar busy times (Always blocks)
-            for gcal_start, gcal_end in gcal_busy_times:
-                if slot.overlaps(to_naive(gcal_start), to_naive(gcal_end)):
-                    is_blocked = True
-                    break
+        counts = self._count_range_bookings(
+            [(slot.start, slot.end) for slot in slots],
+            time_offs,
+            bookings,
+            gcal_busy_times,
+        )
 
-            if is_blocked:
+        available = []
+        for slot, overlapping_bookings in zip(slots, counts):
+            if overlapping_bookings is None:
                 continue
 
-            # Check bookings (Respect capacity)
-            overlapping_bookings = 0
-            for booking in bookings:
-                if slot.overlaps(
-                    to_naive(booking.start_time),
-                    to_naive(booking.end_time),
-                ):
-                    overlapping_bookings += 1
-
-            if overlapping_bookings >= capacity:
-                is_blocked = True
-
             # Update slot info
             slot.max_capacity = capacity
             slot.current_bookings = overlapping_bookings
 
-            if not is_blocked:
+            if overlapping_bookings < capacity:
                 available.append(slot)
 
         return available
 
+    def _filter_blocked_ranges(
+        self,
+        ranges: list[SlotRange],
+        time_offs: list[TimeOff],
+        bookings: list[Booking],
+        gcal_busy_times: list[tuple[datetime, datetime]],
+        capacity: int,
+        therapist_id: uuid.UUID,
+    ) -> list[TimeSlot]:
+        """Like _filter_blocked_slots, building TimeSlots only for survivors."""
+        counts = self._count_range_bookings(
+            ranges, time_offs, bookings, gcal_busy_times
+        )
+        return [
+            TimeSlot(
+                start=start,
+                end=end,
+                therapist_id=therapist_id,
+                max_capacity=capacity,
+                current_bookings=overlapping_bookings,
+            )
+            for (start, end), overlapping_bookings in zip(ranges, counts)
+            if overlapping_bookings is not None and overlapping_bookings < capacity
+        ]
+
+    def _count_range_bookings(
+        self,
+        ranges: list[SlotRange],
+        time_offs: list[TimeOff],
+        bookings: list[Booking],
+        gcal_busy_times: list[tuple[datetime, datetime]],
+    ) -> list[Optional[int]]:
+        """
+        Overlapping booking count per range, or None if the range is blocked.
+
+        Blockers are normalized to naive UTC once and sorted, so each range is
+        resolved with binary searches instead of a scan over every blocker:
+        O((S + B) log(S + B)) rather than O(S x B).
+        """
+        # Time-offs and GCal busy times always block: merge them into one
+        # sorted list of disjoint ranges.
+        blocked_ranges = merge_intervals(
+            [(t.start_datetime, t.end_datetime) for t in time_offs]
+            + list(gcal_busy_times)
+        )
+        blocked_ends = [end for _, end in blocked_ranges]
+
+        # Bookings respect capacity: keep sorted starts/ends to count overlaps.
+        booking_counter = OverlapCounter([(b.start_time, b.end_time) for b in bookings])
+
+        counts: list[Optional[int]] = []
+        for start, end in ranges:
+            # First blocked range ending after the slot starts is the only
+            # candidate that can overlap it.
+            idx = bisect_right(blocked_ends, start)
+            if idx < len(blocked_ranges) and blocked_ranges[idx][0] < end:
+                counts.append(None)
+            else:
+                counts.append(booking_counter.count(start, end))
+        return counts
+
     async def is_slot_available(
         self,
         therapist_id: uuid.UUID,
@@ -445,19 +780,145 @@ class SlotService:
         """
         Check if a specific slot is available for booking.
         Used to validate booking requests.
+
+        Fast path: only the interval [start, start + duration) is queried,
+        cheapest checks first. No other slots are materialized, and Google
+        Calendar is only asked about this interval once the DB checks pass.
         """
-        slot_date = start_time.date()
-        available_slots = await self.get_available_slots(
-            therapist_id=therapist_id,
-            service_id=service_id,
-            start_date=slot_date,
-            end_date=slot_date,
+        service_result = await self.db.execute(
+            select(ServiceType).where(ServiceType.id == service_id)
         )
+        service = service_result.scalar_one_or_none()
+        if not service or service.scheduling_type == SchedulingType.FIXED_DATE:
+            return False
 
-        # Compare without timezone - slots are naive, request might be aware
-        # Strip timezone from start_time for comparison (slots are stored as naive)
-        start_time_naive = (
-            start_time.replace(tzinfo=None) if start_time.tzinfo else start_time
+        schedule_id = await self._resolve_schedule_id(service, therapist_id)
+        if not schedule_id:
+            return False
+
+        # Slots are naive UTC; the request may be timezone-aware
+        start = to_naive_utc(start_time)
+        end = start + timedelta(minutes=service.duration_minutes)
+        if start <= datetime.utcnow():
+            return False
+
+        # 1. Must be a generated slot of a recurring or specific block
+        if not await self._is_slot_covered(
+            therapist_id, schedule_id, start, end, service.duration_minutes
+        ):
+            return False
+
+        # 2. Time-off always blocks
+        if await self._has_time_off_overlap(therapist_id, schedule_id, start, end):
+            return False
+
+        # 3. Bookings respect capacity
+        if (
+            await self._count_overlapping_bookings(therapist_id, start, end)
+            >= service.capacity
+        ):
+            return False
+
+        # 4. Google Calendar busy times always block (mirror refreshed first)
+        busy_times = await self._get_gcal_busy_times_between(
+            therapist_id, schedule_id, start, end, refresh=True
+        )
+        return not any(
+            to_naive_utc(busy_start) < end and to_naive_utc(busy_end) > start
+            for busy_start, busy_end in busy_times
         )
 
-        return any(slot.start == start_time_naive for slot in available_slots)
+    async def _is_slot_covered(
+        self,
+        therapist_id: uuid.UUID,
+        schedule_id: uuid.UUID,
+        start: datetime,
+        end: datetime,
+        duration_minutes: int,
+    ) -> bool:
+        """Whether [start, end) is one of the slots generated for its day.
+
+        Slots are laid out back-to-back from the start of each block, so the
+        start must sit on that grid and the slot must end inside the block.
+        """
+        duration = timedelta(minutes=duration_minutes)
+        now = datetime.utcnow()
+        blocks_result = await self.db.execute(
+            select(AvailabilityBlock).where(
+                AvailabilityBlock.schedule_id == schedule_id,
+                AvailabilityBlock.day_of_week == start.weekday(),
+                AvailabilityBlock.effective_from <= now,
+                or_(
+                    AvailabilityBlock.effective_until.is_(None),
+                    AvailabilityBlock.effective_until >= now,
+                ),
+            )
+        )
+        day = datetime.combine(start.date(), time.min)
+        for block in blocks_result.scalars().all():
+            block_start = day + timedelta(minutes=parse_block_minutes(block.start_time))
+            block_end = day + timedelta(minutes=parse_block_minutes(block.end_time))
+            if (
+                block_start <= start
+                and end <= block_end
+                and (start - block_start) % duration == timedelta(0)
+            ):
+                return True
+
+        specific_result = await self.db.execute(
+            select(SpecificAvailability).where(
+                SpecificAvailability.user_id == therapist_id,
+                SpecificAvailability.start_datetime <= start,
+                SpecificAvailability.end_datetime >= end,
+                or_(
+                    SpecificAvailability.schedule_id.is_(None),  # Global
+                    SpecificAvailability.schedule_id == schedule_id,  # Specific
+                ),
+            )
+        )
+        for block in specific_result.scalars().all():
+            block_start = to_naive_utc(block.start_datetime)
+            if (start - block_start) % duration == timedelta(0):
+                return True
+
+        return False
+
+    async def _has_time_off_overlap(
+        self,
+        therapist_id: uuid.UUID,
+        schedule_id: uuid.UUID,
+        start: datetime,
+        end: datetime,
+    ) -> bool:
+        """Whether any global or schedule time-off overlaps [start, end)."""
+        result = await self.db.execute(
+            select(TimeOff.id)
+            .where(
+                TimeOff.user_id == therapist_id,
+                TimeOff.start_datetime < end,
+                TimeOff.end_datetime > start,
+                or_(
+                    TimeOff.schedule_id.is_(None),  # Global
+                    TimeOff.schedule_id == schedule_id,  # Specific
+                ),
+            )
+            .limit(1)
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def _count_overlapping_bookings(
+        self,
+        therapist_id: uuid.UUID,
+        start: datetime,
+        end: datetime,
+    ) -> int:
+        """Count active bookings overlapping [start, end)."""
+        result = await self.db.execute(
+            select(func.count(Booking.id)).where(
+                Booking.therapist_id == therapist_id,
+                Booking.start_time < end,
+                Booking.end_time > start,
+                Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
+            )
+        )
+        return result.scalar() or 0
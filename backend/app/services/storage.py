@@ -248,6 +248,25 @@ class StorageService:
         blob.upload_from_string(data, content_type=content_type)
         return f"gs://{self.bucket_name}/{blob_path}"
 
+    def get_generation(self, gcs_uri: str) -> Optional[int]:
+        """Get the generation of a gs:// object (changes whenever it is rewritten).
+
+        Args:
+            gcs_uri: GCS URI (gs://bucket/path), in any bucket
+
+        Returns:
+            The object generation, or None if the object does not exist
+        """
+        bucket_name, _, blob_path = gcs_uri.removeprefix("gs://").partition("/")
+        blob = self.client.bucket(bucket_name).get_blob(blob_path)
+        return blob.generation if blob else None
+
+    def get_size(self, gcs_uri: str) -> Optional[int]:
+        """Get the size in bytes of a gs:// object (None if it does not exist)."""
+        bucket_name, _, blob_path = gcs_uri.removeprefix("gs://").partition("/")
+        blob = self.client.bucket(bucket_name).get_blob(blob_path)
+        return blob.size if blob else None
+
 
 # Singleton instance for the vault (lazy - no client created until first use)
 vault_storage = StorageService(VAULT_BUCKET)
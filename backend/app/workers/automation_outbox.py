@@ -0,0 +1,236 @@
+"""Automation Outbox Worker.
+
+fire_event/emit_event only write a PENDING system_events row in the caller's
+transaction. A pool of async workers drains that outbox:
+1. Claim a batch of due PENDING events with FOR UPDATE SKIP LOCKED
+   (claiming bumps `attempts` and leases the row until next_attempt_at)
+2. Run the organization's automation rules for each event
+3. Mark it PROCESSED / IGNORED, or schedule a retry with exponential backoff
+4. After AUTOMATION_OUTBOX_MAX_ATTEMPTS failures, move it to DEAD_LETTER
+
+A worker that dies mid-event leaves the row PENDING; it is claimed again
+once the lease (AUTOMATION_OUTBOX_LEASE_SECONDS) runs out. Delivery is
+therefore at-least-once.
+
+The pool runs inside the API process (see app.main lifespan) and can also
+run standalone to scale automation separately:
+    python -m app.workers.automation_outbox
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import EventStatus, SystemEventLog
+from app.services.automation_engine import AutomationEngine
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the retry backoff
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before retry number `attempts` + 1 (30s, 60s, 120s, ...)."""
+    seconds = settings.AUTOMATION_OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, MAX_RETRY_DELAY.total_seconds()))
+
+
+async def claim_events(
+    db: AsyncSession, batch_size: Optional[int] = None
+) -> list[SystemEventLog]:
+    """
+    Claim up to `batch_size` due events and commit the claim.
+
+    Rows locked by another worker's claim are skipped, never waited on.
+    """
+    due = (
+        select(SystemEventLog.id)
+        .where(
+            SystemEventLog.status == EventStatus.PENDING,
+            SystemEventLog.next_attempt_at <= func.now(),
+        )
+        .order_by(SystemEventLog.next_attempt_at)
+        .limit(batch_size or settings.AUTOMATION_OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    lease = timedelta(seconds=settings.AUTOMATION_OUTBOX_LEASE_SECONDS)
+    result = await db.scalars(
+        update(SystemEventLog)
+        .where(SystemEventLog.id.in_(due.scalar_subquery()))
+        .values(
+            attempts=SystemEventLog.attempts + 1,
+            next_attempt_at=func.now() + lease,
+        )
+        .returning(SystemEventLog)
+        .execution_options(synchronize_session=False)
+    )
+    events = list(result.all())
+    await db.commit()
+    return events
+
+
+async def _finish(db: AsyncSession, event_id: UUID, **values) -> None:
+    await db.execute(
+        update(SystemEventLog)
+        .where(SystemEventLog.id == event_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def deliver_event(db: AsyncSession, event_log: SystemEventLog) -> EventStatus:
+    """
+    Run the rules for one claimed event and record the outcome.
+
+    Returns:
+        The event's new status (PENDING means a retry was scheduled)
+    """
+    # Read up front: the rollback after a failure expires event_log
+    event_id, event_type = event_log.id, event_log.event_type
+    organization_id, attempts = event_log.organization_id, event_log.attempts
+
+    try:
+        matched = await AutomationEngine(db).execute_event(event_log)
+    except Exception as e:
+        await db.rollback()
+        if attempts >= settings.AUTOMATION_OUTBOX_MAX_ATTEMPTS:
+            await _finish(
+                db,
+                event_id,
+                status=EventStatus.DEAD_LETTER,
+                error_message=str(e),
+                processed_at=func.now(),
+            )
+            logger.error(
+                f"Event {event_type} ({event_id}) dead-lettered after "
+                f"{attempts} attempts: {e}"
+            )
+            return EventStatus.DEAD_LETTER
+
+        await _finish(
+            db,
+            event_id,
+            error_message=str(e),
+            next_attempt_at=func.now() + retry_delay(attempts),
+        )
+        logger.warning(
+            f"Event {event_type} ({event_id}) failed on attempt {attempts}, "
+            f"retrying: {e}"
+        )
+        return EventStatus.PENDING
+
+    status = EventStatus.PROCESSED if matched else EventStatus.IGNORED
+    await _finish(
+        db, event_id, status=status, error_message=None, processed_at=func.now()
+    )
+    logger.info(f"Event {event_type} processed: {status.value} (org={organization_id})")
+    return status
+
+
+async def drain_outbox(db: AsyncSession, batch_size: Optional[int] = None) -> dict:
+    """
+    Claim one batch and deliver every event in it.
+
+    Returns:
+        dict with stats: {"claimed": int, "processed": int, "ignored": int,
+        "retried": int, "dead_lettered": int}
+    """
+    stats = {
+        "claimed": 0,
+        "processed": 0,
+        "ignored": 0,
+        "retried": 0,
+        "dead_lettered": 0,
+    }
+    events = await claim_events(db, batch_size)
+    stats["claimed"] = len(events)
+
+    outcome_keys = {
+        EventStatus.PROCESSED: "processed",
+        EventStatus.IGNORED: "ignored",
+        EventStatus.PENDING: "retried",
+        EventStatus.DEAD_LETTER: "dead_lettered",
+    }
+    for event_log in events:
+        status = await deliver_event(db, event_log)
+        stats[outcome_keys[status]] += 1
+    return stats
+
+
+# =============================================================================
+# Worker Pool
+# =============================================================================
+
+
+class OutboxWorkerPool:
+    """N asyncio tasks draining the outbox, each with its own DB sessions."""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = (
+            settings.AUTOMATION_OUTBOX_WORKERS if workers is None else workers
+        )
+        self._stop = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._tasks = [
+            asyncio.create_task(self._run(n), name=f"automation-outbox-{n}")
+            for n in range(self.workers)
+        ]
+        if self._tasks:
+            logger.info(f"✅ Automation outbox: {len(self._tasks)} workers started")
+
+    async def stop(self) -> None:
+        """Let in-flight events finish, then stop every worker."""
+        self._stop.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, worker_id: int) -> None:
+        from app.db.base import get_session_factory
+
+        factory = get_session_factory()
+        while not self._stop.is_set():
+            claimed = 0
+            try:
+                async with factory() as db:
+                    claimed = (await drain_outbox(db))["claimed"]
+            except Exception as e:
+                logger.error(f"Automation outbox worker {worker_id} failed: {e}")
+
+            # A full or partial batch means there may be more; an empty one idles
+            if not claimed:
+                try:
+                    await asyncio.wait_for(
+                        self._stop.wait(),
+                        timeout=settings.AUTOMATION_OUTBOX_POLL_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+
+async def _main() -> None:
+    from app.db.base import close_db, init_db
+
+    await init_db()
+    pool = OutboxWorkerPool(max(settings.AUTOMATION_OUTBOX_WORKERS, 1))
+    pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -0,0 +1,67 @@
+"""Google Calendar Mirror Worker.
+
+Runs periodically (via APScheduler) to keep the local busy-time mirror of
+every schedule's blocking calendars fresh:
+1. Find enabled ScheduleCalendarSync rows whose mirror is missing or aging
+2. Run an incremental (sync token) refresh for each one
+3. The sync invalidates the slot cache for schedules whose busy data changed
+
+Each sync is isolated, so one broken integration never blocks the others.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import AvailabilitySchedule, ScheduleCalendarSync
+from app.services.google_calendar import GoogleCalendarService
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_calendar_mirrors(db: AsyncSession) -> dict:
+    """
+    Incrementally refresh busy-time mirrors that are due.
+
+    Returns:
+        dict with stats: {"synced": int, "changed": int, "failed": int}
+    """
+    # Half the interval, so a mirror refreshed by a booking right after the
+    # previous run is still picked up before it goes stale
+    due_before = datetime.utcnow() - timedelta(
+        minutes=settings.GCAL_MIRROR_REFRESH_MINUTES / 2
+    )
+    result = await db.execute(
+        select(ScheduleCalendarSync, AvailabilitySchedule.user_id)
+        .join(
+            AvailabilitySchedule,
+            AvailabilitySchedule.id == ScheduleCalendarSync.schedule_id,
+        )
+        .where(
+            ScheduleCalendarSync.sync_enabled == True,
+            or_(
+                ScheduleCalendarSync.mirror_synced_at.is_(None),
+                ScheduleCalendarSync.mirror_synced_at < due_before,
+            ),
+        )
+    )
+    rows = [(sync, user_id) for sync, user_id in result if sync.blocking_calendar_ids]
+
+    stats = {"synced": 0, "changed": 0, "failed": 0}
+    gcal = GoogleCalendarService(db)
+    for sync_config, user_id in rows:
+        try:
+            if await gcal.sync_busy_mirror(sync_config, user_id):
+                stats["changed"] += 1
+            stats["synced"] += 1
+        except Exception as e:
+            await db.rollback()
+            stats["failed"] += 1
+            logger.error(f"GCal mirror refresh failed for {sync_config.id}: {e}")
+
+    if rows:
+        logger.info(f"📅 GCal mirror refresh: {stats}")
+    return stats
@@ -3,158 +3,345 @@
 This worker runs periodically (via APScheduler) to analyze
 WhatsApp conversations using AletheIA and detect risk patterns.
 
-Batch processing approach:
-1. Find patients with messages in last 24h without analysis for today
-2. Build chat transcript from MessageLog
-3. Call AletheIA for sentiment/risk analysis
-4. Store results in DailyConversationAnalysis
-5. Trigger RISK_DETECTED_IN_CHAT event if risks found
+Incremental processing approach (per-patient watermark):
+1. Load each patient's latest analysis in the lookback window: its summary
+   and watermark (last analyzed message timestamp/id)
+2. Load only the messages past each watermark (one query for all patients)
+   and build their transcripts in memory
+3. Call AletheIA on the new messages, with the previous summary as rolling
+   context, CONVERSATION_ANALYSIS_CONCURRENCY calls at a time and at most
+   CONVERSATION_ANALYSIS_ORG_CONCURRENCY per organization
+4. Upsert today's DailyConversationAnalysis (updated summary, accumulated
+   message count and risk flags, new watermark), committing
+   CONVERSATION_ANALYSIS_COMMIT_BATCH at a time
+5. Queue a RISK_DETECTED_IN_CHAT event (in the same commit) when risks not
+   yet reported today are found
+
+Messages arriving after a patient's first analysis of the day are picked up
+by the next run, so the job can run every CONVERSATION_ANALYSIS_INTERVAL_MINUTES.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Optional
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
 from uuid import UUID
 
-from sqlalchemy import select, func, and_
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.config import settings
 from app.db.models import (
     MessageLog,
     DailyConversationAnalysis,
-    Patient,
     MessageDirection,
 )
 from app.services.aletheia import get_aletheia
-from app.services.automation_engine import AutomationEngine
+from app.services.automation_engine import AutomationEngine, enqueue_event
 
 logger = logging.getLogger(__name__)
 
+RISK_DETECTED_IN_CHAT = "RISK_DETECTED_IN_CHAT"
 
-async def analyze_daily_conversations(db: AsyncSession) -> dict:
-    """
-    Analyze WhatsApp conversations from the last 24 hours.
+# Messages older than this are never analyzed (first run for a patient)
+LOOKBACK = timedelta(hours=24)
 
-    This is called by APScheduler daily (or manually via admin endpoint).
 
-    Returns:
-        dict with stats: {"analyzed": int, "risks_detected": int}
+@dataclass
+class PatientConversation:
+    """A patient's messages since the last analysis, ready for AletheIA."""
+
+    patient_id: UUID
+    organization_id: UUID
+    transcript: str
+    message_count: int
+    last_message_at: Optional[datetime] = None  # New watermark
+    last_message_id: Optional[UUID] = None
+    previous: Optional[Any] = None  # Latest analysis row (rolling context)
+
+
+def build_conversations(
+    messages: Iterable, previous: Optional[dict] = None
+) -> list[PatientConversation]:
     """
-    logger.info("🔍 Starting daily conversation analysis...")
+    Group message rows into one transcript per patient.
 
-    # Get current date (UTC) for analysis
-    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    yesterday = today - timedelta(hours=24)
-
-    # Find patients with messages in last 24h
-    # who don't have an analysis for today yet
-    patients_with_messages = await db.execute(
-        select(MessageLog.patient_id, MessageLog.organization_id)
-        .where(MessageLog.timestamp >= yesterday)
-        .group_by(MessageLog.patient_id, MessageLog.organization_id)
+    Args:
+        messages: Rows with id, patient_id, organization_id, direction,
+            content and timestamp, ordered by patient, timestamp and id
+        previous: Latest analysis per patient id (summary, watermark, ...)
+    """
+    previous = previous or {}
+    conversations = []
+    for (patient_id, org_id), rows in groupby(
+        messages, key=lambda m: (m.patient_id, m.organization_id)
+    ):
+        rows = list(rows)
+        lines = [
+            f"{'Paciente' if m.direction == MessageDirection.INBOUND else 'Sistema'}: "
+            f"{m.content}"
+            for m in rows
+        ]
+        conversations.append(
+            PatientConversation(
+                patient_id,
+                org_id,
+                "\n".join(lines),
+                len(lines),
+                last_message_at=rows[-1].timestamp,
+                last_message_id=rows[-1].id,
+                previous=previous.get(patient_id),
+            )
+        )
+    return conversations
+
+
+async def _pending_conversations(
+    db: AsyncSession, since: datetime
+) -> list[PatientConversation]:
+    """Messages since `since` past each patient's watermark, as conversations."""
+    latest = (
+        select(
+            DailyConversationAnalysis.patient_id,
+            DailyConversationAnalysis.date,
+            DailyConversationAnalysis.summary,
+            DailyConversationAnalysis.risk_flags,
+            DailyConversationAnalysis.message_count,
+            DailyConversationAnalysis.last_message_at,
+            DailyConversationAnalysis.last_message_id,
+        )
+        .where(DailyConversationAnalysis.date >= since)
+        .distinct(DailyConversationAnalysis.patient_id)
+        .order_by(
+            DailyConversationAnalysis.patient_id,
+            DailyConversationAnalysis.date.desc(),
+        )
+        .subquery()
     )
-    patient_rows = patients_with_messages.all()
+    previous = {row.patient_id: row for row in await db.execute(select(latest))}
 
-    if not patient_rows:
-        logger.info("No new messages to analyze")
-        return {"analyzed": 0, "risks_detected": 0}
+    # (timestamp, id) keyset: the id breaks timestamp ties deterministically
+    messages = await db.execute(
+        select(
+            MessageLog.id,
+            MessageLog.patient_id,
+            MessageLog.organization_id,
+            MessageLog.direction,
+            MessageLog.content,
+            MessageLog.timestamp,
+        )
+        .outerjoin(latest, latest.c.patient_id == MessageLog.patient_id)
+        .where(
+            MessageLog.timestamp >= since,
+            MessageLog.patient_id.is_not(None),  # Lead-only chats have no patient
+            or_(
+                latest.c.last_message_at.is_(None),
+                MessageLog.timestamp > latest.c.last_message_at,
+                and_(
+                    MessageLog.timestamp == latest.c.last_message_at,
+                    MessageLog.id > latest.c.last_message_id,
+                ),
+            ),
+        )
+        .order_by(MessageLog.patient_id, MessageLog.timestamp, MessageLog.id)
+    )
+    return build_conversations(messages.all(), previous)
 
-    analyzed = 0
-    risks_detected = 0
+
+async def analyze_conversations(
+    conversations: list[PatientConversation],
+    session_factory: Callable[[], AsyncSession],
+) -> AsyncIterator[tuple[PatientConversation, Optional[dict]]]:
+    """
+    Run AletheIA over `conversations` concurrently.
+
+    Each call gets its own session (task routing lookup + AI usage log), as
+    an AsyncSession cannot be shared between concurrent calls.
+
+    Yields:
+        (conversation, result) as each call finishes; result is None if the
+        call failed
+    """
+    pool = asyncio.Semaphore(settings.CONVERSATION_ANALYSIS_CONCURRENCY)
+    org_limits = defaultdict(
+        lambda: asyncio.Semaphore(settings.CONVERSATION_ANALYSIS_ORG_CONCURRENCY)
+    )
     aletheia = get_aletheia()
 
-    for patient_id, org_id in patient_rows:
-        # Check if already analyzed today
-        existing = await db.execute(
-            select(DailyConversationAnalysis).where(
-                and_(
-                    DailyConversationAnalysis.patient_id == patient_id,
-                    DailyConversationAnalysis.date >= today,
+    async def analyze(conversation: PatientConversation):
+        previous = conversation.previous
+        # Org limit first: waiting on its own org must not hold a pool slot
+        async with org_limits[conversation.organization_id], pool:
+            try:
+                async with session_factory() as session:
+                    result = await aletheia.with_context(
+                        db=session,
+                        organization_id=conversation.organization_id,
+                        patient_id=conversation.patient_id,
+                    ).analyze_chat_transcript(
+                        conversation.transcript,
+                        previous_summary=previous.summary if previous else None,
+                    )
+                    await session.commit()  # Usage log
+                return conversation, result
+            except Exception as e:
+                logger.error(
+                    f"Analysis failed for patient {conversation.patient_id}: {e}"
                 )
+                return conversation, None
+
+    tasks = [asyncio.ensure_future(analyze(c)) for c in conversations]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _save_batch(
+    db: AsyncSession,
+    today: datetime,
+    batch: list[tuple[PatientConversation, dict]],
+) -> int:
+    """
+    Upsert a batch of today's analyses in one commit, with their risk events.
+
+    A patient already analyzed today keeps one row: the new run's summary
+    and scores replace the old ones (they were produced with its summary as
+    context), while message counts and risk flags accumulate.
+
+    Returns:
+        Number of analyses with risk flags not reported earlier today
+    """
+    rows, events = [], []
+    for conversation, result in batch:
+        previous = conversation.previous
+        earlier = previous if previous and previous.date >= today else None
+        reported = earlier.risk_flags if earlier else []
+        new_flags = [f for f in result["risk_flags"] if f not in reported]
+        risk_flags = reported + new_flags
+
+        rows.append(
+            dict(
+                organization_id=conversation.organization_id,
+                patient_id=conversation.patient_id,
+                date=today,
+                summary=result["summary"],
+                sentiment_score=result["sentiment_score"],
+                emotional_state=result["emotional_state"],
+                risk_flags=risk_flags,
+                suggestion=result["suggestion"],
+                message_count=conversation.message_count
+                + (earlier.message_count if earlier else 0),
+                last_message_at=conversation.last_message_at,
+                last_message_id=conversation.last_message_id,
             )
         )
-        if existing.scalar_one_or_none():
-            logger.debug(f"Patient {patient_id} already analyzed today")
-            continue
-
-        # Get messages for this patient from last 24h
-        messages_result = await db.execute(
-            select(MessageLog)
-            .where(
-                and_(
-                    MessageLog.patient_id == patient_id,
-                    MessageLog.timestamp >= yesterday,
+        if new_flags:
+            events.append(
+                dict(
+                    event_type=RISK_DETECTED_IN_CHAT,
+                    payload={
+                        "patient_id": str(conversation.patient_id),
+                        "organization_id": str(conversation.organization_id),
+                        "risk_flags": risk_flags,
+                        "new_risk_flags": new_flags,
+                        "sentiment_score": result["sentiment_score"],
+                        "summary": result["summary"],
+                    },
+                    organization_id=conversation.organization_id,
+                    entity_type="patient",
+                    entity_id=conversation.patient_id,
                 )
             )
-            .order_by(MessageLog.timestamp)
+
+    stmt = insert(DailyConversationAnalysis).values(rows)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["patient_id", "date"],
+            set_={
+                column: stmt.excluded[column]
+                for column in rows[0]
+                if column not in ("organization_id", "patient_id", "date")
+            },
         )
-        messages = messages_result.scalars().all()
+    )
 
-        if not messages:
-            continue
+    if settings.AUTOMATION_OUTBOX_ENABLED:
+        for event in events:
+            await enqueue_event(db, **event)
+        await db.commit()
+    else:
+        await db.commit()
+        for event in events:
+            try:
+                await AutomationEngine(db).process_event(**event)
+            except Exception as e:
+                logger.error(f"Failed to trigger automation: {e}")
 
-        # Build transcript
-        transcript_lines = []
-        for msg in messages:
-            sender = (
-                "Paciente" if msg.direction == MessageDirection.INBOUND else "Sistema"
-            )
-            transcript_lines.append(f"{sender}: {msg.content}")
+    return len(events)
 
-        transcript = "\n".join(transcript_lines)
 
-        # Analyze with AletheIA
-        try:
-            # v1.3.5: Set context and use await (now async)
-            aletheia.set_context(db=db, organization_id=org_id, patient_id=patient_id)
-            result = await aletheia.analyze_chat_transcript(transcript)
-        except Exception as e:
-            logger.error(f"Analysis failed for patient {patient_id}: {e}")
-            continue
+async def analyze_daily_conversations(db: AsyncSession) -> dict:
+    """
+    Analyze WhatsApp messages received since each patient's last analysis.
 
-        # Store analysis
-        analysis = DailyConversationAnalysis(
-            organization_id=org_id,
-            patient_id=patient_id,
-            date=today,
-            summary=result["summary"],
-            sentiment_score=result["sentiment_score"],
-            emotional_state=result["emotional_state"],
-            risk_flags=result["risk_flags"],
-            suggestion=result["suggestion"],
-            message_count=len(messages),
-        )
-        db.add(analysis)
-        await db.commit()
+    This is called by APScheduler (or manually via admin endpoint).
+
+    Returns:
+        dict with stats: {"analyzed": int, "messages": int,
+        "risks_detected": int, "failed": int}
+    """
+    logger.info("🔍 Starting conversation analysis...")
+
+    # Get current date (UTC) for analysis
+    today = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+    conversations = await _pending_conversations(db, today - LOOKBACK)
+    stats = {"analyzed": 0, "messages": 0, "risks_detected": 0, "failed": 0}
+    if not conversations:
+        logger.info("No new messages to analyze")
+        return stats
+    await db.commit()  # Don't hold a connection while AletheIA runs
+
+    session_factory = async_sessionmaker(
+        db.bind, class_=AsyncSession, expire_on_commit=False, autoflush=False
+    )
+    batch: list[tuple[PatientConversation, dict]] = []
+    async for conversation, result in analyze_conversations(
+        conversations, session_factory
+    ):
+        if result is None:
+            stats["failed"] += 1
+            continue
 
-        analyzed += 1
         logger.info(
-            f"✅ Analyzed patient {patient_id}: "
+            f"✅ Analyzed patient {conversation.patient_id}: "
+            f"messages={conversation.message_count}, "
             f"sentiment={result['sentiment_score']:.2f}, "
             f"risks={len(result['risk_flags'])}"
         )
+        stats["messages"] += conversation.message_count
+        batch.append((conversation, result))
+        if len(batch) >= settings.CONVERSATION_ANALYSIS_COMMIT_BATCH:
+            stats["risks_detected"] += await _save_batch(db, today, batch)
+            stats["analyzed"] += len(batch)
+            batch = []
 
-        # Trigger automation if risks detected
-        if result["risk_flags"]:
-            risks_detected += 1
-            try:
-                engine = AutomationEngine(db)
-                await engine.process_event(
-                    event_type="RISK_DETECTED_IN_CHAT",
-                    payload={
-                        "patient_id": str(patient_id),
-                        "organization_id": str(org_id),
-                        "risk_flags": result["risk_flags"],
-                        "sentiment_score": result["sentiment_score"],
-                        "summary": result["summary"],
-                    },
-                    organization_id=org_id,
-                    patient_id=patient_id,
-                )
-            except Exception as e:
-                logger.error(f"Failed to trigger automation: {e}")
+    if batch:
+        stats["risks_detected"] += await _save_batch(db, today, batch)
+        stats["analyzed"] += len(batch)
 
     logger.info(
-        f"📊 Daily analysis complete: {analyzed} analyzed, {risks_detected} with risks"
+        f"📊 Conversation analysis complete: {stats['analyzed']} analyzed "
+        f"({stats['messages']} new messages), "
+        f"{stats['risks_detected']} with new risks, {stats['failed']} failed"
     )
-    return {"analyzed": analyzed, "risks_detected": risks_detected}
+    return stats
@@ -0,0 +1,436 @@
+"""Durable Job Worker.
+
+Runs the jobs queued with app.services.job_queue.enqueue_job:
+1. Claim a due job (QUEUED past its run_after, or RUNNING with an expired
+   lease) with FOR UPDATE SKIP LOCKED, highest priority first
+2. Run the kind's handler in its own session while a heartbeat renews the
+   lease every JOB_HEARTBEAT_SECONDS
+3. Mark the job SUCCEEDED, or re-queue it with exponential backoff
+4. After max_attempts, mark it FAILED and let the handler record the failure
+   on its entity (e.g. the clinical entry's processing_status)
+
+A worker that dies mid-job stops heartbeating; the job is claimed again once
+its lease (JOB_LEASE_SECONDS) runs out, so handlers must be idempotent.
+
+Dedicated workers keep AI work off the web process:
+    python -m app.workers.job_worker
+The API itself runs JOB_WORKERS_IN_PROCESS workers (0 = dedicated only).
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import ClinicalEntry, Job, JobStatus, ProcessingStatus
+from app.services import job_queue
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the retry backoff
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before retry number `attempts` + 1 (30s, 60s, 120s, ...)."""
+    seconds = settings.JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, MAX_RETRY_DELAY.total_seconds()))
+
+
+# =============================================================================
+# Handlers
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    run: Callable[[AsyncSession, dict], Awaitable[None]]
+    # Called once when the job is given up on, with the last error
+    on_failure: Optional[Callable[[AsyncSession, dict, str], Awaitable[None]]] = None
+
+
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str, on_failure=None):
+    """Register the decorated coroutine as the handler for `kind` jobs."""
+
+    def register(run):
+        JOB_HANDLERS[kind] = JobHandler(run, on_failure)
+        return run
+
+    return register
+
+
+async def _analysis_failed(db: AsyncSession, payload: dict, error: str) -> None:
+    entry = await db.get(ClinicalEntry, UUID(payload["entry_id"]))
+    if entry and entry.processing_status in (
+        ProcessingStatus.PENDING,
+        ProcessingStatus.PROCESSING,
+    ):
+        entry.processing_status = ProcessingStatus.FAILED
+        entry.processing_error = error[:500]
+        await db.commit()
+
+
+@job_handler(job_queue.ANALYZE_CLINICAL_ENTRY, on_failure=_analysis_failed)
+async def analyze_clinical_entry(db: AsyncSession, payload: dict) -> None:
+    """Cortex analysis of a clinical entry (POST /clinical-entries/{id}/analyze)."""
+    from app.services.clinical_service import ClinicalService
+
+    result = await ClinicalService(db).process_entry_async(
+        entry_id=UUID(payload["entry_id"]), user_id=UUID(payload["user_id"])
+    )
+    if result is not None and not result.success:
+        # The entry is marked FAILED already; raise so the job is retried
+        raise RuntimeError(result.error or "Clinical analysis failed")
+
+
+@job_handler(job_queue.SANITIZE_CLINICAL_ENTRY)
+async def sanitize_clinical_entry(db: AsyncSession, payload: dict) -> None:
+    """Anonymized copy of a clinical note for The Vault."""
+    from app.services.data_sanitizer import sanitize_and_store
+
+    entry = await db.get(ClinicalEntry, UUID(payload["entry_id"]))
+    if not entry or not entry.content:
+        return  # Deleted or emptied since it was queued
+
+    dataset_id = await sanitize_and_store(
+        db=db,
+        content=entry.content,
+        metadata=entry.entry_metadata or {},
+        source_type="CLINICAL_NOTE",
+    )
+    if dataset_id is None:
+        raise RuntimeError("Vault sanitization failed")
+
+
+async def _bulk_run_failed(db: AsyncSession, payload: dict, error: str) -> None:
+    from app.db.models import BulkRunStatus, CortexBulkRun
+
+    run = await db.get(CortexBulkRun, UUID(payload["run_id"]))
+    if run and run.status in (BulkRunStatus.QUEUED, BulkRunStatus.RUNNING):
+        run.status = BulkRunStatus.FAILED
+        run.last_error = error[:500]
+        run.finished_at = func.now()
+        await db.commit()
+
+
+@job_handler(job_queue.CORTEX_BULK_RUN, on_failure=_bulk_run_failed)
+async def cortex_bulk_run(db: AsyncSession, payload: dict) -> None:
+    """Bulk re-processing of clinical entries (resumes from its checkpoint)."""
+    from app.services.cortex.bulk import run_bulk
+
+    await run_bulk(db, UUID(payload["run_id"]))
+
+
+# =============================================================================
+# Claiming and Running
+# =============================================================================
+
+
+async def claim_jobs(db: AsyncSession, worker_id: str, limit: int = 1) -> list[Job]:
+    """
+    Claim up to `limit` due jobs for `worker_id` and commit the claim.
+
+    Rows locked by another worker's claim are skipped, never waited on.
+    """
+    now = func.now()
+    due = (
+        select(Job.id)
+        .where(
+            or_(
+                and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+                and_(Job.status == JobStatus.RUNNING, Job.lease_expires_at < now),
+            )
+        )
+        .order_by(Job.priority.desc(), Job.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    lease = timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    result = await db.scalars(
+        update(Job)
+        .where(Job.id.in_(due.scalar_subquery()))
+        .values(
+            status=JobStatus.RUNNING,
+            attempts=Job.attempts + 1,
+            locked_by=worker_id,
+            lease_expires_at=now + lease,
+            heartbeat_at=now,
+            started_at=now,
+        )
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    )
+    jobs = list(result.all())
+    await db.commit()
+    return jobs
+
+
+async def _update_owned(db: AsyncSession, job_id: UUID, worker_id: str, **values):
+    """Update a job only while `worker_id` still holds its lease."""
+    result = await db.execute(
+        update(Job)
+        .where(
+            Job.id == job_id,
+            Job.locked_by == worker_id,
+            Job.status == JobStatus.RUNNING,
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def heartbeat(db: AsyncSession, job_id: UUID, worker_id: str) -> bool:
+    """Extend the lease of a running job. False if the lease was lost."""
+    lease = timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    return await _update_owned(
+        db,
+        job_id,
+        worker_id,
+        heartbeat_at=func.now(),
+        lease_expires_at=func.now() + lease,
+    )
+
+
+@asynccontextmanager
+async def _heartbeating(job_id: UUID, worker_id: str):
+    from app.db.base import get_session_factory
+
+    async def beat():
+        factory = get_session_factory()
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                async with factory() as db:
+                    if not await heartbeat(db, job_id, worker_id):
+                        logger.warning(f"Job {job_id}: lease lost by {worker_id}")
+                        return
+            except Exception as e:
+                logger.warning(f"Job {job_id}: heartbeat failed: {e}")
+
+    task = asyncio.create_task(beat())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+async def _give_up(db: AsyncSession, job: dict, worker_id: str, error: str) -> None:
+    from app.db.base import get_session_factory
+
+    await _update_owned(
+        db,
+        job["id"],
+        worker_id,
+        status=JobStatus.FAILED,
+        last_error=error,
+        finished_at=func.now(),
+        locked_by=None,
+        lease_expires_at=None,
+    )
+    logger.error(
+        f"Job {job['kind']} ({job['id']}) failed after {job['attempts']} "
+        f"attempts: {error}"
+    )
+
+    handler = JOB_HANDLERS.get(job["kind"])
+    if handler and handler.on_failure:
+        factory = get_session_factory()
+        try:
+            async with factory() as session:
+                await handler.on_failure(session, job["payload"], error)
+        except Exception as e:
+            logger.error(f"Job {job['id']}: failure hook failed: {e}")
+
+
+async def run_job(db: AsyncSession, job: Job, worker_id: str) -> JobStatus:
+    """
+    Run one claimed job and record the outcome.
+
+    Returns:
+        The job's new status (QUEUED means a retry was scheduled)
+    """
+    from app.db.base import get_session_factory
+
+    # Read up front: commits in this session may expire `job`
+    snapshot = {
+        "id": job.id,
+        "kind": job.kind,
+        "payload": job.payload or {},
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "last_error": job.last_error,
+    }
+
+    handler = JOB_HANDLERS.get(snapshot["kind"])
+    if handler is None:
+        await _give_up(db, snapshot, worker_id, f"No handler for {snapshot['kind']}")
+        return JobStatus.FAILED
+
+    # Reclaimed after the lease of its final attempt ran out (worker lost)
+    if snapshot["attempts"] > snapshot["max_attempts"]:
+        error = snapshot["last_error"] or "Worker lost while running the job"
+        await _give_up(db, snapshot, worker_id, error)
+        return JobStatus.FAILED
+
+    factory = get_session_factory()
+    try:
+        async with _heartbeating(snapshot["id"], worker_id):
+            async with factory() as session:
+                await handler.run(session, snapshot["payload"])
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        if snapshot["attempts"] >= snapshot["max_attempts"]:
+            await _give_up(db, snapshot, worker_id, error)
+            return JobStatus.FAILED
+
+        await _update_owned(
+            db,
+            snapshot["id"],
+            worker_id,
+            status=JobStatus.QUEUED,
+            last_error=error,
+            run_after=func.now() + retry_delay(snapshot["attempts"]),
+            locked_by=None,
+            lease_expires_at=None,
+        )
+        logger.warning(
+            f"Job {snapshot['kind']} ({snapshot['id']}) failed on attempt "
+            f"{snapshot['attempts']}, retrying: {error}"
+        )
+        return JobStatus.QUEUED
+
+    await _update_owned(
+        db,
+        snapshot["id"],
+        worker_id,
+        status=JobStatus.SUCCEEDED,
+        last_error=None,
+        finished_at=func.now(),
+        locked_by=None,
+        lease_expires_at=None,
+    )
+    logger.info(f"Job {snapshot['kind']} ({snapshot['id']}) succeeded")
+    return JobStatus.SUCCEEDED
+
+
+async def drain_jobs(db: AsyncSession, worker_id: str, limit: int = 1) -> dict:
+    """
+    Claim up to `limit` jobs and run them one after another.
+
+    Returns:
+        dict with stats: {"claimed": int, "succeeded": int, "retried": int,
+        "failed": int}
+    """
+    stats = {"claimed": 0, "succeeded": 0, "retried": 0, "failed": 0}
+    jobs = await claim_jobs(db, worker_id, limit)
+    stats["claimed"] = len(jobs)
+
+    outcome_keys = {
+        JobStatus.SUCCEEDED: "succeeded",
+        JobStatus.QUEUED: "retried",
+        JobStatus.FAILED: "failed",
+    }
+    for job in jobs:
+        status = await run_job(db, job, worker_id)
+        stats[outcome_keys[status]] += 1
+    return stats
+
+
+# =============================================================================
+# Worker Pool
+# =============================================================================
+
+
+class JobWorkerPool:
+    """N asyncio tasks running jobs one at a time, each with its own sessions."""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = settings.JOB_WORKERS if workers is None else workers
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._tasks = [
+            asyncio.create_task(self._run(f"{self.name}:{n}"), name=f"job-worker-{n}")
+            for n in range(self.workers)
+        ]
+        if self._tasks:
+            logger.info(f"✅ Job queue: {len(self._tasks)} workers started")
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Let in-flight jobs finish (up to `timeout` seconds), then stop.
+
+        Jobs still running at the timeout are cancelled; their lease expires
+        and another worker picks them up.
+        """
+        self._stop.set()
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, worker_id: str) -> None:
+        from app.db.base import get_session_factory
+
+        factory = get_session_factory()
+        while not self._stop.is_set():
+            claimed = 0
+            try:
+                async with factory() as db:
+                    claimed = (await drain_jobs(db, worker_id))["claimed"]
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} failed: {e}")
+
+            if not claimed:
+                try:
+                    await asyncio.wait_for(
+                        self._stop.wait(), timeout=settings.JOB_POLL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+
+async def _main() -> None:
+    from app.db.base import close_db, init_db
+
+    await init_db()
+    pool = JobWorkerPool(max(settings.JOB_WORKERS, 1))
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    pool.start()
+    try:
+        await stopping.wait()
+    finally:
+        # Leave headroom before the orchestrator's SIGKILL
+        await pool.stop(timeout=settings.JOB_LEASE_SECONDS / 4)
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
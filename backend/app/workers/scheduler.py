@@ -0,0 +1,342 @@
+"""Cluster Scheduler.
+
+Every API instance starts an APScheduler, but only the elected leader runs
+the periodic jobs, so each job runs once per cluster per interval:
+1. Leader election: a Postgres session-level advisory lock held on a
+   dedicated connection. The leader re-checks it every
+   SCHEDULER_LEADER_RENEW_SECONDS; followers retry on the same cadence. A
+   crashed leader's connection closes and the lock passes to another
+   instance.
+2. Staggered offsets: jobs fire at fixed wall-clock slots (interval
+   boundaries plus a per-job offset), so the hourly jobs do not start
+   together and a new leader keeps the same slots.
+3. Run history: each run is recorded in scheduled_job_runs (instance,
+   timing, outcome and the job's stats dict).
+
+Leadership can move while a job is running; the jobs' own dedupe (e.g. the
+24h reminder window) still guards against a rare overlap.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import socket
+import time as timer
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import delete, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.db.models import ScheduledJobRun, ScheduledRunStatus
+
+logger = logging.getLogger(__name__)
+
+# pg advisory lock key ("KURA"); below 2^31 so pg_locks shows it as objid
+SCHEDULER_LOCK_KEY = 0x4B555241
+
+
+# =============================================================================
+# Jobs
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class ScheduledJob:
+    id: str
+    name: str
+    run: Callable[[AsyncSession], Awaitable[Optional[dict]]]
+    interval: timedelta
+    offset: timedelta = timedelta(0)  # Into each interval (staggering)
+
+
+async def prune_run_history(db: AsyncSession) -> dict:
+    """Delete scheduled_job_runs older than SCHEDULER_RUN_HISTORY_DAYS."""
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.SCHEDULER_RUN_HISTORY_DAYS
+    )
+    result = await db.execute(
+        delete(ScheduledJobRun).where(ScheduledJobRun.started_at < cutoff)
+    )
+    await db.commit()
+    return {"deleted": result.rowcount}
+
+
+def scheduled_jobs() -> list[ScheduledJob]:
+    """The cluster's periodic jobs."""
+    from app.services.cortex.cache import prune_step_results
+    from app.services.cortex.tracing import prune_pipeline_traces
+    from app.workers.calendar_mirror import refresh_calendar_mirrors
+    from app.workers.conversation_analyzer import analyze_daily_conversations
+    from app.workers.stale_journey_monitor import (
+        check_stale_journeys,
+        check_stale_leads,
+    )
+
+    hour = timedelta(hours=1)
+    return [
+        ScheduledJob(
+            "stale_journey_monitor", "Stale Journey Monitor", check_stale_journeys, hour
+        ),
+        ScheduledJob(
+            "stale_leads_monitor",
+            "Stale Leads Monitor",
+            check_stale_leads,
+            hour,
+            offset=timedelta(minutes=15),
+        ),
+        # Incremental (watermarked), so it can run well within the hour
+        ScheduledJob(
+            "conversation_analyzer",
+            "Conversation Analyzer",
+            analyze_daily_conversations,
+            timedelta(minutes=settings.CONVERSATION_ANALYSIS_INTERVAL_MINUTES),
+            offset=timedelta(minutes=10),
+        ),
+        # Keep busy-time mirrors within GCAL_MIRROR_MAX_STALENESS_MINUTES
+        ScheduledJob(
+            "calendar_mirror",
+            "Google Calendar Busy Mirror",
+            refresh_calendar_mirrors,
+            timedelta(minutes=settings.GCAL_MIRROR_REFRESH_MINUTES),
+            offset=timedelta(minutes=2),
+        ),
+        ScheduledJob(
+            "scheduler_history_prune",
+            "Scheduler Run History Prune",
+            prune_run_history,
+            timedelta(days=1),
+            offset=timedelta(hours=3, minutes=45),
+        ),
+        ScheduledJob(
+            "cortex_step_cache_prune",
+            "Cortex Step Cache Prune",
+            prune_step_results,
+            timedelta(days=1),
+            offset=timedelta(hours=4, minutes=5),
+        ),
+        ScheduledJob(
+            "cortex_trace_prune",
+            "Cortex Pipeline Trace Prune",
+            prune_pipeline_traces,
+            timedelta(days=1),
+            offset=timedelta(hours=4, minutes=25),
+        ),
+    ]
+
+
+def next_slot(now: datetime, interval: timedelta, offset: timedelta) -> datetime:
+    """
+    First run time after `now`: a multiple of `interval` (from the Unix
+    epoch) plus `offset`.
+
+    Every instance computes the same slots, e.g. hourly + 15min -> hh:15.
+    """
+    period = interval.total_seconds()
+    shift = offset.total_seconds() % period
+    slot = math.floor((now.timestamp() - shift) / period) + 1
+    return datetime.fromtimestamp(slot * period + shift, tz=timezone.utc)
+
+
+# =============================================================================
+# Leader Election
+# =============================================================================
+
+
+class LeaderElection:
+    """Postgres advisory lock held on a dedicated connection.
+
+    The lock lives as long as the connection: it is released explicitly on
+    stop, or by Postgres when the holder's connection dies.
+    """
+
+    def __init__(self, engine=None, lock_key: int = SCHEDULER_LOCK_KEY):
+        self.engine = engine
+        self.lock_key = lock_key
+        self.is_leader = False
+        self._conn: Optional[AsyncConnection] = None
+
+    def _engine(self):
+        from app.db.base import get_engine
+
+        return self.engine or get_engine()
+
+    async def try_acquire(self) -> bool:
+        """Become leader if nobody holds the lock."""
+        if self.is_leader:
+            return True
+        conn = await self._engine().connect()
+        try:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+            )
+        except Exception:
+            await conn.invalidate()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        self._conn = conn
+        self.is_leader = True
+        logger.info("👑 Scheduler leadership acquired")
+        return True
+
+    async def renew(self) -> bool:
+        """Confirm the lock is still held; step down if the connection is gone."""
+        if not self._conn:
+            return False
+        try:
+            held = await self._conn.scalar(
+                text("""
+                    SELECT EXISTS (
+                        SELECT 1 FROM pg_locks
+                        WHERE locktype = 'advisory' AND granted
+                          AND pid = pg_backend_pid()
+                          AND classid = 0 AND objid = :key AND objsubid = 1
+                    )
+                """),
+                {"key": self.lock_key},
+            )
+        except Exception as e:
+            logger.warning(f"Scheduler leadership check failed: {e}")
+            held = False
+        if not held:
+            await self._drop(invalidate=True)
+            logger.warning("Scheduler leadership lost")
+        return bool(held)
+
+    async def release(self) -> None:
+        if not self._conn:
+            return
+        try:
+            await self._conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key}
+            )
+            await self._drop(invalidate=False)
+        except Exception:
+            # Closing the physical connection releases the lock anyway
+            await self._drop(invalidate=True)
+        logger.info("Scheduler leadership released")
+
+    async def _drop(self, invalidate: bool) -> None:
+        conn, self._conn = self._conn, None
+        self.is_leader = False
+        if conn is None:
+            return
+        with suppress(Exception):
+            if invalidate:
+                # Never return a lock-holding connection to the pool
+                await conn.invalidate()
+            await conn.close()
+
+
+# =============================================================================
+# Scheduler
+# =============================================================================
+
+
+class ClusterScheduler:
+    """APScheduler whose jobs only run on the elected leader instance."""
+
+    def __init__(self, jobs: Optional[list[ScheduledJob]] = None):
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        self.jobs = scheduled_jobs() if jobs is None else jobs
+        self.instance = f"{socket.gethostname()}:{os.getpid()}"
+        self.leader = LeaderElection()
+        self.scheduler = AsyncIOScheduler()
+        self._election: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        from apscheduler.triggers.interval import IntervalTrigger
+
+        now = datetime.now(timezone.utc)
+        for job in self.jobs:
+            self.scheduler.add_job(
+                self.run_job,
+                IntervalTrigger(
+                    seconds=job.interval.total_seconds(),
+                    start_date=next_slot(now, job.interval, job.offset),
+                ),
+                args=[job],
+                id=job.id,
+                name=job.name,
+                coalesce=True,
+                max_instances=1,
+            )
+        self.scheduler.start()
+
+        if settings.SCHEDULER_LEADER_ELECTION:
+            self._election = asyncio.create_task(
+                self._elect(), name="scheduler-election"
+            )
+        else:
+            self.leader.is_leader = True  # Single instance (local dev)
+        logger.info(f"✅ APScheduler started: {', '.join(job.id for job in self.jobs)}")
+
+    async def stop(self) -> None:
+        self.scheduler.shutdown(wait=False)
+        if self._election:
+            self._election.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._election
+            self._election = None
+        await self.leader.release()
+
+    async def _elect(self) -> None:
+        while True:
+            try:
+                if self.leader.is_leader:
+                    await self.leader.renew()
+                else:
+                    await self.leader.try_acquire()
+            except Exception as e:
+                logger.warning(f"Scheduler leader election failed: {e}")
+            await asyncio.sleep(settings.SCHEDULER_LEADER_RENEW_SECONDS)
+
+    async def run_job(self, job: ScheduledJob) -> Optional[ScheduledJobRun]:
+        """Run `job` if this instance leads, recording the run. None if skipped."""
+        if not self.leader.is_leader:
+            logger.debug(f"{job.name}: skipped (not the scheduler leader)")
+            return None
+
+        from app.db.base import get_session_factory
+
+        factory = get_session_factory()
+        async with factory() as db:
+            run = ScheduledJobRun(
+                job_id=job.id,
+                instance=self.instance,
+                status=ScheduledRunStatus.RUNNING,
+            )
+            db.add(run)
+            await db.commit()
+
+        started = timer.perf_counter()
+        values = {}
+        try:
+            async with factory() as db:
+                result = await job.run(db)
+            values["status"] = ScheduledRunStatus.SUCCEEDED
+            values["stats"] = result if isinstance(result, dict) else None
+        except Exception as e:
+            logger.error(f"{job.name} failed: {e}")
+            values["status"] = ScheduledRunStatus.FAILED
+            values["error"] = str(e)[:2000]
+
+        values["duration_ms"] = int((timer.perf_counter() - started) * 1000)
+        async with factory() as db:
+            await db.execute(
+                update(ScheduledJobRun)
+                .where(ScheduledJobRun.id == run.id)
+                .values(finished_at=datetime.now(timezone.utc), **values)
+            )
+            await db.commit()
+        for key, value in values.items():
+            setattr(run, key, value)
+        return run
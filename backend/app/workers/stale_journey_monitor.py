@@ -7,12 +7,14 @@ Philosophy: The system should "persist" - actively pursuing patients
 who haven't completed their journey (payment, feedback, etc.)
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from uuid import UUID
 from typing import Optional
 
-from sqlalchemy import text
+from sqlalchemy import Integer, String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import SystemEventLog, EventStatus
@@ -86,137 +88,155 @@ STALE_RULES = [
 
 # ============ CORE WORKER FUNCTION ============
 
+# Concurrent reminder sends per run
+REMINDER_SEND_CONCURRENCY = 8
+
+# One pass over patient_journey_state (the current stage of every patient
+# in every journey), evaluating every STALE_RULES entry at once. Rules
+# arrive as parallel arrays; each one is an index range scan on
+# (journey_key, stage, entered_at). A patient matches a rule when they
+# entered its stage more than max_hours ago, without a reminder for that
+# (journey, stage) in the last 24h. Rows with an unknown entered_at (NULL,
+# backfilled from journey_status alone) never match.
+_FIND_STALE_PATIENTS = text("""
+    WITH rules AS (
+        SELECT *
+        FROM unnest(:journey_keys, :stages, :max_hours)
+            AS r(journey_key, stage, max_hours)
+    ),
+    recent_reminders AS (
+        SELECT DISTINCT
+            entity_id AS patient_id,
+            payload->>'journey_key' AS journey_key,
+            payload->>'stage' AS stage
+        FROM system_events
+        WHERE event_type = 'JOURNEY_STAGE_TIMEOUT'
+        AND created_at > NOW() - INTERVAL '24 hours'
+    )
+    SELECT
+        p.id,
+        p.first_name,
+        p.last_name,
+        p.email,
+        p.organization_id,
+        js.journey_key,
+        js.stage,
+        js.entered_at AS entered_stage_at
+    FROM rules r
+    JOIN patient_journey_state js
+        ON js.journey_key = r.journey_key
+        AND js.stage = r.stage
+        AND js.entered_at < NOW() - make_interval(hours => r.max_hours)
+    JOIN patients p ON p.id = js.patient_id
+    LEFT JOIN recent_reminders rr
+        ON rr.patient_id = js.patient_id
+        AND rr.journey_key = js.journey_key
+        AND rr.stage = js.stage
+    WHERE rr.patient_id IS NULL
+    AND p.email IS NOT NULL
+""").bindparams(
+    bindparam("journey_keys", type_=ARRAY(String)),
+    bindparam("stages", type_=ARRAY(String)),
+    bindparam("max_hours", type_=ARRAY(Integer)),
+)
+
 
 async def check_stale_journeys(db: AsyncSession) -> dict:
     """
     Find patients stuck in a stage for too long and trigger actions.
 
     This is called by APScheduler every hour (or manually via admin endpoint).
+    All rules are evaluated in one query; the JOURNEY_STAGE_TIMEOUT events
+    are inserted in one commit, then the reminders are sent concurrently.
 
     Returns:
         dict with counts of patients processed per rule
     """
-    results = {"processed": 0, "rules_triggered": {}}
-
-    for rule in STALE_RULES:
-        # Find patients stuck in this stage beyond the threshold
-        stale_patients = await _find_stale_patients(
-            db=db,
-            journey_key=rule["journey_key"],
-            stage=rule["stage"],
-            max_hours=rule["max_hours"],
-        )
+    results = {
+        "processed": 0,
+        "rules_triggered": {
+            f"{rule['journey_key']}.{rule['stage']}": 0 for rule in STALE_RULES
+        },
+    }
 
-        rule_key = f"{rule['journey_key']}.{rule['stage']}"
-        results["rules_triggered"][rule_key] = len(stale_patients)
+    matches = await _find_stale_patients(db, STALE_RULES)
+    if not matches:
+        logger.info(f"Stale journey check completed: {results}")
+        return results
 
-        for patient_data in stale_patients:
+    for patient_data, rule in matches:
+        results["rules_triggered"][f"{rule['journey_key']}.{rule['stage']}"] += 1
+
+    # 1. Log every timeout event (also the 24h cooldown marker) in one batch
+    db.add_all(
+        [_build_timeout_event(patient_data, rule) for patient_data, rule in matches]
+    )
+    await db.commit()
+
+    # 2. Send the reminders, a few at a time
+    semaphore = asyncio.Semaphore(REMINDER_SEND_CONCURRENCY)
+
+    async def send(patient_data: dict, rule: dict) -> bool:
+        async with semaphore:
             try:
-                await _execute_stale_action(
-                    db=db,
-                    patient_data=patient_data,
-                    rule=rule,
-                )
-                results["processed"] += 1
+                await _send_stale_reminder(patient_data, rule)
+                return True
             except Exception as e:
                 logger.error(
                     f"Failed to process stale patient {patient_data['id']}: {e}"
                 )
+                return False
+
+    sent = await asyncio.gather(*(send(*match) for match in matches))
+    results["processed"] = sum(sent)
 
     logger.info(f"Stale journey check completed: {results}")
     return results
 
 
 async def _find_stale_patients(
-    db: AsyncSession,
-    journey_key: str,
-    stage: str,
-    max_hours: int,
-) -> list[dict]:
+    db: AsyncSession, rules: list[dict]
+) -> list[tuple[dict, dict]]:
     """
-    Query patients who have been in a specific stage for > max_hours.
+    Query patients who have been in a rule's stage for > its max_hours.
 
-    Uses journey_logs to determine when they entered this stage.
-    Falls back to checking if no reminder was sent recently.
-    """
-    cutoff_time = datetime.utcnow() - timedelta(hours=max_hours)
-
-    # Query: Find patients in this stage whose last transition was before cutoff
-    # AND who haven't received a reminder for this stage recently (24h)
-    query = text("""
-        WITH latest_transitions AS (
-            SELECT DISTINCT ON (patient_id)
-                patient_id,
-                to_stage,
-                changed_at
-            FROM journey_logs
-            WHERE journey_key = :journey_key
-            ORDER BY patient_id, changed_at DESC
-        ),
-        recent_reminders AS (
-            SELECT entity_id as patient_id
-            FROM system_events
-            WHERE event_type = 'JOURNEY_STAGE_TIMEOUT'
-            AND payload->>'journey_key' = :journey_key
-            AND payload->>'stage' = :stage
-            AND created_at > NOW() - INTERVAL '24 hours'
-        )
-        SELECT 
-            p.id,
-            p.first_name,
-            p.last_name,
-            p.email,
-            p.organization_id,
-            lt.changed_at as entered_stage_at
-        FROM patients p
-        JOIN latest_transitions lt ON p.id = lt.patient_id
-        LEFT JOIN recent_reminders rr ON p.id = rr.patient_id
-        WHERE lt.to_stage = :stage
-        AND lt.changed_at < :cutoff_time
-        AND rr.patient_id IS NULL
-        AND p.email IS NOT NULL
-    """)
+    Uses patient_journey_state to determine when they entered the stage, and
+    skips patients who received a reminder for that stage recently (24h).
 
+    Returns:
+        (patient_data, rule) pairs
+    """
+    by_stage = {(rule["journey_key"], rule["stage"]): rule for rule in rules}
     result = await db.execute(
-        query,
+        _FIND_STALE_PATIENTS,
         {
-            "journey_key": journey_key,
-            "stage": stage,
-            "cutoff_time": cutoff_time,
+            "journey_keys": [rule["journey_key"] for rule in rules],
+            "stages": [rule["stage"] for rule in rules],
+            "max_hours": [rule["max_hours"] for rule in rules],
         },
     )
 
-    rows = result.fetchall()
     return [
-        {
-            "id": row.id,
-            "first_name": row.first_name,
-            "last_name": row.last_name,
-            "email": row.email,
-            "organization_id": row.organization_id,
-            "entered_stage_at": row.entered_stage_at,
-        }
-        for row in rows
+        (
+            {
+                "id": row.id,
+                "first_name": row.first_name,
+                "last_name": row.last_name,
+                "email": row.email,
+                "organization_id": row.organization_id,
+                "entered_stage_at": row.entered_stage_at,
+            },
+            by_stage[(row.journey_key, row.stage)],
+        )
+        for row in result.fetchall()
     ]
 
 
-async def _execute_stale_action(
-    db: AsyncSession,
-    patient_data: dict,
-    rule: dict,
-):
-    """
-    Execute the action for a stale patient (send reminder email).
-    Logs a JOURNEY_STAGE_TIMEOUT event for audit.
-    """
-    from app.core.config import settings
-
+def _build_timeout_event(patient_data: dict, rule: dict) -> SystemEventLog:
+    """JOURNEY_STAGE_TIMEOUT audit event for a stale patient."""
     patient_id = patient_data["id"]
-    organization_id = patient_data["organization_id"]
-
-    # 1. Log the timeout event
-    event = SystemEventLog(
-        organization_id=organization_id,
+    return SystemEventLog(
+        organization_id=patient_data["organization_id"],
         event_type=TriggerEvent.JOURNEY_STAGE_TIMEOUT.value
         if hasattr(TriggerEvent, "JOURNEY_STAGE_TIMEOUT")
         else "JOURNEY_STAGE_TIMEOUT",
@@ -231,9 +251,13 @@ async def _execute_stale_action(
         entity_type="patient",
         entity_id=patient_id,
     )
-    db.add(event)
 
-    # 2. Send reminder email based on action type
+
+async def _send_stale_reminder(patient_data: dict, rule: dict):
+    """Send the reminder email for a stale patient based on the rule's action."""
+    from app.core.config import settings
+
+    patient_id = patient_data["id"]
     patient_name = f"{patient_data['first_name']} {patient_data['last_name']}"
     email_subject = rule.get("email_subject", "⏰ Recordatorio de TherapistOS")
 
@@ -268,8 +292,6 @@ async def _execute_stale_action(
         f"Stale action executed for patient {patient_id}: {action} ({rule['journey_key']}.{rule['stage']})"
     )
 
-    await db.commit()
-
 
 # ============ LEAD STAGNATION MONITOR ============
 
@@ -342,27 +364,8 @@ async def check_stale_leads(db: AsyncSession) -> dict:
                 datetime.utcnow() - lead_row.updated_at
             ).total_seconds() / 3600
 
-            # Log the LEAD_STAGED_TIMEOUT event
-            event = SystemEventLog(
-                organization_id=lead_row.organization_id,
-                event_type=TriggerEvent.LEAD_STAGED_TIMEOUT.value,
-                payload={
-                    "lead_id": str(lead_row.id),
-                    "first_name": lead_row.first_name,
-                    "last_name": lead_row.last_name,
-                    "email": lead_row.email,
-                    "phone": lead_row.phone or "",
-                    "status": lead_row.status,
-                    "source": lead_row.source or "",
-                    "hours_stale": round(hours_stale, 1),
-                },
-                status=EventStatus.PENDING,
-                entity_type="lead",
-                entity_id=lead_row.id,
-            )
-            db.add(event)
-
-            # Process via automation engine (will trigger Agente Fantasma rules)
+            # Queue for the automation engine (will trigger Agente Fantasma
+            # rules); the outbox row is also the cooldown marker queried above
             from app.services.automation_engine import emit_event
 
             await emit_event(
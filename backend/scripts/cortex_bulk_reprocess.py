@@ -0,0 +1,137 @@
+"""Bulk re-process clinical entries through Cortex (backfills, re-analysis).
+
+Creates a checkpointed bulk run (cortex_bulk_runs) and runs it in this
+process; an interrupted run is resumed with --resume. Same runner as
+POST /api/v1/admin/cortex/bulk-runs, without the job queue.
+
+Run with:
+    docker exec kuraos-backend-1 python scripts/cortex_bulk_reprocess.py \\
+        --entry-type AUDIO --created-after 2026-01-01 \\
+        --concurrency 8 --rpm gemini-2.5-pro=120
+    docker exec kuraos-backend-1 python scripts/cortex_bulk_reprocess.py --resume <run_id>
+    docker exec kuraos-backend-1 python scripts/cortex_bulk_reprocess.py --status <run_id>
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import uuid
+from datetime import datetime, timezone
+
+# Add parent to path
+sys.path.insert(0, "/app")
+
+from app.db.base import close_db, get_session_factory
+from app.db.models import CortexBulkRun
+from app.services.cortex.bulk import (
+    bulk_progress,
+    create_bulk_run,
+    reopen_bulk_run,
+    run_bulk,
+)
+
+
+def _date(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _rpm(value: str) -> tuple[str, int]:
+    model, _, rpm = value.partition("=")
+    if not model or not rpm.isdigit():
+        raise argparse.ArgumentTypeError(f"Expected MODEL=RPM, got '{value}'")
+    return model, int(rpm)
+
+
+def _print_progress(progress: dict) -> None:
+    eta = progress["eta_seconds"]
+    print(
+        f"📊 Run {progress['id']} [{progress['status']}]: "
+        f"{progress['processed']}/{progress['total']} ({progress['percent']}%), "
+        f"{progress['succeeded']} ok, {progress['failed']} failed"
+        + (f", ETA {eta // 60} min" if eta is not None else "")
+    )
+    for error in progress["errors"][-5:]:
+        print(f"  ⚠️  {error['entry_id']}: {error['error']}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    session_factory = get_session_factory()
+    try:
+        async with session_factory() as db:
+            if args.status:
+                run = await db.get(CortexBulkRun, args.status)
+                if not run:
+                    sys.exit(f"❌ Bulk run {args.status} not found")
+                _print_progress(bulk_progress(run))
+                return
+
+            if args.resume:
+                run = await db.get(CortexBulkRun, args.resume)
+                if not run:
+                    sys.exit(f"❌ Bulk run {args.resume} not found")
+                # Failed and cancelled runs are queued again (like the
+                # admin /resume endpoint); run_bulk skips finished runs
+                try:
+                    reopen_bulk_run(run)
+                except ValueError as e:
+                    sys.exit(f"❌ {e}")
+                await db.commit()
+                run_id = run.id
+            else:
+                try:
+                    run = await create_bulk_run(
+                        db,
+                        filters={
+                            "organization_id": args.org,
+                            "entry_types": args.entry_type,
+                            "statuses": args.entry_status,
+                            "created_after": args.created_after,
+                            "created_before": args.created_before,
+                        },
+                        concurrency=args.concurrency,
+                        model_rpm=dict(args.rpm or []),
+                    )
+                except ValueError as e:
+                    sys.exit(f"❌ {e}")
+                await db.commit()
+                run_id = run.id
+                print(f"🧠 Bulk run {run_id}: {run.total} entries to re-process")
+                print(f"   Resume after an interruption with --resume {run_id}")
+
+            try:
+                _print_progress(await run_bulk(db, run_id))
+            except ValueError as e:
+                sys.exit(f"❌ {e}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resume", type=uuid.UUID, help="Resume this bulk run")
+    parser.add_argument("--status", type=uuid.UUID, help="Show a run's progress")
+    parser.add_argument("--org", type=uuid.UUID, help="Only this organization")
+    parser.add_argument(
+        "--entry-type", action="append", help="SESSION_NOTE, AUDIO, ... (repeatable)"
+    )
+    parser.add_argument(
+        "--entry-status",
+        action="append",
+        help="COMPLETED and/or FAILED (default: both)",
+    )
+    parser.add_argument("--created-after", type=_date, help="ISO date/datetime (UTC)")
+    parser.add_argument(
+        "--created-before", type=_date, help="ISO date/datetime (default: now)"
+    )
+    parser.add_argument("--concurrency", type=int, help="Entries in flight")
+    parser.add_argument(
+        "--rpm",
+        type=_rpm,
+        action="append",
+        help="Requests per minute for a model, e.g. gemini-2.5-pro=120 (repeatable)",
+    )
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args()))
@@ -19,6 +19,7 @@ from sqlalchemy import select, text
 sys.path.insert(0, "/app")
 
 from app.db.base import AsyncSessionLocal
+from app.services.journey_state import rebuild_journey_state
 from app.db.models import (
     User,
     Organization,
@@ -729,6 +730,7 @@ async def main():
         await seed_forms(db, org_id)
         services = await seed_services(db, org_id, admin.id)
         await seed_patients(db, org_id, services, admin.id)
+        await rebuild_journey_state(db)  # Seeds write journey_logs directly
 
         await db.commit()
         print("\n✨ GOLDEN SEED COMPLETE. UNIVERSE IS READY.")
@@ -21,6 +21,7 @@ from sqlalchemy import select, text
 sys.path.insert(0, "/app")
 
 from app.db.base import get_session_factory
+from app.services.journey_state import rebuild_journey_state
 from app.db.models import (
     User,
     Organization,
@@ -699,6 +700,7 @@ async def main():
 
         # Seed only the 4 demo patients
         await seed_patients(db, org_id, service_map, admin.id)
+        await rebuild_journey_state(db)  # Seeds write journey_logs directly
 
         await db.commit()
         print("\n✨ DEMO RESEED COMPLETE. 4 archetypes ready.")
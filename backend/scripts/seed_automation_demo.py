@@ -13,6 +13,7 @@ async def main():
     from sqlalchemy import select, text
     from app.db.base import AsyncSessionLocal
     from app.db.models import User, Organization, Patient, JourneyLog, JourneyTemplate
+    from app.services.journey_state import rebuild_journey_state
 
     async with AsyncSessionLocal() as db:
         # Find the admin user
@@ -150,6 +151,9 @@ async def main():
             db.add(template)
             print("✅ Created JourneyTemplate: Intake Flow")
 
+        # Seeded journey_logs bypass the engine; materialize current stages
+        await rebuild_journey_state(db)
+
         await db.commit()
 
         print(f"\n🎉 Seed complete! Created {created_count} test patients.")
@@ -100,6 +100,7 @@ PIPELINES = [
                 "model": "gemini-2.5-pro",
                 "prompt_key": "clinical_analysis",
                 "temperature": 0.4,
+                "chunk_threshold": 60000,  # Retreats/groups: map-reduce
             },
         ],
         "description": "VOICE - Session Synthesis Engine. Full session audio → transcription → SOAP analysis.",
@@ -0,0 +1,42 @@
+"""Smoke test: the automation replay harness runs and emits its JSON schema."""
+
+import asyncio
+
+from tests.perf.benchmark_automation import compare, replay_synthetic, summarize
+
+
+def test_synthetic_replay_reports_rules_and_latency():
+    stats, elapsed = asyncio.run(
+        replay_synthetic(organizations=2, rules_per_trigger=2, events=50, seed=1)
+    )
+    results = summarize(stats, elapsed)
+
+    assert results["events"] == 50
+    assert results["failures"] == 0
+    assert results["throughput_eps"] > 0
+    assert set(results["latency"]) == {"evaluation", "event"}
+    assert sum(t["events"] for t in results["triggers"].values()) == 50
+    # Every rule of a replayed (organization, trigger) pair was evaluated
+    assert results["rules"]
+    for rule in results["rules"]:
+        assert 0 <= rule["matched"] <= rule["evaluated"]
+
+
+def test_compare_flags_throughput_and_latency():
+    report = {
+        "results": {
+            "throughput_eps": 100.0,
+            "latency": {"event": {"p50_ms": 3.0, "p99_ms": 1.0}},
+        }
+    }
+    baseline = {
+        "results": {
+            "throughput_eps": 200.0,
+            "latency": {"event": {"p50_ms": 1.0, "p99_ms": 1.0}},
+        }
+    }
+
+    assert compare(report, baseline, max_regression=1.25) == [
+        "throughput: 2.00x slower",
+        "event/p50_ms: 3.00x",
+    ]
@@ -0,0 +1,36 @@
+"""Smoke test: the slot benchmark suite runs and emits its JSON schema."""
+
+from tests.perf.benchmark_slots import Scenario, compare, run_scenario
+
+
+def test_smallest_scenario_reports_every_stage():
+    result = run_scenario(
+        Scenario(therapists=1, weekly_blocks=5, blockers=10, days=7), repeat=1, seed=1
+    )
+
+    assert set(result["stages"]) == {
+        "generation",
+        "generation_reference",
+        "dedup",
+        "filtering",
+        "end_to_end",
+    }
+    # Optimized and reference generators agree on the slot count
+    stages = result["stages"]
+    assert stages["generation"]["items"] == stages["generation_reference"]["items"]
+    assert stages["filtering"]["items"] == stages["end_to_end"]["items"]
+
+
+def test_compare_flags_slow_stages():
+    report = {
+        "results": [
+            {"scenario": "s", "stages": {"filtering": {"median_ms": 3.0}}},
+        ]
+    }
+    baseline = {
+        "results": [
+            {"scenario": "s", "stages": {"filtering": {"median_ms": 1.0}}},
+        ]
+    }
+
+    assert compare(report, baseline, max_regression=1.25) == ["s/filtering: 3.00x"]
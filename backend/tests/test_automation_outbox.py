@@ -0,0 +1,165 @@
+"""Tests for the automation event outbox (system_events drained by workers)."""
+
+import pytest
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.models import EventStatus, Lead, SystemEventLog
+from app.schemas.automation_types import TriggerEvent
+from app.services.automation_engine import emit_event, fire_event
+from app.workers.automation_outbox import (
+    MAX_RETRY_DELAY,
+    claim_events,
+    drain_outbox,
+    retry_delay,
+)
+
+# =============================================================================
+# Backoff (no database)
+# =============================================================================
+
+
+class TestRetryDelay:
+    def test_doubles_per_attempt(self):
+        base = timedelta(seconds=settings.AUTOMATION_OUTBOX_RETRY_BASE_SECONDS)
+        assert retry_delay(1) == base
+        assert retry_delay(2) == 2 * base
+        assert retry_delay(3) == 4 * base
+
+    def test_capped(self):
+        assert retry_delay(50) == MAX_RETRY_DELAY
+
+
+# =============================================================================
+# Outbox (real Postgres)
+# =============================================================================
+
+
+async def _fire(db, org_id, **payload) -> SystemEventLog:
+    return await fire_event(
+        db=db,
+        event_type=TriggerEvent.PAYMENT_SUCCEEDED,
+        payload=payload,
+        organization_id=org_id,
+        entity_type="booking",
+    )
+
+
+async def _make_due(db, *events) -> None:
+    """Skip the backoff/lease of the given events."""
+    await db.execute(
+        update(SystemEventLog)
+        .where(SystemEventLog.id.in_([e.id for e in events]))
+        .values(next_attempt_at=SystemEventLog.created_at)
+    )
+    await db.commit()
+
+
+async def _status(db, event) -> SystemEventLog:
+    result = await db.execute(
+        select(SystemEventLog)
+        .where(SystemEventLog.id == event.id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+class TestAutomationOutbox:
+    async def test_fire_event_only_enqueues(self, test_db, test_org):
+        with patch(
+            "app.services.automation_engine.AutomationEngine._execute_rules",
+            new_callable=AsyncMock,
+        ) as execute_rules:
+            event = await _fire(test_db, test_org.id, amount=100)
+
+        execute_rules.assert_not_called()
+        stored = await _status(test_db, event)
+        assert stored.status == EventStatus.PENDING
+        assert stored.attempts == 0
+
+    async def test_event_commits_with_callers_changes(self, test_db, test_org):
+        """The outbox row is written in the caller's transaction."""
+        lead = Lead(organization_id=test_org.id, first_name="Ana", last_name="Ruiz")
+        test_db.add(lead)
+        await test_db.flush()
+
+        event = await emit_event(
+            db=test_db,
+            event_type=TriggerEvent.LEAD_CREATED,
+            organization_id=test_org.id,
+            entity_id=lead.id,
+            entity_type="lead",
+        )
+        await test_db.rollback()  # Nothing left to undo: one commit covered both
+
+        assert (await test_db.get(Lead, lead.id)) is not None
+        assert (await _status(test_db, event)).entity_id == lead.id
+
+    async def test_drain_marks_processed_or_ignored(self, test_db, test_org):
+        matched = await _fire(test_db, test_org.id, n=1)
+        ignored = await _fire(test_db, test_org.id, n=2)
+
+        async def execute_rules(event_type, payload, organization_id):
+            return payload["n"] == 1
+
+        with patch(
+            "app.services.automation_engine.AutomationEngine._execute_rules",
+            side_effect=execute_rules,
+        ):
+            stats = await drain_outbox(test_db)
+
+        assert stats["claimed"] == 2
+        assert (await _status(test_db, matched)).status == EventStatus.PROCESSED
+        assert (await _status(test_db, ignored)).status == EventStatus.IGNORED
+        assert (await _status(test_db, matched)).processed_at is not None
+
+    async def test_failures_retry_then_dead_letter(self, test_db, test_org):
+        event = await _fire(test_db, test_org.id)
+
+        with patch(
+            "app.services.automation_engine.AutomationEngine._execute_rules",
+            side_effect=RuntimeError("Brevo down"),
+        ):
+            for attempt in range(1, settings.AUTOMATION_OUTBOX_MAX_ATTEMPTS):
+                stats = await drain_outbox(test_db)
+                assert stats["retried"] == 1
+                stored = await _status(test_db, event)
+                assert stored.status == EventStatus.PENDING
+                assert stored.attempts == attempt
+                assert stored.error_message == "Brevo down"
+
+                # Backed off: not claimable until due
+                assert (await drain_outbox(test_db))["claimed"] == 0
+                await _make_due(test_db, event)
+
+            stats = await drain_outbox(test_db)
+
+        assert stats["dead_lettered"] == 1
+        assert (await _status(test_db, event)).status == EventStatus.DEAD_LETTER
+
+    async def test_concurrent_claims_skip_locked_rows(self, engine, test_db, test_org):
+        events = [await _fire(test_db, test_org.id, n=n) for n in range(4)]
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with factory() as holder, factory() as other:
+            # Hold row locks on two events in an open transaction
+            locked = await holder.execute(
+                select(SystemEventLog.id)
+                .where(SystemEventLog.id.in_([e.id for e in events[:2]]))
+                .with_for_update()
+            )
+            locked_ids = set(locked.scalars())
+
+            claimed = await claim_events(other, batch_size=10)
+            assert {e.id for e in claimed} == {e.id for e in events} - locked_ids
+            await holder.rollback()
+
+        # Claimed rows are leased: a second claim does not see them
+        async with factory() as again:
+            assert {e.id for e in await claim_events(again)} == locked_ids
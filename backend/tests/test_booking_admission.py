@@ -0,0 +1,168 @@
+"""Tests for slot-scoped booking admission (advisory locks per time bucket)."""
+
+import asyncio
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Booking, BookingStatus, Patient, ServiceType
+from app.services.booking_admission import BookingAdmissionService, slot_lock_keys
+
+# =============================================================================
+# Lock keys (no database)
+# =============================================================================
+
+
+class TestSlotLockKeys:
+    def test_overlapping_ranges_share_a_key(self):
+        therapist_id = uuid.uuid4()
+        a = slot_lock_keys(
+            therapist_id, datetime(2030, 1, 7, 9, 0), datetime(2030, 1, 7, 10, 0)
+        )
+        b = slot_lock_keys(
+            therapist_id, datetime(2030, 1, 7, 9, 50), datetime(2030, 1, 7, 11, 0)
+        )
+        assert set(a) & set(b)
+
+    def test_adjacent_ranges_and_other_therapists_do_not(self):
+        therapist_id = uuid.uuid4()
+        nine = slot_lock_keys(
+            therapist_id, datetime(2030, 1, 7, 9, 0), datetime(2030, 1, 7, 10, 0)
+        )
+        ten = slot_lock_keys(
+            therapist_id, datetime(2030, 1, 7, 10, 0), datetime(2030, 1, 7, 11, 0)
+        )
+        other = slot_lock_keys(
+            uuid.uuid4(), datetime(2030, 1, 7, 9, 0), datetime(2030, 1, 7, 10, 0)
+        )
+        assert not set(nine) & set(ten)
+        assert not set(nine) & set(other)
+
+    def test_aware_and_naive_utc_map_to_same_keys(self):
+        therapist_id = uuid.uuid4()
+        aware = slot_lock_keys(
+            therapist_id,
+            datetime(2030, 1, 7, 10, 0, tzinfo=timezone(timedelta(hours=1))),
+            datetime(2030, 1, 7, 11, 0, tzinfo=timezone(timedelta(hours=1))),
+        )
+        naive = slot_lock_keys(
+            therapist_id, datetime(2030, 1, 7, 9, 0), datetime(2030, 1, 7, 10, 0)
+        )
+        assert aware == naive == sorted(naive)
+
+
+# =============================================================================
+# Concurrency (real Postgres)
+# =============================================================================
+
+
+@pytest.fixture
+async def group_service(test_db, test_org, test_user):
+    service = ServiceType(
+        organization_id=test_org.id,
+        title="Workshop",
+        duration_minutes=60,
+        price=0,
+        capacity=3,
+        is_active=True,
+    )
+    test_db.add(service)
+    await test_db.commit()
+    return service
+
+
+async def _try_book(factory, service, therapist_id, start: datetime) -> bool:
+    """One public booking attempt in its own transaction."""
+    end = start + timedelta(minutes=service.duration_minutes)
+    async with factory() as db:
+        patient = Patient(
+            organization_id=service.organization_id,
+            first_name="Load",
+            last_name="Test",
+            email=f"load-{uuid.uuid4().hex[:8]}@example.com",
+        )
+        db.add(patient)
+        await db.flush()
+
+        admitted, _ = await BookingAdmissionService(db).admit(
+            therapist_id, start, end, service.capacity
+        )
+        if not admitted:
+            await db.rollback()
+            return False
+
+        db.add(
+            Booking(
+                organization_id=service.organization_id,
+                patient_id=patient.id,
+                service_type_id=service.id,
+                therapist_id=therapist_id,
+                start_time=start,
+                end_time=end,
+                status=BookingStatus.PENDING,
+                amount_paid=0,
+                currency="EUR",
+            )
+        )
+        # Widen the race window between the capacity check and the commit
+        await asyncio.sleep(0.01)
+        await db.commit()
+        return True
+
+
+@pytest.mark.asyncio
+class TestBookingAdmissionConcurrency:
+    async def test_concurrent_bookings_never_exceed_capacity(
+        self, engine, test_db, test_user, group_service
+    ):
+        """Many simultaneous sign-ups for one slot admit exactly `capacity`."""
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        start = datetime(2030, 1, 7, 9, 0)
+
+        results = await asyncio.gather(
+            *[_try_book(factory, group_service, test_user.id, start) for _ in range(12)]
+        )
+
+        assert sum(results) == group_service.capacity
+        count = await test_db.execute(
+            select(func.count(Booking.id)).where(Booking.therapist_id == test_user.id)
+        )
+        assert count.scalar() == group_service.capacity
+
+    async def test_different_slots_admitted_in_parallel(
+        self, engine, test_user, group_service
+    ):
+        """A held slot lock blocks overlapping admissions only."""
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        nine = datetime(2030, 1, 7, 9, 0)
+        hour = timedelta(hours=1)
+
+        async with factory() as holder, factory() as other, factory() as overlap:
+            await BookingAdmissionService(holder).lock_slot(
+                test_user.id, nine, nine + hour
+            )
+
+            # Slot two hours later: admitted while 9:00 is locked
+            admitted, _ = await asyncio.wait_for(
+                BookingAdmissionService(other).admit(
+                    test_user.id, nine + 2 * hour, nine + 3 * hour, 1
+                ),
+                timeout=5,
+            )
+            assert admitted
+
+            # Overlapping slot waits for the holder
+            await overlap.execute(text("SET LOCAL lock_timeout = '200ms'"))
+            with pytest.raises(DBAPIError):
+                await BookingAdmissionService(overlap).lock_slot(
+                    test_user.id, nine + hour / 2, nine + 3 * hour / 2
+                )
+
+            await overlap.rollback()
+            await other.rollback()
+            await holder.rollback()
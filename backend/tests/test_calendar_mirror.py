@@ -0,0 +1,284 @@
+"""Tests for the Google Calendar busy-time mirror (incremental sync)."""
+
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import (
+    AvailabilitySchedule,
+    CalendarBusyInterval,
+    CalendarIntegration,
+    ScheduleCalendarSync,
+)
+from app.services.google_calendar import GoogleCalendarService, parse_busy_event
+
+# =============================================================================
+# Event parsing (no database)
+# =============================================================================
+
+
+class TestParseBusyEvent:
+    def test_timed_event_normalized_to_utc(self):
+        busy = parse_busy_event(
+            {
+                "id": "e1",
+                "start": {"dateTime": "2030-12-16T10:00:00+01:00"},
+                "end": {"dateTime": "2030-12-16T11:00:00+01:00"},
+            }
+        )
+        assert busy == (
+            datetime(2030, 12, 16, 9, 0, tzinfo=timezone.utc),
+            datetime(2030, 12, 16, 10, 0, tzinfo=timezone.utc),
+        )
+
+    def test_all_day_event_spans_whole_days(self):
+        busy = parse_busy_event(
+            {"id": "e1", "start": {"date": "2030-12-16"}, "end": {"date": "2030-12-17"}}
+        )
+        assert busy == (
+            datetime(2030, 12, 16, tzinfo=timezone.utc),
+            datetime(2030, 12, 17, tzinfo=timezone.utc),
+        )
+
+    @pytest.mark.parametrize(
+        "extra",
+        [{"status": "cancelled"}, {"transparency": "transparent"}],
+    )
+    def test_non_blocking_events_ignored(self, extra):
+        item = {
+            "id": "e1",
+            "start": {"dateTime": "2030-12-16T10:00:00Z"},
+            "end": {"dateTime": "2030-12-16T11:00:00Z"},
+            **extra,
+        }
+        assert parse_busy_event(item) is None
+
+
+class TestMirrorFreshness:
+    def test_fresh_only_when_recently_synced(self):
+        gcal = GoogleCalendarService(MagicMock(spec=AsyncSession))
+        sync = ScheduleCalendarSync(mirror_synced_at=None)
+        assert not gcal._is_mirror_fresh(sync)
+
+        sync.mirror_synced_at = datetime.now(timezone.utc)
+        assert gcal._is_mirror_fresh(sync)
+
+        sync.mirror_synced_at = datetime.now(timezone.utc) - timedelta(days=1)
+        assert not gcal._is_mirror_fresh(sync)
+
+
+# =============================================================================
+# Incremental sync against a stubbed calendar server
+# =============================================================================
+
+
+def _event(event_id: str, hour: int, **extra) -> dict:
+    return {
+        "id": event_id,
+        "start": {"dateTime": f"2030-12-16T{hour:02d}:00:00Z"},
+        "end": {"dateTime": f"2030-12-16T{hour + 1:02d}:00:00Z"},
+        **extra,
+    }
+
+
+class StubCalendar:
+    """Minimal Events API: full sync, sync tokens and 410 expiry."""
+
+    def __init__(self, events: list[dict]):
+        self.full = events
+        self.changes: list[dict] = []
+        self.expire_token = False
+        self.requests: list[dict] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        self.requests.append(params)
+        if "syncToken" in params:
+            if self.expire_token:
+                self.expire_token = False
+                return httpx.Response(410, json={"error": "gone"})
+            return httpx.Response(
+                200, json={"items": self.changes, "nextSyncToken": "tok-2"}
+            )
+        return httpx.Response(200, json={"items": self.full, "nextSyncToken": "tok-1"})
+
+
+@pytest.fixture
+async def mirror_setup(test_db, test_user):
+    schedule = AvailabilitySchedule(user_id=test_user.id, name="Default")
+    test_db.add(schedule)
+    await test_db.flush()
+    sync = ScheduleCalendarSync(
+        schedule_id=schedule.id,
+        blocking_calendar_ids=["work@example.com"],
+        booking_calendar_id="primary",
+    )
+    test_db.add_all(
+        [sync, CalendarIntegration(user_id=test_user.id, access_token="token")]
+    )
+    await test_db.commit()
+    return sync, test_user
+
+
+async def _mirrored_event_ids(db, sync_id: uuid.UUID) -> set[str]:
+    result = await db.execute(
+        select(CalendarBusyInterval.event_id).where(
+            CalendarBusyInterval.sync_id == sync_id
+        )
+    )
+    return set(result.scalars().all())
+
+
+@pytest.mark.asyncio
+class TestSyncBusyMirror:
+    async def test_full_then_incremental_sync(self, test_db, mirror_setup):
+        sync, user = mirror_setup
+        stub = StubCalendar([_event("a", 9), _event("b", 11)])
+        gcal = GoogleCalendarService(
+            test_db, transport=httpx.MockTransport(stub.handler)
+        )
+
+        await gcal.sync_busy_mirror(sync, user.id)
+        assert await _mirrored_event_ids(test_db, sync.id) == {"a", "b"}
+        assert sync.sync_tokens == {"work@example.com": "tok-1"}
+        assert sync.mirror_synced_at is not None
+
+        # Incremental: "a" cancelled, "c" added
+        stub.changes = [_event("a", 9, status="cancelled"), _event("c", 14)]
+        await gcal.sync_busy_mirror(sync, user.id)
+        assert stub.requests[-1]["syncToken"] == "tok-1"
+        assert await _mirrored_event_ids(test_db, sync.id) == {"b", "c"}
+
+        busy = await gcal.get_busy_times(
+            user.id,
+            sync.schedule_id,
+            datetime(2030, 12, 16, 0, 0),
+            datetime(2030, 12, 16, 12, 0),
+        )
+        assert busy == [(datetime(2030, 12, 16, 11, 0), datetime(2030, 12, 16, 12, 0))]
+
+    async def test_expired_token_triggers_full_resync(self, test_db, mirror_setup):
+        sync, user = mirror_setup
+        stub = StubCalendar([_event("a", 9)])
+        gcal = GoogleCalendarService(
+            test_db, transport=httpx.MockTransport(stub.handler)
+        )
+        await gcal.sync_busy_mirror(sync, user.id)
+
+        stub.full = [_event("z", 15)]
+        stub.expire_token = True
+        await gcal.sync_busy_mirror(sync, user.id)
+
+        assert "syncToken" not in stub.requests[-1]
+        assert await _mirrored_event_ids(test_db, sync.id) == {"z"}
+        assert sync.sync_tokens == {"work@example.com": "tok-1"}
+
+    async def test_failed_sync_leaves_mirror_unusable(self, test_db, mirror_setup):
+        sync, user = mirror_setup
+        gcal = GoogleCalendarService(
+            test_db,
+            transport=httpx.MockTransport(lambda request: httpx.Response(500)),
+        )
+
+        await gcal.sync_busy_mirror(sync, user.id)
+
+        assert sync.mirror_synced_at is None
+        assert not gcal._is_mirror_fresh(sync)
+
+    async def test_failed_full_resync_keeps_previous_rows(self, test_db, mirror_setup):
+        sync, user = mirror_setup
+        stub = StubCalendar([_event("a", 9)])
+        gcal = GoogleCalendarService(
+            test_db, transport=httpx.MockTransport(stub.handler)
+        )
+        await gcal.sync_busy_mirror(sync, user.id)
+
+        # Token expires, then the full resync itself fails
+        def failing(request: httpx.Request) -> httpx.Response:
+            if "syncToken" in request.url.params:
+                return httpx.Response(410, json={"error": "gone"})
+            return httpx.Response(500)
+
+        gcal.transport = httpx.MockTransport(failing)
+        await gcal.sync_busy_mirror(sync, user.id)
+
+        assert await _mirrored_event_ids(test_db, sync.id) == {"a"}
+        assert sync.mirror_synced_at is None  # Reads fall back to FreeBusy
+
+
+@pytest.mark.asyncio
+class TestBookingPathRefresh:
+    async def test_incremental_refresh_does_not_commit(self, test_db, mirror_setup):
+        sync, user = mirror_setup
+        stub = StubCalendar([_event("a", 9)])
+        gcal = GoogleCalendarService(
+            test_db, transport=httpx.MockTransport(stub.handler)
+        )
+        await gcal.sync_busy_mirror(sync, user.id)
+        stub.changes = [_event("c", 10)]
+
+        with patch.object(test_db, "commit") as commit:
+            busy = await gcal.get_busy_times(
+                user.id,
+                sync.schedule_id,
+                datetime(2030, 12, 16, 0, 0),
+                datetime(2030, 12, 16, 23, 0),
+                refresh=True,
+            )
+
+        commit.assert_not_called()
+        assert stub.requests[-1]["syncToken"] == "tok-1"
+        assert len(busy) == 2
+
+    async def test_unbootstrapped_mirror_uses_freebusy(self, test_db, mirror_setup):
+        sync, user = mirror_setup
+        stub = StubCalendar([_event("a", 9)])
+        gcal = GoogleCalendarService(
+            test_db, transport=httpx.MockTransport(stub.handler)
+        )
+
+        await gcal.get_busy_times(
+            user.id,
+            sync.schedule_id,
+            datetime(2030, 12, 16, 0, 0),
+            datetime(2030, 12, 16, 23, 0),
+            refresh=True,
+        )
+
+        # No (paginated) Events API full sync on the request path
+        assert not any("singleEvents" in params for params in stub.requests)
+        assert sync.sync_tokens is None or sync.sync_tokens == {}
+
+    async def test_expired_token_is_left_to_the_refresher(self, test_db, mirror_setup):
+        sync, user = mirror_setup
+        stub = StubCalendar([_event("a", 9)])
+        gcal = GoogleCalendarService(
+            test_db, transport=httpx.MockTransport(stub.handler)
+        )
+        await gcal.sync_busy_mirror(sync, user.id)
+        stub.expire_token = True
+
+        await gcal.get_busy_times(
+            user.id,
+            sync.schedule_id,
+            datetime(2030, 12, 16, 0, 0),
+            datetime(2030, 12, 16, 23, 0),
+            refresh=True,
+        )
+
+        # No full resync on the request path; rows kept, mirror marked stale
+        events_requests = [p for p in stub.requests if "singleEvents" in p]
+        assert all("syncToken" in params for params in events_requests[1:])
+        assert await _mirrored_event_ids(test_db, sync.id) == {"a"}
+        assert sync.mirror_synced_at is None
+        assert sync.sync_tokens == {}
+
+        # The background refresher then runs the full sync
+        await gcal.sync_busy_mirror(sync, user.id)
+        assert sync.sync_tokens == {"work@example.com": "tok-1"}
+        assert sync.mirror_synced_at is not None
@@ -0,0 +1,155 @@
+"""Tests for the conversation analyzer (MessageLog -> AletheIA -> analyses)."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.models import (
+    DailyConversationAnalysis,
+    MessageDirection,
+    MessageLog,
+    Patient,
+    SystemEventLog,
+)
+from app.workers.conversation_analyzer import analyze_daily_conversations
+
+CALM = {
+    "summary": "Día tranquilo.",
+    "sentiment_score": 0.4,
+    "emotional_state": "Sereno",
+    "risk_flags": [],
+    "suggestion": "",
+}
+RISK = {**CALM, "sentiment_score": -0.8, "risk_flags": ["Abandono de Medicación"]}
+
+
+def _message(org, patient, content: str, minutes_ago: int) -> MessageLog:
+    return MessageLog(
+        organization_id=org.id,
+        patient_id=patient.id,
+        direction=MessageDirection.INBOUND,
+        content=content,
+        provider_id=f"SM{uuid.uuid4().hex[:20]}",
+        timestamp=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+    )
+
+
+async def _patient_with_chat(db, org, name: str, messages: int) -> Patient:
+    patient = Patient(
+        id=uuid.uuid4(), organization_id=org.id, first_name=name, last_name="Test"
+    )
+    db.add(patient)
+    await db.flush()
+    db.add_all(
+        [_message(org, patient, f"{name} {i}", messages - i) for i in range(messages)]
+    )
+    return patient
+
+
+class _FakeAletheia:
+    """Records each call's transcript and rolling context."""
+
+    def __init__(self, risky_patients=()):
+        self.risky_patients = set(risky_patients)
+        self.calls = {}
+
+    def with_context(self, db=None, organization_id=None, patient_id=None):
+        async def analyze_chat_transcript(transcript, previous_summary=None):
+            self.calls[patient_id] = (transcript, previous_summary)
+            return RISK if patient_id in self.risky_patients else CALM
+
+        return SimpleNamespace(analyze_chat_transcript=analyze_chat_transcript)
+
+
+async def _analyze(db, aletheia) -> dict:
+    with (
+        patch("app.workers.conversation_analyzer.get_aletheia", return_value=aletheia),
+        patch(
+            "app.workers.conversation_analyzer.settings.CONVERSATION_ANALYSIS_COMMIT_BATCH",
+            1,
+        ),
+    ):
+        return await analyze_daily_conversations(db)
+
+
+async def _analysis(db, patient) -> DailyConversationAnalysis:
+    result = await db.execute(
+        select(DailyConversationAnalysis)
+        .where(DailyConversationAnalysis.patient_id == patient.id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+async def _risk_events(db) -> list[SystemEventLog]:
+    result = await db.scalars(
+        select(SystemEventLog).where(
+            SystemEventLog.event_type == "RISK_DETECTED_IN_CHAT"
+        )
+    )
+    return result.all()
+
+
+@pytest.mark.asyncio
+class TestConversationAnalyzer:
+    async def test_first_run_analyzes_every_chat(self, test_db, test_org):
+        calm = await _patient_with_chat(test_db, test_org, "Calm", 2)
+        risky = await _patient_with_chat(test_db, test_org, "Risky", 3)
+        await test_db.commit()
+        aletheia = _FakeAletheia(risky_patients={risky.id})
+
+        stats = await _analyze(test_db, aletheia)
+
+        assert stats == {
+            "analyzed": 2,
+            "messages": 5,
+            "risks_detected": 1,
+            "failed": 0,
+        }
+        assert aletheia.calls[risky.id] == (
+            "Paciente: Risky 0\nPaciente: Risky 1\nPaciente: Risky 2",
+            None,
+        )
+        assert (await _analysis(test_db, calm)).message_count == 2
+        assert (await _analysis(test_db, risky)).message_count == 3
+
+        # The risk event is queued in the outbox with its analysis
+        [event] = await _risk_events(test_db)
+        assert event.entity_id == risky.id
+        assert event.payload["new_risk_flags"] == ["Abandono de Medicación"]
+
+    async def test_later_runs_only_send_new_messages(self, test_db, test_org):
+        risky = await _patient_with_chat(test_db, test_org, "Risky", 2)
+        await test_db.commit()
+        aletheia = _FakeAletheia(risky_patients={risky.id})
+        await _analyze(test_db, aletheia)
+
+        # Nothing new: no AletheIA call
+        aletheia.calls.clear()
+        assert (await _analyze(test_db, aletheia))["analyzed"] == 0
+        assert aletheia.calls == {}
+
+        test_db.add(_message(test_org, risky, "Sigo sin tomarla", 0))
+        await test_db.commit()
+        stats = await _analyze(test_db, aletheia)
+
+        assert stats["messages"] == 1
+        assert aletheia.calls[risky.id] == (
+            "Paciente: Sigo sin tomarla",
+            RISK["summary"],
+        )
+        analysis = await _analysis(test_db, risky)
+        assert analysis.message_count == 3
+        assert analysis.risk_flags == ["Abandono de Medicación"]
+
+        # Already reported today
+        assert stats["risks_detected"] == 0
+        assert len(await _risk_events(test_db)) == 1
+        count = await test_db.scalar(
+            select(func.count()).select_from(DailyConversationAnalysis)
+        )
+        assert count == 1
@@ -0,0 +1,180 @@
+"""Tests for checkpointed Cortex bulk re-processing (cortex_bulk_runs)."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select, update
+
+from app.db.models import (
+    BulkRunStatus,
+    ClinicalEntry,
+    CortexBulkRun,
+    EntryType,
+    Patient,
+    ProcessingStatus,
+)
+from app.services.clinical_service import ProcessingResult
+from app.services.cortex.bulk import create_bulk_run, reopen_bulk_run, run_bulk
+
+BASE_TIME = datetime(2026, 9, 1, 9, 0, tzinfo=timezone.utc)
+
+
+async def _entries(db, org, count: int, **values) -> list[ClinicalEntry]:
+    patient = Patient(
+        id=uuid.uuid4(), organization_id=org.id, first_name="Bulk", last_name="Test"
+    )
+    db.add(patient)
+    await db.flush()
+    entries = [
+        ClinicalEntry(
+            id=uuid.uuid4(),
+            patient_id=patient.id,
+            entry_type=EntryType.SESSION_NOTE,
+            content=f"Nota {i}",
+            processing_status=ProcessingStatus.COMPLETED,
+            created_at=BASE_TIME + timedelta(minutes=i),
+            **values,
+        )
+        for i in range(count)
+    ]
+    db.add_all(entries)
+    await db.commit()
+    return entries
+
+
+class _FakeProcessing:
+    """Stands in for ClinicalService.process_entry; records processed ids."""
+
+    def __init__(self, failing=(), on_call=None):
+        self.failing = set(failing)
+        self.on_call = on_call
+        self.processed = []
+
+    async def __call__(self, service, entry, patient, organization):
+        self.processed.append(entry.id)
+        if self.on_call:
+            await self.on_call(service.db)
+        if entry.id in self.failing:
+            return ProcessingResult(
+                False, "unknown", "unknown", False, error="Vertex timeout"
+            )
+        return ProcessingResult(True, "clinical_soap_v1", "STANDARD", False)
+
+
+async def _run(db, run_id, fake, page_size=2) -> dict:
+    with (
+        patch(
+            "app.services.clinical_service.ClinicalService.process_entry",
+            _bound(fake),
+        ),
+        patch("app.services.cortex.bulk.settings.CORTEX_BULK_PAGE_SIZE", page_size),
+    ):
+        return await run_bulk(db, run_id)
+
+
+def _bound(fake):
+    async def process_entry(self, entry, patient, organization, file_path=None):
+        return await fake(self, entry, patient, organization)
+
+    return process_entry
+
+
+@pytest.mark.asyncio
+class TestBulkRun:
+    async def test_processes_matching_entries_in_pages(self, test_db, test_org):
+        entries = await _entries(test_db, test_org, 5)
+        ghost = (await _entries(test_db, test_org, 1, is_ghost=True))[0]
+        busy = (
+            await _entries(
+                test_db, test_org, 1, processing_status=ProcessingStatus.PROCESSING
+            )
+        )[0]
+        run = await create_bulk_run(test_db, {"organization_id": test_org.id})
+        await test_db.commit()
+        assert run.total == 5
+
+        fake = _FakeProcessing(failing={entries[3].id})
+        progress = await _run(test_db, run.id, fake)
+
+        assert sorted(fake.processed) == sorted(e.id for e in entries)
+        assert ghost.id not in fake.processed and busy.id not in fake.processed
+        assert progress["status"] == "SUCCEEDED"
+        assert (progress["processed"], progress["succeeded"], progress["failed"]) == (
+            5,
+            4,
+            1,
+        )
+        assert progress["errors"] == [
+            {"entry_id": str(entries[3].id), "error": "Vertex timeout"}
+        ]
+        assert progress["percent"] == 100.0
+
+        # Finished runs are not processed again
+        fake.processed.clear()
+        await _run(test_db, run.id, fake)
+        assert fake.processed == []
+
+    async def test_resumes_after_last_checkpoint(self, test_db, test_org):
+        entries = await _entries(test_db, test_org, 5)
+        run = await create_bulk_run(test_db, {"organization_id": test_org.id})
+        # Interrupted after its first page (checkpoint at the 2nd entry)
+        run.status = BulkRunStatus.RUNNING
+        run.started_at = run.updated_at = datetime.now(timezone.utc)
+        run.cursor_created_at, run.cursor_id = entries[1].created_at, entries[1].id
+        run.processed = run.succeeded = 2
+        await test_db.commit()
+
+        fake = _FakeProcessing()
+        progress = await _run(test_db, run.id, fake)
+
+        assert sorted(fake.processed) == sorted(e.id for e in entries[2:])
+        assert progress["status"] == "SUCCEEDED"
+        assert progress["processed"] == 5
+
+    async def test_reopened_cancelled_run_resumes(self, test_db, test_org):
+        entries = await _entries(test_db, test_org, 5)
+        run = await create_bulk_run(test_db, {"organization_id": test_org.id})
+        # Cancelled after its first page (checkpoint at the 2nd entry)
+        run.status = BulkRunStatus.CANCELLED
+        run.started_at = run.updated_at = datetime.now(timezone.utc)
+        run.cursor_created_at, run.cursor_id = entries[1].created_at, entries[1].id
+        run.processed = run.succeeded = 2
+        await test_db.commit()
+
+        fake = _FakeProcessing()
+        await _run(test_db, run.id, fake)
+        assert fake.processed == []  # Finished runs are skipped as they are
+
+        reopen_bulk_run(run)
+        await test_db.commit()
+        progress = await _run(test_db, run.id, fake)
+
+        assert sorted(fake.processed) == sorted(e.id for e in entries[2:])
+        assert progress["status"] == "SUCCEEDED"
+        with pytest.raises(ValueError, match="already SUCCEEDED"):
+            reopen_bulk_run(run)
+
+    async def test_cancel_stops_at_next_checkpoint(self, test_db, test_org):
+        entries = await _entries(test_db, test_org, 5)
+        run = await create_bulk_run(test_db, {"organization_id": test_org.id})
+        await test_db.commit()
+
+        async def cancel(session):
+            await session.execute(
+                update(CortexBulkRun)
+                .where(CortexBulkRun.id == run.id)
+                .values(status=BulkRunStatus.CANCELLED)
+            )
+
+        fake = _FakeProcessing(on_call=cancel)
+        progress = await _run(test_db, run.id, fake)
+
+        assert len(fake.processed) == 2  # First page only
+        assert progress["status"] == "CANCELLED"
+        assert progress["processed"] == 2
+        saved = await test_db.scalar(
+            select(CortexBulkRun.cursor_id).where(CortexBulkRun.id == run.id)
+        )
+        assert saved == entries[1].id
@@ -0,0 +1,86 @@
+"""Tests for the Cortex step result cache (cortex_step_results)."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.db.models import CortexStepResult, Patient, PrivacyTier
+from app.services.cortex.cache import (
+    StepCache,
+    prune_step_results,
+    purge_patient_step_results,
+)
+from app.services.cortex.context import PatientEventContext
+from app.services.cortex.stages import get_step
+
+
+async def _patient(db, org) -> Patient:
+    patient = Patient(
+        id=uuid.uuid4(), organization_id=org.id, first_name="Cache", last_name="Test"
+    )
+    db.add(patient)
+    await db.flush()
+    return patient
+
+
+def _context(patient, transcript="Hola") -> PatientEventContext:
+    context = PatientEventContext(
+        patient_id=patient.id, organization_id=patient.organization_id
+    )
+    context.resolved_tier = PrivacyTier.STANDARD
+    context.add_output("transcribe", "transcript", transcript)
+    return context
+
+
+async def _count(db) -> int:
+    return await db.scalar(select(func.count()).select_from(CortexStepResult))
+
+
+@pytest.mark.asyncio
+class TestStepCacheStorage:
+    async def test_put_get_and_prune(self, test_db, test_org):
+        cache = StepCache(test_db)
+        step = get_step("transcribe")
+        context = _context(await _patient(test_db, test_org))
+
+        assert await cache.get("k" * 64) is None
+        await cache.put("k" * 64, step, context)
+        await test_db.commit()
+        assert await cache.get("k" * 64) == {"transcript": "Hola"}
+
+        # Re-memoizing the same key replaces the outputs
+        context.add_output("transcribe", "transcript", "Hola de nuevo")
+        await cache.put("k" * 64, step, context)
+        assert await cache.get("k" * 64) == {"transcript": "Hola de nuevo"}
+
+        # Expired results are ignored, then pruned
+        await test_db.execute(
+            update(CortexStepResult).values(
+                expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)
+            )
+        )
+        await test_db.commit()
+        assert await cache.get("k" * 64) is None
+        assert await prune_step_results(test_db) == {"deleted": 1}
+
+    async def test_purge_and_delete_with_patient(self, test_db, test_org):
+        cache = StepCache(test_db)
+        step = get_step("transcribe")
+        ghost = await _patient(test_db, test_org)
+        other = await _patient(test_db, test_org)
+        await cache.put("a" * 64, step, _context(ghost))
+        await cache.put("b" * 64, step, _context(other))
+        await test_db.commit()
+
+        # Switching a patient to GHOST purges only their results
+        assert await purge_patient_step_results(test_db, Patient.id == ghost.id) == 1
+        await test_db.commit()
+        assert await cache.get("a" * 64) is None
+        assert await cache.get("b" * 64) == {"transcript": "Hola"}
+
+        # Erasing the patient deletes the rest (ON DELETE CASCADE)
+        await test_db.delete(other)
+        await test_db.commit()
+        assert await _count(test_db) == 0
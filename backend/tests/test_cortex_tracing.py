@@ -0,0 +1,103 @@
+"""Tests for persisted Cortex pipeline traces (cortex_pipeline_traces)."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.db.models import CortexPipelineTrace, PrivacyTier
+from app.services.cortex.context import PatientEventContext
+from app.services.cortex.tracing import (
+    PipelineTrace,
+    StageSpan,
+    prune_pipeline_traces,
+    save_trace,
+    stage_latency_percentiles,
+)
+
+
+def _trace(org, pipeline_name="clinical_soap_v1", analyze_ms=1000, error=None):
+    context = PatientEventContext(patient_id=uuid.uuid4(), organization_id=org.id)
+    context.resolved_tier = PrivacyTier.STANDARD
+    trace = PipelineTrace(pipeline_name, context)
+    trace.stages = [
+        StageSpan("transcribe", "transcribe", "whisper-1", wall_ms=50, cached=True),
+        StageSpan(
+            "analyze",
+            "analyze",
+            "gemini-2.5-pro",
+            wall_ms=analyze_ms,
+            queue_wait_ms=10,
+            tokens_input=1000,
+            tokens_output=200,
+            status="error" if error else "ok",
+        ),
+    ]
+    trace.phases = {"finalize": 5, "ledger": 3}
+    trace.finish(error)
+    return trace
+
+
+@pytest.mark.asyncio
+class TestPipelineTraces:
+    async def test_saved_summary(self, test_db, test_org):
+        await save_trace(test_db, _trace(test_org))
+        await test_db.commit()
+
+        row = await test_db.scalar(
+            select(CortexPipelineTrace).where(
+                CortexPipelineTrace.organization_id == test_org.id
+            )
+        )
+        assert row.succeeded is True
+        assert row.privacy_tier == "STANDARD"
+        assert (row.tokens_input, row.tokens_output) == (1000, 200)
+        assert (row.finalize_ms, row.ledger_ms) == (5, 3)
+        assert [s["stage"] for s in row.stages] == ["transcribe", "analyze"]
+
+    async def test_percentiles_per_stage_and_model(self, test_db, test_org):
+        since = datetime.now(timezone.utc) - timedelta(hours=1)
+        for ms in range(100, 1100, 100):
+            await save_trace(test_db, _trace(test_org, analyze_ms=ms))
+        await save_trace(test_db, _trace(test_org, analyze_ms=99999, error=True))
+        await save_trace(test_db, _trace(test_org, "other_pipeline"))
+        await test_db.commit()
+
+        report = await stage_latency_percentiles(test_db, since, "clinical_soap_v1")
+
+        stages = {row["step_type"]: row for row in report["stages"]}
+        analyze = stages["analyze"]
+        assert analyze["model_id"] == "gemini-2.5-pro"
+        assert analyze["count"] == 10  # Failed stages are left out
+        assert analyze["wall_p50_ms"] == 550.0
+        assert analyze["wall_p95_ms"] == 955.0
+        assert analyze["queue_wait_p50_ms"] == 10.0
+        assert analyze["avg_tokens_input"] == 1000
+        assert stages["transcribe"]["cache_hit_rate"] == 1.0
+        phases = {row["phase"]: row for row in report["phases"]}
+        assert phases["finalize"]["count"] == 11
+        assert phases["finalize"]["wall_p50_ms"] == 5.0
+
+    async def test_prune_deletes_expired_traces(self, test_db, test_org):
+        await save_trace(test_db, _trace(test_org))
+        await save_trace(test_db, _trace(test_org))
+        await test_db.execute(
+            update(CortexPipelineTrace)
+            .where(
+                CortexPipelineTrace.id
+                == select(CortexPipelineTrace.id).limit(1).scalar_subquery()
+            )
+            .values(created_at=datetime.now(timezone.utc) - timedelta(days=40))
+        )
+        await test_db.commit()
+
+        with patch(
+            "app.services.cortex.tracing.settings.CORTEX_TRACE_RETENTION_DAYS", 30
+        ):
+            assert await prune_pipeline_traces(test_db) == {"deleted": 1}
+        remaining = await test_db.scalar(
+            select(func.count()).select_from(CortexPipelineTrace)
+        )
+        assert remaining == 1
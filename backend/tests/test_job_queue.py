@@ -0,0 +1,265 @@
+"""Tests for the durable job queue (jobs table run by job workers)."""
+
+import pytest
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.models import (
+    ClinicalEntry,
+    EntryType,
+    Job,
+    JobStatus,
+    Patient,
+    ProcessingStatus,
+)
+from app.services.cortex import CortexOrchestrator
+from app.services.job_queue import ANALYZE_CLINICAL_ENTRY, enqueue_job
+from app.workers.job_worker import (
+    JOB_HANDLERS,
+    MAX_RETRY_DELAY,
+    JobHandler,
+    claim_jobs,
+    drain_jobs,
+    heartbeat,
+    retry_delay,
+)
+
+# =============================================================================
+# Backoff (no database)
+# =============================================================================
+
+
+class TestRetryDelay:
+    def test_doubles_per_attempt(self):
+        base = timedelta(seconds=settings.JOB_RETRY_BASE_SECONDS)
+        assert retry_delay(1) == base
+        assert retry_delay(2) == 2 * base
+        assert retry_delay(3) == 4 * base
+
+    def test_capped(self):
+        assert retry_delay(50) == MAX_RETRY_DELAY
+
+
+# =============================================================================
+# Queue (real Postgres)
+# =============================================================================
+
+
+async def _job(db, job_id) -> Job:
+    result = await db.execute(
+        select(Job).where(Job.id == job_id).execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+async def _make_due(db, job_id) -> None:
+    """Skip the backoff of a queued job."""
+    await db.execute(
+        update(Job).where(Job.id == job_id).values(run_after=Job.created_at)
+    )
+    await db.commit()
+
+
+@pytest.mark.asyncio
+class TestJobQueue:
+    async def test_dedupe_key_allows_one_active_job(self, test_db):
+        first = await enqueue_job(test_db, "test.kind", {}, dedupe_key="entry:1")
+        duplicate = await enqueue_job(test_db, "test.kind", {}, dedupe_key="entry:1")
+        other = await enqueue_job(test_db, "test.kind", {}, dedupe_key="entry:2")
+        await test_db.commit()
+
+        assert first and other
+        assert duplicate is None
+
+        # A finished job frees its key
+        await test_db.execute(
+            update(Job).where(Job.id == first).values(status=JobStatus.SUCCEEDED)
+        )
+        await test_db.commit()
+        assert await enqueue_job(test_db, "test.kind", {}, dedupe_key="entry:1")
+
+    async def test_claim_by_priority(self, test_db):
+        low = await enqueue_job(test_db, "test.kind", {}, priority=0)
+        high = await enqueue_job(test_db, "test.kind", {}, priority=10)
+        await test_db.commit()
+
+        claimed = await claim_jobs(test_db, "w1", limit=1)
+
+        assert [j.id for j in claimed] == [high]
+        job = await _job(test_db, high)
+        assert job.status == JobStatus.RUNNING
+        assert job.attempts == 1
+        assert job.locked_by == "w1"
+        assert (await _job(test_db, low)).status == JobStatus.QUEUED
+
+    async def test_drain_runs_handler(self, test_db):
+        run = AsyncMock()
+        job_id = await enqueue_job(test_db, "test.kind", {"n": 1})
+        await test_db.commit()
+
+        with patch.dict(JOB_HANDLERS, {"test.kind": JobHandler(run)}):
+            stats = await drain_jobs(test_db, "w1")
+
+        assert stats == {"claimed": 1, "succeeded": 1, "retried": 0, "failed": 0}
+        assert run.await_args.args[1] == {"n": 1}
+        job = await _job(test_db, job_id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.locked_by is None
+        assert job.finished_at is not None
+
+    async def test_failures_retry_then_fail(self, test_db):
+        run = AsyncMock(side_effect=RuntimeError("Gemini timeout"))
+        on_failure = AsyncMock()
+        job_id = await enqueue_job(test_db, "test.kind", {"n": 1}, max_attempts=2)
+        await test_db.commit()
+
+        with patch.dict(JOB_HANDLERS, {"test.kind": JobHandler(run, on_failure)}):
+            assert (await drain_jobs(test_db, "w1"))["retried"] == 1
+            job = await _job(test_db, job_id)
+            assert job.status == JobStatus.QUEUED
+            assert job.last_error == "Gemini timeout"
+
+            # Backed off: not claimable until due
+            assert (await drain_jobs(test_db, "w1"))["claimed"] == 0
+            await _make_due(test_db, job_id)
+
+            assert (await drain_jobs(test_db, "w1"))["failed"] == 1
+
+        assert (await _job(test_db, job_id)).status == JobStatus.FAILED
+        on_failure.assert_awaited_once()
+        assert on_failure.await_args.args[1:] == ({"n": 1}, "Gemini timeout")
+
+    async def test_expired_lease_is_reclaimed(self, test_db):
+        job_id = await enqueue_job(test_db, "test.kind", {})
+        await test_db.commit()
+        await claim_jobs(test_db, "dead-worker")
+        assert await claim_jobs(test_db, "w2") == []  # Leased
+
+        # The first worker stopped heartbeating
+        await test_db.execute(
+            update(Job).where(Job.id == job_id).values(lease_expires_at=Job.created_at)
+        )
+        await test_db.commit()
+
+        reclaimed = await claim_jobs(test_db, "w2")
+        assert [j.id for j in reclaimed] == [job_id]
+        assert (await _job(test_db, job_id)).attempts == 2
+
+        # The old owner can no longer touch it
+        assert not await heartbeat(test_db, job_id, "dead-worker")
+        assert await heartbeat(test_db, job_id, "w2")
+
+    async def test_lost_final_attempt_fails_job(self, test_db):
+        on_failure = AsyncMock()
+        job_id = await enqueue_job(test_db, "test.kind", {}, max_attempts=1)
+        await test_db.commit()
+        await claim_jobs(test_db, "dead-worker")
+        await test_db.execute(
+            update(Job).where(Job.id == job_id).values(lease_expires_at=Job.created_at)
+        )
+        await test_db.commit()
+
+        run = AsyncMock()
+        with patch.dict(JOB_HANDLERS, {"test.kind": JobHandler(run, on_failure)}):
+            assert (await drain_jobs(test_db, "w2"))["failed"] == 1
+
+        run.assert_not_awaited()
+        on_failure.assert_awaited_once()
+        assert (await _job(test_db, job_id)).status == JobStatus.FAILED
+
+    async def test_concurrent_claims_skip_locked_rows(self, engine, test_db):
+        ids = [await enqueue_job(test_db, "test.kind", {"n": n}) for n in range(4)]
+        await test_db.commit()
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with factory() as holder, factory() as other:
+            locked = await holder.execute(
+                select(Job.id).where(Job.id.in_(ids[:2])).with_for_update()
+            )
+            locked_ids = set(locked.scalars())
+
+            claimed = await claim_jobs(other, "w1", limit=10)
+            assert {j.id for j in claimed} == set(ids) - locked_ids
+            await holder.rollback()
+
+
+@pytest.mark.asyncio
+class TestAnalyzeEndpointQueuesJob:
+    async def test_reanalyze_after_failed_job(self, client, test_db):
+        await client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": "jobs@example.com",
+                "password": "Password123!",
+                "full_name": "Test User",
+                "org_name": "Jobs Org",
+            },
+        )
+        patient = await client.post(
+            "/api/v1/patients/",
+            json={"first_name": "Job", "last_name": "Patient", "email": "j@x.com"},
+        )
+        entry = await client.post(
+            "/api/v1/clinical-entries/",
+            json={
+                "patient_id": patient.json()["id"],
+                "entry_type": "SESSION_NOTE",
+                "content": "Sesión tranquila.",
+            },
+        )
+        entry_id = entry.json()["id"]
+        url = f"/api/v1/clinical-entries/{entry_id}/analyze"
+
+        assert (await client.post(url)).status_code == 202
+        assert (await client.post(url)).status_code == 409
+
+        jobs = (await test_db.execute(select(Job).order_by(Job.created_at))).scalars()
+        kinds = {job.kind: job for job in jobs}
+        assert set(kinds) == {"vault.sanitize_clinical_entry", "clinical.analyze_entry"}
+        analysis = kinds["clinical.analyze_entry"]
+        assert analysis.payload["entry_id"] == entry_id
+
+        # Once the job is over (here: failed), a new analysis can be queued
+        await test_db.execute(
+            update(Job).where(Job.id == analysis.id).values(status=JobStatus.FAILED)
+        )
+        await test_db.commit()
+        assert (await client.post(url)).status_code == 202
+
+
+@pytest.mark.asyncio
+class TestAnalyzeClinicalEntryHandler:
+    async def test_failed_analysis_fails_the_attempt(
+        self, test_db, test_org, test_user
+    ):
+        patient = Patient(
+            organization_id=test_org.id, first_name="Job", last_name="Patient"
+        )
+        test_db.add(patient)
+        await test_db.flush()
+        entry = ClinicalEntry(
+            patient_id=patient.id,
+            entry_type=EntryType.SESSION_NOTE,
+            content="Sesión tranquila.",
+        )
+        test_db.add(entry)
+        await test_db.commit()
+        payload = {"entry_id": str(entry.id), "user_id": str(test_user.id)}
+
+        with patch.object(
+            CortexOrchestrator,
+            "run_pipeline",
+            AsyncMock(side_effect=RuntimeError("Gemini timeout")),
+        ):
+            # Raised (not swallowed), so the job is retried with backoff
+            with pytest.raises(RuntimeError, match="Gemini timeout"):
+                await JOB_HANDLERS[ANALYZE_CLINICAL_ENTRY].run(test_db, payload)
+
+        await test_db.refresh(entry)
+        assert entry.processing_status == ProcessingStatus.FAILED
+        assert entry.processing_error == "Gemini timeout"
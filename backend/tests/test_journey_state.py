@@ -0,0 +1,160 @@
+"""Tests for the materialized current journey stage (patient_journey_state)."""
+
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from app.db.models import JourneyLog, Patient, PatientJourneyState
+from app.services.automation_engine import AutomationEngine
+from app.services.journey_state import rebuild_journey_state, record_stage
+
+
+async def _patient(db, org, journey_status=None) -> Patient:
+    patient = Patient(
+        organization_id=org.id,
+        first_name="Journey",
+        last_name="Test",
+        email=f"journey-{uuid.uuid4().hex[:8]}@example.com",
+        journey_status=journey_status or {},
+    )
+    db.add(patient)
+    await db.commit()
+    return patient
+
+
+async def _states(db, patient) -> dict[str, str]:
+    result = await db.execute(
+        select(PatientJourneyState.journey_key, PatientJourneyState.stage).where(
+            PatientJourneyState.patient_id == patient.id
+        )
+    )
+    return dict(result.all())
+
+
+@pytest.mark.asyncio
+class TestPatientJourneyState:
+    async def test_engine_updates_state_with_the_log(self, test_db, test_org):
+        patient = await _patient(test_db, test_org)
+        engine = AutomationEngine(test_db)
+
+        await engine._update_patient_journey_status(
+            str(patient.id), "intake", "AWAITING_PAYMENT"
+        )
+        await engine._update_patient_journey_status(
+            str(patient.id), "booking", "CONFIRMED"
+        )
+        await engine._update_patient_journey_status(str(patient.id), "intake", "PAID")
+        await test_db.commit()
+
+        assert await _states(test_db, patient) == {
+            "intake": "PAID",
+            "booking": "CONFIRMED",
+        }
+
+    async def test_same_stage_keeps_its_entry_time(self, test_db, test_org):
+        patient = await _patient(test_db, test_org)
+        entered = datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)
+        await record_stage(test_db, patient.id, "intake", "AWAITING_PAYMENT")
+        await test_db.execute(
+            update(PatientJourneyState)
+            .where(PatientJourneyState.patient_id == patient.id)
+            .values(entered_at=entered)
+        )
+
+        async def entered_at():
+            return await test_db.scalar(
+                select(PatientJourneyState.entered_at).where(
+                    PatientJourneyState.patient_id == patient.id
+                )
+            )
+
+        await record_stage(test_db, patient.id, "intake", "AWAITING_PAYMENT")
+        assert await entered_at() == entered  # Stage age not reset
+
+        await record_stage(test_db, patient.id, "intake", "PAID")
+        assert await entered_at() > entered
+
+    async def test_state_rolls_back_with_the_transaction(self, test_db, test_org):
+        patient = await _patient(test_db, test_org)
+
+        await AutomationEngine(test_db)._update_patient_journey_status(
+            str(patient.id), "intake", "AWAITING_PAYMENT"
+        )
+        await test_db.rollback()
+
+        assert await _states(test_db, patient) == {}
+
+    async def test_rebuild_uses_latest_log_then_journey_status(self, test_db, test_org):
+        patient = await _patient(
+            test_db, test_org, journey_status={"carta_natal": "AWAITING_BIRTH_DATA"}
+        )
+        now = datetime.now(timezone.utc)
+        for stage, hours_ago in [("ONBOARDING", 30), ("DEEP_DIVE", 5)]:
+            test_db.add(
+                JourneyLog(
+                    patient_id=patient.id,
+                    journey_key="despertar_8s",
+                    to_stage=stage,
+                    changed_at=now - timedelta(hours=hours_ago),
+                )
+            )
+        await test_db.flush()
+
+        await rebuild_journey_state(test_db, [patient.id])
+        await test_db.commit()
+
+        assert await _states(test_db, patient) == {
+            "despertar_8s": "DEEP_DIVE",
+            "carta_natal": "AWAITING_BIRTH_DATA",
+        }
+        entered = await test_db.scalar(
+            select(PatientJourneyState.entered_at).where(
+                PatientJourneyState.patient_id == patient.id,
+                PatientJourneyState.journey_key == "despertar_8s",
+            )
+        )
+        assert abs(entered - (now - timedelta(hours=5))) < timedelta(seconds=1)
+        # Only in journey_status: entry time unknown
+        fallback = await test_db.scalar(
+            select(PatientJourneyState.entered_at).where(
+                PatientJourneyState.patient_id == patient.id,
+                PatientJourneyState.journey_key == "carta_natal",
+            )
+        )
+        assert fallback is None
+
+    async def test_patients_list_status_filter(self, client, test_db):
+        await client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": "journey-filter@example.com",
+                "password": "Password123!",
+                "full_name": "Test User",
+                "org_name": "Journey Org",
+            },
+        )
+        ids = []
+        for name in ("Blocked", "Active"):
+            response = await client.post(
+                "/api/v1/patients/",
+                json={
+                    "first_name": name,
+                    "last_name": "Patient",
+                    "email": f"{name.lower()}@example.com",
+                },
+            )
+            ids.append(response.json()["id"])
+
+        await AutomationEngine(test_db)._update_patient_journey_status(
+            ids[0], "intake", "BLOCKED_HIGH_RISK"
+        )
+        await test_db.commit()
+
+        response = await client.get(
+            "/api/v1/patients/", params={"status_filter": "BLOCKED_HIGH_RISK"}
+        )
+
+        assert response.status_code == 200
+        assert [p["id"] for p in response.json()["data"]] == [ids[0]]
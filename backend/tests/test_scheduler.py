@@ -0,0 +1,71 @@
+"""Tests for the leader-elected scheduler (advisory lock + run history)."""
+
+import pytest
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+from sqlalchemy import select
+
+from app.db.models import ScheduledJobRun, ScheduledRunStatus
+from app.workers.scheduler import ClusterScheduler, LeaderElection, ScheduledJob
+
+LOCK_KEY = 0x7E57  # Not the production key
+
+
+@pytest.mark.asyncio
+class TestLeaderElection:
+    async def test_only_one_leader(self, engine):
+        first = LeaderElection(engine, LOCK_KEY)
+        second = LeaderElection(engine, LOCK_KEY)
+        try:
+            assert await first.try_acquire()
+            assert not await second.try_acquire()
+            assert await first.renew()
+
+            # Leadership passes on once released
+            await first.release()
+            assert not first.is_leader
+            assert await second.try_acquire()
+        finally:
+            await first.release()
+            await second.release()
+
+    async def test_lost_connection_steps_down(self, engine):
+        leader = LeaderElection(engine, LOCK_KEY)
+        other = LeaderElection(engine, LOCK_KEY)
+        try:
+            assert await leader.try_acquire()
+            await leader._conn.invalidate()  # Connection dropped
+
+            assert not await leader.renew()
+            assert not leader.is_leader
+            assert await other.try_acquire()
+        finally:
+            await leader.release()
+            await other.release()
+
+
+@pytest.mark.asyncio
+class TestRunHistory:
+    async def _run(self, engine, run):
+        job = ScheduledJob("test_job", "Test Job", run, timedelta(hours=1))
+        scheduler = ClusterScheduler(jobs=[job])
+        scheduler.leader.is_leader = True
+        return await scheduler.run_job(job)
+
+    async def test_success_records_stats(self, engine, test_db):
+        await self._run(engine, AsyncMock(return_value={"processed": 3}))
+
+        run = (await test_db.execute(select(ScheduledJobRun))).scalar_one()
+        assert run.job_id == "test_job"
+        assert run.status == ScheduledRunStatus.SUCCEEDED
+        assert run.stats == {"processed": 3}
+        assert run.finished_at is not None
+        assert run.duration_ms is not None
+
+    async def test_failure_recorded(self, engine, test_db):
+        await self._run(engine, AsyncMock(side_effect=RuntimeError("AI quota")))
+
+        run = (await test_db.execute(select(ScheduledJobRun))).scalar_one()
+        assert run.status == ScheduledRunStatus.FAILED
+        assert run.error == "AI quota"
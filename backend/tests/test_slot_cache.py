@@ -0,0 +1,164 @@
+"""Unit tests for the availability cache (app.services.slot_cache).
+
+Tests cover:
+1. Week bucketing helpers
+2. Cache hits skipping the SlotService pipeline
+3. Write-driven invalidation scopes from changed ORM rows
+"""
+
+import pytest
+import uuid
+from datetime import datetime, date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Booking, ServiceType, SchedulingType, TimeOff
+from app.services import slot_cache
+from app.services.slots import SlotService, TimeSlot
+
+
+@pytest.fixture(autouse=True)
+def clear_slot_cache():
+    slot_cache.clear()
+    yield
+    slot_cache.clear()
+
+
+def _service(schedule_id: uuid.UUID) -> ServiceType:
+    return ServiceType(
+        id=uuid.uuid4(),
+        duration_minutes=60,
+        capacity=1,
+        scheduling_type=SchedulingType.CALENDAR,
+        schedule_id=schedule_id,
+    )
+
+
+def _mock_db_for(service: ServiceType) -> AsyncMock:
+    mock_db = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = service
+    mock_db.execute.return_value = mock_result
+    return mock_db
+
+
+class TestWeekHelpers:
+    def test_week_start_is_monday(self):
+        assert slot_cache.week_start(date(2030, 1, 6)) == date(2029, 12, 31)
+        assert slot_cache.week_start(date(2029, 12, 31)) == date(2029, 12, 31)
+
+    def test_weeks_between_spans_partial_weeks(self):
+        weeks = slot_cache.weeks_between(date(2030, 1, 4), date(2030, 1, 15))
+        assert weeks == [date(2029, 12, 31), date(2030, 1, 7), date(2030, 1, 14)]
+
+
+@pytest.mark.asyncio
+class TestCachedSlots:
+    async def test_second_read_is_a_cache_hit(self):
+        """Repeated reads for the same weeks don't re-run the pipeline."""
+        therapist_id = uuid.uuid4()
+        service = _service(uuid.uuid4())
+        slot_service = SlotService(_mock_db_for(service))
+        computed = [
+            TimeSlot(
+                datetime(2030, 1, 7, 9, 0), datetime(2030, 1, 7, 10, 0), therapist_id
+            ),
+            TimeSlot(
+                datetime(2030, 1, 9, 9, 0), datetime(2030, 1, 9, 10, 0), therapist_id
+            ),
+        ]
+
+        with patch.object(
+            slot_service, "_compute_slots", AsyncMock(return_value=computed)
+        ) as mock_compute:
+            first = await slot_service.get_available_slots(
+                therapist_id, service.id, date(2030, 1, 7), date(2030, 1, 13), True
+            )
+            second = await slot_service.get_available_slots(
+                therapist_id, service.id, date(2030, 1, 7), date(2030, 1, 8), True
+            )
+
+        assert mock_compute.await_count == 1
+        assert [s.start for s in first] == [c.start for c in computed]
+        # Served from the cached week, trimmed to the requested range
+        assert [s.start for s in second] == [datetime(2030, 1, 7, 9, 0)]
+
+    async def test_invalidation_forces_recompute(self):
+        therapist_id = uuid.uuid4()
+        service = _service(uuid.uuid4())
+        slot_service = SlotService(_mock_db_for(service))
+
+        with patch.object(
+            slot_service, "_compute_slots", AsyncMock(return_value=[])
+        ) as mock_compute:
+            await slot_service.get_available_slots(
+                therapist_id, service.id, date(2030, 1, 7), date(2030, 1, 13), True
+            )
+            await slot_cache.invalidate_therapist(therapist_id, [date(2030, 1, 7)])
+            await slot_service.get_available_slots(
+                therapist_id, service.id, date(2030, 1, 7), date(2030, 1, 13), True
+            )
+
+        assert mock_compute.await_count == 2
+
+    async def test_uncached_read_bypasses_cache(self):
+        therapist_id = uuid.uuid4()
+        service = _service(uuid.uuid4())
+        slot_service = SlotService(_mock_db_for(service))
+
+        with patch.object(
+            slot_service, "_compute_slots", AsyncMock(return_value=[])
+        ) as mock_compute:
+            for _ in range(2):
+                await slot_service.get_available_slots(
+                    therapist_id, service.id, date(2030, 1, 7), date(2030, 1, 13)
+                )
+
+        assert mock_compute.await_count == 2
+
+
+class TestWriteDrivenInvalidation:
+    def test_booking_scope_covers_its_weeks(self):
+        therapist_id = uuid.uuid4()
+        booking = Booking(
+            therapist_id=therapist_id,
+            start_time=datetime(2030, 1, 7, 0, 30),
+            end_time=datetime(2030, 1, 7, 1, 30),
+        )
+
+        scopes = slot_cache._scopes_for(booking)
+
+        # Monday 00:30 can be overlapped by a slot starting on the Sunday before
+        assert scopes == {
+            (
+                "therapist",
+                therapist_id,
+                frozenset({date(2029, 12, 31), date(2030, 1, 7)}),
+            )
+        }
+
+    def test_long_time_off_invalidates_whole_therapist(self):
+        therapist_id = uuid.uuid4()
+        time_off = TimeOff(
+            user_id=therapist_id,
+            start_datetime=datetime(2030, 1, 1),
+            end_datetime=datetime(2030, 1, 1) + timedelta(weeks=52),
+        )
+
+        assert slot_cache._scopes_for(time_off) == {("therapist", therapist_id, None)}
+
+    def test_commit_drops_only_affected_entries(self):
+        therapist_id = uuid.uuid4()
+        schedule_id = uuid.uuid4()
+        service_id = uuid.uuid4()
+        kept = (therapist_id, schedule_id, service_id, date(2030, 2, 4))
+        dropped = (therapist_id, schedule_id, service_id, date(2030, 1, 7))
+        slot_cache._local_cache[kept] = []
+        slot_cache._local_cache[dropped] = []
+
+        slot_cache._invalidate_scopes(
+            {("therapist", therapist_id, frozenset({date(2030, 1, 7)}))}
+        )
+
+        assert kept in slot_cache._local_cache
+        assert dropped not in slot_cache._local_cache
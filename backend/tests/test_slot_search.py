@@ -0,0 +1,121 @@
+"""Unit tests for the organization-wide slot search (SlotSearchService)."""
+
+import pytest
+import uuid
+from datetime import datetime, date, timedelta
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.connect.public_booking import (
+    MAX_SEARCH_RANGE_DAYS,
+    search_public_slots,
+)
+from app.services.slot_search import SlotSearchService, Timeline
+from app.services.slots import TimeSlot
+
+
+def _timeline(hours: list[int], day: int = 16) -> Timeline:
+    therapist_id = uuid.uuid4()
+    return Timeline(
+        therapist_id=therapist_id,
+        service_id=uuid.uuid4(),
+        schedule_id=uuid.uuid4(),
+        slots=[
+            TimeSlot(
+                datetime(2030, 12, day, h, 0),
+                datetime(2030, 12, day, h + 1, 0),
+                therapist_id,
+            )
+            for h in hours
+        ],
+    )
+
+
+@pytest.mark.asyncio
+class TestMergeEarliest:
+    async def test_merges_timelines_in_start_order(self):
+        """Earliest slots are interleaved across therapists."""
+        search = SlotSearchService(MagicMock(spec=AsyncSession))
+        first = _timeline([9, 12, 15])
+        second = _timeline([10, 11])
+
+        with patch.object(
+            search.slots, "_get_gcal_busy_times", AsyncMock(return_value=[])
+        ):
+            results = await search._merge_earliest(
+                [first, second], date(2030, 12, 16), date(2030, 12, 16), limit=4
+            )
+
+        assert [s.start.hour for s in results] == [9, 10, 11, 12]
+        assert results[1].therapist_id == second.therapist_id
+
+    async def test_gcal_checked_lazily_for_winners_only(self):
+        """Busy times are fetched only for therapists whose slots surface."""
+        search = SlotSearchService(MagicMock(spec=AsyncSession))
+        early = _timeline([9, 10])
+        late = _timeline([9], day=20)
+        busy = AsyncMock(
+            return_value=[(datetime(2030, 12, 16, 9, 0), datetime(2030, 12, 16, 10, 0))]
+        )
+
+        with patch.object(search.slots, "_get_gcal_busy_times", busy):
+            results = await search._merge_earliest(
+                [early, late], date(2030, 12, 16), date(2030, 12, 20), limit=1
+            )
+
+        # 9:00 is busy in Google Calendar, 10:00 wins; the late therapist is
+        # never looked up
+        assert [s.start.hour for s in results] == [10]
+        busy.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+class TestLoadTimelines:
+    async def test_no_services_short_circuits(self):
+        """Only the services query runs when nothing is bookable."""
+        mock_db = AsyncMock(spec=AsyncSession)
+        empty = MagicMock()
+        empty.scalars.return_value.all.return_value = []
+        mock_db.execute.return_value = empty
+
+        search = SlotSearchService(mock_db)
+        slots = await search.search_earliest_slots(
+            organization_id=uuid.uuid4(),
+            start_date=date(2030, 12, 16),
+            end_date=date(2030, 12, 20),
+        )
+
+        assert slots == []
+        assert mock_db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+class TestSearchEndpoint:
+    async def test_range_is_capped(self):
+        start = date(2030, 12, 16)
+        db = MagicMock(spec=AsyncSession)
+
+        with patch.object(
+            SlotSearchService, "search_earliest_slots", AsyncMock(return_value=[])
+        ) as search:
+            await search_public_slots(
+                organization_id=uuid.uuid4(),
+                start_date=start,
+                end_date=start + timedelta(days=MAX_SEARCH_RANGE_DAYS),
+                service_ids=None,
+                limit=10,
+                db=db,
+            )
+            with pytest.raises(HTTPException) as exc:
+                await search_public_slots(
+                    organization_id=uuid.uuid4(),
+                    start_date=start,
+                    end_date=start + timedelta(days=MAX_SEARCH_RANGE_DAYS + 1),
+                    service_ids=None,
+                    limit=10,
+                    db=db,
+                )
+
+        assert exc.value.status_code == 400
+        search.assert_awaited_once()
@@ -9,13 +9,19 @@ Tests cover:
 
 import pytest
 import uuid
-from datetime import datetime, date, time, timedelta
+from datetime import datetime, date, time, timedelta, timezone
+from contextlib import ExitStack, contextmanager
 from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.connect.public_booking import (
+    MAX_HORIZON_DAYS,
+    _decode_slot_cursor,
+    _encode_slot_cursor,
+)
+from app.db.models import SchedulingType
 from app.services.slots import SlotService, TimeSlot
 
-
 # ============ TimeSlot Tests ============
 
 
@@ -226,6 +232,73 @@ class TestSlotServiceGeneration:
 
         assert len(slots) == 0
 
+    def test_template_generation_matches_reference(self):
+        """Precompiled weekly template yields the reference slots, in order."""
+        import random
+
+        mock_db = MagicMock(spec=AsyncSession)
+        service = SlotService(mock_db)
+        therapist_id = uuid.uuid4()
+        rng = random.Random(7)
+
+        blocks = []
+        for _ in range(12):
+            start = rng.randint(0, 22 * 4) * 15
+            end = min(start + rng.randint(0, 16) * 15, 23 * 60 + 59)
+            mock_block = MagicMock()
+            mock_block.day_of_week = rng.randint(0, 6)
+            mock_block.start_time = f"{start // 60:02d}:{start % 60:02d}"
+            mock_block.end_time = f"{end // 60:02d}:{end % 60:02d}"
+            blocks.append(mock_block)
+
+        for duration in (15, 45, 60, 90):
+            reference = service._generate_slots_from_availability(
+                blocks, date(2025, 12, 3), date(2026, 3, 4), duration, therapist_id
+            )
+            ranges = service._generate_slot_ranges_from_availability(
+                blocks, date(2025, 12, 3), date(2026, 3, 4), duration
+            )
+            assert ranges == [(s.start, s.end) for s in reference]
+
+    def test_range_pipeline_matches_slot_pipeline(self):
+        """Filtering ranges builds the same TimeSlots as filtering TimeSlots."""
+        mock_db = MagicMock(spec=AsyncSession)
+        service = SlotService(mock_db)
+        therapist_id = uuid.uuid4()
+
+        mock_block = MagicMock()
+        mock_block.day_of_week = 0  # Monday
+        mock_block.start_time = "09:00"
+        mock_block.end_time = "13:00"
+        mock_booking = MagicMock()
+        mock_booking.start_time = datetime(2025, 12, 15, 10, 0)
+        mock_booking.end_time = datetime(2025, 12, 15, 11, 0)
+        busy = [(datetime(2025, 12, 22, 9, 30), datetime(2025, 12, 22, 10, 30))]
+
+        reference = service._filter_blocked_slots(
+            service._generate_slots_from_availability(
+                [mock_block], date(2025, 12, 15), date(2025, 12, 28), 60, therapist_id
+            ),
+            [],
+            [mock_booking],
+            busy,
+            capacity=2,
+        )
+        slots = service._filter_blocked_ranges(
+            service._generate_slot_ranges_from_availability(
+                [mock_block], date(2025, 12, 15), date(2025, 12, 28), 60
+            ),
+            [],
+            [mock_booking],
+            busy,
+            2,
+            therapist_id,
+        )
+
+        assert slots == reference
+        assert len(slots) == 6
+        assert slots[1].current_bookings == 1
+
 
 class TestSlotServiceFiltering:
     """Test slot filtering with TimeOffs and Bookings."""
@@ -343,6 +416,124 @@ class TestSlotServiceFiltering:
         assert filtered[0].start.hour == 10
         assert filtered[1].start.hour == 12
 
+    def test_filter_slots_group_capacity(self):
+        """Group slots stay available until overlapping bookings reach capacity."""
+        mock_db = MagicMock(spec=AsyncSession)
+        service = SlotService(mock_db)
+        therapist_id = uuid.uuid4()
+
+        slots = [
+            TimeSlot(
+                datetime(2025, 12, 15, 9, 0),
+                datetime(2025, 12, 15, 10, 0),
+                therapist_id,
+            ),
+            TimeSlot(
+                datetime(2025, 12, 15, 10, 0),
+                datetime(2025, 12, 15, 11, 0),
+                therapist_id,
+            ),
+        ]
+
+        # Two bookings at 9-10, one at 10-11
+        bookings = []
+        for hour in (9, 9, 10):
+            mock_booking = MagicMock()
+            mock_booking.start_time = datetime(2025, 12, 15, hour, 0)
+            mock_booking.end_time = datetime(2025, 12, 15, hour + 1, 0)
+            bookings.append(mock_booking)
+
+        filtered = service._filter_blocked_slots(slots, [], bookings, [], capacity=2)
+
+        # 9-10 is full (2/2), 10-11 has one spot left
+        assert len(filtered) == 1
+        assert filtered[0].start.hour == 10
+        assert filtered[0].max_capacity == 2
+        assert filtered[0].current_bookings == 1
+
+    def test_filter_slots_normalizes_aware_blockers_to_utc(self):
+        """Timezone-aware blockers are converted to naive UTC before comparing."""
+        mock_db = MagicMock(spec=AsyncSession)
+        service = SlotService(mock_db)
+        therapist_id = uuid.uuid4()
+
+        slots = [
+            TimeSlot(
+                datetime(2025, 12, 15, 9, 0),
+                datetime(2025, 12, 15, 10, 0),
+                therapist_id,
+            ),
+            TimeSlot(
+                datetime(2025, 12, 15, 10, 0),
+                datetime(2025, 12, 15, 11, 0),
+                therapist_id,
+            ),
+        ]
+
+        # 11:00-12:00 at UTC+2 is 09:00-10:00 UTC
+        plus_two = timezone(timedelta(hours=2))
+        busy = [
+            (
+                datetime(2025, 12, 15, 11, 0, tzinfo=plus_two),
+                datetime(2025, 12, 15, 12, 0, tzinfo=plus_two),
+            )
+        ]
+
+        filtered = service._filter_blocked_slots(slots, [], [], busy)
+
+        assert len(filtered) == 1
+        assert filtered[0].start.hour == 10
+
+    def test_filter_slots_matches_pairwise_check(self):
+        """Sorted-interval filtering agrees with a pairwise overlap check."""
+        import random
+
+        mock_db = MagicMock(spec=AsyncSession)
+        service = SlotService(mock_db)
+        therapist_id = uuid.uuid4()
+        rng = random.Random(42)
+        base = datetime(2025, 12, 15, 8, 0)
+
+        def random_range(max_len: int) -> tuple[datetime, datetime]:
+            start = base + timedelta(minutes=15 * rng.randint(0, 60))
+            return start, start + timedelta(minutes=15 * rng.randint(0, max_len))
+
+        slots = [
+            TimeSlot(
+                base + timedelta(minutes=30 * i),
+                base + timedelta(minutes=30 * i + 60),
+                therapist_id,
+            )
+            for i in range(30)
+        ]
+        time_offs = []
+        for _ in range(4):
+            mock_time_off = MagicMock()
+            mock_time_off.start_datetime, mock_time_off.end_datetime = random_range(6)
+            time_offs.append(mock_time_off)
+        busy = [random_range(4) for _ in range(4)]
+        bookings = []
+        for _ in range(25):
+            mock_booking = MagicMock()
+            mock_booking.start_time, mock_booking.end_time = random_range(8)
+            bookings.append(mock_booking)
+
+        expected = []
+        for slot in slots:
+            if any(slot.overlaps(t.start_datetime, t.end_datetime) for t in time_offs):
+                continue
+            if any(slot.overlaps(s, e) for s, e in busy):
+                continue
+            count = sum(slot.overlaps(b.start_time, b.end_time) for b in bookings)
+            if count < 3:
+                expected.append((slot.start, count))
+
+        filtered = service._filter_blocked_slots(
+            slots, time_offs, bookings, busy, capacity=3
+        )
+
+        assert [(s.start, s.current_bookings) for s in filtered] == expected
+
 
 # ============ Integration-Style Tests ============
 
@@ -368,52 +559,218 @@ class TestSlotServiceIntegration:
 
         assert slots == []
 
-    async def test_is_slot_available_found(self):
-        """Slot should be available if it exists in available slots."""
-        mock_db = AsyncMock(spec=AsyncSession)
-        service = SlotService(mock_db)
+    async def test_iter_available_slots_computes_weeks_lazily(self):
+        """Stopping at the first slot never computes the following weeks."""
+        service = SlotService(MagicMock(spec=AsyncSession))
         therapist_id = uuid.uuid4()
-        service_id = uuid.uuid4()
-
-        # Mock the full flow
-        with patch.object(service, "get_available_slots") as mock_get_slots:
-            mock_get_slots.return_value = [
-                TimeSlot(
-                    start=datetime(2025, 12, 15, 10, 0),
-                    end=datetime(2025, 12, 15, 11, 0),
-                    therapist_id=therapist_id,
+
+        def week_slots(svc, schedule_id, tid, chunk_start, chunk_end, use_cache):
+            day = datetime.combine(chunk_start, time(10, 0))
+            return [
+                TimeSlot(day + timedelta(hours=1), day + timedelta(hours=2), tid),
+                TimeSlot(day, day + timedelta(hours=1), tid),
+            ]
+
+        range_slots = AsyncMock(side_effect=week_slots)
+        with patch.object(
+            service,
+            "_get_bookable_service",
+            AsyncMock(return_value=(MagicMock(), uuid.uuid4())),
+        ), patch.object(service, "_get_range_slots", range_slots):
+            upcoming = service.iter_available_slots(
+                therapist_id, uuid.uuid4(), date(2030, 12, 16), date(2031, 2, 14)
+            )
+            first = await upcoming.__anext__()
+            await upcoming.aclose()
+
+        assert first.start == datetime(2030, 12, 16, 10, 0)
+        range_slots.assert_awaited_once()
+        assert range_slots.await_args.args[3:5] == (
+            date(2030, 12, 16),
+            date(2030, 12, 22),
+        )
+
+    async def test_iter_available_slots_resumes_after_cursor(self):
+        """Slots at or before `after` are skipped, later weeks continue."""
+        service = SlotService(MagicMock(spec=AsyncSession))
+
+        def week_slots(svc, schedule_id, tid, chunk_start, chunk_end, use_cache):
+            day = datetime.combine(chunk_start, time(9, 0))
+            return [TimeSlot(day, day + timedelta(hours=1), tid)]
+
+        with patch.object(
+            service,
+            "_get_bookable_service",
+            AsyncMock(return_value=(MagicMock(), uuid.uuid4())),
+        ), patch.object(service, "_get_range_slots", AsyncMock(side_effect=week_slots)):
+            slots = [
+                slot
+                async for slot in service.iter_available_slots(
+                    uuid.uuid4(),
+                    uuid.uuid4(),
+                    date(2030, 12, 16),
+                    date(2030, 12, 31),
+                    after=datetime(2030, 12, 18, 9, 0),
                 )
             ]
 
+        # Chunks start on the cursor's day, then each following Monday
+        assert [s.start for s in slots] == [
+            datetime(2030, 12, 23, 9, 0),
+            datetime(2030, 12, 30, 9, 0),
+        ]
+
+    async def test_is_slot_available_found(self):
+        """Slot should be available if covered, unblocked and under capacity."""
+        therapist_id = uuid.uuid4()
+        mock_db = _mock_db_returning_service(capacity=1)
+        service = SlotService(mock_db)
+
+        with _patch_fast_path(service, covered=True) as mocks:
             result = await service.is_slot_available(
                 therapist_id=therapist_id,
-                service_id=service_id,
-                start_time=datetime(2025, 12, 15, 10, 0),
+                service_id=uuid.uuid4(),
+                start_time=datetime(2030, 12, 16, 10, 0),
             )
 
-            assert result is True
+        assert result is True
+        # Only the requested interval is checked
+        mocks["_is_slot_covered"].assert_awaited_once_with(
+            therapist_id,
+            mocks["_resolve_schedule_id"].return_value,
+            datetime(2030, 12, 16, 10, 0),
+            datetime(2030, 12, 16, 11, 0),
+            60,
+        )
 
     async def test_is_slot_available_not_found(self):
-        """Slot should NOT be available if not in available slots."""
-        mock_db = AsyncMock(spec=AsyncSession)
+        """Slot should NOT be available if no block generates it."""
+        mock_db = _mock_db_returning_service(capacity=1)
         service = SlotService(mock_db)
-        therapist_id = uuid.uuid4()
-        service_id = uuid.uuid4()
-
-        with patch.object(service, "get_available_slots") as mock_get_slots:
-            mock_get_slots.return_value = [
-                TimeSlot(
-                    start=datetime(2025, 12, 15, 10, 0),
-                    end=datetime(2025, 12, 15, 11, 0),
-                    therapist_id=therapist_id,
-                )
-            ]
 
-            # Check for a different time
+        with _patch_fast_path(service, covered=False) as mocks:
             result = await service.is_slot_available(
-                therapist_id=therapist_id,
-                service_id=service_id,
-                start_time=datetime(2025, 12, 15, 14, 0),  # Not 10:00
+                therapist_id=uuid.uuid4(),
+                service_id=uuid.uuid4(),
+                start_time=datetime(2030, 12, 16, 14, 0),
             )
 
-            assert result is False
+        assert result is False
+        # Short-circuits before the blocker queries and Google Calendar
+        mocks["_has_time_off_overlap"].assert_not_awaited()
+        mocks["_get_gcal_busy_times_between"].assert_not_awaited()
+
+    async def test_is_slot_available_full(self):
+        """Slot should NOT be available once bookings reach capacity."""
+        mock_db = _mock_db_returning_service(capacity=2)
+        service = SlotService(mock_db)
+
+        with _patch_fast_path(service, covered=True, bookings=2):
+            result = await service.is_slot_available(
+                therapist_id=uuid.uuid4(),
+                service_id=uuid.uuid4(),
+                start_time=datetime(2030, 12, 16, 10, 0),
+            )
+
+        assert result is False
+
+    async def test_is_slot_available_gcal_busy(self):
+        """Slot should NOT be available if Google Calendar is busy (aware times)."""
+        mock_db = _mock_db_returning_service(capacity=1)
+        service = SlotService(mock_db)
+        plus_one = timezone(timedelta(hours=1))
+
+        with _patch_fast_path(
+            service,
+            covered=True,
+            busy=[
+                (
+                    datetime(2030, 12, 16, 11, 30, tzinfo=plus_one),
+                    datetime(2030, 12, 16, 12, 0, tzinfo=plus_one),
+                )
+            ],
+        ):
+            result = await service.is_slot_available(
+                therapist_id=uuid.uuid4(),
+                service_id=uuid.uuid4(),
+                start_time=datetime(2030, 12, 16, 10, 0, tzinfo=timezone.utc),
+            )
+
+        assert result is False
+
+    async def test_is_slot_available_covered_by_specific_block(self):
+        """Specific availability covers slots on its own back-to-back grid."""
+        mock_db = AsyncMock(spec=AsyncSession)
+        service = SlotService(mock_db)
+
+        no_blocks = MagicMock()
+        no_blocks.scalars.return_value.all.return_value = []
+        specific_block = MagicMock()
+        specific_block.start_datetime = datetime(2030, 12, 20, 9, 30)
+        specific = MagicMock()
+        specific.scalars.return_value.all.return_value = [specific_block]
+        mock_db.execute.side_effect = [no_blocks, specific, no_blocks, specific]
+
+        args = (uuid.uuid4(), uuid.uuid4())
+        on_grid = await service._is_slot_covered(
+            *args, datetime(2030, 12, 20, 10, 30), datetime(2030, 12, 20, 11, 30), 60
+        )
+        off_grid = await service._is_slot_covered(
+            *args, datetime(2030, 12, 20, 10, 0), datetime(2030, 12, 20, 11, 0), 60
+        )
+
+        assert on_grid is True
+        assert off_grid is False
+
+
+def _mock_db_returning_service(capacity: int) -> AsyncMock:
+    """DB mock whose first query returns a 60-minute CALENDAR service."""
+    mock_service = MagicMock()
+    mock_service.duration_minutes = 60
+    mock_service.capacity = capacity
+    mock_service.scheduling_type = SchedulingType.CALENDAR
+    mock_db = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = mock_service
+    mock_db.execute.return_value = mock_result
+    return mock_db
+
+
+@contextmanager
+def _patch_fast_path(service, covered, bookings=0, busy=None):
+    """Patch the per-interval queries used by SlotService.is_slot_available."""
+    mocks = {}
+    returns = {
+        "_resolve_schedule_id": uuid.uuid4(),
+        "_is_slot_covered": covered,
+        "_has_time_off_overlap": False,
+        "_count_overlapping_bookings": bookings,
+        "_get_gcal_busy_times_between": busy or [],
+    }
+    with ExitStack() as stack:
+        for name, value in returns.items():
+            mocks[name] = stack.enter_context(
+                patch.object(service, name, AsyncMock(return_value=value))
+            )
+        yield mocks
+
+
+# ============ Slot Cursor Tests ============
+
+
+class TestSlotCursor:
+    def test_round_trip(self):
+        after = datetime(2030, 12, 16, 9, 0)
+        until = datetime.utcnow().date() + timedelta(days=30)
+
+        assert _decode_slot_cursor(_encode_slot_cursor(after, until)) == (
+            after,
+            until,
+        )
+
+    def test_crafted_until_is_clamped_to_the_horizon_cap(self):
+        cursor = _encode_slot_cursor(datetime(2030, 12, 16, 9, 0), date(2999, 1, 1))
+
+        _, until = _decode_slot_cursor(cursor)
+
+        assert until == datetime.utcnow().date() + timedelta(days=MAX_HORIZON_DAYS)
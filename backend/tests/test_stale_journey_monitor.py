@@ -0,0 +1,122 @@
+"""Tests for the single-pass stale journey scan."""
+
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import func, select
+
+from app.db.models import JourneyLog, Patient, SystemEventLog
+from app.services.journey_state import rebuild_journey_state
+from app.workers.stale_journey_monitor import check_stale_journeys
+
+
+async def _patient_in(db, org, stage_history: list[tuple[str, str, int]]) -> Patient:
+    """Patient with (journey_key, to_stage, hours_ago) transitions."""
+    patient = Patient(
+        organization_id=org.id,
+        first_name="Stale",
+        last_name="Patient",
+        email=f"stale-{uuid.uuid4().hex[:8]}@example.com",
+    )
+    db.add(patient)
+    await db.flush()
+    now = datetime.now(timezone.utc)
+    for journey_key, to_stage, hours_ago in stage_history:
+        db.add(
+            JourneyLog(
+                patient_id=patient.id,
+                journey_key=journey_key,
+                to_stage=to_stage,
+                changed_at=now - timedelta(hours=hours_ago),
+            )
+        )
+    await db.flush()
+    await rebuild_journey_state(db, [patient.id])
+    await db.commit()
+    return patient
+
+
+@pytest.mark.asyncio
+class TestCheckStaleJourneys:
+    async def test_all_rules_evaluated_in_one_pass(self, test_db, test_org):
+        # Stale in two journeys at once
+        both = await _patient_in(
+            test_db,
+            test_org,
+            [
+                ("retreat_ibiza_2025", "AWAITING_PAYMENT", 72),
+                ("carta_natal", "AWAITING_BIRTH_DATA", 30),
+            ],
+        )
+        # Within the threshold
+        await _patient_in(
+            test_db, test_org, [("carta_natal", "AWAITING_BIRTH_DATA", 2)]
+        )
+        # Moved on: only the latest transition counts
+        await _patient_in(
+            test_db,
+            test_org,
+            [
+                ("retreat_ibiza_2025", "AWAITING_PAYMENT", 100),
+                ("retreat_ibiza_2025", "PREPARATION_PHASE", 1),
+            ],
+        )
+
+        with patch(
+            "app.workers.stale_journey_monitor.email_service.send_automation_email",
+            new_callable=AsyncMock,
+        ) as send:
+            results = await check_stale_journeys(test_db)
+
+        assert results["processed"] == 2
+        assert results["rules_triggered"]["retreat_ibiza_2025.AWAITING_PAYMENT"] == 1
+        assert results["rules_triggered"]["carta_natal.AWAITING_BIRTH_DATA"] == 1
+        assert results["rules_triggered"]["retreat_ibiza_2025.PREPARATION_PHASE"] == 0
+        assert send.await_count == 2
+
+        events = await test_db.execute(
+            select(SystemEventLog.entity_id, func.count()).group_by(
+                SystemEventLog.entity_id
+            )
+        )
+        assert dict(events.all()) == {both.id: 2}
+
+    async def test_recent_reminder_suppresses_repeat(self, test_db, test_org):
+        await _patient_in(test_db, test_org, [("intake", "AWAITING_PAYMENT", 50)])
+
+        with patch(
+            "app.workers.stale_journey_monitor.email_service.send_automation_email",
+            new_callable=AsyncMock,
+        ) as send:
+            first = await check_stale_journeys(test_db)
+            second = await check_stale_journeys(test_db)
+
+        assert first["processed"] == 1
+        assert second["processed"] == 0
+        assert send.await_count == 1
+
+    async def test_journey_status_without_log_is_never_stale(self, test_db, test_org):
+        # Long-standing patient whose stage only exists in journey_status
+        patient = Patient(
+            organization_id=test_org.id,
+            first_name="Legacy",
+            last_name="Patient",
+            email=f"legacy-{uuid.uuid4().hex[:8]}@example.com",
+            journey_status={"intake": "AWAITING_PAYMENT"},
+            created_at=datetime.now(timezone.utc) - timedelta(days=400),
+        )
+        test_db.add(patient)
+        await test_db.flush()
+        await rebuild_journey_state(test_db, [patient.id])
+        await test_db.commit()
+
+        with patch(
+            "app.workers.stale_journey_monitor.email_service.send_automation_email",
+            new_callable=AsyncMock,
+        ) as send:
+            results = await check_stale_journeys(test_db)
+
+        assert results["processed"] == 0
+        send.assert_not_awaited()
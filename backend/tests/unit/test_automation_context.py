@@ -0,0 +1,131 @@
+"""
+Automation Event Context Tests
+
+Covers the enrichment lookups shared by AutomationEngine rules:
+1. The payload's Lead is loaded once per event
+2. Organization lookups are cached across events and invalidated on commit
+3. Several matching rules on one event reuse the same lookups
+"""
+
+import pytest
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.db.models import OrgTier
+from app.services import automation_context, automation_rule_index
+from app.services.automation_context import EventContext
+from app.services.automation_engine import AutomationEngine
+
+
+def _db_returning(value):
+    db = AsyncMock()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = value
+    db.execute.return_value = result
+    return db
+
+
+@pytest.mark.asyncio
+class TestEventContext:
+    def setup_method(self):
+        automation_context.invalidate()
+
+    async def test_lead_loaded_once_per_event(self):
+        lead = MagicMock()
+        db = _db_returning(lead)
+        lead_id = str(uuid.uuid4())
+        context = EventContext(db, uuid.uuid4(), {"lead_id": lead_id})
+
+        assert await context.lead() is lead
+        assert await context.lead(lead_id) is lead
+        assert db.execute.await_count == 1
+
+        # A new event loads it again (it may have changed)
+        await EventContext(db, uuid.uuid4(), {"lead_id": lead_id}).lead()
+        assert db.execute.await_count == 2
+
+    async def test_missing_lead_id_skips_query(self):
+        db = _db_returning(None)
+        assert await EventContext(db, uuid.uuid4(), {}).lead() is None
+        db.execute.assert_not_awaited()
+
+    async def test_org_lookups_cached_across_events(self):
+        org_id = uuid.uuid4()
+        db = _db_returning(OrgTier.CENTER)
+
+        for _ in range(3):
+            assert await EventContext(db, org_id, {}).organization_tier() == (
+                OrgTier.CENTER
+            )
+        assert db.execute.await_count == 1
+
+    async def test_missing_consultation_service_is_cached_too(self):
+        org_id = uuid.uuid4()
+        db = _db_returning(None)
+        context = EventContext(db, org_id, {})
+
+        assert (await context.booking_link("x")).endswith("/contact")
+        assert (await context.booking_link("y")).endswith("/contact")
+        assert db.execute.await_count == 1
+
+    async def test_commit_touching_org_invalidates(self):
+        org_id = uuid.uuid4()
+        db = _db_returning(OrgTier.PRO)
+        await automation_context.get_organization_tier(db, org_id)
+
+        automation_context._invalidate_orgs({org_id})
+
+        await automation_context.get_organization_tier(db, org_id)
+        assert db.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+class TestEngineSharesContext:
+    def setup_method(self):
+        automation_context.invalidate()
+
+    async def test_rules_on_one_event_share_lookups(self):
+        org_id = uuid.uuid4()
+        lead = MagicMock(first_name="Ana", last_name="Ruiz", email="ana@x.com")
+        service_id = uuid.uuid4()
+
+        db = AsyncMock()
+        lead_result = MagicMock()
+        lead_result.scalar_one_or_none.return_value = lead
+        service_result = MagicMock()
+        service_result.scalar_one_or_none.return_value = service_id
+        db.execute.side_effect = [lead_result, service_result]
+
+        rules = tuple(
+            automation_rule_index.CompiledRule(
+                id=uuid.uuid4(),
+                organization_id=org_id,
+                name=f"welcome-{n}",
+                trigger_event="LEAD_STAGED_TIMEOUT",
+                priority=n,
+                actions=[
+                    {
+                        "type": "send_email",
+                        "params": {"to": "lead", "body": "{booking_link}"},
+                    }
+                ],
+                agent_config=None,
+                matches=lambda payload: True,
+            )
+            for n in range(5)
+        )
+
+        with patch.object(
+            automation_rule_index, "get_rules", AsyncMock(return_value=rules)
+        ), patch(
+            "app.services.email.email_service.send_automation_email",
+            new_callable=AsyncMock,
+        ) as send:
+            matched = await AutomationEngine(db)._execute_rules(
+                "LEAD_STAGED_TIMEOUT", {"lead_id": str(uuid.uuid4())}, org_id
+            )
+
+        assert matched
+        assert send.await_count == 5
+        assert db.execute.await_count == 2  # One Lead + one service lookup
+        assert str(service_id) in send.await_args.kwargs["context"]["body"]
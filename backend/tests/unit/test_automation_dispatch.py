@@ -0,0 +1,245 @@
+"""
+Automation Action Dispatch Tests
+
+Covers concurrent execution of an event's side-effect actions:
+1. Sends from several rules overlap instead of running back to back
+2. The concurrency limit is respected
+3. Isolated failures are logged; non-isolated ones surface after all finish
+   (a send returning False is a failure)
+4. A failing event cancels unstarted sends and waits for running ones
+5. A dynamic rule only counts as matched once its sends succeeded
+"""
+
+import asyncio
+import pytest
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import automation_context, automation_rule_index
+from app.services.automation_engine import ActionDispatcher, AutomationEngine
+
+
+def _email_rule(org_id, priority):
+    return automation_rule_index.CompiledRule(
+        id=uuid.uuid4(),
+        organization_id=org_id,
+        name=f"notify-{priority}",
+        trigger_event="BOOKING_CANCELLED",
+        priority=priority,
+        actions=[
+            {
+                "type": "send_email",
+                "params": {"to": f"staff{priority}@example.com", "body": "Hola"},
+            }
+        ],
+        agent_config=None,
+        matches=lambda payload: True,
+    )
+
+
+@pytest.mark.asyncio
+class TestActionDispatcher:
+    async def test_limit_bounds_in_flight_actions(self):
+        in_flight = peak = 0
+
+        async def action():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        dispatcher = ActionDispatcher(limit=3)
+        for n in range(10):
+            dispatcher.submit(f"action {n}", action())
+        await dispatcher.wait()
+
+        assert peak == 3
+
+    async def test_isolated_failure_does_not_stop_others(self):
+        done = []
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def succeed():
+            done.append(True)
+
+        dispatcher = ActionDispatcher()
+        dispatcher.submit("failing", fail())
+        dispatcher.submit("ok", succeed())
+        await dispatcher.wait()
+
+        assert done == [True]
+
+    async def test_non_isolated_failure_raised_after_all_finish(self):
+        done = []
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def slow():
+            await asyncio.sleep(0.01)
+            done.append(True)
+
+        dispatcher = ActionDispatcher()
+        dispatcher.submit("legacy", fail(), isolate=False)
+        dispatcher.submit("slow", slow())
+        with pytest.raises(RuntimeError):
+            await dispatcher.wait()
+
+        assert done == [True]
+
+    async def test_false_result_is_a_failure(self):
+        async def not_sent():
+            return False
+
+        dispatcher = ActionDispatcher()
+        dispatcher.submit("isolated", not_sent(), group="rule")
+        await dispatcher.wait()
+        assert dispatcher.failed == {"rule"}
+
+        dispatcher.submit("legacy", not_sent(), isolate=False)
+        with pytest.raises(RuntimeError, match="legacy was not sent"):
+            await dispatcher.wait()
+
+    async def test_abort_cancels_unstarted_and_waits_for_running(self):
+        done = []
+
+        async def send(n):
+            await asyncio.sleep(0.01)
+            done.append(n)
+
+        dispatcher = ActionDispatcher(limit=1)
+        for n in range(3):
+            dispatcher.submit(f"send {n}", send(n))
+        await asyncio.sleep(0)  # The first send starts
+        await dispatcher.abort()
+
+        assert done == [0]
+
+
+@pytest.mark.asyncio
+class TestEngineFanOut:
+    def setup_method(self):
+        automation_context.invalidate()
+
+    async def test_event_takes_about_the_slowest_send(self):
+        org_id = uuid.uuid4()
+        rules = tuple(_email_rule(org_id, n) for n in range(5))
+
+        async def slow_send(**kwargs):
+            await asyncio.sleep(0.1)
+            return True
+
+        with patch.object(
+            automation_rule_index, "get_rules", AsyncMock(return_value=rules)
+        ), patch(
+            "app.services.email.email_service.send_automation_email",
+            side_effect=slow_send,
+        ) as send:
+            started = time.perf_counter()
+            matched = await AutomationEngine(AsyncMock())._execute_rules(
+                "BOOKING_CANCELLED", {}, org_id
+            )
+            elapsed = time.perf_counter() - started
+
+        assert matched
+        assert send.call_count == 5
+        assert elapsed < 0.3  # Sequential sends would take 0.5s
+
+    async def test_failed_send_isolated_per_rule(self):
+        org_id = uuid.uuid4()
+        rules = tuple(_email_rule(org_id, n) for n in range(3))
+        sent = []
+
+        async def flaky_send(to_email, **kwargs):
+            if to_email == "staff1@example.com":
+                raise RuntimeError("Brevo down")
+            sent.append(to_email)
+            return True
+
+        with patch.object(
+            automation_rule_index, "get_rules", AsyncMock(return_value=rules)
+        ), patch(
+            "app.services.email.email_service.send_automation_email",
+            side_effect=flaky_send,
+        ):
+            matched = await AutomationEngine(MagicMock())._execute_rules(
+                "BOOKING_CANCELLED", {}, org_id
+            )
+
+        assert matched
+        assert sorted(sent) == ["staff0@example.com", "staff2@example.com"]
+
+    async def test_rule_with_failed_sends_is_not_matched(self):
+        org_id = uuid.uuid4()
+        rules = (_email_rule(org_id, 0),)
+
+        with patch.object(
+            automation_rule_index, "get_rules", AsyncMock(return_value=rules)
+        ), patch(
+            "app.services.email.email_service.send_automation_email",
+            AsyncMock(side_effect=RuntimeError("Brevo down")),
+        ):
+            matched = await AutomationEngine(MagicMock())._execute_rules(
+                "BOOKING_CANCELLED", {}, org_id
+            )
+
+        assert not matched
+
+    async def test_rule_whose_send_returns_false_is_not_matched(self):
+        org_id = uuid.uuid4()
+        rules = (_email_rule(org_id, 0),)
+
+        with patch.object(
+            automation_rule_index, "get_rules", AsyncMock(return_value=rules)
+        ), patch(
+            "app.services.email.email_service.send_automation_email",
+            AsyncMock(return_value=False),  # How Brevo errors are reported
+        ):
+            matched = await AutomationEngine(MagicMock())._execute_rules(
+                "BOOKING_CANCELLED", {}, org_id
+            )
+
+        assert not matched
+
+    async def test_failing_legacy_rule_leaves_no_send_behind(self):
+        org_id = uuid.uuid4()
+        rules = tuple(_email_rule(org_id, n) for n in range(2))
+        sent = []
+
+        async def slow_send(to_email, **kwargs):
+            await asyncio.sleep(0.02)
+            sent.append(to_email)
+            return True
+
+        async def failing_update(*args):
+            await asyncio.sleep(0.005)  # Sends start meanwhile
+            raise RuntimeError("deadlock")
+
+        engine = AutomationEngine(MagicMock())
+        engine._update_patient_journey_status = failing_update
+        with patch.object(
+            automation_rule_index, "get_rules", AsyncMock(return_value=rules)
+        ), patch(
+            "app.services.email.email_service.send_automation_email",
+            side_effect=slow_send,
+        ), patch(
+            "app.services.automation_engine.settings.AUTOMATION_ACTION_CONCURRENCY", 1
+        ):
+            with pytest.raises(RuntimeError, match="deadlock"):
+                await engine._execute_rules(
+                    "FORM_SUBMISSION_COMPLETED",
+                    {
+                        "patient_id": str(uuid.uuid4()),
+                        "risk_analysis": {"level": "LOW"},
+                    },
+                    org_id,
+                )
+            # The running send finished before the error surfaced; the
+            # queued one never starts (the retry would send it again)
+            assert sent == ["staff0@example.com"]
+            await asyncio.sleep(0.05)
+            assert sent == ["staff0@example.com"]
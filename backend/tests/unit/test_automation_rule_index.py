@@ -0,0 +1,141 @@
+"""
+Automation Rule Index Tests
+
+Covers the compiled rule index used by AutomationEngine:
+1. Compiled conditions keep the interpreter's semantics
+2. Rules are loaded once per organization and grouped by trigger
+3. Commits touching automation_rules invalidate the organization
+"""
+
+import pytest
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services import automation_rule_index
+from app.services.automation_rule_index import compile_conditions
+
+
+def _cond(operator, value, field="risk.score", logic="AND"):
+    return {
+        "logic": logic,
+        "rules": [{"field": field, "operator": operator, "value": value}],
+    }
+
+
+class TestCompileConditions:
+    """Compiled predicates match the original JSON interpreter."""
+
+    @pytest.mark.parametrize(
+        "operator,value,actual,expected",
+        [
+            ("eq", "5", 5, True),
+            ("==", 5, "5", True),
+            ("!=", "HIGH", "LOW", True),
+            ("contains", "ANXI", "high anxiety", True),
+            ("contains", "x", "", False),
+            ("starts_with", "hi", "High", True),
+            ("ends_with", "TY", "anxiety", True),
+            (">=", "7", 7, True),
+            ("gt", 7, "7.5", True),
+            ("lt", 3, "abc", False),
+            ("<=", "abc", 1, False),
+            ("between", 1, 1, False),
+        ],
+    )
+    def test_operator_semantics(self, operator, value, actual, expected):
+        predicate = compile_conditions(_cond(operator, value))
+        assert predicate({"risk": {"score": actual}}) is expected
+
+    def test_missing_field_compares_as_none(self):
+        assert compile_conditions(_cond("eq", "None"))({}) is True
+        assert compile_conditions(_cond("gte", 0))({}) is False
+
+    def test_no_conditions_always_match(self):
+        assert compile_conditions(None)({}) is True
+        assert compile_conditions({"logic": "AND", "rules": []})({}) is True
+
+    def test_or_logic(self):
+        conditions = {
+            "logic": "OR",
+            "rules": [
+                {"field": "source", "operator": "eq", "value": "instagram"},
+                {"field": "source", "operator": "eq", "value": "whatsapp"},
+            ],
+        }
+        predicate = compile_conditions(conditions)
+        assert predicate({"source": "whatsapp"}) is True
+        assert predicate({"source": "web"}) is False
+
+
+def _rule(org_id, trigger, priority=100, conditions=None):
+    rule = MagicMock()
+    rule.id = uuid.uuid4()
+    rule.organization_id = org_id
+    rule.name = f"{trigger}-{priority}"
+    rule.trigger_event = trigger
+    rule.priority = priority
+    rule.actions = []
+    rule.agent_config = None
+    rule.conditions = conditions
+    return rule
+
+
+def _db_returning(rules):
+    db = AsyncMock()
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = rules
+    db.execute.return_value = result
+    return db
+
+
+@pytest.mark.asyncio
+class TestRuleIndex:
+    """Index lookups, caching and invalidation."""
+
+    def setup_method(self):
+        automation_rule_index.invalidate()
+
+    async def test_loads_organization_once_grouped_by_trigger(self):
+        org_id = uuid.uuid4()
+        db = _db_returning(
+            [
+                _rule(org_id, "LEAD_CREATED", 200),
+                _rule(org_id, "LEAD_CREATED", 100),
+                _rule(org_id, "PAYMENT_FAILED"),
+            ]
+        )
+
+        leads = await automation_rule_index.get_rules(db, org_id, "LEAD_CREATED")
+        payments = await automation_rule_index.get_rules(db, org_id, "PAYMENT_FAILED")
+        none = await automation_rule_index.get_rules(db, org_id, "BOOKING_CONFIRMED")
+
+        assert [r.priority for r in leads] == [200, 100]
+        assert len(payments) == 1
+        assert none == ()
+        assert db.execute.await_count == 1
+
+    async def test_commit_with_rule_changes_invalidates_org(self):
+        org_id = uuid.uuid4()
+        db = _db_returning([_rule(org_id, "LEAD_CREATED")])
+        await automation_rule_index.get_rules(db, org_id, "LEAD_CREATED")
+
+        automation_rule_index._invalidate_orgs({org_id})
+
+        await automation_rule_index.get_rules(db, org_id, "LEAD_CREATED")
+        assert db.execute.await_count == 2
+
+    async def test_load_racing_an_invalidation_is_not_cached(self):
+        org_id = uuid.uuid4()
+        db = _db_returning([_rule(org_id, "LEAD_CREATED")])
+
+        async def invalidate_during_load(*args, **kwargs):
+            automation_rule_index.invalidate(org_id)
+            result = MagicMock()
+            result.scalars.return_value.all.return_value = []
+            return result
+
+        db.execute.side_effect = invalidate_during_load
+        await automation_rule_index.get_rules(db, org_id, "LEAD_CREATED")
+        await automation_rule_index.get_rules(db, org_id, "LEAD_CREATED")
+
+        assert db.execute.await_count == 2
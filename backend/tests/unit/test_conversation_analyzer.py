@@ -0,0 +1,165 @@
+"""
+Conversation Analyzer Tests
+
+Covers the parts of the conversation analyzer that need no database:
+1. New message rows are grouped into one transcript per patient, with the
+   new watermark and the previous analysis (rolling context)
+2. AletheIA calls run concurrently, within the global and per-org limits
+3. A failed call is reported without stopping the others
+4. The previous summary is passed along as rolling context
+"""
+
+import asyncio
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.db.models import MessageDirection
+from app.workers.conversation_analyzer import (
+    PatientConversation,
+    analyze_conversations,
+    build_conversations,
+)
+
+ORG_A, ORG_B = uuid.uuid4(), uuid.uuid4()
+NOW = datetime(2030, 1, 7, 12, tzinfo=timezone.utc)
+
+
+def _message(patient_id, direction, content, org_id=ORG_A, minute=0):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        patient_id=patient_id,
+        organization_id=org_id,
+        direction=direction,
+        content=content,
+        timestamp=NOW + timedelta(minutes=minute),
+    )
+
+
+class TestBuildConversations:
+    def test_one_transcript_per_patient(self):
+        ana, bob = uuid.uuid4(), uuid.uuid4()
+        messages = [
+            _message(ana, MessageDirection.INBOUND, "Hola"),
+            _message(ana, MessageDirection.OUTBOUND, "¿Cómo estás?", minute=1),
+            _message(bob, MessageDirection.INBOUND, "No he dormido", ORG_B),
+        ]
+
+        conversations = build_conversations(messages)
+
+        assert [(c.patient_id, c.organization_id) for c in conversations] == [
+            (ana, ORG_A),
+            (bob, ORG_B),
+        ]
+        assert conversations[0].transcript == "Paciente: Hola\nSistema: ¿Cómo estás?"
+        assert conversations[0].message_count == 2
+        assert conversations[1].transcript == "Paciente: No he dormido"
+
+    def test_watermark_is_the_last_message(self):
+        ana = uuid.uuid4()
+        first = _message(ana, MessageDirection.INBOUND, "Hola")
+        last = _message(ana, MessageDirection.INBOUND, "Sigo aquí", minute=5)
+
+        [conversation] = build_conversations([first, last])
+
+        assert conversation.last_message_at == last.timestamp
+        assert conversation.last_message_id == last.id
+        assert conversation.previous is None
+
+    def test_attaches_previous_analysis(self):
+        ana = uuid.uuid4()
+        previous = SimpleNamespace(summary="Ansiedad leve por la mañana.")
+
+        [conversation] = build_conversations(
+            [_message(ana, MessageDirection.INBOUND, "Mejor ahora")], {ana: previous}
+        )
+
+        assert conversation.previous is previous
+
+
+def _conversation(org_id) -> PatientConversation:
+    return PatientConversation(uuid.uuid4(), org_id, "Paciente: Hola", 1)
+
+
+@asynccontextmanager
+async def _session():
+    yield AsyncMock()
+
+
+class _SlowAletheia:
+    """Records how many calls (in total and per org) run at once."""
+
+    def __init__(self, fail_for=None):
+        self.fail_for = fail_for
+        self.active = Counter()
+        self.peak = Counter()
+        self.previous_summaries = {}
+
+    def with_context(self, db=None, organization_id=None, patient_id=None):
+        async def analyze_chat_transcript(transcript, previous_summary=None):
+            self.previous_summaries[patient_id] = previous_summary
+            return await self._call(organization_id, patient_id)
+
+        return SimpleNamespace(analyze_chat_transcript=analyze_chat_transcript)
+
+    async def _call(self, org_id, patient_id):
+        for key in ("all", org_id):
+            self.active[key] += 1
+            self.peak[key] = max(self.peak[key], self.active[key])
+        await asyncio.sleep(0.01)
+        for key in ("all", org_id):
+            self.active[key] -= 1
+        if patient_id == self.fail_for:
+            raise RuntimeError("Gemini timeout")
+        return {"risk_flags": []}
+
+
+async def _run(conversations, aletheia):
+    with patch("app.workers.conversation_analyzer.get_aletheia", return_value=aletheia):
+        return [r async for r in analyze_conversations(conversations, _session)]
+
+
+@pytest.mark.asyncio
+class TestAnalyzeConversations:
+    async def test_concurrency_limits(self):
+        conversations = [_conversation(ORG_A) for _ in range(6)] + [
+            _conversation(ORG_B) for _ in range(2)
+        ]
+        aletheia = _SlowAletheia()
+
+        with patch("app.workers.conversation_analyzer.settings") as settings:
+            settings.CONVERSATION_ANALYSIS_CONCURRENCY = 3
+            settings.CONVERSATION_ANALYSIS_ORG_CONCURRENCY = 2
+            results = await _run(conversations, aletheia)
+
+        assert len(results) == 8
+        assert aletheia.peak["all"] == 3
+        assert aletheia.peak[ORG_A] == 2  # The third slot went to ORG_B
+
+    async def test_failure_is_isolated(self):
+        conversations = [_conversation(ORG_A) for _ in range(3)]
+        failing = conversations[1]
+
+        aletheia = _SlowAletheia(fail_for=failing.patient_id)
+        results = {c.patient_id: r for c, r in await _run(conversations, aletheia)}
+
+        assert results[failing.patient_id] is None
+        assert sum(r is not None for r in results.values()) == 2
+
+    async def test_previous_summary_is_rolling_context(self):
+        fresh = _conversation(ORG_A)
+        followup = _conversation(ORG_A)
+        followup.previous = SimpleNamespace(summary="Insomnio post-sesión.")
+        aletheia = _SlowAletheia()
+
+        await _run([fresh, followup], aletheia)
+
+        assert aletheia.previous_summaries == {
+            fresh.patient_id: None,
+            followup.patient_id: "Insomnio post-sesión.",
+        }
@@ -0,0 +1,204 @@
+"""
+Cortex Bulk Runner Tests
+
+Covers the parts of bulk re-processing that need no database:
+1. Per-model rate limiting spaces calls to each model's requests per minute
+2. Model calls take a budget slot on cache misses only
+3. Filters are validated and snapshotted (created_before defaults to now)
+4. Progress reports: percent, rate and ETA
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.db.models import BulkRunStatus, PrivacyTier
+from app.services.cortex.bulk import (
+    ModelRateLimiter,
+    bulk_progress,
+    normalize_filters,
+)
+from app.services.cortex.cache import StepCache
+from app.services.cortex.context import PatientEventContext
+from app.services.cortex.stages import get_step
+
+
+class _Clock:
+    """time.monotonic stand-in advanced by the patched asyncio.sleep."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = _Clock()
+    with (
+        patch("app.services.cortex.bulk.time.monotonic", clock.monotonic),
+        patch("app.services.cortex.bulk.asyncio.sleep", clock.sleep),
+    ):
+        yield clock
+
+
+@pytest.mark.asyncio
+class TestModelRateLimiter:
+    async def test_calls_are_spaced_per_model(self, clock):
+        limiter = ModelRateLimiter({"gemini-2.5-pro": 30, "gemini-2.5-flash": 120})
+
+        for _ in range(3):
+            await limiter.acquire("gemini-2.5-pro")
+        await limiter.acquire("gemini-2.5-flash")  # Own budget: no wait
+
+        assert clock.sleeps == [2.0, 2.0]
+
+    async def test_idle_time_is_not_banked(self, clock):
+        limiter = ModelRateLimiter({"gemini-2.5-pro": 60})
+        await limiter.acquire("gemini-2.5-pro")
+
+        clock.now += 30  # Idle: no burst of 30 calls afterwards
+        await limiter.acquire("gemini-2.5-pro")
+        await limiter.acquire("gemini-2.5-pro")
+
+        assert clock.sleeps == [1.0]
+
+    async def test_unlisted_models_use_default_and_zero_disables(self, clock):
+        limiter = ModelRateLimiter({"gemini-2.5-pro": 0})
+
+        with patch("app.services.cortex.bulk.settings.CORTEX_BULK_DEFAULT_RPM", 6):
+            await limiter.acquire("other-model")
+            await limiter.acquire("other-model")
+        for _ in range(5):
+            await limiter.acquire("gemini-2.5-pro")
+
+        assert clock.sleeps == [10.0]
+
+
+@pytest.mark.asyncio
+class TestModelBudgetInStepCache:
+    def _context(self):
+        context = PatientEventContext(
+            patient_id=uuid.uuid4(), organization_id=uuid.uuid4()
+        )
+        context.resolved_tier = PrivacyTier.STANDARD
+        context.add_evidence("audio:session", "gs://kura-vault/audio/session.webm")
+        return context
+
+    def _cache(self, budget):
+        storage = MagicMock()
+        storage.get_generation.return_value = 1234
+        cache = StepCache(AsyncMock(), storage, budget)
+        cache.get = AsyncMock(return_value=None)
+        cache.put = AsyncMock()
+        return cache
+
+    async def test_miss_takes_a_slot_for_the_step_model(self):
+        budget = SimpleNamespace(acquire=AsyncMock())
+        step = get_step("analyze")
+        step.model = "gemini-2.5-pro"
+        step.execute = AsyncMock()
+
+        await self._cache(budget).execute(step, self._context())
+
+        budget.acquire.assert_awaited_once_with("gemini-2.5-pro")
+        step.execute.assert_awaited_once()
+
+    async def test_hit_and_model_free_steps_cost_nothing(self):
+        budget = SimpleNamespace(acquire=AsyncMock())
+        cache = self._cache(budget)
+        cache.get.return_value = {"transcript": "Texto memorizado"}
+        transcribe = get_step("transcribe")
+        transcribe.execute = AsyncMock()
+        intake = get_step("intake")
+        intake.execute = AsyncMock()
+
+        await cache.execute(transcribe, self._context())
+        await cache.execute(intake, self._context())
+
+        budget.acquire.assert_not_awaited()
+        intake.execute.assert_awaited_once()
+
+
+class TestFilters:
+    def test_defaults(self):
+        filters = normalize_filters(None)
+
+        assert filters["statuses"] == ["COMPLETED", "FAILED"]
+        assert filters["entry_types"] == []
+        assert filters["organization_id"] is None
+        created_before = datetime.fromisoformat(filters["created_before"])
+        assert datetime.now(timezone.utc) - created_before < timedelta(seconds=5)
+
+    def test_values_are_stored_as_json(self):
+        org_id = uuid.uuid4()
+        filters = normalize_filters(
+            {
+                "organization_id": org_id,
+                "entry_types": ["AUDIO"],
+                "statuses": ["FAILED"],
+                "created_after": datetime(2026, 1, 1, tzinfo=timezone.utc),
+            }
+        )
+
+        assert filters["organization_id"] == str(org_id)
+        assert filters["entry_types"] == ["AUDIO"]
+        assert filters["statuses"] == ["FAILED"]
+        assert filters["created_after"] == "2026-01-01T00:00:00+00:00"
+
+    @pytest.mark.parametrize(
+        "filters",
+        [{"statuses": ["PROCESSING"]}, {"statuses": ["BOGUS"]}, {"entry_types": ["X"]}],
+    )
+    def test_invalid_filters_raise(self, filters):
+        with pytest.raises(ValueError):
+            normalize_filters(filters)
+
+
+def _run(**values):
+    started_at = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+    defaults = dict(
+        id=uuid.uuid4(),
+        status=BulkRunStatus.RUNNING,
+        filters={},
+        concurrency=4,
+        model_rpm={},
+        total=1000,
+        processed=250,
+        succeeded=240,
+        failed=10,
+        errors=[],
+        last_error=None,
+        created_at=started_at,
+        started_at=started_at,
+        updated_at=started_at + timedelta(minutes=10),
+        finished_at=None,
+    )
+    return SimpleNamespace(**{**defaults, **values})
+
+
+class TestProgress:
+    def test_rate_and_eta(self):
+        progress = bulk_progress(_run())
+
+        assert progress["percent"] == 25.0
+        assert progress["remaining"] == 750
+        assert progress["rate_per_minute"] == 25.0
+        assert progress["eta_seconds"] == 30 * 60
+
+    def test_not_started_and_finished_runs_have_no_eta(self):
+        assert bulk_progress(_run(processed=0, started_at=None))["eta_seconds"] is None
+        finished = bulk_progress(_run(status=BulkRunStatus.CANCELLED))
+        assert finished["eta_seconds"] is None
+
+    def test_empty_run_is_complete(self):
+        assert bulk_progress(_run(total=0, processed=0))["percent"] == 100.0
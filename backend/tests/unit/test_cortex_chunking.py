@@ -0,0 +1,220 @@
+"""
+Chunked (Map-Reduce) Analysis Tests
+
+Covers long-transcript analysis in AnalyzeStep:
+1. Transcripts split on speaker/time boundaries, then sentences, then words
+2. Above the stage's chunk_threshold, chunks are summarized concurrently
+   and the summaries (in order) are analyzed with the stage's prompt
+3. Below the threshold (or without one) a single call is made
+4. Stage config reaches the step; chunk failures fail the stage
+5. Under a model budget every chunk call and the final call take a slot
+"""
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.db.models import PrivacyTier
+from app.services.ai.base import AIResponse
+from app.services.cortex.cache import StepCache
+from app.services.cortex.chunking import split_transcript
+from app.services.cortex.context import PatientEventContext
+from app.services.cortex.orchestrator import CortexOrchestrator
+from app.services.cortex.stages import StepExecutionError, get_step
+
+
+class TestSplitTranscript:
+    def test_breaks_on_speaker_labels_and_timestamps(self):
+        text = (
+            "Terapeuta: ¿Cómo llegas hoy?\n"
+            "Paciente: Cansada, pero con ganas.\n"
+            "Sigo pensando en la ceremonia.\n"
+            "[00:12:40] Terapeuta: Cuéntame más.\n"
+            "Paciente: Vi a mi abuela."
+        )
+
+        chunks = split_transcript(text, 70)
+
+        assert chunks == [
+            "Terapeuta: ¿Cómo llegas hoy?",
+            "Paciente: Cansada, pero con ganas.\nSigo pensando en la ceremonia.",
+            "[00:12:40] Terapeuta: Cuéntame más.\nPaciente: Vi a mi abuela.",
+        ]
+
+    def test_short_transcript_is_one_chunk(self):
+        assert split_transcript("A: Hola\nB: Hola", 1000) == ["A: Hola\nB: Hola"]
+
+    def test_long_turns_split_on_sentences_then_words(self):
+        turn = "Participante 2: " + "Respiro hondo. " * 10 + "x" * 50
+
+        chunks = split_transcript(turn, 40)
+
+        assert all(len(chunk) <= 40 for chunk in chunks)
+        assert chunks[0].startswith("Participante 2: Respiro hondo.")
+        assert "".join(chunks).replace("\n", "").count("Respiro hondo.") == 10
+
+    def test_paragraphs_without_labels(self):
+        text = "Primer bloque de texto.\n\nSegundo bloque de texto."
+
+        assert split_transcript(text, 30) == [
+            "Primer bloque de texto.",
+            "Segundo bloque de texto.",
+        ]
+
+
+class _FakeProvider:
+    """analyze_text stand-in: chunk notes, or the final JSON analysis."""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_on = fail_on
+
+    async def analyze_text(self, content, system_prompt=None):
+        self.calls.append(content)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if self.fail_on and self.fail_on in content:
+            raise RuntimeError("Vertex timeout")
+        if "PART " in content:
+            part = content.split("PART ")[1].split(" ")[0]
+            text = f"Notas {part}"
+        else:
+            text = json.dumps({"summary": "Sesión grupal", "risk_level": "LOW"})
+        return AIResponse(
+            text=text,
+            tokens_input=len(content),
+            tokens_output=10,
+            model_id="gemini-2.5-pro",
+            provider_id="vertex-google",
+        )
+
+
+def _transcript(turns: int) -> str:
+    return "\n".join(
+        f"Participante {i % 3 + 1}: Frase número {i} del círculo." for i in range(turns)
+    )
+
+
+def _context(transcript: str) -> PatientEventContext:
+    context = PatientEventContext(patient_id=uuid.uuid4(), organization_id=uuid.uuid4())
+    context.resolved_tier = PrivacyTier.STANDARD
+    context.add_output("transcribe", "transcript", transcript)
+    return context
+
+
+async def _execute(step, context, provider):
+    with patch(
+        "app.services.ai.factory.ProviderFactory.get_provider", return_value=provider
+    ):
+        await step.execute(context)
+
+
+@pytest.mark.asyncio
+class TestChunkedAnalysis:
+    async def test_long_transcript_is_map_reduced(self):
+        transcript = _transcript(40)
+        context = _context(transcript)
+        provider = _FakeProvider()
+        step = get_step("analyze")
+        step.chunk_threshold = 500
+        step.chunk_size = 400
+
+        with patch(
+            "app.services.cortex.steps.core.settings.CORTEX_ANALYZE_CHUNK_CONCURRENCY",
+            2,
+        ):
+            await _execute(step, context, provider)
+
+        chunks = split_transcript(transcript, 400)
+        total = len(chunks)
+        assert total > 2
+        assert len(provider.calls) == total + 1
+        assert provider.max_in_flight == 2
+        for chunk in chunks:
+            assert any(chunk in call for call in provider.calls[:-1])
+
+        final = provider.calls[-1]
+        assert "Frase número" not in final  # Only the notes are reduced
+        notes = [f"### Parte {i}/{total}\nNotas {i}" for i in (1, 2, 3)]
+        assert final.index(notes[0]) < final.index(notes[1]) < final.index(notes[2])
+        assert context.get_output("analyze", "summary") == "Sesión grupal"
+        assert context.get_output("analyze", "chunk_count") == total
+        assert len(context.ai_usage) == total + 1
+
+    async def test_below_threshold_is_a_single_call(self):
+        context = _context(_transcript(5))
+        provider = _FakeProvider()
+        step = get_step("analyze")
+        step.chunk_threshold = 100_000
+
+        await _execute(step, context, provider)
+
+        assert len(provider.calls) == 1
+        assert "Frase número 4" in provider.calls[0]
+        assert context.get_output("analyze", "chunk_count") is None
+
+    async def test_chunk_failure_fails_the_stage(self):
+        context = _context(_transcript(40))
+        provider = _FakeProvider(fail_on="PART 2 ")
+        step = get_step("analyze")
+        step.chunk_threshold = step.chunk_size = 400
+
+        with pytest.raises(StepExecutionError, match="Vertex timeout"):
+            await _execute(step, context, provider)
+
+        assert provider.in_flight == 0  # No chunk call left running
+
+    async def test_stage_config_reaches_the_step(self):
+        stage = {"step": "analyze", "chunk_threshold": 500, "chunk_size": 400}
+        orchestrator = CortexOrchestrator(MagicMock())
+        steps = []
+
+        def capture(step_type):
+            step = get_step(step_type)
+            steps.append(step)
+            return step
+
+        node = MagicMock(config=stage, step_type="analyze", id="analyze")
+        orchestrator.step_cache.execute = MagicMock(
+            side_effect=lambda step, context: asyncio.sleep(0)
+        )
+        with patch("app.services.cortex.orchestrator.get_step", side_effect=capture):
+            await orchestrator._run_stage(
+                node, _context(""), MagicMock(), queue_wait_ms=0
+            )
+
+        assert (steps[0].chunk_threshold, steps[0].chunk_size) == (500, 400)
+
+    async def test_every_model_call_takes_a_budget_slot(self):
+        transcript = _transcript(40)
+        context = _context(transcript)
+        provider = _FakeProvider()
+        budget = SimpleNamespace(
+            acquire=AsyncMock(
+                side_effect=lambda model_id: provider.calls.append("SLOT")
+            )
+        )
+        cache = StepCache(AsyncMock(), MagicMock(), budget)
+        step = get_step("analyze")
+        step.chunk_threshold = 500
+        step.chunk_size = 400
+
+        with patch(
+            "app.services.ai.factory.ProviderFactory.get_provider",
+            return_value=provider,
+        ):
+            await cache.execute(step, context)
+
+        total = len(split_transcript(transcript, 400))
+        assert budget.acquire.await_count == total + 1
+        assert {c.args for c in budget.acquire.await_args_list} == {("gemini-2.5-pro",)}
+        # The final call's slot is taken once the chunk notes are in
+        assert provider.calls[-2:] == ["SLOT", provider.calls[-1]]
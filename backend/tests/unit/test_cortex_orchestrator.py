@@ -5,14 +5,17 @@ Tests Phase 3 & 4 components:
 - Step registry
 - CortexOrchestrator
 - Pipeline execution flow
+- Stage graph (depends_on) and concurrent stages
 """
 
+import asyncio
 import uuid
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 
 from app.db.models import PrivacyTier, AIPipelineConfig
 from app.services.cortex.context import PatientEventContext
+from app.services.cortex.dag import plan_stages
 from app.services.cortex.orchestrator import CortexOrchestrator, PipelineExecutionError
 from app.services.cortex.stages import get_step, list_steps, StepExecutionError
 from app.services.cortex.steps.base import PipelineStep
@@ -61,6 +64,7 @@ def mock_db_session(mock_pipeline_config):
     result = MagicMock()
     result.scalar_one_or_none.return_value = mock_pipeline_config
     session.execute = AsyncMock(return_value=result)
+    session.begin_nested = MagicMock()  # Savepoints (pipeline trace)
 
     return session
 
@@ -253,3 +257,183 @@ class TestCortexOrchestrator:
                 organization=mock_organization,
                 input_data={"field": "value"},
             )
+
+
+# ============ Stage Graph Tests ============
+
+
+class TestStagePlanning:
+    """Tests for plan_stages (depends_on)."""
+
+    def test_without_depends_on_stages_run_in_order(self):
+        plan = plan_stages(
+            [{"step": "intake"}, {"step": "analyze"}, {"step": "triage"}]
+        )
+
+        assert [node.depends_on for node in plan] == [set(), {0}, {1}]
+
+    def test_depends_on_by_id_or_step(self):
+        plan = plan_stages(
+            [
+                {"id": "doc", "step": "ocr"},
+                {"step": "transcribe"},
+                {"step": "analyze", "depends_on": ["doc", "transcribe"]},
+            ]
+        )
+
+        assert [node.depends_on for node in plan] == [set(), set(), {0, 1}]
+
+    def test_stage_without_step_is_skipped(self):
+        plan = plan_stages([{"model": "x"}, {"step": "intake"}, {"step": "triage"}])
+
+        assert [(node.index, node.depends_on) for node in plan] == [
+            (1, set()),
+            (2, {1}),
+        ]
+
+    @pytest.mark.parametrize(
+        "stages, message",
+        [
+            ([{"step": "ocr"}, {"step": "ocr", "depends_on": []}], "Duplicate"),
+            ([{"step": "analyze", "depends_on": ["ocr"]}], "unknown stage 'ocr'"),
+            (
+                [
+                    {"step": "ocr", "depends_on": ["analyze"]},
+                    {"step": "analyze", "depends_on": ["ocr"]},
+                ],
+                "cycle",
+            ),
+        ],
+    )
+    def test_invalid_graphs_raise(self, stages, message):
+        with pytest.raises(ValueError, match=message):
+            plan_stages(stages)
+
+
+class _TimedStep(PipelineStep):
+    """Records when it runs; optionally fails."""
+
+    def __init__(self, step_type, log, fail=False):
+        self.step_type = step_type
+        self.log = log
+        self.fail = fail
+
+    async def execute(self, context):
+        self.log.append(("start", self.step_type))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise StepExecutionError(self.step_type, "boom")
+        context.add_output(self.step_type, "done", True)
+        self.log.append(("end", self.step_type))
+
+
+class TestParallelStages:
+    """Tests for concurrent execution of independent stages."""
+
+    def _orchestrator(self, mock_db_session, log, failing=(), gcs_service=None):
+        orchestrator = CortexOrchestrator(mock_db_session, gcs_service)
+        steps = patch(
+            "app.services.cortex.orchestrator.get_step",
+            side_effect=lambda t: _TimedStep(t, log, fail=t in failing),
+        )
+        return orchestrator, steps
+
+    @pytest.mark.asyncio
+    async def test_independent_stages_overlap(
+        self, mock_db_session, mock_patient, mock_organization, mock_pipeline_config
+    ):
+        mock_pipeline_config.stages = [
+            {"step": "ocr"},
+            {"step": "transcribe", "depends_on": []},
+            {"step": "analyze", "depends_on": ["ocr", "transcribe"]},
+        ]
+        log = []
+        orchestrator, steps = self._orchestrator(mock_db_session, log)
+
+        with steps:
+            result = await orchestrator.run_pipeline(
+                pipeline_name="test_pipeline",
+                patient=mock_patient,
+                organization=mock_organization,
+            )
+
+        assert log[:2] == [("start", "ocr"), ("start", "transcribe")]
+        assert log.index(("start", "analyze")) > log.index(("end", "ocr"))
+        assert log.index(("start", "analyze")) > log.index(("end", "transcribe"))
+        assert set(result["outputs"]) == {"ocr", "transcribe", "analyze"}
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(
+        self, mock_db_session, mock_patient, mock_organization, mock_pipeline_config
+    ):
+        mock_pipeline_config.stages = [
+            {"step": s, "depends_on": []} for s in ("a", "b", "c")
+        ]
+        log = []
+        orchestrator, steps = self._orchestrator(mock_db_session, log)
+
+        with steps, patch(
+            "app.services.cortex.orchestrator.settings.CORTEX_STAGE_CONCURRENCY", 2
+        ):
+            await orchestrator.run_pipeline(
+                pipeline_name="test_pipeline",
+                patient=mock_patient,
+                organization=mock_organization,
+            )
+
+        assert log[:3] == [("start", "a"), ("start", "b"), ("end", "a")]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("concurrency", [0, -1])
+    async def test_non_positive_concurrency_runs_sequentially(
+        self,
+        concurrency,
+        mock_db_session,
+        mock_patient,
+        mock_organization,
+        mock_pipeline_config,
+    ):
+        mock_pipeline_config.stages = [
+            {"step": s, "depends_on": []} for s in ("a", "b")
+        ]
+        log = []
+        orchestrator, steps = self._orchestrator(mock_db_session, log)
+
+        with steps, patch(
+            "app.services.cortex.orchestrator.settings.CORTEX_STAGE_CONCURRENCY",
+            concurrency,
+        ):
+            await orchestrator.run_pipeline(
+                pipeline_name="test_pipeline",
+                patient=mock_patient,
+                organization=mock_organization,
+            )
+
+        assert log == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+
+    @pytest.mark.asyncio
+    async def test_failure_stops_dependents_and_still_cleans_up(
+        self, mock_db_session, mock_patient, mock_organization, mock_pipeline_config
+    ):
+        mock_pipeline_config.stages = [
+            {"step": "ocr"},
+            {"step": "transcribe", "depends_on": []},
+            {"step": "analyze", "depends_on": ["ocr", "transcribe"]},
+        ]
+        mock_patient.privacy_tier_override = PrivacyTier.GHOST
+        log = []
+        orchestrator, steps = self._orchestrator(
+            mock_db_session, log, failing={"ocr"}, gcs_service=MagicMock()
+        )
+        orchestrator.finalizer.finalize = AsyncMock(return_value={"deleted": 1})
+
+        with steps, pytest.raises(PipelineExecutionError) as exc:
+            await orchestrator.run_pipeline(
+                pipeline_name="test_pipeline",
+                patient=mock_patient,
+                organization=mock_organization,
+            )
+
+        assert exc.value.failed_step == "ocr"
+        assert ("start", "analyze") not in log
+        orchestrator.finalizer.finalize.assert_awaited_once()
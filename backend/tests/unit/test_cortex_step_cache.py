@@ -0,0 +1,138 @@
+"""
+Cortex Step Cache Tests
+
+Covers the memoization of cacheable pipeline steps without a database:
+1. Cache keys change with the model, prompt version and GCS generation
+2. A hit restores the outputs (and transcript evidence) without Vertex calls
+3. A miss executes the step and memoizes its outputs
+4. GHOST contexts and unidentifiable evidence are never cached
+"""
+
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.db.models import PrivacyTier
+from app.services.cortex.cache import StepCache
+from app.services.cortex.context import PatientEventContext
+from app.services.cortex.stages import get_step
+
+AUDIO_URI = "gs://kura-vault/audio/session.webm"
+
+
+def _context(tier=PrivacyTier.STANDARD, uri=AUDIO_URI) -> PatientEventContext:
+    context = PatientEventContext(patient_id=uuid.uuid4(), organization_id=uuid.uuid4())
+    context.resolved_tier = tier
+    context.add_evidence("audio:session", uri)
+    return context
+
+
+def _cache(generation=1234) -> StepCache:
+    storage = MagicMock()
+    storage.get_generation.return_value = generation
+    cache = StepCache(AsyncMock(), storage)
+    cache.get = AsyncMock(return_value=None)
+    cache.put = AsyncMock()
+    return cache
+
+
+def _transcribe_step(text="Hola, hoy me siento mejor."):
+    step = get_step("transcribe")
+    step.execute = AsyncMock(
+        side_effect=lambda context: context.add_output("transcribe", "transcript", text)
+    )
+    return step
+
+
+@pytest.mark.asyncio
+class TestCacheKey:
+    async def test_same_inputs_same_key(self):
+        step = get_step("transcribe")
+        first = await _cache().key_for(step, _context())
+        second = await _cache().key_for(step, _context())
+
+        assert first and first == second
+
+    async def test_key_changes_with_generation_model_and_prompt(self):
+        step = get_step("ocr")
+        context = _context()
+        context.add_evidence("document:upload", "gs://kura-vault/docs/intake.pdf")
+        base = await _cache().key_for(step, context)
+
+        assert await _cache(generation=5678).key_for(step, context) != base
+
+        step.model_id = "gemini-2.5-pro"
+        assert await _cache().key_for(step, context) != base
+
+        step = get_step("ocr")
+        step.prompt_version = "v2"
+        assert await _cache().key_for(step, context) != base
+
+    async def test_unidentifiable_evidence_has_no_key(self):
+        step = get_step("transcribe")
+
+        assert await _cache(generation=None).key_for(step, _context()) is None
+        local = _context(uri="/static/uploads/session.webm")
+        assert await _cache().key_for(step, local) is None
+
+
+@pytest.mark.asyncio
+class TestStepCacheExecute:
+    async def test_miss_executes_and_memoizes(self):
+        cache = _cache()
+        step = _transcribe_step()
+        context = _context()
+
+        await cache.execute(step, context)
+
+        step.execute.assert_awaited_once()
+        cache.put.assert_awaited_once()
+        assert cache.put.await_args.args[1:] == (step, context)
+
+    async def test_hit_restores_outputs_without_executing(self):
+        cache = _cache()
+        cache.get.return_value = {"transcript": "Texto memorizado", "language": "es"}
+        step = _transcribe_step()
+        context = _context()
+
+        await cache.execute(step, context)
+
+        step.execute.assert_not_awaited()
+        cache.put.assert_not_awaited()
+        assert context.get_output("transcribe", "transcript") == "Texto memorizado"
+        assert context.get_evidence("transcript:raw") is not None
+        assert context.ai_usage == []  # No Vertex spend
+
+    async def test_ghost_is_never_cached(self):
+        cache = _cache()
+        step = _transcribe_step()
+
+        await cache.execute(step, _context(tier=PrivacyTier.GHOST))
+
+        step.execute.assert_awaited_once()
+        cache.get.assert_not_awaited()
+        cache.put.assert_not_awaited()
+        cache.gcs_service.get_generation.assert_not_called()
+
+    async def test_non_cacheable_step_just_executes(self):
+        cache = _cache()
+        step = get_step("intake")
+        step.execute = AsyncMock()
+
+        await cache.execute(step, _context())
+
+        step.execute.assert_awaited_once()
+        cache.get.assert_not_awaited()
+
+    async def test_disabled_by_setting(self):
+        cache = _cache()
+        step = _transcribe_step()
+
+        with patch(
+            "app.services.cortex.cache.settings.CORTEX_STEP_CACHE_ENABLED", False
+        ):
+            await cache.execute(step, _context())
+
+        cache.get.assert_not_awaited()
+        cache.put.assert_not_awaited()
@@ -0,0 +1,271 @@
+"""
+Cortex Pipeline Tracing Tests
+
+Covers per-stage traces of pipeline runs:
+1. Model usage recorded during a stage is attributed to that stage
+2. Queue wait for a stage slot, step cache hits and evidence size (also on
+   the exported OpenTelemetry span)
+3. Failed runs are persisted with the failed step; stage statuses
+4. Persisting a trace never fails the pipeline
+"""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.db.models import AIPipelineConfig, PrivacyTier
+from app.services.cortex.cache import StepCache
+from app.services.cortex.context import PatientEventContext
+from app.services.cortex.orchestrator import CortexOrchestrator, PipelineExecutionError
+from app.services.cortex.stages import StepExecutionError, get_step
+from app.services.cortex.steps.base import PipelineStep
+from app.services.cortex.tracing import PipelineTrace, evidence_size, save_trace
+
+
+class _UsageStep(PipelineStep):
+    """Records model usage like AnalyzeStep; optionally fails."""
+
+    def __init__(self, step_type, fail=False, delay=0.01):
+        self.step_type = step_type
+        self.model = f"model-{step_type}"
+        self.fail = fail
+        self.delay = delay
+
+    async def execute(self, context):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise StepExecutionError(self.step_type, "boom")
+        context.record_usage(
+            {
+                "model_id": self.model,
+                "tokens_input": 100,
+                "tokens_output": 20,
+                "task_type": self.step_type,
+            }
+        )
+        context.add_output(self.step_type, "done", True)
+
+
+def _context():
+    context = PatientEventContext(patient_id=uuid.uuid4(), organization_id=uuid.uuid4())
+    context.resolved_tier = PrivacyTier.STANDARD
+    return context
+
+
+@pytest.fixture
+def mock_patient():
+    patient = MagicMock()
+    patient.id = uuid.uuid4()
+    patient.privacy_tier_override = None
+    return patient
+
+
+@pytest.fixture
+def mock_organization():
+    org = MagicMock()
+    org.id = uuid.uuid4()
+    org.country_code = "ES"
+    org.default_privacy_tier = None
+    return org
+
+
+def _orchestrator(stages, failing=(), delays=None):
+    config = MagicMock(spec=AIPipelineConfig)
+    config.name = "traced_pipeline"
+    config.input_modality = "TEXT"
+    config.is_active = True
+    config.privacy_tier_required = None
+    config.stages = stages
+
+    session = AsyncMock()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = config
+    session.execute = AsyncMock(return_value=result)
+    session.begin_nested = MagicMock()
+
+    orchestrator = CortexOrchestrator(session, MagicMock())
+    orchestrator.finalizer.finalize = AsyncMock(return_value={"deleted": 0})
+    steps = patch(
+        "app.services.cortex.orchestrator.get_step",
+        side_effect=lambda t: _UsageStep(
+            t, fail=t in failing, delay=(delays or {}).get(t, 0.01)
+        ),
+    )
+    return orchestrator, steps
+
+
+@pytest.mark.asyncio
+class TestPipelineTrace:
+    async def test_usage_is_attributed_to_the_running_stage(self):
+        context = _context()
+        trace = PipelineTrace("p", context)
+
+        async def run(stage_id, tokens):
+            step = _UsageStep(stage_id)
+            with trace.stage(stage_id, step):
+                await asyncio.sleep(0.01)
+                context.record_usage(
+                    {"model_id": "gemini-2.5-pro", "tokens_input": tokens}
+                )
+
+        await asyncio.gather(run("ocr", 10), run("analyze", 500))
+        context.record_usage({"tokens_input": 7})  # Outside any stage
+        trace.finish()
+
+        by_stage = {s.stage: s for s in trace.stages}
+        assert by_stage["ocr"].tokens_input == 10
+        assert by_stage["analyze"].tokens_input == 500
+        assert by_stage["analyze"].model_id == "gemini-2.5-pro"
+        assert by_stage["analyze"].wall_ms >= 10
+        assert len(context.ai_usage) == 3
+        assert trace.summary()["tokens_input"] == 510
+
+    async def test_stage_status_on_error(self):
+        trace = PipelineTrace("p", _context())
+
+        with pytest.raises(StepExecutionError):
+            with trace.stage("ocr", _UsageStep("ocr")):
+                raise StepExecutionError("ocr", "boom")
+        trace.finish(PipelineExecutionError("p", "boom", step="ocr"))
+
+        summary = trace.summary()
+        assert summary["stages"][0]["status"] == "error"
+        assert summary["succeeded"] is False
+        assert summary["failed_step"] == "ocr"
+
+    async def test_step_cache_hit_is_flagged(self):
+        context = _context()
+        context.add_evidence("audio:session", "gs://kura-vault/audio/session.webm")
+        storage = MagicMock()
+        storage.get_generation.return_value = 1234
+        cache = StepCache(AsyncMock(), storage)
+        cache.get = AsyncMock(return_value={"transcript": "Texto memorizado"})
+        step = get_step("transcribe")
+        trace = PipelineTrace("p", context)
+
+        with trace.stage("transcribe", step) as span:
+            await cache.execute(step, context)
+
+        assert span.cached is True
+        assert span.tokens_input == 0
+
+    async def test_evidence_size(self, tmp_path):
+        audio = tmp_path / "session.webm"
+        audio.write_bytes(b"x" * 2048)
+        storage = MagicMock()
+        storage.get_size.return_value = 4096
+
+        assert await evidence_size(str(audio)) == 2048
+        assert await evidence_size("gs://kura-vault/a.webm", storage) == 4096
+        assert await evidence_size(str(tmp_path / "missing.webm")) is None
+        storage.get_size.side_effect = RuntimeError("forbidden")
+        assert await evidence_size("gs://kura-vault/a.webm", storage) is None
+
+
+@pytest.mark.asyncio
+class TestOrchestratorTracing:
+    async def test_run_is_traced_and_saved(self, mock_patient, mock_organization):
+        orchestrator, steps = _orchestrator(
+            [{"step": s, "depends_on": []} for s in ("ocr", "transcribe")],
+            delays={"ocr": 0.03},
+        )
+
+        with (
+            steps,
+            patch(
+                "app.services.cortex.orchestrator.settings.CORTEX_STAGE_CONCURRENCY",
+                1,
+            ),
+            patch("app.services.cortex.orchestrator.save_trace") as save,
+            patch("app.services.ai.ledger.CostLedger.log_usage", AsyncMock()),
+        ):
+            await orchestrator.run_pipeline(
+                pipeline_name="traced_pipeline",
+                patient=mock_patient,
+                organization=mock_organization,
+            )
+
+        trace = save.await_args.args[1]
+        summary = trace.summary()
+        assert summary["succeeded"] is True
+        assert summary["privacy_tier"] == "LEGACY"
+        assert [s["stage"] for s in summary["stages"]] == ["ocr", "transcribe"]
+        ocr, transcribe = summary["stages"]
+        assert ocr["model_id"] == "model-ocr"
+        assert (ocr["tokens_input"], ocr["tokens_output"]) == (100, 20)
+        # transcribe waited for the only stage slot while ocr ran
+        assert ocr["queue_wait_ms"] < 30 <= transcribe["queue_wait_ms"]
+        assert summary["finalize_ms"] is not None
+        assert summary["ledger_ms"] is not None
+        assert summary["total_ms"] >= ocr["wall_ms"] + transcribe["wall_ms"]
+
+    async def test_evidence_size_reaches_the_otel_span(self):
+        orchestrator, steps = _orchestrator([{"step": "transcribe"}])
+        node = MagicMock(config={}, step_type="transcribe", id="transcribe")
+        trace = PipelineTrace("p", _context())
+
+        with (
+            steps,
+            patch(
+                "app.services.cortex.orchestrator.evidence_size",
+                AsyncMock(return_value=2048),
+            ),
+            patch("app.services.cortex.tracing.tracer") as tracer,
+        ):
+            await orchestrator._run_stage(node, _context(), trace)
+
+        otel_span = tracer.start_span.return_value
+        attributes = otel_span.set_attributes.call_args.args[0]
+        assert attributes["cortex.evidence_bytes"] == 2048
+        otel_span.end.assert_called_once()
+
+    async def test_failed_run_is_saved_with_failed_step(
+        self, mock_patient, mock_organization
+    ):
+        orchestrator, steps = _orchestrator(
+            [{"step": "ocr"}, {"step": "transcribe", "depends_on": []}],
+            failing={"ocr"},
+            delays={"transcribe": 1},
+        )
+
+        with (
+            steps,
+            patch("app.services.cortex.orchestrator.save_trace") as save,
+            pytest.raises(PipelineExecutionError),
+        ):
+            await orchestrator.run_pipeline(
+                pipeline_name="traced_pipeline",
+                patient=mock_patient,
+                organization=mock_organization,
+            )
+
+        summary = save.await_args.args[1].summary()
+        assert summary["succeeded"] is False
+        assert summary["failed_step"] == "ocr"
+        assert {s["stage"]: s["status"] for s in summary["stages"]} == {
+            "ocr": "error",
+            "transcribe": "cancelled",
+        }
+        assert summary["ledger_ms"] is None
+
+
+@pytest.mark.asyncio
+class TestSaveTrace:
+    async def test_disabled_writes_nothing(self):
+        db = AsyncMock()
+        with patch("app.services.cortex.tracing.settings.CORTEX_TRACE_ENABLED", False):
+            await save_trace(db, PipelineTrace("p", _context()))
+        db.execute.assert_not_awaited()
+
+    async def test_write_errors_are_swallowed(self):
+        db = AsyncMock()
+        db.begin_nested = MagicMock()
+        db.execute.side_effect = RuntimeError("connection reset")
+        trace = PipelineTrace("p", _context())
+        trace.finish()
+
+        await save_trace(db, trace)  # Does not raise
+
+        db.execute.assert_awaited_once()
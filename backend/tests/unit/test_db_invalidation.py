@@ -0,0 +1,68 @@
+"""
+Commit-Driven Invalidation Tests
+
+Covers the shared session hooks of app.db.invalidation:
+1. Scopes collected on flush are applied once, after commit, per cache
+2. A rollback discards them
+3. Re-registering a cache replaces its functions
+"""
+
+from unittest.mock import MagicMock, patch
+
+from app.db import invalidation
+
+
+def _session():
+    session = MagicMock()
+    session.info = {}
+    return session
+
+
+class TestCommitInvalidation:
+    def setup_method(self):
+        self.handlers = patch.dict(invalidation._handlers, clear=True)
+        self.handlers.start()
+
+    def teardown_method(self):
+        self.handlers.stop()
+
+    def test_flushed_scopes_applied_after_commit(self):
+        applied = {}
+        invalidation.register_commit_invalidation(
+            "a", lambda session: {1}, lambda scopes: applied.setdefault("a", scopes)
+        )
+        invalidation.register_commit_invalidation(
+            "b", lambda session: set(), lambda scopes: applied.setdefault("b", scopes)
+        )
+        session = _session()
+
+        invalidation._collect_changes(session, None)
+        invalidation._collect_changes(session, None)
+        assert applied == {}  # Nothing before commit
+
+        invalidation._apply_after_commit(session)
+        assert applied == {"a": {1}}  # b changed nothing
+        assert session.info == {}
+
+    def test_rollback_discards_scopes(self):
+        apply = MagicMock()
+        invalidation.register_commit_invalidation("a", lambda session: {1}, apply)
+        session = _session()
+
+        invalidation._collect_changes(session, None)
+        invalidation._discard_after_rollback(session)
+        invalidation._apply_after_commit(session)
+
+        apply.assert_not_called()
+
+    def test_reregistering_replaces(self):
+        old, new = MagicMock(), MagicMock()
+        invalidation.register_commit_invalidation("a", lambda session: {1}, old)
+        invalidation.register_commit_invalidation("a", lambda session: {2}, new)
+        session = _session()
+
+        invalidation._collect_changes(session, None)
+        invalidation._apply_after_commit(session)
+
+        old.assert_not_called()
+        new.assert_called_once_with({2})
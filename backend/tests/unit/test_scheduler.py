@@ -0,0 +1,81 @@
+"""
+Cluster Scheduler Tests
+
+Covers the parts of the leader-elected scheduler that need no database:
+1. Run slots are aligned to interval boundaries plus the job's offset
+2. The default jobs are staggered (the conversation analyzer included)
+3. Followers skip runs without touching the database
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from app.workers.scheduler import (
+    ClusterScheduler,
+    ScheduledJob,
+    next_slot,
+    scheduled_jobs,
+)
+
+HOUR = timedelta(hours=1)
+
+
+class TestNextSlot:
+    def test_hourly_with_offset(self):
+        now = datetime(2030, 1, 7, 10, 20, tzinfo=timezone.utc)
+        assert next_slot(now, HOUR, timedelta(minutes=15)) == now.replace(
+            hour=11, minute=15
+        )
+        assert next_slot(now, HOUR, timedelta(minutes=30)) == now.replace(minute=30)
+
+    def test_exactly_on_a_slot_moves_to_the_next(self):
+        now = datetime(2030, 1, 7, 10, 15, tzinfo=timezone.utc)
+        assert next_slot(now, HOUR, timedelta(minutes=15)) == now + HOUR
+
+    def test_same_slots_on_every_instance(self):
+        """Instances starting at different times agree on the schedule."""
+        early = datetime(2030, 1, 7, 10, 1, tzinfo=timezone.utc)
+        late = datetime(2030, 1, 7, 10, 44, tzinfo=timezone.utc)
+        five = timedelta(minutes=5)
+        offset = timedelta(minutes=2)
+
+        first = next_slot(early, five, offset)
+        assert first.minute == 2
+        assert (next_slot(late, five, offset) - first) % five == timedelta(0)
+
+
+class TestDefaultJobs:
+    def test_hourly_jobs_are_staggered(self):
+        hourly = [job for job in scheduled_jobs() if job.interval == HOUR]
+
+        assert len(hourly) == 2
+        assert len({job.offset for job in hourly}) == 2
+
+    def test_conversation_analyzer_avoids_other_slots(self):
+        jobs = {job.id: job for job in scheduled_jobs()}
+        analyzer = jobs.pop("conversation_analyzer")
+        start = datetime(2030, 1, 7, tzinfo=timezone.utc)
+
+        def slots(job):
+            return {
+                next_slot(start + timedelta(minutes=m), job.interval, job.offset)
+                for m in range(0, 120, 5)
+            }
+
+        taken = set().union(*(slots(job) for job in jobs.values()))
+        assert not slots(analyzer) & taken
+
+
+@pytest.mark.asyncio
+class TestFollowerSkipsRuns:
+    async def test_not_leader_does_not_run(self):
+        run = AsyncMock()
+        job = ScheduledJob("test", "Test", run, HOUR)
+        scheduler = ClusterScheduler(jobs=[job])
+
+        with patch("app.db.base.get_session_factory") as factory:
+            assert await scheduler.run_job(job) is None
+
+        run.assert_not_awaited()
+        factory.assert_not_called()